@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import text
 from ..db.database import get_db
 from ..core.config import settings
+from ..services.email_service import email_service
 import os
 from typing import Dict, Any
 from datetime import datetime
@@ -254,6 +255,16 @@ async def debug_processing_queue_stats(db: Session = Depends(get_db)):
     except Exception as e:
         return {"error": str(e), "timestamp": datetime.utcnow().isoformat()}
 
+@router.get("/email/outbox-stats")
+async def debug_email_outbox_stats():
+    """Email outbox delivery metrics and queue state without authentication"""
+    if not email_service.outbox:
+        return {"enabled": False, "timestamp": datetime.utcnow().isoformat()}
+    try:
+        return {"enabled": True, **email_service.outbox.metrics(), "timestamp": datetime.utcnow().isoformat()}
+    except Exception as e:
+        return {"error": str(e), "timestamp": datetime.utcnow().isoformat()}
+
 @router.get("/processing/deck/{deck_id}")
 async def debug_deck_processing(deck_id: int, db: Session = Depends(get_db)):
     """Get comprehensive deck processing information without authentication"""
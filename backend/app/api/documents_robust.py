@@ -5,19 +5,23 @@ This replaces the fragile in-memory processing with a persistent queue system
 that survives server restarts and handles failures gracefully.
 """
 
+import asyncio
 import logging
 import os
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException, UploadFile, Depends, BackgroundTasks
+from fastapi import APIRouter, HTTPException, UploadFile, Depends, BackgroundTasks, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 
-from ..core.volume_storage import volume_storage
+from ..core.volume_storage import volume_storage, UploadTooLargeError
 from ..core.config import settings
+from ..core.access_control import check_project_access
 from ..db.models import User, ProjectDocument, ProjectMember
 from ..db.database import get_db
 from ..services.processing_queue import processing_queue_manager, TaskPriority
+from ..services.progress_events import progress_broadcaster, ProgressSubscription, format_sse, RESYNC_SECONDS
 from .auth import get_current_user
 
 logger = logging.getLogger(__name__)
@@ -59,12 +63,41 @@ async def upload_document_robust(
         project_id, company_id, project_name = project_result
         logger.info(f"User {current_user.email} uploading to project {project_id} ({project_name}) with company_id: {company_id}")
         
-        # Save file to shared volume
-        file_path = volume_storage.save_upload(
-            file.file, 
-            file.filename, 
-            current_user.company_name
-        )
+        # Stream file to shared volume, hashing it on the way
+        try:
+            stored_upload = await volume_storage.save_upload_stream(
+                file,
+                file.filename,
+                current_user.company_name,
+                max_size=settings.MAX_UPLOAD_SIZE
+            )
+        except UploadTooLargeError:
+            raise HTTPException(
+                status_code=413,
+                detail=f"File too large. Maximum size is {settings.MAX_UPLOAD_SIZE // (1024*1024)}MB"
+            )
+        file_path = stored_upload.file_path
+        
+        # Reject re-uploads of an identical file into the same project
+        duplicate_document = db.query(ProjectDocument.id).filter(
+            ProjectDocument.project_id == project_id,
+            ProjectDocument.file_hash == stored_upload.file_hash,
+            ProjectDocument.is_active == True
+        ).first()
+        if duplicate_document:
+            await asyncio.to_thread(volume_storage.delete_file, file_path)
+            logger.info(f"Duplicate upload of {file.filename} by {current_user.email} matches document {duplicate_document.id}")
+            raise HTTPException(
+                status_code=409,
+                detail=f"This file has already been uploaded to the project (document {duplicate_document.id})"
+            )
+        
+        # A pitch deck uploaded to a project that already has one is the next version of it
+        previous_version = db.query(ProjectDocument.id, ProjectDocument.version_number).filter(
+            ProjectDocument.project_id == project_id,
+            ProjectDocument.document_type == "pitch_deck",
+            ProjectDocument.is_active == True
+        ).order_by(ProjectDocument.upload_date.desc(), ProjectDocument.id.desc()).first()
         
         # Create ProjectDocument - clean architecture
         project_document = ProjectDocument(
@@ -73,8 +106,12 @@ async def upload_document_robust(
             file_name=file.filename,
             file_path=file_path,
             original_filename=file.filename,
+            file_size=stored_upload.file_size,
+            file_hash=stored_upload.file_hash,
             uploaded_by=current_user.id,
-            processing_status="queued"
+            processing_status="queued",
+            previous_version_id=previous_version.id if previous_version else None,
+            version_number=(previous_version.version_number or 1) + 1 if previous_version else 1
         )
         db.add(project_document)
         db.commit()
@@ -116,6 +153,9 @@ async def upload_document_robust(
             "upload_timestamp": project_document.upload_date.isoformat(),
             "project_id": project_id  # Include project_id for new architecture
         }
+        if previous_version:
+            # Lets the text step carry forward answers for slides unchanged since the previous version
+            processing_options["previous_document_id"] = previous_version.id
         processing_options.update(template_config)  # Add template config if available
         
         # Use new 4-layer processing pipeline architecture
@@ -125,7 +165,8 @@ async def upload_document_robust(
             company_id=company_id,
             priority=TaskPriority.NORMAL,
             processing_options=processing_options,
-            db=db
+            db=db,
+            submitted_by=current_user.id
         )
         
         task_id = project_document.id if pipeline_created else None
@@ -149,9 +190,14 @@ async def upload_document_robust(
             "project_id": project_id,
             "file_path": file_path,
             "processing_status": "queued",
-            "task_id": task_id
+            "task_id": task_id,
+            "version_number": project_document.version_number,
+            "previous_version_id": project_document.previous_version_id
         }
         
+    except HTTPException:
+        db.rollback()
+        raise
     except Exception as e:
         logger.error(f"Upload failed: {str(e)}")
         db.rollback()
@@ -210,6 +256,62 @@ async def get_processing_progress_robust(
         logger.error(f"Error getting processing progress for document {document_id}: {e}")
         raise HTTPException(status_code=500, detail="Failed to get processing progress")
 
+async def _progress_event_stream(request: Request, subscription: ProgressSubscription):
+    """Yield queued progress events as SSE, with keepalive comments while idle"""
+    try:
+        while not await request.is_disconnected():
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), timeout=RESYNC_SECONDS)
+                yield format_sse(event)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+    finally:
+        progress_broadcaster.unsubscribe(subscription)
+
+def _progress_stream_response(request: Request, subscription: ProgressSubscription) -> StreamingResponse:
+    return StreamingResponse(
+        _progress_event_stream(request, subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/processing-progress/{document_id}/stream")
+async def stream_processing_progress(
+    document_id: int,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Server-sent events with the progress of one document, pushed whenever it changes"""
+    document = db.query(ProjectDocument.project_id).filter(ProjectDocument.id == document_id).first()
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found")
+    if not check_project_access(current_user, document.project_id, db):
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    # Release the connection; the stream can stay open for a long time
+    db.close()
+    
+    subscription = await progress_broadcaster.subscribe(document_id=document_id)
+    return _progress_stream_response(request, subscription)
+
+@router.get("/projects/{project_id}/processing-progress/stream")
+async def stream_project_processing_progress(
+    project_id: int,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Server-sent events with the progress of every document in a project"""
+    if not check_project_access(current_user, project_id, db):
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    # Release the connection; the stream can stay open for a long time
+    db.close()
+    
+    subscription = await progress_broadcaster.subscribe(project_id=project_id)
+    return _progress_stream_response(request, subscription)
+
 @router.get("/failure-details/{document_id}")
 async def get_document_failure_details(
     document_id: int,
@@ -376,7 +478,8 @@ async def retry_failed_document(
                 company_id=company_id,
                 priority=TaskPriority.HIGH,  # Give retry higher priority
                 processing_options=processing_options,
-                db=db
+                db=db,
+                submitted_by=current_user.id
             )
             if task_id:
                 created_tasks.append(task_type)
@@ -440,18 +543,20 @@ async def recover_abandoned_tasks(
 @router.post("/admin/retry-failed-tasks")
 async def retry_failed_tasks(
     max_age_hours: int = 24,
+    resume: bool = True,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Retry failed processing tasks (GP only)"""
+    """Retry failed processing tasks (GP only), resuming from their checkpoints unless resume=false"""
     if current_user.role != "gp":
         raise HTTPException(status_code=403, detail="Access denied")
     
     try:
-        retried_count = processing_queue_manager.retry_failed_tasks(db, max_age_hours)
+        retried_count = processing_queue_manager.retry_failed_tasks(db, max_age_hours, resume=resume)
         return {
             "message": f"Scheduled {retried_count} failed tasks for retry",
-            "retried_count": retried_count
+            "retried_count": retried_count,
+            "resume": resume
         }
     except Exception as e:
         logger.error(f"Error retrying failed tasks: {e}")
@@ -3,7 +3,7 @@ Dojo API Endpoints
 Handles training data uploads and management for GPs
 """
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, BackgroundTasks, Query
 from sqlalchemy.orm import Session
 from typing import List, Dict, Any, Optional
 import os
@@ -14,13 +14,21 @@ import glob
 from pathlib import Path
 import uuid
 import json
+import time
+import asyncio
 from datetime import datetime
 from sqlalchemy import func, text
 
 from ..db.database import get_db
-from ..db.models import User, ProjectDocument, Project
+from ..db.models import User, ProjectDocument, Project, load_json_column
 import json
 from .auth import get_current_user
+from ..core.volume_storage import UPLOAD_CHUNK_SIZE, UploadTooLargeError
+from ..services.dojo_ingestion import dojo_zip_ingester, DojoUploadResult
+from ..services.dojo_progress import dojo_progress_store
+from ..services.processing_queue import processing_queue_manager, TaskLane
+from ..services.experiment_details import experiment_details_service, parse_sections, MAX_PAGE_SIZE
+from ..services.slide_index import slide_index_service
 
 # Import for extraction testing functionality
 from pydantic import BaseModel
@@ -29,22 +37,6 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/dojo", tags=["dojo"])
 
-# In-memory progress tracking for current deck processing
-progress_tracker = {
-    "step2": {
-        "current_deck": "", 
-        "status": "idle", 
-        "progress": 0, 
-        "total": 0,
-        "start_time": None,
-        "completion_time": None,
-        "processing_times": [],
-        "current_deck_start_time": None
-    },
-    "step3": {"current_deck": "", "status": "idle", "progress": 0, "total": 0}, 
-    "step4": {"current_deck": "", "current_chapter": "", "status": "idle", "progress": 0, "total": 0}
-}
-
 # Dojo configuration
 # Use environment-aware path from settings with unified structure
 from ..core.config import settings
@@ -98,168 +90,114 @@ def ensure_dojo_project(db: Session) -> int:
     
     return dojo_project.id
 
-def check_duplicate_file(db: Session, file_name: str, file_hash: str) -> Optional[int]:
-    """Check if file already exists by name or hash. Returns document_id if found."""
-    dojo_project_id = ensure_dojo_project(db)
+def start_upload_progress(zip_filename: str, user_id: int) -> str:
+    """Start a progress record for a ZIP upload"""
+    return dojo_progress_store.start_job(
+        "upload",
+        user_id=user_id,
+        details={"zip_filename": zip_filename, "new_files": 0, "duplicate_files": 0, "error_files": 0}
+    )
+
+def upload_progress_callback(job_id: str):
+    """Progress callback for ZIP ingestion, exposed through /extraction-test/progress"""
+    def update_upload_progress(processed: int, total: int, current_file: str, result: DojoUploadResult):
+        dojo_progress_store.update(
+            job_id,
+            current_deck=current_file,
+            progress=processed,
+            total=total,
+            details=upload_result_details(result)
+        )
+    return update_upload_progress
+
+def upload_result_details(result: DojoUploadResult) -> Dict[str, int]:
+    return {
+        "new_files": result.success_count,
+        "duplicate_files": result.duplicate_count,
+        "error_files": result.error_count
+    }
+
+def finish_upload_progress(job_id: str, status: str, result: Optional[DojoUploadResult] = None):
+    """Mark the upload progress record as completed or failed"""
+    if result:
+        dojo_progress_store.finish(job_id, status, details=upload_result_details(result))
+    else:
+        dojo_progress_store.finish(job_id, status)
+
+def resume_step_job(step: str, user_id: int, total: int) -> str:
+    """Continue the user's running job of a multi-request step, or start a fresh one"""
+    job_id = dojo_progress_store.latest_job_id(step, user_id=user_id, active_only=True)
+    if not job_id:
+        # Finished jobs keep their result; a new run gets its own progress and start time
+        return dojo_progress_store.start_job(step, user_id=user_id, total=total)
+    dojo_progress_store.update(job_id, total=total)
+    return job_id
+
+def get_latest_visual_analysis(db: Session, document_ids: List[int]) -> Dict[int, Any]:
+    """Newest cached visual analysis of each document, fetched with a single query"""
+    if not document_ids:
+        return {}
     
-    existing = db.query(ProjectDocument).filter(
-        ProjectDocument.project_id == dojo_project_id,
-        (ProjectDocument.file_name == file_name) | (ProjectDocument.extracted_data.contains(f'"file_hash": "{file_hash}"'))
-    ).first()
-    return existing.id if existing else None
+    rows = db.execute(text("""
+        SELECT DISTINCT ON (document_id) document_id, analysis_result_json
+        FROM visual_analysis_cache
+        WHERE document_id = ANY(:document_ids)
+        ORDER BY document_id, created_at DESC
+    """), {"document_ids": list(document_ids)}).fetchall()
+    
+    cached_analysis = {}
+    for document_id, analysis_result_json in rows:
+        try:
+            cached_analysis[document_id] = load_json_column(analysis_result_json)
+        except (TypeError, ValueError) as e:
+            logger.error(f"Invalid cached visual analysis for document {document_id}: {e}")
+    return cached_analysis
+
+async def save_dojo_zip_upload(file: UploadFile, target_path: str) -> int:
+    """Stream an uploaded ZIP to disk in chunks instead of reading it into memory; returns its size"""
+    file_size = 0
+    target = await asyncio.to_thread(open, target_path, "wb")
+    try:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            file_size += len(chunk)
+            if file_size > MAX_ZIP_SIZE:
+                raise UploadTooLargeError(f"ZIP exceeds {MAX_ZIP_SIZE} bytes")
+            await asyncio.to_thread(target.write, chunk)
+    except BaseException:
+        await asyncio.to_thread(target.close)
+        if os.path.exists(target_path):
+            os.remove(target_path)
+        raise
+    await asyncio.to_thread(target.close)
+    return file_size
 
-async def extract_dojo_zip_only(zip_file_path: str, uploaded_by: int, db: Session, original_filename: str = None):
-    """Extract dojo zip file and create database entries (no AI processing)"""
+def extract_dojo_zip_only(zip_file_path: str, uploaded_by: int, dojo_project_id: int, original_filename: str = None, job_id: str = None):
+    """Stream the PDFs of a dojo zip file into the dojo project (no AI processing)
+    
+    Synchronous on purpose: BackgroundTasks runs it in the threadpool instead of on the event loop.
+    """
+    zip_filename = original_filename if original_filename else os.path.basename(zip_file_path)
     try:
         logger.info(f"Extracting dojo zip file: {zip_file_path}")
+        if job_id is None:
+            job_id = start_upload_progress(zip_filename, uploaded_by)
+        
+        result = dojo_zip_ingester.ingest(
+            zip_file_path,
+            uploaded_by,
+            dojo_project_id,
+            zip_filename=zip_filename,
+            progress_callback=upload_progress_callback(job_id)
+        )
+        finish_upload_progress(job_id, "completed", result)
         
-        # Get original ZIP filename for database storage
-        zip_filename = original_filename if original_filename else os.path.basename(zip_file_path)
-        
-        # Extract zip file
-        extract_dir = os.path.join(DOJO_BASE_PATH, f"extract_{uuid.uuid4().hex}")
-        os.makedirs(extract_dir, exist_ok=True)
-        
-        with zipfile.ZipFile(zip_file_path, 'r') as zip_ref:
-            zip_ref.extractall(extract_dir)
-        
-        # Find all PDF files in extracted content
-        pdf_files = []
-        for root, dirs, files in os.walk(extract_dir):
-            for file in files:
-                if file.lower().endswith('.pdf'):
-                    pdf_files.append(os.path.join(root, file))
-        
-        logger.info(f"Found {len(pdf_files)} PDF files in dojo upload")
-        
-        # Process each PDF file (create DB entries only, no AI processing)
-        processed_count = 0
-        for pdf_path in pdf_files:
-            try:
-                # Generate unique filename
-                original_name = os.path.basename(pdf_path)
-                unique_name = f"{uuid.uuid4().hex}_{original_name}"
-                
-                # Move to dojo uploads directory
-                final_path = os.path.join(DOJO_UPLOADS_PATH, unique_name)
-                shutil.move(pdf_path, final_path)
-                
-                # Ensure dojo project exists
-                dojo_project_id = ensure_dojo_project(db)
-                
-                # Calculate file hash for duplicate detection
-                file_hash = calculate_file_hash(final_path)
-                
-                # Create database record using ProjectDocument (clean architecture)
-                document = ProjectDocument(
-                    project_id=dojo_project_id,
-                    document_type="pitch_deck",
-                    file_name=original_name,
-                    file_path=f"projects/dojo/uploads/{unique_name}",
-                    original_filename=original_name,
-                    uploaded_by=uploaded_by,
-                    processing_status="pending",  # Ready for manual AI processing
-                    extracted_data=json.dumps({
-                        "data_source": "dojo",
-                        "zip_filename": zip_filename,
-                        "file_hash": file_hash
-                    })
-                )
-                db.add(document)
-                processed_count += 1
-                
-            except Exception as e:
-                logger.error(f"Error processing PDF {pdf_path}: {e}")
-                continue
-        
-        # Commit all database changes
-        db.commit()
-        
-        # Clean up
-        shutil.rmtree(extract_dir, ignore_errors=True)
-        os.remove(zip_file_path)
-        
-        logger.info(f"Successfully extracted {processed_count} PDF files from dojo upload")
+        logger.info(f"Successfully extracted {result.success_count} PDF files from dojo upload ({result.duplicate_count} duplicates skipped)")
         
     except Exception as e:
         logger.error(f"Error extracting dojo zip file: {e}")
-        # Clean up on error
-        if os.path.exists(extract_dir):
-            shutil.rmtree(extract_dir, ignore_errors=True)
-        if os.path.exists(zip_file_path):
-            os.remove(zip_file_path)
-
-async def process_dojo_zip(zip_file_path: str, uploaded_by: int, db: Session, original_filename: str = None):
-    """Background task to process uploaded dojo zip file"""
-    try:
-        logger.info(f"Processing dojo zip file: {zip_file_path}")
-        
-        # Get original ZIP filename for database storage
-        zip_filename = original_filename if original_filename else os.path.basename(zip_file_path)
+        finish_upload_progress(job_id, "error")
         
-        # Extract zip file
-        extract_dir = os.path.join(DOJO_BASE_PATH, f"extract_{uuid.uuid4().hex}")
-        os.makedirs(extract_dir, exist_ok=True)
-        
-        with zipfile.ZipFile(zip_file_path, 'r') as zip_ref:
-            zip_ref.extractall(extract_dir)
-        
-        # Find all PDF files in extracted content
-        pdf_files = []
-        for root, dirs, files in os.walk(extract_dir):
-            for file in files:
-                if file.lower().endswith('.pdf'):
-                    pdf_files.append(os.path.join(root, file))
-        
-        logger.info(f"Found {len(pdf_files)} PDF files in dojo upload")
-        
-        # Process each PDF file
-        processed_count = 0
-        for pdf_path in pdf_files:
-            try:
-                # Generate unique filename
-                original_name = os.path.basename(pdf_path)
-                unique_name = f"{uuid.uuid4().hex}_{original_name}"
-                
-                # Move to dojo uploads directory
-                final_path = os.path.join(DOJO_UPLOADS_PATH, unique_name)
-                shutil.move(pdf_path, final_path)
-                
-                # Create database record
-                document = ProjectDocument(
-                    project_id=dojo_project_id,
-                    document_type="pitch_deck",
-                    file_name=original_name,
-                    file_path=f"projects/dojo/uploads/{unique_name}",
-                    original_filename=original_name,
-                    uploaded_by=uploaded_by,
-                    processing_status="pending",
-                    extracted_data=json.dumps({
-                        "data_source": "dojo",
-                        "zip_filename": zip_filename
-                    })
-                )
-                db.add(document)
-                processed_count += 1
-                
-            except Exception as e:
-                logger.error(f"Error processing PDF {pdf_path}: {e}")
-                continue
-        
-        # Commit all database changes
-        db.commit()
-        
-        # Clean up
-        shutil.rmtree(extract_dir, ignore_errors=True)
-        os.remove(zip_file_path)
-        
-        logger.info(f"Successfully processed {processed_count} PDF files from dojo upload")
-        
-    except Exception as e:
-        logger.error(f"Error processing dojo zip file: {e}")
-        # Clean up on error
-        if os.path.exists(extract_dir):
-            shutil.rmtree(extract_dir, ignore_errors=True)
+    finally:
         if os.path.exists(zip_file_path):
             os.remove(zip_file_path)
 
@@ -286,32 +224,28 @@ async def upload_dojo_zip(
                 detail="Only ZIP files are allowed"
             )
         
-        # Check file size
-        file_size = 0
-        content = await file.read()
-        file_size = len(content)
+        # Ensure dojo directories exist
+        ensure_dojo_directories()
         
-        if file_size > MAX_ZIP_SIZE:
+        # Stream uploaded file to a temporary location, enforcing the size limit
+        temp_file_path = os.path.join(DOJO_BASE_PATH, f"temp_{uuid.uuid4().hex}.zip")
+        try:
+            file_size = await save_dojo_zip_upload(file, temp_file_path)
+        except UploadTooLargeError:
             raise HTTPException(
                 status_code=400,
                 detail=f"File size exceeds maximum limit of {MAX_ZIP_SIZE // (1024*1024)} MB"
             )
         
-        # Ensure dojo directories exist
-        ensure_dojo_directories()
-        
-        # Save uploaded file temporarily
-        temp_file_path = os.path.join(DOJO_BASE_PATH, f"temp_{uuid.uuid4().hex}.zip")
-        with open(temp_file_path, 'wb') as temp_file:
-            temp_file.write(content)
-        
         # Extract ZIP file immediately (but don't do AI processing)
+        job_id = start_upload_progress(file.filename, current_user.id)
         background_tasks.add_task(
             extract_dojo_zip_only,
             temp_file_path,
             current_user.id,
-            db,
-            file.filename  # Pass original filename
+            ensure_dojo_project(db),
+            file.filename,  # Pass original filename
+            job_id
         )
         
         logger.info(f"Dojo zip upload initiated by {current_user.email}: {file.filename} ({file_size} bytes)")
@@ -320,7 +254,8 @@ async def upload_dojo_zip(
             "message": "Dojo training data uploaded successfully",
             "filename": file.filename,
             "size": file_size,
-            "status": "extracting"
+            "status": "extracting",
+            "job_id": job_id
         }
         
     except HTTPException:
@@ -354,37 +289,43 @@ async def upload_dojo_zip_enhanced(
                 detail="Only ZIP files are allowed"
             )
         
-        # Check file size
-        content = await file.read()
-        file_size = len(content)
+        # Ensure dojo directories exist
+        ensure_dojo_directories()
         
-        if file_size > MAX_ZIP_SIZE:
+        # Stream uploaded file to a temporary location, enforcing the size limit
+        temp_path = os.path.join(DOJO_BASE_PATH, f"temp_{uuid.uuid4().hex}_{os.path.basename(file.filename)}")
+        try:
+            await save_dojo_zip_upload(file, temp_path)
+        except UploadTooLargeError:
             raise HTTPException(
                 status_code=413,
                 detail=f"File too large. Maximum size is {MAX_ZIP_SIZE // (1024*1024)}MB"
             )
         
-        # Ensure dojo directories exist
-        ensure_dojo_directories()
-        
-        # Save uploaded file temporarily
-        temp_path = os.path.join(DOJO_BASE_PATH, f"temp_{uuid.uuid4().hex}_{file.filename}")
-        with open(temp_path, "wb") as f:
-            f.write(content)
-        
         # Import enhanced extraction function
         from .dojo_enhanced import extract_dojo_zip_enhanced
         
-        # Process ZIP file with enhanced duplicate detection
-        result = await extract_dojo_zip_enhanced(
-            zip_file_path=temp_path,
-            uploaded_by=current_user.id,
-            db=db,
-            dojo_uploads_path=DOJO_UPLOADS_PATH,
-            original_filename=file.filename
-        )
+        # Process ZIP file with enhanced duplicate detection, off the event loop
+        dojo_project_id = ensure_dojo_project(db)
+        job_id = start_upload_progress(file.filename, current_user.id)
+        try:
+            result = await asyncio.to_thread(
+                extract_dojo_zip_enhanced,
+                zip_file_path=temp_path,
+                uploaded_by=current_user.id,
+                dojo_uploads_path=DOJO_UPLOADS_PATH,
+                dojo_project_id=dojo_project_id,
+                original_filename=file.filename,
+                progress_callback=upload_progress_callback(job_id)
+            )
+        except Exception:
+            finish_upload_progress(job_id, "error")
+            raise
+        finish_upload_progress(job_id, "completed", result)
         
-        return result.to_dict()
+        response_data = result.to_dict()
+        response_data["job_id"] = job_id
+        return response_data
         
     except HTTPException:
         raise
@@ -671,8 +612,8 @@ async def delete_all_dojo_files(
             exp_cleanup_result = db.execute(text("""
                 UPDATE extraction_experiments 
                 SET template_processing_results_json = NULL
-                WHERE template_processing_results_json LIKE '%"deck_id":%'
-                AND template_processing_results_json LIKE '%"data_source": "dojo"%'
+                WHERE template_processing_results_json::text LIKE '%"deck_id":%'
+                AND template_processing_results_json::text LIKE '%"data_source": "dojo"%'
             """))
             logger.info(f"Cleaned up extraction experiment references")
         except Exception as e:
@@ -923,9 +864,10 @@ async def get_cached_decks_count(
 
 @router.get("/extraction-test/progress")
 async def get_processing_progress(
+    job_id: Optional[str] = None,
     current_user: User = Depends(get_current_user)
 ):
-    """Get current processing progress for all steps with enhanced timing data"""
+    """Get the latest progress of every step (or of one job) with timing data"""
     try:
         # Only GPs can access progress
         if current_user.role != "gp":
@@ -934,38 +876,13 @@ async def get_processing_progress(
                 detail="Only GPs can access processing progress"
             )
         
-        # Enhance step2 progress with calculated timing data
-        step2_data = progress_tracker["step2"].copy()
-        if step2_data["processing_times"]:
-            # Calculate average processing time
-            avg_time = sum(step2_data["processing_times"]) / len(step2_data["processing_times"])
-            step2_data["average_processing_time"] = avg_time
-            
-            # Calculate total processing time if completed
-            if step2_data.get("start_time") and step2_data.get("completion_time"):
-                step2_data["total_processing_time"] = step2_data["completion_time"] - step2_data["start_time"]
-            elif step2_data.get("start_time"):
-                import time
-                step2_data["total_processing_time"] = time.time() - step2_data["start_time"]
-        
-        # Enhance step3 progress with calculated timing data
-        step3_data = progress_tracker["step3"].copy()
-        if step3_data.get("start_time"):
-            # Calculate total processing time if completed
-            if step3_data.get("completion_time"):
-                step3_data["total_processing_time"] = step3_data["completion_time"] - step3_data["start_time"]
-                # Calculate average time per extraction type (5 types)
-                step3_data["average_processing_time"] = step3_data["total_processing_time"] / 5
-            else:
-                import time
-                step3_data["total_processing_time"] = time.time() - step3_data["start_time"]
-                step3_data["average_processing_time"] = step3_data["total_processing_time"] / max(step3_data.get("progress", 1), 1)
-        
-        enhanced_tracker = progress_tracker.copy()
-        enhanced_tracker["step2"] = step2_data
-        enhanced_tracker["step3"] = step3_data
+        if job_id:
+            job = dojo_progress_store.get_job(job_id)
+            if not job:
+                raise HTTPException(status_code=404, detail="Job not found")
+            return job
         
-        return enhanced_tracker
+        return dojo_progress_store.latest_jobs(user_id=current_user.id)
         
     except HTTPException:
         raise
@@ -976,6 +893,46 @@ async def get_processing_progress(
             detail="Failed to get processing progress"
         )
 
+@router.get("/extraction-test/jobs")
+async def list_processing_jobs(
+    active_only: bool = False,
+    limit: int = 20,
+    current_user: User = Depends(get_current_user)
+):
+    """List recent dojo batch jobs of the current user"""
+    if current_user.role != "gp":
+        raise HTTPException(
+            status_code=403,
+            detail="Only GPs can access processing progress"
+        )
+    
+    try:
+        jobs = dojo_progress_store.list_jobs(user_id=current_user.id, active_only=active_only, limit=min(limit, 100))
+        return {"jobs": jobs}
+    except Exception as e:
+        logger.error(f"Error listing dojo jobs: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail="Failed to list processing jobs"
+        )
+
+@router.get("/extraction-test/jobs/{job_id}")
+async def get_processing_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Get the progress of one dojo batch job"""
+    if current_user.role != "gp":
+        raise HTTPException(
+            status_code=403,
+            detail="Only GPs can access processing progress"
+        )
+    
+    job = dojo_progress_store.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
 @router.post("/extraction-test/update-progress")
 async def update_processing_progress(
     step: str,
@@ -983,6 +940,7 @@ async def update_processing_progress(
     status: str = "idle",
     progress: int = 0,
     total: int = 0,
+    job_id: Optional[str] = None,
     current_user: User = Depends(get_current_user)
 ):
     """Update current processing progress - called by GPU instance"""
@@ -994,13 +952,14 @@ async def update_processing_progress(
                 detail="Only GPs can update processing progress"
             )
         
-        if step in progress_tracker:
-            progress_tracker[step]["current_deck"] = current_deck
-            progress_tracker[step]["status"] = status
+        # Several dojo jobs may run at once, so only the job named by the caller is updated
+        if job_id:
+            fields = {"current_deck": current_deck, "status": status}
             if progress > 0:
-                progress_tracker[step]["progress"] = progress
+                fields["progress"] = progress
             if total > 0:
-                progress_tracker[step]["total"] = total
+                fields["total"] = total
+            dojo_progress_store.update(job_id, **fields)
             logger.info(f"Updated progress for {step}: {current_deck} ({status}) - {progress}/{total}")
         
         return {"success": True}
@@ -1017,7 +976,6 @@ async def update_processing_progress(
 @router.post("/extraction-test/run-visual-analysis")
 async def run_visual_analysis_batch(
     request: VisualAnalysisRequest,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -1072,13 +1030,50 @@ async def run_visual_analysis_batch(
             else:
                 new_analysis_needed.append(deck)
         
-        # Start background task for visual analysis
+        # Queue one batch-lane task per deck; the GPU takes them in fair share with startup uploads
+        # and the job advances as each task reports its status
+        job_id = None
         if new_analysis_needed:
-            background_tasks.add_task(
-                process_visual_analysis_batch,
-                [deck.id for deck in new_analysis_needed],
-                request.vision_model
+            job_id = dojo_progress_store.start_job(
+                "step2",
+                user_id=current_user.id,
+                total=len(new_analysis_needed),
+                current_deck="Queued for visual analysis..."
             )
+            task_ids = []
+            for deck in new_analysis_needed:
+                task_id = processing_queue_manager.add_task(
+                    document_id=deck.id,
+                    file_path=deck.file_path,
+                    company_id="dojo",
+                    task_type="dojo_visual_analysis",
+                    processing_options={
+                        "vision_model": request.vision_model,
+                        "analysis_prompt": analysis_prompt,
+                        "dojo_job_id": job_id
+                    },
+                    db=db,
+                    lane=TaskLane.BATCH,
+                    submitted_by=current_user.id
+                )
+                if task_id:
+                    task_ids.append(task_id)
+                else:
+                    logger.error(f"Could not queue visual analysis for dojo deck {deck.id}")
+            
+            # add_task returns the active task of an earlier batch for a deck it is already analyzing with
+            # the same model and prompt; the job is recounted from its own queue tasks, so only those count
+            queued_count = db.execute(text(
+                "SELECT COUNT(*) FROM processing_queue WHERE processing_options->>'dojo_job_id' = :job_id"
+            ), {"job_id": job_id}).scalar()
+            if not task_ids:
+                dojo_progress_store.finish(job_id, "error", current_deck="Could not queue visual analysis")
+            elif not queued_count:
+                dojo_progress_store.finish(job_id, "completed", current_deck="All decks are already being analyzed by another batch")
+            elif queued_count < len(new_analysis_needed):
+                dojo_progress_store.update(job_id, total=queued_count)
+            if len(task_ids) > queued_count:
+                logger.info(f"Dojo job {job_id}: {len(task_ids) - queued_count} decks already queued by another batch")
         
         logger.info(f"Visual analysis batch started: {len(new_analysis_needed)} new, {cached_count} cached")
         
@@ -1087,7 +1082,8 @@ async def run_visual_analysis_batch(
             "total_decks": len(request.deck_ids),
             "cached_count": cached_count,
             "new_analysis_count": len(new_analysis_needed),
-            "status": "processing" if new_analysis_needed else "all_cached"
+            "status": "processing" if new_analysis_needed else "all_cached",
+            "job_id": job_id
         }
         
     except HTTPException:
@@ -1211,6 +1207,7 @@ async def test_offering_extraction(
     current_user: User = Depends(get_current_user)
 ):
     """Test company offering extraction with different models/prompts"""
+    job_id = None
     try:
         # Only GPs can run extraction tests
         if current_user.role != "gp":
@@ -1236,26 +1233,19 @@ async def test_offering_extraction(
         
         # Collect cached visual analysis for context
         deck_visual_data = {}
-        for deck in decks:
-            if request.use_cached_visual:
-                cache_result = db.execute(text(
-                    "SELECT analysis_result_json FROM visual_analysis_cache WHERE document_id = :deck_id ORDER BY created_at DESC LIMIT 1"
-                ), {"deck_id": deck.id}).fetchone()
-                
-                if cache_result:
-                    deck_visual_data[deck.id] = json.loads(cache_result[0])
-                else:
+        if request.use_cached_visual:
+            deck_visual_data = get_latest_visual_analysis(db, [deck.id for deck in decks])
+            for deck in decks:
+                if deck.id not in deck_visual_data:
                     logger.warning(f"No cached visual analysis found for deck {deck.id}")
         
-        # Update progress tracker - start step 3 processing
-        import time
-        start_time = time.time()
-        progress_tracker["step3"]["status"] = "processing"
-        progress_tracker["step3"]["current_deck"] = "Starting offering extraction..."
-        progress_tracker["step3"]["progress"] = 0
-        progress_tracker["step3"]["total"] = len(decks)
-        progress_tracker["step3"]["start_time"] = start_time
-        progress_tracker["step3"]["processing_times"] = []
+        # Start a step 3 job - the following extraction steps resume it
+        job_id = dojo_progress_store.start_job(
+            "step3",
+            user_id=current_user.id,
+            total=len(decks),
+            current_deck="Starting offering extraction..."
+        )
         
         # Get extraction prompt from database if not provided
         extraction_prompt = request.extraction_prompt
@@ -1292,8 +1282,7 @@ async def test_offering_extraction(
                     if deck:
                         result["filename"] = deck.file_name
                         # Update progress
-                        progress_tracker["step3"]["current_deck"] = f"Processing {deck.file_name}"
-                        progress_tracker["step3"]["progress"] = i + 1
+                        dojo_progress_store.update(job_id, current_deck=f"Processing {deck.file_name}", progress=i + 1)
                         # Check if visual analysis was available
                         result["visual_analysis_used"] = deck_id in deck_visual_data
         else:
@@ -1336,28 +1325,21 @@ async def test_offering_extraction(
         
         logger.info(f"Extraction test completed: {request.experiment_name} (ID: {experiment_id})")
         
-        # Update progress tracker - step 3 completed successfully
-        progress_tracker["step3"]["status"] = "completed"
-        progress_tracker["step3"]["current_deck"] = "Offering extraction completed"
-        progress_tracker["step3"]["progress"] = len(decks)
+        # Step 3 offering extraction completed successfully
+        dojo_progress_store.finish(job_id, "completed", current_deck="Offering extraction completed", progress=len(decks))
         
         # Add experiment_id to response
         response_data = experiment_data.copy()
         response_data["experiment_id"] = experiment_id
+        response_data["job_id"] = job_id
         return response_data
         
     except HTTPException:
-        # Update progress tracker - step 3 error
-        progress_tracker["step3"]["status"] = "error"
-        progress_tracker["step3"]["current_deck"] = "GPU processing failed"
-        progress_tracker["step3"]["progress"] = 0
+        dojo_progress_store.finish(job_id, "error", current_deck="GPU processing failed", progress=0)
         raise
     except Exception as e:
         logger.error(f"Error running extraction test: {e}")
-        # Update progress tracker - step 3 error
-        progress_tracker["step3"]["status"] = "error" 
-        progress_tracker["step3"]["current_deck"] = "Processing error occurred"
-        progress_tracker["step3"]["progress"] = 0
+        dojo_progress_store.finish(job_id, "error", current_deck="Processing error occurred", progress=0)
         raise HTTPException(
             status_code=500,
             detail="Failed to run extraction test"
@@ -1377,40 +1359,41 @@ async def get_extraction_experiments(
                 detail="Only GPs can view extraction experiments"
             )
         
-        experiments = db.execute(text(
-            "SELECT id, experiment_name, extraction_type, text_model_used, created_at, results_json, classification_enabled, classification_completed_at, company_name_completed_at, funding_amount_completed_at, deck_date_completed_at FROM extraction_experiments ORDER BY created_at DESC"
-        )).fetchall()
+        # Summary fields are read inside the JSONB document, so the full results never leave the database
+        experiments = db.execute(text("""
+            SELECT id, experiment_name, extraction_type, text_model_used, created_at,
+                   results_json -> 'total_decks', results_json -> 'successful_extractions',
+                   classification_enabled, classification_completed_at, company_name_completed_at,
+                   funding_amount_completed_at, deck_date_completed_at,
+                   (
+                       SELECT ROUND(AVG(length(result ->> 'offering_extraction')))
+                       FROM jsonb_array_elements(
+                           CASE WHEN jsonb_typeof(results_json -> 'results') = 'array'
+                                THEN results_json -> 'results' ELSE '[]'::jsonb END
+                       ) AS result
+                       WHERE result ->> 'offering_extraction' <> ''
+                         AND result ->> 'offering_extraction' NOT LIKE 'Error:%'
+                   ) AS average_response_length
+            FROM extraction_experiments
+            ORDER BY created_at DESC
+        """)).fetchall()
         
         experiment_data = []
         for exp in experiments:
-            results_data = json.loads(exp[5]) if exp[5] else {}
-            
-            # Calculate average response length from results
-            average_response_length = 0
-            if results_data.get("results"):
-                successful_results = [
-                    result for result in results_data["results"] 
-                    if result.get("offering_extraction") and 
-                    not result["offering_extraction"].startswith("Error:")
-                ]
-                if successful_results:
-                    total_length = sum(len(result["offering_extraction"]) for result in successful_results)
-                    average_response_length = round(total_length / len(successful_results))
-            
             experiment_data.append({
                 "id": exp[0],
                 "experiment_name": exp[1],
                 "extraction_type": exp[2], 
                 "text_model_used": exp[3],
                 "created_at": exp[4].isoformat() if exp[4] else None,
-                "total_decks": results_data.get("total_decks", 0),
-                "successful_extractions": results_data.get("successful_extractions", 0),
-                "classification_enabled": bool(exp[6]) if exp[6] is not None else False,
-                "classification_completed_at": exp[7].isoformat() if exp[7] else None,
-                "company_name_completed_at": exp[8].isoformat() if exp[8] else None,
-                "funding_amount_completed_at": exp[9].isoformat() if exp[9] else None,
-                "deck_date_completed_at": exp[10].isoformat() if exp[10] else None,
-                "average_response_length": average_response_length
+                "total_decks": exp[5] if exp[5] is not None else 0,
+                "successful_extractions": exp[6] if exp[6] is not None else 0,
+                "classification_enabled": bool(exp[7]) if exp[7] is not None else False,
+                "classification_completed_at": exp[8].isoformat() if exp[8] else None,
+                "company_name_completed_at": exp[9].isoformat() if exp[9] else None,
+                "funding_amount_completed_at": exp[10].isoformat() if exp[10] else None,
+                "deck_date_completed_at": exp[11].isoformat() if exp[11] else None,
+                "average_response_length": int(exp[12]) if exp[12] is not None else 0
             })
         
         return {
@@ -1430,10 +1413,13 @@ async def get_extraction_experiments(
 @router.get("/extraction-test/experiments/{experiment_id}")
 async def get_experiment_details(
     experiment_id: int,
+    fields: Optional[str] = Query(None, description="Comma-separated sections: results, classification, company_name, funding_amount, deck_date, template_processing"),
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get detailed results for a specific extraction experiment"""
+    """Get the results of an extraction experiment, optionally limited to some sections and one page of decks"""
     try:
         # Only GPs can view extraction experiment details
         if current_user.role != "gp":
@@ -1442,161 +1428,18 @@ async def get_experiment_details(
                 detail="Only GPs can view extraction experiment details"
             )
         
-        experiment = db.execute(text("""
-            SELECT id, experiment_name, extraction_type, text_model_used, extraction_prompt, 
-                   created_at, results_json, document_ids, classification_enabled, 
-                   classification_results_json, classification_completed_at, company_name_results_json, 
-                   company_name_completed_at, funding_amount_results_json, funding_amount_completed_at,
-                   deck_date_results_json, deck_date_completed_at
-            FROM extraction_experiments 
-            WHERE id = :exp_id
-        """), {"exp_id": experiment_id}).fetchone()
+        try:
+            sections = parse_sections(fields)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         
-        if not experiment:
+        experiment_details = experiment_details_service.get_details(db, experiment_id, sections, offset=offset, limit=limit)
+        if not experiment_details:
             raise HTTPException(
                 status_code=404,
                 detail="Experiment not found"
             )
         
-        # Parse results JSON
-        results_data = json.loads(experiment[6]) if experiment[6] else {}
-        
-        # Get deck information for the experiment
-        deck_ids_raw = experiment[7]  # document_ids array from PostgreSQL
-        # Parse PostgreSQL array format {65,68,61,58,51,71,60,50,62,64} to Python list
-        if isinstance(deck_ids_raw, str) and deck_ids_raw.startswith('{') and deck_ids_raw.endswith('}'):
-            deck_ids = [int(x.strip()) for x in deck_ids_raw[1:-1].split(',') if x.strip()]
-        elif isinstance(deck_ids_raw, list):
-            deck_ids = deck_ids_raw  # Already a list
-        else:
-            deck_ids = []
-        decks = db.query(ProjectDocument).filter(ProjectDocument.id.in_(deck_ids)).all()
-        deck_info = {}
-        for deck in decks:
-            # Extract page count from visual_analysis_cache
-            page_count = None
-            try:
-                # Query visual_analysis_cache for this deck
-                cache_result = db.execute(text("""
-                    SELECT analysis_result_json 
-                    FROM visual_analysis_cache 
-                    WHERE document_id = :deck_id
-                    ORDER BY created_at DESC
-                    LIMIT 1
-                """), {"deck_id": deck.id}).fetchone()
-                
-                if cache_result and cache_result[0]:
-                    analysis_data = json.loads(cache_result[0])
-                    # Page count is the length of visual_analysis_results array
-                    visual_results = analysis_data.get("visual_analysis_results", [])
-                    if isinstance(visual_results, list):
-                        page_count = len(visual_results)
-            except Exception as e:
-                logger.debug(f"Could not get page count for deck {deck.id}: {e}")
-            
-            deck_info[deck.id] = {
-                "filename": deck.file_name, 
-                "company_name": deck.ai_extracted_startup_name,
-                "page_count": page_count
-            }
-        
-        # Parse classification results if available
-        classification_data = {}
-        classification_results = []
-        logger.info(f"Checking classification for experiment {experiment_id}: enabled={experiment[8]}, has_data={bool(experiment[9])}")
-        if experiment[8] and experiment[9]:  # classification_enabled and classification_results_json
-            try:
-                # Parse classification results - it's stored as an array directly
-                classification_results = json.loads(experiment[9])
-                if not isinstance(classification_results, list):
-                    classification_results = []
-                logger.info(f"Parsed {len(classification_results)} classification results")
-            except json.JSONDecodeError as e:
-                logger.warning(f"Failed to parse classification results for experiment {experiment_id}: {e}")
-        
-        # Create a lookup for classification results by deck_id
-        classification_lookup = {}
-        for result in classification_results:
-            deck_id = result.get("deck_id")
-            classification = result.get("classification_result", {})
-            if deck_id:
-                classification_lookup[deck_id] = classification
-        
-        # Enhance results with deck information and classification data
-        enhanced_results = []
-        for result in results_data.get("results", []):
-            deck_id = result.get("deck_id")
-            enhanced_result = {
-                **result,
-                "deck_info": deck_info.get(deck_id, {"filename": f"deck_{deck_id}", "company_name": None})
-            }
-            
-            # Add classification data if available
-            if deck_id in classification_lookup:
-                classification = classification_lookup[deck_id]
-                enhanced_result.update({
-                    "primary_sector": classification.get("primary_sector"),
-                    "secondary_sector": classification.get("secondary_sector"),
-                    "confidence_score": classification.get("confidence_score"),
-                    "classification_reasoning": classification.get("reasoning"),
-                    "subcategory": classification.get("subcategory"),
-                    "keywords_matched": classification.get("keywords_matched"),
-                    "recommended_template": classification.get("recommended_template"),
-                    "classification_error": classification.get("error")
-                })
-            
-            enhanced_results.append(enhanced_result)
-        
-        # Parse company name extraction results if available
-        company_name_data = {}
-        if experiment[11]:  # company_name_results_json
-            try:
-                company_name_data = json.loads(experiment[11])
-            except json.JSONDecodeError:
-                logger.warning(f"Failed to parse company name results for experiment {experiment_id}")
-
-        # Parse funding amount extraction results if available
-        funding_amount_data = {}
-        if experiment[13]:  # funding_amount_results_json
-            try:
-                funding_amount_data = json.loads(experiment[13])
-            except json.JSONDecodeError:
-                logger.warning(f"Failed to parse funding amount results for experiment {experiment_id}")
-
-        # Parse deck date extraction results if available
-        deck_date_data = {}
-        if experiment[15]:  # deck_date_results_json
-            try:
-                deck_date_data = json.loads(experiment[15])
-            except json.JSONDecodeError:
-                logger.warning(f"Failed to parse deck date results for experiment {experiment_id}")
-
-        experiment_details = {
-            "id": experiment[0],
-            "experiment_name": experiment[1],
-            "extraction_type": experiment[2],
-            "text_model_used": experiment[3],
-            "extraction_prompt": experiment[4],
-            "created_at": experiment[5].isoformat() if experiment[5] else None,
-            "total_decks": results_data.get("total_decks", 0),
-            "successful_extractions": results_data.get("successful_extractions", 0),
-            "results": enhanced_results,
-            "deck_ids": deck_ids,
-            "classification_enabled": bool(experiment[8]),
-            "classification_completed_at": experiment[10].isoformat() if experiment[10] else None,
-            "classification_statistics": {},  # TODO: Calculate statistics if needed
-            "classification_results_json": json.dumps(classification_lookup) if classification_lookup else None,
-            "company_name_completed_at": experiment[12].isoformat() if experiment[12] else None,
-            "company_name_statistics": company_name_data.get("statistics", {}) if company_name_data else {},
-            "company_name_results": company_name_data.get("company_name_results", []) if company_name_data else [],
-            "funding_amount_completed_at": experiment[14].isoformat() if experiment[14] else None,
-            "funding_amount_statistics": funding_amount_data.get("statistics", {}) if funding_amount_data else {},
-            "funding_amount_results": funding_amount_data.get("funding_amount_results", []) if funding_amount_data else [],
-            "deck_date_completed_at": experiment[16].isoformat() if experiment[16] else None,
-            "deck_date_statistics": deck_date_data.get("statistics", {}) if deck_date_data else {},
-            "deck_date_results": deck_date_data.get("deck_date_results", []) if deck_date_data else []
-        }
-        
         return experiment_details
         
     except HTTPException:
@@ -1697,7 +1540,7 @@ async def enrich_experiment_with_classification(
             )
         
         # Parse existing results
-        results_data = json.loads(experiment[6]) if experiment[6] else {}
+        results_data = load_json_column(experiment[6]) if experiment[6] else {}
         results = results_data.get("results", [])
         
         if not results:
@@ -1709,7 +1552,7 @@ async def enrich_experiment_with_classification(
         # Check if classification already completed
         if experiment[8] and experiment[10]:  # classification_enabled and classification_completed_at
             logger.info(f"Experiment {request.experiment_id} already has classification results")
-            existing_classification = json.loads(experiment[9]) if experiment[9] else {}
+            existing_classification = load_json_column(experiment[9]) if experiment[9] else {}
             return {
                 "message": "Classification already completed",
                 "experiment_id": request.experiment_id,
@@ -1718,26 +1561,43 @@ async def enrich_experiment_with_classification(
                 "statistics": existing_classification.get("statistics", {})
             }
         
-        # Update progress tracker - start classification
-        progress_tracker["step3"]["status"] = "processing"
-        progress_tracker["step3"]["current_deck"] = "Starting classification..."
-        progress_tracker["step3"]["progress"] = 1
-        progress_tracker["step3"]["total"] = 5
+        # Update progress - start classification
+        job_id = resume_step_job("step3", current_user.id, total=5)
+        dojo_progress_store.update(job_id, current_deck="Starting classification...", progress=1)
         
         # Initialize startup classifier
         from ..services.startup_classifier import StartupClassifier
         classifier = StartupClassifier(db)
         
+        # Classify all valid offerings in GPU batches; results stream back as each deck completes
+        def is_valid_offering(company_offering):
+            return bool(company_offering) and not company_offering.startswith("Error:") and not company_offering.startswith("No visual analysis")
+        
+        offerings = {
+            index: result.get("offering_extraction", "")
+            for index, result in enumerate(results)
+            if is_valid_offering(result.get("offering_extraction", ""))
+        }
+        
+        classified_count = 0
+        
+        def classification_progress(index, classification):
+            nonlocal classified_count
+            classified_count += 1
+            dojo_progress_store.update(job_id, current_deck=f"Classifying decks ({classified_count}/{len(offerings)})...")
+        
+        classifications = await classifier.classify_batch(offerings, on_result=classification_progress) if offerings else {}
+        
         # Process each result for classification
         classification_results = []
         successful_classifications = 0
         
-        for result in results:
+        for index, result in enumerate(results):
             deck_id = result.get("deck_id")
             company_offering = result.get("offering_extraction", "")
             
             # Skip if extraction failed
-            if not company_offering or company_offering.startswith("Error:") or company_offering.startswith("No visual analysis"):
+            if index not in offerings:
                 classification_results.append({
                     "deck_id": deck_id,
                     "filename": result.get("filename", f"deck_{deck_id}"),
@@ -1750,40 +1610,24 @@ async def enrich_experiment_with_classification(
                 })
                 continue
             
-            try:
-                # Run classification
-                classification = await classifier.classify(company_offering)
-                
-                # Check if classification was successful (has primary_sector)
-                if classification.get("primary_sector") and classification.get("primary_sector") != "unknown":
-                    successful_classifications += 1
-                    classification_results.append({
-                        "deck_id": deck_id,
-                        "filename": result.get("filename", f"deck_{deck_id}"),
-                        "company_offering": company_offering,
-                        "classification": classification,
-                        "confidence_score": classification.get("confidence_score", 0.0),
-                        "primary_sector": classification.get("primary_sector"),
-                        "secondary_sector": classification.get("secondary_sector"),
-                        "keywords_matched": classification.get("keywords_matched", []),
-                        "reasoning": classification.get("reasoning", ""),
-                        "error": None
-                    })
-                else:
-                    classification_results.append({
-                        "deck_id": deck_id,
-                        "filename": result.get("filename", f"deck_{deck_id}"),
-                        "company_offering": company_offering,
-                        "classification": None,
-                        "confidence_score": 0.0,
-                        "primary_sector": None,
-                        "secondary_sector": None,
-                        "reasoning": classification.get("reasoning", "Classification failed"),
-                        "error": classification.get("reasoning", "Classification failed")
-                    })
-                    
-            except Exception as e:
-                logger.error(f"Error classifying deck {deck_id}: {e}")
+            classification = classifications[index]
+            
+            # Check if classification was successful (has primary_sector)
+            if classification.get("primary_sector") and classification.get("primary_sector") != "unknown":
+                successful_classifications += 1
+                classification_results.append({
+                    "deck_id": deck_id,
+                    "filename": result.get("filename", f"deck_{deck_id}"),
+                    "company_offering": company_offering,
+                    "classification": classification,
+                    "confidence_score": classification.get("confidence_score", 0.0),
+                    "primary_sector": classification.get("primary_sector"),
+                    "secondary_sector": classification.get("secondary_sector"),
+                    "keywords_matched": classification.get("keywords_matched", []),
+                    "reasoning": classification.get("reasoning", ""),
+                    "error": None
+                })
+            else:
                 classification_results.append({
                     "deck_id": deck_id,
                     "filename": result.get("filename", f"deck_{deck_id}"),
@@ -1792,7 +1636,8 @@ async def enrich_experiment_with_classification(
                     "confidence_score": 0.0,
                     "primary_sector": None,
                     "secondary_sector": None,
-                    "error": f"Classification error: {str(e)}"
+                    "reasoning": classification.get("reasoning", "Classification failed"),
+                    "error": classification.get("reasoning", "Classification failed")
                 })
         
         # Calculate statistics
@@ -1856,8 +1701,7 @@ async def enrich_experiment_with_classification(
         logger.info(f"Classification enrichment completed for experiment {request.experiment_id}: {successful_classifications}/{len(classification_results)} successful")
         
         # Update progress tracker - classification completed
-        progress_tracker["step3"]["current_deck"] = "Classification completed"
-        progress_tracker["step3"]["progress"] = 2
+        dojo_progress_store.update(job_id, current_deck="Classification completed", progress=2)
         
         return {
             "message": "Classification enrichment completed successfully",
@@ -1920,7 +1764,7 @@ async def enrich_experiment_with_company_names(
             )
         
         # Parse existing results
-        results_data = json.loads(experiment[6]) if experiment[6] else {}
+        results_data = load_json_column(experiment[6]) if experiment[6] else {}
         results = results_data.get("results", [])
         
         if not results:
@@ -1942,11 +1786,9 @@ async def enrich_experiment_with_company_names(
         
         startup_name_prompt = prompt_result[0]
         
-        # Update progress tracker - start company name extraction
-        progress_tracker["step3"]["status"] = "processing"
-        progress_tracker["step3"]["current_deck"] = "Starting company name extraction..."
-        progress_tracker["step3"]["progress"] = 2
-        progress_tracker["step3"]["total"] = 5
+        # Update progress - start company name extraction
+        job_id = resume_step_job("step3", current_user.id, total=5)
+        dojo_progress_store.update(job_id, current_deck="Starting company name extraction...", progress=2)
         
         # Use GPU pipeline for company name extraction
         from ..services.gpu_http_client import gpu_http_client
@@ -2050,8 +1892,7 @@ async def enrich_experiment_with_company_names(
         logger.info(f"Company name extraction completed for experiment {request.experiment_id}: {successful_extractions}/{len(company_name_results)} successful")
         
         # Update progress tracker - company name extraction completed
-        progress_tracker["step3"]["current_deck"] = "Company name extraction completed"
-        progress_tracker["step3"]["progress"] = 3
+        dojo_progress_store.update(job_id, current_deck="Company name extraction completed", progress=3)
         
         return {
             "message": "Company name extraction completed successfully",
@@ -2099,7 +1940,7 @@ async def enrich_experiment_with_funding_amounts(
             )
         
         # Parse existing results
-        results_data = json.loads(experiment[6]) if experiment[6] else {}
+        results_data = load_json_column(experiment[6]) if experiment[6] else {}
         results = results_data.get("results", [])
         
         if not results:
@@ -2121,11 +1962,9 @@ async def enrich_experiment_with_funding_amounts(
         
         funding_amount_prompt = prompt_result[0]
         
-        # Update progress tracker - start funding amount extraction
-        progress_tracker["step3"]["status"] = "processing"
-        progress_tracker["step3"]["current_deck"] = "Starting funding amount extraction..."
-        progress_tracker["step3"]["progress"] = 3
-        progress_tracker["step3"]["total"] = 5
+        # Update progress - start funding amount extraction
+        job_id = resume_step_job("step3", current_user.id, total=5)
+        dojo_progress_store.update(job_id, current_deck="Starting funding amount extraction...", progress=3)
         
         # Use GPU pipeline for funding amount extraction
         from ..services.gpu_http_client import gpu_http_client
@@ -2221,8 +2060,7 @@ async def enrich_experiment_with_funding_amounts(
         logger.info(f"Funding amount extraction completed for experiment {request.experiment_id}: {successful_extractions}/{len(funding_amount_results)} successful")
         
         # Update progress tracker - funding amount extraction completed
-        progress_tracker["step3"]["current_deck"] = "Funding amount extraction completed"
-        progress_tracker["step3"]["progress"] = 4
+        dojo_progress_store.update(job_id, current_deck="Funding amount extraction completed", progress=4)
         
         return {
             "message": "Funding amount extraction completed successfully",
@@ -2270,7 +2108,7 @@ async def enrich_experiment_with_deck_dates(
             )
         
         # Parse existing results
-        results_data = json.loads(experiment[6]) if experiment[6] else {}
+        results_data = load_json_column(experiment[6]) if experiment[6] else {}
         results = results_data.get("results", [])
         
         if not results:
@@ -2292,11 +2130,9 @@ async def enrich_experiment_with_deck_dates(
         
         deck_date_prompt = prompt_result[0]
         
-        # Update progress tracker - start deck date extraction
-        progress_tracker["step3"]["status"] = "processing"
-        progress_tracker["step3"]["current_deck"] = "Starting deck date extraction..."
-        progress_tracker["step3"]["progress"] = 4
-        progress_tracker["step3"]["total"] = 5
+        # Update progress - start deck date extraction
+        job_id = resume_step_job("step3", current_user.id, total=5)
+        dojo_progress_store.update(job_id, current_deck="Starting deck date extraction...", progress=4)
         
         # Use GPU pipeline for deck date extraction
         from ..services.gpu_http_client import gpu_http_client
@@ -2391,13 +2227,8 @@ async def enrich_experiment_with_deck_dates(
         
         logger.info(f"Deck date extraction completed for experiment {request.experiment_id}: {successful_extractions}/{len(deck_date_results)} successful")
         
-        # Update progress tracker - all extractions completed
-        import time
-        completion_time = time.time()
-        progress_tracker["step3"]["status"] = "completed"
-        progress_tracker["step3"]["current_deck"] = "All obligatory extractions completed"
-        progress_tracker["step3"]["progress"] = 5
-        progress_tracker["step3"]["completion_time"] = completion_time
+        # Update progress - all extractions completed
+        dojo_progress_store.finish(job_id, "completed", current_deck="All obligatory extractions completed", progress=5)
         
         return {
             "message": "Deck date extraction completed successfully",
@@ -2422,6 +2253,7 @@ async def run_template_processing_batch(
     current_user: User = Depends(get_current_user)
 ):
     """Process decks from current sample through template analysis pipeline with thumbnail generation"""
+    job_id = None
     try:
         # Only GPs can run template processing
         if current_user.role != "gp":
@@ -2513,11 +2345,13 @@ async def run_template_processing_batch(
             except Exception as e:
                 logger.warning(f"Could not get chapter count, using default: {e}")
         
-        # Update progress tracker - start step 4 processing
-        progress_tracker["step4"]["status"] = "processing"
-        progress_tracker["step4"]["current_deck"] = decks[0].file_name if decks else ""
-        progress_tracker["step4"]["progress"] = 0
-        progress_tracker["step4"]["total"] = len(decks) * total_chapters
+        # Start a step 4 job - GPU chapter callbacks advance it
+        job_id = dojo_progress_store.start_job(
+            "step4",
+            user_id=current_user.id,
+            total=len(decks) * total_chapters,
+            current_deck=decks[0].file_name if decks else ""
+        )
         
         # Use GPU pipeline for template processing
         from ..services.gpu_http_client import gpu_http_client
@@ -2527,7 +2361,8 @@ async def run_template_processing_batch(
             deck_ids=deck_ids,
             template_id=request.template_id if request.template_id else (template_info["id"] if template_info else None),
             text_model=request.text_model,
-            generate_thumbnails=request.generate_thumbnails
+            generate_thumbnails=request.generate_thumbnails,
+            job_id=job_id
         )
         
         # Process GPU results
@@ -2690,30 +2525,28 @@ async def run_template_processing_batch(
         db.commit()
         logger.info(f"Marked {len(template_processing_results)} decks as having dojo experiment results")
         
-        # Update progress tracker - step 4 completed successfully
-        progress_tracker["step4"]["status"] = "completed"
-        progress_tracker["step4"]["current_deck"] = "Template processing completed"
-        progress_tracker["step4"]["progress"] = len(decks)
+        # Step 4 completed successfully
+        dojo_progress_store.finish(
+            job_id, "completed",
+            current_deck="Template processing completed",
+            current_chapter="",
+            progress=len(decks) * total_chapters
+        )
         
         return {
             "message": "Template processing completed successfully",
             "template_processing_results": template_processing_results,
             "statistics": statistics,
-            "processed_decks": len(deck_ids)
+            "processed_decks": len(deck_ids),
+            "job_id": job_id
         }
         
     except HTTPException:
-        # Update progress tracker - step 4 error
-        progress_tracker["step4"]["status"] = "error"
-        progress_tracker["step4"]["current_deck"] = "GPU processing failed"
-        progress_tracker["step4"]["progress"] = 0
+        dojo_progress_store.finish(job_id, "error", current_deck="GPU processing failed", progress=0)
         raise
     except Exception as e:
         logger.error(f"Error running template processing: {e}")
-        # Update progress tracker - step 4 error
-        progress_tracker["step4"]["status"] = "error"
-        progress_tracker["step4"]["current_deck"] = "Processing error occurred"
-        progress_tracker["step4"]["progress"] = 0
+        dojo_progress_store.finish(job_id, "error", current_deck="Processing error occurred", progress=0)
         raise HTTPException(
             status_code=500,
             detail="Failed to run template processing"
@@ -2760,6 +2593,13 @@ async def cache_visual_analysis_from_gpu(
             "prompt": prompt_used
         })
         
+        # Index slide image paths so the deck viewer resolves them without directory scans
+        try:
+            with db.begin_nested():
+                slide_index_service.register_slides(db, document_id, analysis_result_json)
+        except Exception as e:
+            logger.warning(f"Could not index slide images for document {document_id}: {e}")
+        
         db.commit()
         
         logger.info(f"Successfully cached visual analysis for document {document_id}")
@@ -2790,6 +2630,7 @@ async def get_cached_visual_analysis_for_gpu(
         
         # Convert single document_id to list for unified processing
         if document_id:
+            document_id = int(document_id)
             deck_ids = [document_id]
         
         if not deck_ids:
@@ -2800,22 +2641,10 @@ async def get_cached_visual_analysis_for_gpu(
         
         logger.info(f"GPU requesting cached visual analysis for {len(deck_ids)} decks: {deck_ids}")
         
-        cached_analysis = {}
-        for deck_id in deck_ids:
-            try:
-                cache_result = db.execute(text(
-                    "SELECT analysis_result_json FROM visual_analysis_cache WHERE document_id = :deck_id ORDER BY created_at DESC LIMIT 1"
-                ), {"deck_id": deck_id}).fetchone()
-                
-                if cache_result:
-                    cached_analysis[deck_id] = json.loads(cache_result[0])
-                    logger.info(f"DEBUG: Found cached visual analysis for deck {deck_id}, keys: {list(cached_analysis[deck_id].keys())}")
-                else:
-                    logger.warning(f"DEBUG: No cached visual analysis found for deck {deck_id}")
-                    
-            except Exception as e:
-                logger.error(f"Error retrieving cached visual analysis for deck {deck_id}: {e}")
-                continue
+        cached_analysis = get_latest_visual_analysis(db, [int(deck_id) for deck_id in deck_ids])
+        missing_ids = [deck_id for deck_id in deck_ids if int(deck_id) not in cached_analysis]
+        if missing_ids:
+            logger.warning(f"No cached visual analysis found for decks {missing_ids}")
         
         logger.info(f"Retrieved cached visual analysis for {len(cached_analysis)}/{len(deck_ids)} documents")
         
@@ -2848,135 +2677,6 @@ async def get_cached_visual_analysis_for_gpu(
             "error": str(e)
         }
 
-async def process_visual_analysis_batch(deck_ids: List[int], vision_model: str):
-    """Background task to process visual analysis for multiple decks individually with real-time progress"""
-    import time
-    try:
-        logger.info(f"Starting individual visual analysis for {len(deck_ids)} decks using GPU pipeline")
-        
-        # Get fresh database connection for background task
-        from ..db.database import get_db
-        db = next(get_db())
-        
-        try:
-            # Get analysis prompt from database 
-            prompt_result = db.execute(text(
-                "SELECT prompt_text FROM pipeline_prompts WHERE stage_name = 'image_analysis' AND is_active = TRUE LIMIT 1"
-            )).fetchone()
-            
-            if prompt_result:
-                analysis_prompt = prompt_result[0]
-            else:
-                # No fallback - fail explicitly
-                raise HTTPException(
-                    status_code=500,
-                    detail="image_analysis prompt not found in pipeline_prompts table. Please add this prompt with stage_name='image_analysis'."
-                )
-            
-            # Initialize progress tracker with timing
-            start_time = time.time()
-            progress_tracker["step2"]["status"] = "processing"
-            progress_tracker["step2"]["current_deck"] = "Starting visual analysis..."
-            progress_tracker["step2"]["progress"] = 0
-            progress_tracker["step2"]["total"] = len(deck_ids)
-            progress_tracker["step2"]["start_time"] = start_time
-            progress_tracker["step2"]["completion_time"] = None
-            progress_tracker["step2"]["processing_times"] = []
-            progress_tracker["step2"]["current_deck_start_time"] = None
-            
-            # Get deck information and file paths
-            decks = db.query(ProjectDocument).filter(ProjectDocument.id.in_(deck_ids)).all()
-            if not decks:
-                logger.error("No decks found for visual analysis batch")
-                progress_tracker["step2"]["status"] = "error"
-                return
-            
-            # Create deck mapping
-            deck_id_to_deck = {deck.id: deck for deck in decks}
-            
-            # Import GPU HTTP client
-            from ..services.gpu_http_client import gpu_http_client
-            
-            # Process each deck individually with real-time progress updates
-            successful_count = 0
-            for i, deck_id in enumerate(deck_ids):
-                deck = deck_id_to_deck.get(deck_id)
-                if not deck:
-                    logger.warning(f"Deck {deck_id} not found in database")
-                    continue
-                
-                deck_name = deck.file_name or f"deck_{deck.id}.pdf"
-                deck_start_time = time.time()
-                
-                # Update progress tracker - currently processing this deck
-                progress_tracker["step2"]["current_deck"] = deck_name
-                progress_tracker["step2"]["progress"] = i
-                progress_tracker["step2"]["current_deck_start_time"] = deck_start_time
-                
-                logger.info(f"Processing deck {i+1}/{len(deck_ids)}: {deck_name}")
-                
-                try:
-                    # Process single deck
-                    result = await gpu_http_client.run_visual_analysis_single_deck(
-                        deck_id=deck_id,
-                        vision_model=vision_model,
-                        analysis_prompt=analysis_prompt,
-                        file_path=deck.file_path
-                    )
-                    
-                    deck_end_time = time.time()
-                    deck_processing_time = deck_end_time - deck_start_time
-                    progress_tracker["step2"]["processing_times"].append(deck_processing_time)
-                    
-                    if result.get("success"):
-                        # Cache the result
-                        deck_result = result.get("result", {})
-                        if deck_result:
-                            db.execute(text(
-                                "INSERT INTO visual_analysis_cache (document_id, analysis_result_json, vision_model_used, prompt_used) VALUES (:deck_id, :result, :model, :prompt) ON CONFLICT (document_id, vision_model_used, prompt_used) DO UPDATE SET analysis_result_json = :result, created_at = CURRENT_TIMESTAMP"
-                            ), {
-                                "deck_id": deck_id,
-                                "result": json.dumps(deck_result),
-                                "model": vision_model,
-                                "prompt": analysis_prompt
-                            })
-                            db.commit()
-                            successful_count += 1
-                            logger.info(f"Successfully processed and cached deck {deck_name} in {deck_processing_time:.1f}s")
-                        else:
-                            logger.warning(f"No result returned for deck {deck_name}")
-                    else:
-                        logger.error(f"GPU processing failed for deck {deck_name}: {result.get('error')}")
-                        
-                except Exception as e:
-                    logger.error(f"Error processing deck {deck_name}: {e}")
-                    deck_end_time = time.time()
-                    deck_processing_time = deck_end_time - deck_start_time
-                    progress_tracker["step2"]["processing_times"].append(deck_processing_time)
-                
-                # Update progress after each deck
-                progress_tracker["step2"]["progress"] = i + 1
-            
-            # Complete processing
-            completion_time = time.time()
-            total_time = completion_time - start_time
-            progress_tracker["step2"]["completion_time"] = completion_time
-            progress_tracker["step2"]["status"] = "completed"
-            progress_tracker["step2"]["current_deck"] = f"Completed: {successful_count}/{len(deck_ids)} decks processed"
-            
-            logger.info(f"Visual analysis completed: {successful_count}/{len(deck_ids)} decks processed in {total_time:.1f}s")
-        
-        finally:
-            # Close the database connection
-            db.close()
-        
-    except Exception as e:
-        logger.error(f"Error in visual analysis processing: {e}")
-        # Update progress tracker - error
-        progress_tracker["step2"]["status"] = "error"
-        progress_tracker["step2"]["current_deck"] = "Processing error occurred"
-        if progress_tracker["step2"]["start_time"]:
-            progress_tracker["step2"]["completion_time"] = time.time()
 @router.post("/template-progress-callback")
 async def template_progress_callback(
     request: Dict[str, Any],
@@ -2988,8 +2688,11 @@ async def template_progress_callback(
         chapter_name = request.get("chapter_name")
         status = request.get("status", "processing")
         chapter_results = request.get("chapter_results")
+        # The GPU echoes the job of the request, so concurrent step 4 jobs advance independently
+        job_id = request.get("job_id")
         
         if deck_id and chapter_name:
+            
             # Get deck filename for display
             try:
                 deck_info = db.execute(text(
@@ -2998,14 +2701,10 @@ async def template_progress_callback(
                 
                 deck_filename = deck_info[0] if deck_info else f"Deck {deck_id}"
                 
-                # Update progress tracker with current deck and chapter
-                progress_tracker["step4"]["current_deck"] = deck_filename
-                progress_tracker["step4"]["current_chapter"] = chapter_name
-                
                 # Increment progress on chapter completion
                 if status == "completed":
-                    progress_tracker["step4"]["progress"] += 1
-                    logger.info(f"Template progress update - Deck {deck_filename}: Completed chapter '{chapter_name}' ({progress_tracker['step4']['progress']}/{progress_tracker['step4']['total']})")
+                    dojo_progress_store.increment(job_id, current_deck=deck_filename, current_chapter=chapter_name)
+                    logger.info(f"Template progress update - Deck {deck_filename}: Completed chapter '{chapter_name}'")
                     
                     # Progressive delivery: Store chapter results if provided
                     if chapter_results:
@@ -3020,7 +2719,7 @@ async def template_progress_callback(
                             
                             if latest_experiment:
                                 experiment_id = latest_experiment[0]
-                                existing_results = json.loads(latest_experiment[1]) if latest_experiment[1] else {}
+                                existing_results = load_json_column(latest_experiment[1]) if latest_experiment[1] else {}
                                 
                                 # Add chapter results to deck
                                 if "results" not in existing_results:
@@ -3056,16 +2755,17 @@ async def template_progress_callback(
                         except Exception as e:
                             logger.warning(f"Failed to store progressive chapter results: {e}")
                 else:
+                    dojo_progress_store.update(job_id, current_deck=deck_filename, current_chapter=chapter_name)
                     logger.info(f"Template progress update - Deck {deck_filename}: Processing chapter '{chapter_name}'")
                 
             except Exception as e:
                 logger.warning(f"Could not get deck filename for {deck_id}: {e}")
-                progress_tracker["step4"]["current_deck"] = f"Processing deck {deck_id}"
-                progress_tracker["step4"]["current_chapter"] = chapter_name
                 
                 # Increment progress on chapter completion (fallback path)
                 if status == "completed":
-                    progress_tracker["step4"]["progress"] += 1
+                    dojo_progress_store.increment(job_id, current_deck=f"Processing deck {deck_id}", current_chapter=chapter_name)
+                else:
+                    dojo_progress_store.update(job_id, current_deck=f"Processing deck {deck_id}", current_chapter=chapter_name)
         
         return {"success": True}
     except Exception as e:
@@ -3210,6 +2910,30 @@ async def internal_classify(
         return {"error": str(e)}
 
 
+@router.post("/internal/classify-batch")
+async def internal_classify_batch(
+    request: Dict[str, Any],
+    db: Session = Depends(get_db)
+):
+    """Internal batch classification endpoint for GPU server - one GPU batch instead of a call per deck"""
+    try:
+        company_offerings = {
+            key: offering for key, offering in (request.get("company_offerings") or {}).items() if offering
+        }
+        if not company_offerings:
+            return {"error": "No company offerings provided"}
+        
+        from ..services.startup_classifier import StartupClassifier
+        classifier = StartupClassifier(db)
+        classifications = await classifier.classify_batch(company_offerings)
+        
+        return {"classifications": classifications}
+        
+    except Exception as e:
+        logger.error(f"Error in internal batch classification: {e}")
+        return {"error": str(e)}
+
+
 @router.post("/internal/add-classification-to-experiment")
 async def add_classification_to_experiment(
     request: Dict[str, Any],
@@ -3240,7 +2964,7 @@ async def add_classification_to_experiment(
             # Parse existing classification results
             if existing_results:
                 try:
-                    results_list = json.loads(existing_results)
+                    results_list = load_json_column(existing_results)
                     if not isinstance(results_list, list):
                         results_list = []
                 except:
@@ -3332,7 +3056,7 @@ async def add_template_results_to_deck(
             # Parse existing template results
             if existing_results:
                 try:
-                    results_data = json.loads(existing_results)
+                    results_data = load_json_column(existing_results)
                     if isinstance(results_data, dict):
                         template_processing_results = results_data.get("template_processing_results", [])
                     else:
@@ -15,7 +15,7 @@ import random
 import uuid
 
 from ..db.database import get_db
-from ..db.models import User
+from ..db.models import User, load_json_column
 from .auth import get_current_user
 
 logger = logging.getLogger(__name__)
@@ -436,11 +436,11 @@ async def add_dojo_projects_from_experiment(
             )
         
         # Parse experiment data
-        results_data = json.loads(experiment[6]) if experiment[6] else {}
-        classification_data = json.loads(experiment[9]) if experiment[9] else {}
-        company_name_data = json.loads(experiment[10]) if experiment[10] else {}
-        funding_amount_data = json.loads(experiment[11]) if experiment[11] else {}
-        template_processing_data = json.loads(experiment[12]) if experiment[12] else {}
+        results_data = load_json_column(experiment[6]) if experiment[6] else {}
+        classification_data = load_json_column(experiment[9]) if experiment[9] else {}
+        company_name_data = load_json_column(experiment[10]) if experiment[10] else {}
+        funding_amount_data = load_json_column(experiment[11]) if experiment[11] else {}
+        template_processing_data = load_json_column(experiment[12]) if experiment[12] else {}
         
         # Check if experiment has required data
         if not experiment[8]:  # classification_enabled
@@ -4,15 +4,18 @@ Internal API endpoints for GPU processing communication
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy import column, func, insert, table, text
+from sqlalchemy.dialects import postgresql
 from pydantic import BaseModel
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 import logging
 import json
 from datetime import datetime
 
 from ..db.database import get_db
-from ..services.processing_queue import processing_queue_manager
+from ..db.models import SpecializedAnalysisResult, load_json_column
+from ..services.processing_queue import processing_queue_manager, notify_document_progress
+from ..services.dojo_progress import dojo_progress_store
 
 logger = logging.getLogger(__name__)
 
@@ -158,6 +161,8 @@ async def update_processing_progress(
             "document_id": request.document_id
         })
         
+        if result.rowcount > 0:
+            notify_document_progress(db, document_id=request.document_id)
         db.commit()
         logger.info(f"📊 Progress update applied to {result.rowcount} queue entries")
         
@@ -196,24 +201,22 @@ async def save_specialized_analysis(
         delete_query = text("DELETE FROM specialized_analysis_results WHERE document_id = :document_id")
         db.execute(delete_query, {"document_id": request.document_id})
         
-        # Save each specialized analysis result
-        saved_analyses = []
-        for analysis_type, analysis_result in request.specialized_analysis.items():
-            if analysis_result and analysis_result.strip():  # Only save non-empty results
-                insert_query = text("""
-                    INSERT INTO specialized_analysis_results 
-                    (document_id, analysis_type, analysis_result, created_at) 
-                    VALUES (:document_id, :analysis_type, :analysis_result, NOW())
-                """)
-                
-                db.execute(insert_query, {
-                    "document_id": request.document_id,
-                    "analysis_type": analysis_type,
-                    "analysis_result": analysis_result
-                })
-                
-                saved_analyses.append(analysis_type)
-                logger.info(f"✅ Saved {analysis_type} analysis for document {request.document_id}")
+        # Save all non-empty specialized analysis results with one multi-row INSERT ... VALUES statement
+        rows = [
+            {
+                "document_id": request.document_id,
+                "analysis_type": analysis_type,
+                "analysis_result": analysis_result,
+                "created_at": func.now()
+            }
+            for analysis_type, analysis_result in request.specialized_analysis.items()
+            if analysis_result and analysis_result.strip()
+        ]
+        saved_analyses = [row["analysis_type"] for row in rows]
+        
+        if rows:
+            db.execute(insert(SpecializedAnalysisResult.__table__).values(rows))
+            logger.info(f"✅ Saved {', '.join(saved_analyses)} analysis for document {request.document_id}")
         
         db.commit()
         
@@ -366,42 +369,42 @@ async def get_extraction_results(
         
         if result[0]:  # results_json (offering extraction)
             try:
-                offering_data = json.loads(result[0])
+                offering_data = load_json_column(result[0])
                 extraction_data["offering_extraction"] = offering_data
             except json.JSONDecodeError:
                 logger.warning(f"Failed to parse offering extraction results for document {document_id}")
         
         if result[1]:  # classification_results_json
             try:
-                classification_data = json.loads(result[1])
+                classification_data = load_json_column(result[1])
                 extraction_data["classification"] = classification_data
             except json.JSONDecodeError:
                 logger.warning(f"Failed to parse classification results for document {document_id}")
         
         if result[2]:  # company_name_results_json
             try:
-                company_name_data = json.loads(result[2])
+                company_name_data = load_json_column(result[2])
                 extraction_data["company_name"] = company_name_data
             except json.JSONDecodeError:
                 logger.warning(f"Failed to parse company name results for document {document_id}")
         
         if result[3]:  # funding_amount_results_json
             try:
-                funding_data = json.loads(result[3])
+                funding_data = load_json_column(result[3])
                 extraction_data["funding_amount"] = funding_data
             except json.JSONDecodeError:
                 logger.warning(f"Failed to parse funding amount results for document {document_id}")
         
         if result[4]:  # deck_date_results_json
             try:
-                date_data = json.loads(result[4])
+                date_data = load_json_column(result[4])
                 extraction_data["deck_date"] = date_data
             except json.JSONDecodeError:
                 logger.warning(f"Failed to parse deck date results for document {document_id}")
         
         if result[5]:  # template_processing_results_json
             try:
-                template_data = json.loads(result[5])
+                template_data = load_json_column(result[5])
                 extraction_data["template_processing"] = template_data
             except json.JSONDecodeError:
                 logger.warning(f"Failed to parse template processing results for document {document_id}")
@@ -526,6 +529,8 @@ class ProcessingServerRegistration(BaseModel):
 
 class ServerHeartbeat(BaseModel):
     server_id: str
+    task_ids: List[int] = []  # In-flight tasks whose leases the heartbeat renews
+    lease_seconds: Optional[int] = None
 
 class GetNextTaskRequest(BaseModel):
     server_id: str
@@ -597,7 +602,7 @@ async def server_heartbeat(
     heartbeat: ServerHeartbeat,
     db: Session = Depends(get_db)
 ):
-    """Update server heartbeat to maintain registration"""
+    """Update server heartbeat to maintain registration and renew the leases of its in-flight tasks"""
     try:
         query = text("""
             UPDATE processing_servers 
@@ -606,6 +611,11 @@ async def server_heartbeat(
         """)
         
         result = db.execute(query, {"server_id": heartbeat.server_id})
+        renewed_task_ids = []
+        if result.rowcount and heartbeat.task_ids and heartbeat.lease_seconds:
+            renewed_task_ids = processing_queue_manager.renew_task_leases(
+                db, heartbeat.server_id, heartbeat.task_ids, heartbeat.lease_seconds
+            )
         db.commit()
         
         if result.rowcount == 0:
@@ -617,10 +627,17 @@ async def server_heartbeat(
         
         logger.debug(f"💓 Heartbeat received from server {heartbeat.server_id}")
         
+        # Tasks whose lease already expired and were requeued; the server no longer owns them
+        lost_task_ids = sorted(set(heartbeat.task_ids) - set(renewed_task_ids)) if heartbeat.lease_seconds else []
+        if lost_task_ids:
+            logger.warning(f"⚠️ Server {heartbeat.server_id} lost the leases of tasks {lost_task_ids}")
+        
         return {
             "success": True,
             "message": "Heartbeat recorded",
-            "server_id": heartbeat.server_id
+            "server_id": heartbeat.server_id,
+            "renewed_task_ids": renewed_task_ids,
+            "lost_task_ids": lost_task_ids
         }
         
     except HTTPException:
@@ -682,7 +699,8 @@ async def get_next_queue_task(
                 "task_type": task[2],
                 "file_path": task[3],
                 "company_id": task[4],
-                "processing_options": processing_options
+                "processing_options": processing_options,
+                "lane": task[6]
             }
         else:
             # No tasks available
@@ -695,6 +713,51 @@ async def get_next_queue_task(
             detail=f"Failed to get next queue task: {str(e)}"
         )
 
+def advance_dojo_job(db: Session, task_id: int):
+    """Recount the dojo batch job that queued a task from its finished queue tasks; the last task finishes the job
+
+    A task is finished once it completed or failed, so a failed deck does not keep the job open.
+    Failed tasks are only retried on request; when a retried task is picked up again the job is
+    recounted and reopens until it finishes. Deck durations of finished tasks feed the job's ETA.
+    """
+    try:
+        task = db.execute(text("""
+            SELECT pq.processing_options->>'dojo_job_id', pd.file_name
+            FROM processing_queue pq
+            LEFT JOIN project_documents pd ON pd.id = pq.document_id
+            WHERE pq.id = :task_id
+        """), {"task_id": task_id}).fetchone()
+        if not task or not task[0]:
+            return
+        
+        job_id = task[0]
+        rows = db.execute(text("""
+            SELECT status, processing_duration_seconds
+            FROM processing_queue
+            WHERE processing_options->>'dojo_job_id' = :job_id
+            AND status IN ('completed', 'failed')
+            ORDER BY completed_at NULLS LAST, id
+        """), {"job_id": job_id}).fetchall()
+        total = db.execute(text("""
+            SELECT COUNT(*) FROM processing_queue WHERE processing_options->>'dojo_job_id' = :job_id
+        """), {"job_id": job_id}).scalar()
+        
+        completed = sum(1 for row in rows if row[0] == 'completed')
+        fields = {
+            "progress": len(rows),
+            "processing_times": [float(row[1]) for row in rows if row[1] is not None]
+        }
+        if len(rows) >= total:
+            dojo_progress_store.finish(job_id, "completed", current_deck=f"Completed: {completed}/{total} decks processed",
+                                       **fields)
+            logger.info(f"Dojo job {job_id} finished: {completed}/{total} queue tasks completed")
+        else:
+            dojo_progress_store.update(job_id, status="processing", completion_time=None,
+                                       current_deck=task[1] or f"Deck task {task_id}", **fields)
+            dojo_progress_store.flush(job_id)
+    except Exception as e:
+        logger.warning(f"Could not update dojo job progress for task {task_id}: {e}")
+
 @router.post("/update-task-status")
 async def update_task_status(
     update: TaskStatusUpdate,
@@ -738,8 +801,12 @@ async def update_task_status(
             "message": update.message
         })
         
+        notify_document_progress(db, task_id=update.task_id)
         db.commit()
         
+        if update.status in ('processing', 'completed', 'failed'):
+            advance_dojo_job(db, update.task_id)
+        
         logger.info(f"✅ Updated task {update.task_id} status to {update.status}")
         
         return {
@@ -872,6 +939,42 @@ async def complete_task_and_create_specialized(
             detail=f"Failed to complete task and create specialized analysis: {str(e)}"
         )
 
+def upsert_analysis_results(db: Session, table_name: str, key_column: str, rows: List[Dict[str, Any]]):
+    """Insert or replace a deck's analysis rows with a single multi-row INSERT ... ON CONFLICT statement.
+
+    Passing a list of parameter sets to text() would run executemany, one round trip per row with psycopg2.
+    Rows must be unique per (document_id, key_column).
+    """
+    if not rows:
+        return
+    target = table(table_name, column("document_id"), column(key_column), column("analysis_results_json"), column("created_at"))
+    statement = postgresql.insert(target).values([{**row, "created_at": func.now()} for row in rows])
+    db.execute(statement.on_conflict_do_update(
+        index_elements=["document_id", key_column],
+        set_={
+            "analysis_results_json": statement.excluded.analysis_results_json,
+            "created_at": statement.excluded.created_at
+        }
+    ))
+
+def chapter_analysis_rows(document_id: int, chapter_analysis: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """One chapter_analysis_results row per chapter, keyed by its template chapter.
+
+    Chapters are keyed by name in the payload and carry their template_chapters id. Chapters of
+    the built-in fallback template have no row there and use their position in the template.
+    """
+    rows = {}
+    for position, (chapter_key, chapter_data) in enumerate(chapter_analysis.items(), 1):
+        chapter_id = (chapter_data or {}).get("template_chapter_id")
+        if not isinstance(chapter_id, int):
+            chapter_id = int(chapter_key) if chapter_key.isdigit() else position
+        rows[chapter_id] = {
+            "document_id": document_id,
+            "chapter_id": chapter_id,
+            "analysis_results_json": json.dumps(chapter_data)
+        }
+    return list(rows.values())
+
 @router.post("/save-extraction-template-results")
 async def save_extraction_template_results(
     request: ExtractionTemplateResultsRequest,
@@ -881,56 +984,33 @@ async def save_extraction_template_results(
     try:
         logger.info(f"💾 Saving extraction and template results for document {request.document_id}")
         
-        # Save chapter analysis results if present
+        # Save chapter analysis results if present - all chapters in one INSERT ... ON CONFLICT statement
         if request.chapter_analysis:
-            for chapter_id, chapter_data in request.chapter_analysis.items():
-                try:
-                    insert_query = text("""
-                        INSERT INTO chapter_analysis_results 
-                        (document_id, chapter_id, analysis_results_json, created_at)
-                        VALUES (:document_id, :chapter_id, :analysis_json, NOW())
-                        ON CONFLICT (document_id, chapter_id) 
-                        DO UPDATE SET 
-                            analysis_results_json = EXCLUDED.analysis_results_json,
-                            created_at = EXCLUDED.created_at
-                    """)
-                    
-                    db.execute(insert_query, {
-                        "document_id": request.document_id,
-                        "chapter_id": int(chapter_id) if chapter_id.isdigit() else 0,
-                        "analysis_json": json.dumps(chapter_data)
-                    })
-                except Exception as e:
-                    logger.warning(f"Failed to save chapter {chapter_id}: {e}")
-        
-        # Save question analysis results if present
+            upsert_analysis_results(db, "chapter_analysis_results", "chapter_id",
+                                    chapter_analysis_rows(request.document_id, request.chapter_analysis))
+        
+        # Save question analysis results if present - all questions in one INSERT ... ON CONFLICT statement
         if request.question_analysis:
+            question_rows = {}
             for question_key, question_data in request.question_analysis.items():
-                try:
-                    # Extract question_id from the key (format: "chapterX_questionY")
-                    parts = question_key.split('_')
-                    if len(parts) >= 2 and parts[-1].startswith('question'):
-                        question_id = int(parts[-1].replace('question', ''))
-                    else:
-                        question_id = 0
-                    
-                    insert_query = text("""
-                        INSERT INTO question_analysis_results 
-                        (document_id, question_id, analysis_results_json, created_at)
-                        VALUES (:document_id, :question_id, :analysis_json, NOW())
-                        ON CONFLICT (document_id, question_id) 
-                        DO UPDATE SET 
-                            analysis_results_json = EXCLUDED.analysis_results_json,
-                            created_at = EXCLUDED.created_at
-                    """)
-                    
-                    db.execute(insert_query, {
-                        "document_id": request.document_id,
-                        "question_id": question_id,
-                        "analysis_json": json.dumps(question_data)
-                    })
-                except Exception as e:
-                    logger.warning(f"Failed to save question {question_key}: {e}")
+                # Extract question_id from the key (format: "chapterX_questionY")
+                parts = question_key.split('_')
+                if len(parts) >= 2 and parts[-1].startswith('question'):
+                    suffix = parts[-1].replace('question', '')
+                    if not suffix.isdigit():
+                        logger.warning(f"Failed to save question {question_key}: invalid question id")
+                        continue
+                    question_id = int(suffix)
+                else:
+                    question_id = 0
+                
+                question_rows[question_id] = {
+                    "document_id": request.document_id,
+                    "question_id": question_id,
+                    "analysis_results_json": json.dumps(question_data)
+                }
+            
+            upsert_analysis_results(db, "question_analysis_results", "question_id", list(question_rows.values()))
         
         # Save extraction results (offering, classification, name, funding, date) to extraction_experiments
         # This maintains compatibility with dojo's expected format
@@ -3,12 +3,14 @@ Project-based API Endpoints
 Handles project dashboard, deck viewer, results, and uploads
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import FileResponse, JSONResponse, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel, Field
 from datetime import datetime
+import base64
 import json
 import os
 import logging
@@ -18,10 +20,11 @@ import re
 from pathlib import Path
 
 from ..db.database import get_db
-from ..db.models import User, Project, ProjectMember
+from ..db.models import User, Project, ProjectMember, load_json_column
 from .auth import get_current_user
 from ..core.config import settings
 from ..core.access_control import check_project_access_by_company_id, check_project_access
+from ..services.slide_index import slide_index_service, THUMBNAIL_DIRNAME, THUMBNAIL_VARIANTS
 
 logger = logging.getLogger(__name__)
 
@@ -168,7 +171,7 @@ async def get_deck_analysis(
         if template_result and template_result[0]:
             try:
                 # Parse the template processing results JSON
-                template_data = json.loads(template_result[0])
+                template_data = load_json_column(template_result[0])
                 
                 # Find results for this specific document
                 if isinstance(template_data, list):
@@ -243,10 +246,7 @@ async def get_deck_analysis(
                     logger.info(f"Found cached visual analysis for deck {deck_id}, model: {vision_model}")
                     
                     # Parse the cached analysis JSON
-                    if isinstance(cached_analysis_json, str):
-                        cached_analysis = json.loads(cached_analysis_json)
-                    else:
-                        cached_analysis = cached_analysis_json
+                    cached_analysis = load_json_column(cached_analysis_json)
                     
                     # Create results_data structure from cached analysis
                     results_data = {
@@ -466,11 +466,10 @@ async def get_project_results(
         """)
         specialized_results = db.execute(specialized_analysis_query, {"deck_id": deck_id}).fetchall()
         
-        # 4. Get visual analysis (if needed for partial results)
+        # 4. Check for visual analysis (only its existence is needed, not the document)
         visual_query = text("""
-            SELECT analysis_result_json FROM visual_analysis_cache 
+            SELECT 1 FROM visual_analysis_cache 
             WHERE document_id = :deck_id
-            ORDER BY created_at DESC
             LIMIT 1
         """)
         visual_result = db.execute(visual_query, {"deck_id": deck_id}).fetchone()
@@ -481,7 +480,7 @@ async def get_project_results(
         # Add template processing results if available
         if template_result and template_result[0]:
             try:
-                template_data = json.loads(template_result[0])
+                template_data = load_json_column(template_result[0])
                 template_analysis = template_data.get("template_analysis", "")
                 
                 # Extract chapter scores from structured chapter_analysis if available
@@ -521,7 +520,7 @@ async def get_project_results(
         # Add extraction results if available
         if extraction_result and extraction_result[0]:
             try:
-                extraction_data = json.loads(extraction_result[0])
+                extraction_data = load_json_column(extraction_result[0])
                 
                 # Handle both new format (arrays) and legacy format (keyed by deck_id)
                 deck_data = extraction_data.get(str(deck_id), {})
@@ -810,20 +809,22 @@ async def get_project_uploads(
 async def get_document_slide_image(
     document_id: int,
     slide_filename: str,
+    request: Request,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Serve slide images for a specific document"""
     try:
-        # Get document information and check access
+        # Get document information, access data and the indexed slide path in one query
         document_query = text("""
-        SELECT pd.id, pd.file_name, pd.original_filename, pd.project_id, p.company_id 
+        SELECT pd.id, pd.file_name, pd.original_filename, pd.project_id, p.company_id, si.slide_image_path
         FROM project_documents pd
         JOIN projects p ON pd.project_id = p.id
+        LEFT JOIN slide_images si ON si.document_id = pd.id AND si.slide_filename = :slide_filename
         WHERE pd.id = :document_id AND pd.is_active = TRUE AND p.is_active = TRUE
         """)
         
-        document_result = db.execute(document_query, {"document_id": document_id}).fetchone()
+        document_result = db.execute(document_query, {"document_id": document_id, "slide_filename": slide_filename}).fetchone()
         
         if not document_result:
             raise HTTPException(
@@ -831,7 +832,7 @@ async def get_document_slide_image(
                 detail=f"Document {document_id} not found"
             )
         
-        doc_id, file_name, original_filename, project_id, company_id = document_result
+        doc_id, file_name, original_filename, project_id, company_id, indexed_slide_path = document_result
         
         # Check project access permissions
         if not check_project_access(current_user, project_id, db):
@@ -843,42 +844,24 @@ async def get_document_slide_image(
         # Derive deck name from filename (remove extension)
         deck_name = os.path.splitext(original_filename)[0] if original_filename else os.path.splitext(file_name)[0]
         
-        # Construct image path - check multiple possible locations
-        possible_paths = [
-            # Standard company-based structure
-            os.path.join(settings.SHARED_FILESYSTEM_MOUNT_PATH, "projects", company_id, "analysis", deck_name, slide_filename),
-        ]
-        
         image_path = None
-        for path in possible_paths:
-            logger.info(f"Checking image path: {path}")
-            if os.path.exists(path):
-                image_path = path
-                logger.info(f"Found image at: {path}")
-                break
-        
-        if not image_path:
-            # Try to find the image in any directory that contains the deck name
-            # Search through company analysis directories
-            projects_path = os.path.join(settings.SHARED_FILESYSTEM_MOUNT_PATH, "projects")
-            if os.path.exists(projects_path):
-                logger.info(f"Searching in company analysis directories for deck containing: {deck_name}")
-                for company_dir in os.listdir(projects_path):
-                    analysis_dir = os.path.join(projects_path, company_dir, "analysis")
-                    if os.path.exists(analysis_dir):
-                        for deck_dir in os.listdir(analysis_dir):
-                            if deck_name in deck_dir:
-                                potential_path = os.path.join(analysis_dir, deck_dir, slide_filename)
-                        logger.info(f"Checking potential path: {potential_path}")
-                        if os.path.exists(potential_path):
-                            image_path = potential_path
-                            logger.info(f"Found image in directory: {dir_name}")
-                            break
+        if indexed_slide_path:
+            image_path = slide_index_service.absolute_path(indexed_slide_path)
+        else:
+            # Not indexed yet (processed before the slide index existed) - check the standard location once
+            relative_path = os.path.join(company_id, "analysis", deck_name, slide_filename)
+            standard_path = slide_index_service.absolute_path(relative_path)
+            if os.path.exists(standard_path):
+                image_path = standard_path
+                try:
+                    slide_index_service.register_slide(db, doc_id, slide_filename, relative_path)
+                    db.commit()
+                except Exception as e:
+                    db.rollback()
+                    logger.warning(f"Could not index slide {slide_filename} for document {doc_id}: {e}")
         
-        # Debug logging
         if image_path:
-            logger.info(f"Final image path: {image_path}")
-            logger.info(f"File exists: {os.path.exists(image_path)}")
+            logger.debug(f"Resolved slide image path: {image_path}")
         else:
             logger.error(f"No valid image path found for {slide_filename}")
         
@@ -932,40 +915,33 @@ async def get_document_slide_image(
                     logger.warning("PIL not available, serving text placeholder")
                     # Fallback to text response if PIL is not available
                     placeholder_text = f"Slide {slide_filename} - Development Placeholder\nDeck: {deck_name}\nCompany: {company_id}"
-                    from fastapi.responses import Response
                     return Response(
                         content=placeholder_text,
                         media_type="text/plain",
                         headers={"Content-Disposition": f"inline; filename={slide_filename}.txt"}
                     )
             
-            # Add more debug info for production
             if image_path:
-                parent_dir = os.path.dirname(image_path)
                 logger.error(f"Image not found: {image_path}")
-                logger.error(f"Parent directory exists: {os.path.exists(parent_dir)}")
-                if os.path.exists(parent_dir):
-                    logger.error(f"Files in parent directory: {os.listdir(parent_dir)}")
             else:
                 logger.error(f"No valid path found for slide {slide_filename} in deck {deck_name}")
-                
-                # List what directories are actually available
-                projects_path = os.path.join(settings.SHARED_FILESYSTEM_MOUNT_PATH, "projects")
-                if os.path.exists(projects_path):
-                    available_dirs = os.listdir(projects_path)
-                    logger.error(f"Available analysis directories: {available_dirs}")
             
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Slide image not found: {slide_filename} for deck {deck_name}"
             )
         
+        # Slides never change once rendered - let browsers and proxies revalidate cheaply
+        cache_headers = slide_index_service.cache_headers(os.stat(image_path))
+        if slide_index_service.is_not_modified(request.headers, cache_headers):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers)
+        
         # Return image file
-        from fastapi.responses import FileResponse
         return FileResponse(
             path=image_path,
             media_type="image/jpeg",
-            filename=slide_filename
+            filename=slide_filename,
+            headers=cache_headers
         )
         
     except HTTPException:
@@ -977,6 +953,129 @@ async def get_document_slide_image(
             detail="Failed to serve slide image"
         )
 
+def _get_accessible_document_deck(document_id: int, current_user: User, db: Session) -> tuple:
+    """Return (company_id, deck_name) for an active document the user may access"""
+    document_result = db.execute(text("""
+    SELECT pd.file_name, pd.original_filename, pd.project_id, p.company_id
+    FROM project_documents pd
+    JOIN projects p ON pd.project_id = p.id
+    WHERE pd.id = :document_id AND pd.is_active = TRUE AND p.is_active = TRUE
+    """), {"document_id": document_id}).fetchone()
+    
+    if not document_result:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Document {document_id} not found"
+        )
+    
+    file_name, original_filename, project_id, company_id = document_result
+    
+    if not check_project_access(current_user, project_id, db):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You don't have access to this document's project"
+        )
+    
+    deck_name = os.path.splitext(original_filename)[0] if original_filename else os.path.splitext(file_name)[0]
+    return company_id, deck_name
+
+@router.get("/documents/{document_id}/slide-overview")
+async def get_document_slide_overview(
+    document_id: int,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Return the thumbnail manifest and the small-variant sprite sheet of a deck in one response"""
+    try:
+        company_id, deck_name = _get_accessible_document_deck(document_id, current_user, db)
+        deck_directory = slide_index_service.deck_directory(db, document_id, company_id, deck_name)
+        
+        manifest = slide_index_service.load_thumbnail_manifest(deck_directory)
+        if not manifest or not manifest.get("sprite"):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"No slide thumbnails available for document {document_id}"
+            )
+        
+        sprite_path = os.path.join(deck_directory, manifest["sprite"]["filename"])
+        cache_headers = slide_index_service.cache_headers(os.stat(sprite_path))
+        if slide_index_service.is_not_modified(request.headers, cache_headers):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers)
+        
+        with open(sprite_path, "rb") as f:
+            sprite_data = base64.b64encode(f.read()).decode("ascii")
+        
+        return JSONResponse(
+            content={
+                "document_id": document_id,
+                "deck_name": deck_name,
+                "manifest": manifest,
+                "sprite": {
+                    "media_type": manifest["sprite"].get("media_type", "image/jpeg"),
+                    "data": sprite_data
+                }
+            },
+            headers=cache_headers
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error serving slide overview for document {document_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to serve slide overview"
+        )
+
+@router.get("/documents/{document_id}/slide-thumbnail/{variant}/{slide_number}")
+async def get_document_slide_thumbnail(
+    document_id: int,
+    variant: str,
+    slide_number: int,
+    request: Request,
+    format: str = "jpeg",
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Serve a pre-generated small or medium slide variant (format=jpeg or webp)"""
+    if variant not in THUMBNAIL_VARIANTS or format not in ("jpeg", "webp"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported thumbnail variant/format: {variant}/{format}"
+        )
+    
+    try:
+        company_id, deck_name = _get_accessible_document_deck(document_id, current_user, db)
+        deck_directory = slide_index_service.deck_directory(db, document_id, company_id, deck_name)
+        
+        extension = "jpg" if format == "jpeg" else "webp"
+        thumbnail_path = os.path.join(deck_directory, THUMBNAIL_DIRNAME, f"slide_{slide_number}_{variant}.{extension}")
+        if not os.path.exists(thumbnail_path):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Thumbnail not found: slide {slide_number} ({variant}, {format})"
+            )
+        
+        cache_headers = slide_index_service.cache_headers(os.stat(thumbnail_path))
+        if slide_index_service.is_not_modified(request.headers, cache_headers):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers)
+        
+        return FileResponse(
+            path=thumbnail_path,
+            media_type=f"image/{format}",
+            headers=cache_headers
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error serving {variant} thumbnail for document {document_id}, slide {slide_number}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to serve slide thumbnail"
+        )
+
 @router.delete("/{project_id}/deck/{deck_id}")
 async def delete_deck(
     project_id: int,
@@ -1280,7 +1379,7 @@ async def get_extraction_results(
             # Parse unified results_json - handle both new array format and legacy keyed format
             if row.results_json:
                 try:
-                    results_data = json.loads(row.results_json)
+                    results_data = load_json_column(row.results_json)
                     
                     # Try legacy format first (keyed by deck_id)
                     deck_data = results_data.get(str(deck_id), {})
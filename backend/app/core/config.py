@@ -47,8 +47,17 @@ class Settings(BaseSettings):
     SMTP_PASSWORD: str = ""
     FROM_EMAIL: str = "registration@halbzeit.ai"
     FROM_NAME: str = "HALBZEIT AI Review Platform"
+    SMTP_TIMEOUT: int = 30  # Seconds
+    EMAIL_OUTBOX_ENABLED: bool = True  # Queue emails and send them from a background thread
+    EMAIL_OUTBOX_BATCH_SIZE: int = 20
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = 6
+    EMAIL_TEMPLATE_CACHE_DIR: str = ""  # Jinja2 bytecode cache for the email templates, shared across restarts
     FRONTEND_URL: str = "http://localhost:3000"  # Update for production
 
+    # Processing Queue
+    QUEUE_LEASE_SWEEP_ENABLED: bool = True  # Requeue tasks whose GPU lease expired from a background thread
+    QUEUE_LEASE_SWEEP_SECONDS: float = 30.0
+
     # File Upload Settings
     MAX_UPLOAD_SIZE: int = 1073741824  # 1GB
     UPLOAD_PATH: str = "/tmp/uploads"
@@ -70,6 +79,13 @@ class Settings(BaseSettings):
     SENTRY_DSN: Optional[str] = None
     LOG_FILE: Optional[str] = None
 
+    # Sector pre-classification: skip the LLM when the embedding index is confident.
+    # Off until the thresholds are tuned with scripts/benchmark_sector_preclassifier.py
+    SECTOR_PRECLASSIFIER_ENABLED: bool = False
+    SECTOR_PRECLASSIFIER_MIN_SIMILARITY: float = 0.3
+    SECTOR_PRECLASSIFIER_MIN_MARGIN: float = 0.15  # Best sector similarity minus the runner-up's
+    SECTOR_EMBEDDING_INDEX_PATH: str = ""  # Prebuilt index (scripts/build_sector_embedding_index.py)
+
     # Performance settings
     WORKERS: int = 1
     WORKER_TIMEOUT: int = 300
@@ -5,7 +5,7 @@ Handles file upload and management for the document processing pipeline.
 Primary purpose: Save uploaded PDFs to shared filesystem for GPU processing.
 
 ACTIVE FUNCTIONS:
-- File upload management (save_upload, get_file_path, file_exists, etc.)
+- File upload management (save_upload, save_upload_stream, get_file_path, file_exists, etc.)
 - Filesystem mount validation (is_filesystem_mounted, is_volume_mounted)
 - Basic file operations (delete_file, get_file_size)
 
@@ -17,6 +17,9 @@ DEPRECATED FUNCTIONS (2025-08-16):
 import os
 import shutil
 import uuid
+import asyncio
+import hashlib
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional, BinaryIO
 from ..core.config import settings
@@ -24,6 +27,20 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Chunk size for streamed uploads - large enough to keep NFS writes efficient
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+@dataclass
+class StoredUpload:
+    """A file streamed to the shared filesystem, hashed and measured in the same pass"""
+    file_path: str  # Relative path for database storage
+    file_hash: str  # SHA-256 hex digest
+    file_size: int
+
+class UploadTooLargeError(Exception):
+    """Raised when a streamed upload exceeds the allowed size"""
+    pass
+
 class VolumeStorageService:
     def __init__(self):
         self.mount_path = Path(settings.SHARED_FILESYSTEM_MOUNT_PATH)
@@ -80,6 +97,63 @@ class VolumeStorageService:
         
         return relative_path
     
+    async def save_upload_stream(self, upload, original_filename: str, company_name: str, max_size: Optional[int] = None) -> StoredUpload:
+        """
+        Stream an upload to the shared filesystem without blocking the event loop
+        
+        `upload` is any object with an async read(size) method (e.g. fastapi.UploadFile).
+        The SHA-256 hash and size are computed while the chunks are written, so the
+        file is read exactly once. Partial files are removed if the upload fails.
+        """
+        if not self.is_filesystem_mounted():
+            raise Exception("Shared filesystem is not mounted")
+        
+        # Generate unique filename structure (same layout as save_upload)
+        file_id = str(uuid.uuid4())
+        company_slug = company_name.replace(" ", "_").lower()
+        file_dir = self.uploads_dir / company_slug / file_id
+        file_path = file_dir / original_filename
+        
+        await asyncio.to_thread(file_dir.mkdir, parents=True, exist_ok=True)
+        
+        sha256_hash = hashlib.sha256()
+        file_size = 0
+        target = await asyncio.to_thread(open, file_path, "wb")
+        try:
+            while True:
+                chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                file_size += len(chunk)
+                if max_size and file_size > max_size:
+                    raise UploadTooLargeError(f"Upload exceeds maximum size of {max_size} bytes")
+                await asyncio.to_thread(self._write_chunk, target, sha256_hash, chunk)
+        except BaseException:
+            await asyncio.to_thread(target.close)
+            await asyncio.to_thread(self._remove_partial_upload, file_path)
+            raise
+        await asyncio.to_thread(target.close)
+        
+        relative_path = f"uploads/{company_slug}/{file_id}/{original_filename}"
+        logger.info(f"Streamed file to: {relative_path} ({file_size} bytes)")
+        
+        return StoredUpload(file_path=relative_path, file_hash=sha256_hash.hexdigest(), file_size=file_size)
+    
+    @staticmethod
+    def _write_chunk(target: BinaryIO, sha256_hash, chunk: bytes) -> None:
+        """Hash and write one chunk (runs in a worker thread)"""
+        sha256_hash.update(chunk)
+        target.write(chunk)
+    
+    @staticmethod
+    def _remove_partial_upload(file_path: Path) -> None:
+        """Remove a partially written upload and its empty directory"""
+        try:
+            file_path.unlink(missing_ok=True)
+            file_path.parent.rmdir()
+        except OSError:
+            pass
+    
     def get_file_path(self, relative_path: str) -> Path:
         """Get absolute file path from relative path"""
         return self.mount_path / relative_path
@@ -1,9 +1,10 @@
 
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, DateTime, Text, Numeric, UniqueConstraint, Index
+from sqlalchemy import BigInteger, Boolean, Column, ForeignKey, Integer, String, DateTime, Text, Numeric, Float, UniqueConstraint, Index
 from sqlalchemy.dialects import postgresql
 from sqlalchemy.orm import relationship, DeclarativeBase
 from datetime import datetime
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
+import json
 
 if TYPE_CHECKING:
     from sqlalchemy.orm import Mapped
@@ -11,6 +12,19 @@ if TYPE_CHECKING:
 class Base(DeclarativeBase):
     pass
 
+def load_json_column(value: Any) -> Any:
+    """Decode an analysis JSON column value.
+    
+    JSONB columns come back from psycopg2 already decoded; text values (rows read
+    before the JSONB migration, or other databases) are parsed here. Invalid JSON
+    raises json.JSONDecodeError like json.loads.
+    """
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        value = bytes(value).decode("utf-8")
+    if isinstance(value, str):
+        return json.loads(value)
+    return value
+
 class User(Base):
     __tablename__ = "users"
     id = Column(Integer, primary_key=True, index=True)
@@ -128,16 +142,26 @@ class ProjectDocument(Base):
     file_path = Column(String)  # Relative path in shared volume
     original_filename = Column(String, nullable=True)  # Original uploaded filename
     file_size = Column(Integer, nullable=True)
+    file_hash = Column(String(64), nullable=True)  # SHA-256 of the file content, computed while uploading
     processing_status = Column(String, default="pending")  # pending, processing, completed, failed
     extracted_data = Column(Text, nullable=True)  # JSON for document-specific extractions
     analysis_results_path = Column(String, nullable=True)  # Path to analysis results file
     uploaded_by = Column(Integer, ForeignKey("users.id"))
     upload_date = Column(DateTime, default=datetime.utcnow)
     is_active = Column(Boolean, default=True)
+    previous_version_id = Column(Integer, ForeignKey("project_documents.id", ondelete="SET NULL"), nullable=True)  # Deck this upload revises
+    version_number = Column(Integer, default=1, nullable=False)
     
     # Relationships
     project = relationship("Project", back_populates="documents")
     uploader = relationship("User")
+    previous_version = relationship("ProjectDocument", remote_side=[id])
+    
+    # Indexes for duplicate detection within a project
+    __table_args__ = (
+        Index('idx_project_documents_project_file_hash', 'project_id', 'file_hash'),
+        Index('idx_project_documents_project_file_name', 'project_id', 'file_name'),
+    )
 
 class ProjectInteraction(Base):
     __tablename__ = "project_interactions"
@@ -172,13 +196,18 @@ class VisualAnalysisCache(Base):
     __tablename__ = "visual_analysis_cache"
     id = Column(Integer, primary_key=True, index=True)
     document_id = Column(Integer, ForeignKey("project_documents.id", ondelete="CASCADE"), nullable=False, index=True)
-    analysis_result_json = Column(Text, nullable=False)  # Store full visual analysis JSON
+    analysis_result_json = Column(postgresql.JSONB, nullable=False)  # Full visual analysis, read with load_json_column
     vision_model_used = Column(String(255), nullable=False)  # e.g., "gemma3:12b"
     prompt_used = Column(Text, nullable=False)  # Store the prompt used for visual analysis
     created_at = Column(DateTime, default=datetime.utcnow, index=True)
     
     # Relationships
     project_document = relationship("ProjectDocument")
+    
+    # Serves the latest-entry-per-document lookup (DISTINCT ON document_id ... created_at DESC)
+    __table_args__ = (
+        Index('idx_visual_analysis_cache_document_created', document_id, created_at.desc()),
+    )
 
 class ExtractionExperiment(Base):
     __tablename__ = "extraction_experiments"
@@ -188,29 +217,29 @@ class ExtractionExperiment(Base):
     extraction_type = Column(String(50), nullable=False, default='company_offering')
     text_model_used = Column(String(255), nullable=False)  # Model used for extraction
     extraction_prompt = Column(Text, nullable=False)  # Custom prompt for extraction
-    results_json = Column(Text, nullable=False)  # Store all extraction results
+    results_json = Column(postgresql.JSONB, nullable=False)  # Store all extraction results
     created_at = Column(DateTime, default=datetime.utcnow, index=True)
     
     # Step 3.2: Classification
     classification_enabled = Column(Boolean, default=False)
-    classification_results_json = Column(Text)
+    classification_results_json = Column(postgresql.JSONB)
     classification_model_used = Column(String(255))
     classification_completed_at = Column(DateTime)
     
     # Step 3.3: Company Name
-    company_name_results_json = Column(Text)
+    company_name_results_json = Column(postgresql.JSONB)
     company_name_completed_at = Column(DateTime)
     
     # Step 3.4: Funding Amount
-    funding_amount_results_json = Column(Text)
+    funding_amount_results_json = Column(postgresql.JSONB)
     funding_amount_completed_at = Column(DateTime)
     
     # Step 3.5: Deck Date
-    deck_date_results_json = Column(Text)
+    deck_date_results_json = Column(postgresql.JSONB)
     deck_date_completed_at = Column(DateTime)
     
     # Step 4: Template Processing
-    template_processing_results_json = Column(Text)
+    template_processing_results_json = Column(postgresql.JSONB)
     template_processing_completed_at = Column(DateTime)
 
 
@@ -522,6 +551,86 @@ class SlideFeedback(Base):
     __table_args__ = (UniqueConstraint('document_id', 'slide_number'),)
 
 
+class SlideImage(Base):
+    __tablename__ = "slide_images"
+
+    id = Column(Integer, primary_key=True, index=True)
+    document_id = Column(Integer, ForeignKey("project_documents.id", ondelete="CASCADE"), nullable=False)
+    slide_number = Column(Integer)
+    slide_filename = Column(String(255), nullable=False)
+    slide_image_path = Column(Text, nullable=False)  # Relative to {SHARED_FILESYSTEM_MOUNT_PATH}/projects
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    # Relationships
+    document = relationship("ProjectDocument")
+
+    # One row per slide file; the unique index doubles as the lookup index for the deck viewer
+    __table_args__ = (
+        UniqueConstraint('document_id', 'slide_filename', name='uq_slide_images_document_filename'),
+    )
+
+class SlideAnalysisCache(Base):
+    __tablename__ = "slide_analysis_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(20), nullable=False)  # 'description' or 'feedback'
+    company_id = Column(String(255), nullable=False)  # Results are only reused within this company
+    slide_hash = Column(BigInteger, nullable=False)  # 64-bit perceptual hash (dHash), signed
+    text_hash = Column(String(32), nullable=False, default="")  # md5 of the page text layer, '' without one
+    detail_hash = Column(String(64), nullable=False)  # 256-bit dHash (hex)
+    hash_band_0 = Column(Integer, nullable=False)
+    hash_band_1 = Column(Integer, nullable=False)
+    hash_band_2 = Column(Integer, nullable=False)
+    hash_band_3 = Column(Integer, nullable=False)
+    vision_model = Column(String(255), nullable=False)
+    prompt_hash = Column(String(32), nullable=False)  # md5 of the image analysis / slide feedback prompt
+    result = Column(Text)
+    has_issues = Column(Boolean)
+    analysis_route = Column(String(20))
+    hit_count = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_used_at = Column(DateTime, default=datetime.utcnow)
+
+    # Written by the GPU server; the band indexes find near-duplicate slides by Hamming distance
+    __table_args__ = (
+        UniqueConstraint('kind', 'company_id', 'slide_hash', 'vision_model', 'prompt_hash', 'text_hash', 'detail_hash',
+                         name='uq_slide_analysis_cache_entry'),
+        Index('idx_slide_analysis_cache_band_0', 'kind', 'company_id', 'vision_model', 'prompt_hash', 'hash_band_0'),
+        Index('idx_slide_analysis_cache_band_1', 'kind', 'company_id', 'vision_model', 'prompt_hash', 'hash_band_1'),
+        Index('idx_slide_analysis_cache_band_2', 'kind', 'company_id', 'vision_model', 'prompt_hash', 'hash_band_2'),
+        Index('idx_slide_analysis_cache_band_3', 'kind', 'company_id', 'vision_model', 'prompt_hash', 'hash_band_3'),
+        Index('idx_slide_analysis_cache_last_used', 'last_used_at'),
+    )
+
+class DojoJobProgress(Base):
+    __tablename__ = "dojo_job_progress"
+
+    job_id = Column(String(36), primary_key=True)  # UUID, returned to the client that started the job
+    step = Column(String(20), nullable=False)  # step2 (visual analysis), step3 (extractions), step4 (templates), upload
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    status = Column(String(20), default="processing")  # processing, completed, error
+    current_deck = Column(Text, nullable=True)
+    current_chapter = Column(Text, nullable=True)
+    progress = Column(Integer, default=0)
+    total = Column(Integer, default=0)
+    start_time = Column(Float, nullable=True)  # Epoch seconds, as reported to the dojo UI
+    completion_time = Column(Float, nullable=True)
+    current_deck_start_time = Column(Float, nullable=True)
+    processing_times = Column(Text, nullable=True)  # JSON list of per-deck durations in seconds
+    details = Column(Text, nullable=True)  # JSON for step-specific counters
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relationships
+    user = relationship("User")
+
+    # Latest job per step (and per GP) without scanning finished jobs
+    __table_args__ = (
+        Index('idx_dojo_job_progress_step_updated', 'step', 'updated_at'),
+        Index('idx_dojo_job_progress_user_step_updated', 'user_id', 'step', 'updated_at'),
+    )
+
+
 class ProcessingQueue(Base):
     __tablename__ = "processing_queue"
     
@@ -530,6 +639,8 @@ class ProcessingQueue(Base):
     task_type = Column(String(50), nullable=False, default="pdf_analysis")
     status = Column(String(20), nullable=False, default="queued")  # queued, processing, completed, failed, retry
     priority = Column(Integer, nullable=False, default=1)  # 1=normal, 2=high, 3=urgent
+    lane = Column(String(20), ForeignKey("processing_queue_lanes.lane"), nullable=False, default="interactive")  # interactive, batch, maintenance
+    submitted_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"))  # Fair share between users within a lane
     
     # Task parameters
     file_path = Column(Text, nullable=False)
@@ -548,6 +659,7 @@ class ProcessingQueue(Base):
     retry_count = Column(Integer, default=0)
     max_retries = Column(Integer, default=3)
     next_retry_at = Column(DateTime)
+    attempt_count = Column(Integer, default=0, nullable=False)  # Times the task was picked up (set by trigger)
     
     # Error handling
     last_error = Column(Text)
@@ -567,6 +679,7 @@ class ProcessingQueue(Base):
     progress_steps = relationship("ProcessingProgress", back_populates="processing_task", cascade="all, delete-orphan")
     dependent_tasks = relationship("TaskDependency", foreign_keys="TaskDependency.depends_on_task_id", back_populates="depends_on_task")
     dependency_tasks = relationship("TaskDependency", foreign_keys="TaskDependency.dependent_task_id", back_populates="dependent_task")
+    checkpoints = relationship("TaskCheckpoint", back_populates="processing_task", cascade="all, delete-orphan")
     
     # Indexes for efficient queue processing
     __table_args__ = (
@@ -574,9 +687,20 @@ class ProcessingQueue(Base):
         Index('idx_processing_queue_document', 'document_id'),
         Index('idx_processing_queue_retry', 'status', 'next_retry_at'),
         Index('idx_processing_queue_lock', 'locked_by', 'lock_expires_at'),
+        Index('idx_processing_queue_lane_status', 'lane', 'status'),
+        Index('idx_processing_queue_lane_started', 'lane', 'started_at'),
     )
 
 
+class ProcessingQueueLane(Base):
+    __tablename__ = "processing_queue_lanes"
+    
+    lane = Column(String(20), primary_key=True)  # interactive, batch, maintenance
+    weight = Column(Integer, nullable=False)  # Share of GPU time relative to the other lanes
+    reserved_slots = Column(Integer, nullable=False, default=0)  # GPU slots the other lanes leave free
+    description = Column(Text)
+
+
 class ProcessingProgress(Base):
     __tablename__ = "processing_progress"
     
@@ -598,6 +722,27 @@ class ProcessingProgress(Base):
     )
 
 
+class TaskCheckpoint(Base):
+    __tablename__ = "task_checkpoints"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    processing_queue_id = Column(Integer, ForeignKey("processing_queue.id", ondelete="CASCADE"), nullable=False)
+    attempt = Column(Integer, nullable=False, default=1)
+    stage = Column(String(50), nullable=False)  # visual_page, question
+    item_key = Column(String(100), nullable=False)  # page number or question id
+    fingerprint = Column(String(64))  # Slide hash / question context hash of the item's inputs
+    payload = Column(postgresql.JSONB, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    processing_task = relationship("ProcessingQueue", back_populates="checkpoints")
+    
+    # Written item by item by the GPU server while a task runs
+    __table_args__ = (
+        UniqueConstraint('processing_queue_id', 'stage', 'item_key', name='uq_task_checkpoints_item'),
+    )
+
+
 class ProcessingServer(Base):
     __tablename__ = "processing_servers"
     
@@ -640,3 +785,25 @@ class TemplateConfiguration(Base):
     # Relationships
     user = relationship("User")
     selected_template = relationship("AnalysisTemplate")
+
+
+class EmailOutboxMessage(Base):
+    __tablename__ = "email_outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    to_email = Column(String(255), nullable=False)
+    subject = Column(Text, nullable=False)
+    html_body = Column(Text, nullable=False)
+    text_body = Column(Text, nullable=True)
+    status = Column(String(20), default="pending")  # pending, sending, sent, failed
+    attempts = Column(Integer, default=0)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow)  # Pushed back exponentially after each failure
+    last_error = Column(Text, nullable=True)
+    sent_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # The sender claims due messages in id order
+    __table_args__ = (
+        Index('idx_email_outbox_status_next_attempt', 'status', 'next_attempt_at'),
+    )
@@ -8,6 +8,8 @@ from .api import auth, documents_robust, config, healthcare_templates, pipeline,
 # CLEAN ARCHITECTURE: Removed CPU queue processor - all queue processing now handled by GPU server
 from .db.models import Base
 from .db.database import engine
+from .services.email_service import email_service
+from .services.queue_lease_sweeper import queue_lease_sweeper
 
 # Configure shared filesystem logging
 logger = setup_shared_logging("backend")
@@ -19,7 +21,14 @@ Base.metadata.create_all(bind=engine)
 async def lifespan(app: FastAPI):
     # Startup
     logger.info("Backend startup - All queue processing handled by GPU server")
+    if email_service.outbox:
+        email_service.outbox.start()
+    if settings.QUEUE_LEASE_SWEEP_ENABLED:
+        queue_lease_sweeper.start()
     yield
+    if email_service.outbox:
+        email_service.outbox.stop()
+    queue_lease_sweeper.stop()
     # Shutdown
     logger.info("Backend shutdown complete")
 
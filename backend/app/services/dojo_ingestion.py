@@ -0,0 +1,361 @@
+"""
+Dojo ZIP Ingestion - Streams PDFs from dojo training ZIPs into the dojo project
+
+PDF members are read straight from the archive and hashed while they are written to
+the dojo uploads directory, in a bounded thread pool, so large uploads are never
+unpacked to a temporary directory first. Documents are inserted in batches with one
+duplicate lookup and one commit per batch.
+"""
+
+import os
+import json
+import uuid
+import hashlib
+import zipfile
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..db.database import SessionLocal
+from ..db.models import ProjectDocument
+
+logger = logging.getLogger(__name__)
+
+DOJO_UPLOADS_RELATIVE_PATH = "projects/dojo/uploads"
+INGEST_MAX_WORKERS = 4
+INGEST_BATCH_SIZE = 50
+MEMBER_CHUNK_SIZE = 1024 * 1024
+MAX_MEMBER_SIZE = 512 * 1024 * 1024  # Per-PDF limit, guards against ZIP bombs
+
+
+class DojoUploadResult:
+    """Result object for dojo upload operations"""
+
+    def __init__(self):
+        self.total_files = 0
+        self.new_files: List[str] = []
+        self.duplicate_files: List[str] = []
+        self.error_files: List[str] = []
+        self.new_document_ids: List[int] = []
+
+    @property
+    def success_count(self) -> int:
+        return len(self.new_files)
+
+    @property
+    def duplicate_count(self) -> int:
+        return len(self.duplicate_files)
+
+    @property
+    def error_count(self) -> int:
+        return len(self.error_files)
+
+    def to_dict(self) -> Dict:
+        return {
+            "success": True,
+            "summary": {
+                "total_files": self.total_files,
+                "new_files": self.success_count,
+                "duplicate_files": self.duplicate_count,
+                "error_files": self.error_count
+            },
+            "new_files": self.new_files,
+            "duplicates": self.duplicate_files,
+            "errors": self.error_files,
+            "new_document_ids": self.new_document_ids
+        }
+
+
+@dataclass
+class ExtractedMember:
+    """A PDF written from the archive to the uploads directory"""
+    original_name: str
+    unique_name: str
+    path: str
+    file_hash: str
+    file_size: int
+
+
+@dataclass
+class _IngestRun:
+    """State shared by the batches of one ingestion"""
+    dojo_project_id: int
+    uploaded_by: int
+    zip_filename: str
+    match_names: bool
+    result: DojoUploadResult
+    seen_hashes: Set[str] = field(default_factory=set)
+    seen_names: Set[str] = field(default_factory=set)
+
+
+# Called after each archive member: (processed, total, current_file, result)
+ProgressCallback = Callable[[int, int, str, DojoUploadResult], None]
+
+
+def find_existing_documents(
+    db: Session,
+    project_id: int,
+    file_hashes: Iterable[str],
+    file_names: Iterable[str] = ()
+) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """
+    Look up already ingested documents for a batch of files in one query
+
+    Returns:
+        (document_id by file_hash, document_id by file_name) for the matches found
+    """
+    file_hashes = {file_hash for file_hash in file_hashes if file_hash}
+    file_names = {file_name for file_name in file_names if file_name}
+    if not file_hashes and not file_names:
+        return {}, {}
+
+    match = ProjectDocument.file_hash.in_(file_hashes) if file_hashes else None
+    if file_names:
+        name_match = ProjectDocument.file_name.in_(file_names)
+        match = name_match if match is None else (match | name_match)
+
+    rows = db.query(ProjectDocument.id, ProjectDocument.file_hash, ProjectDocument.file_name).filter(
+        ProjectDocument.project_id == project_id,
+        match
+    ).all()
+
+    by_hash: Dict[str, int] = {}
+    by_name: Dict[str, int] = {}
+    for document_id, file_hash, file_name in rows:
+        if file_hash in file_hashes:
+            by_hash.setdefault(file_hash, document_id)
+        if file_name in file_names:
+            by_name.setdefault(file_name, document_id)
+    return by_hash, by_name
+
+
+class DojoZipIngester:
+    """Streams the PDFs of a dojo ZIP into the uploads directory and the dojo project"""
+
+    def __init__(
+        self,
+        uploads_path: str,
+        max_workers: int = INGEST_MAX_WORKERS,
+        batch_size: int = INGEST_BATCH_SIZE,
+        max_member_size: int = MAX_MEMBER_SIZE,
+        session_factory: Callable[[], Session] = SessionLocal
+    ):
+        self.uploads_path = uploads_path
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.max_member_size = max_member_size
+        self.session_factory = session_factory
+
+    @staticmethod
+    def pdf_members(zip_ref: zipfile.ZipFile) -> List[zipfile.ZipInfo]:
+        """PDF entries of the archive, skipping directories and macOS resource forks"""
+        return [
+            info for info in zip_ref.infolist()
+            if not info.is_dir()
+            and info.filename.lower().endswith(".pdf")
+            and not info.filename.startswith("__MACOSX/")
+            and not os.path.basename(info.filename).startswith("._")
+        ]
+
+    def ingest(
+        self,
+        zip_file_path: str,
+        uploaded_by: int,
+        dojo_project_id: int,
+        zip_filename: Optional[str] = None,
+        match_names: bool = False,
+        progress_callback: Optional[ProgressCallback] = None
+    ) -> DojoUploadResult:
+        """
+        Ingest every PDF in the archive; runs synchronously, call it from a worker thread
+
+        Args:
+            zip_file_path: Path to the uploaded ZIP file (left in place)
+            uploaded_by: User ID who uploaded the file
+            dojo_project_id: ID of the dojo project the documents belong to
+            zip_filename: Original ZIP filename recorded on each document
+            match_names: Also treat files with an already ingested name as duplicates
+            progress_callback: Called after every archive member
+
+        Returns:
+            DojoUploadResult with detailed processing information
+        """
+        result = DojoUploadResult()
+        run = _IngestRun(
+            dojo_project_id=dojo_project_id,
+            uploaded_by=uploaded_by,
+            zip_filename=zip_filename or os.path.basename(zip_file_path),
+            match_names=match_names,
+            result=result
+        )
+        os.makedirs(self.uploads_path, exist_ok=True)
+
+        db = self.session_factory()
+        pending: List[ExtractedMember] = []
+        try:
+            with zipfile.ZipFile(zip_file_path, "r") as zip_ref:
+                members = self.pdf_members(zip_ref)
+                result.total_files = len(members)
+                logger.info(f"Found {result.total_files} PDF files in dojo upload {run.zip_filename}")
+                if progress_callback:
+                    progress_callback(0, result.total_files, "", result)
+
+                with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                    futures = {executor.submit(self._extract_member, zip_ref, info): info for info in members}
+                    consumed = set()
+                    try:
+                        for processed, future in enumerate(as_completed(futures), start=1):
+                            consumed.add(future)
+                            member_name = os.path.basename(futures[future].filename)
+                            try:
+                                pending.append(future.result())
+                            except Exception as e:
+                                logger.error(f"Error extracting PDF {member_name}: {e}")
+                                result.error_files.append(member_name)
+
+                            if len(pending) >= self.batch_size:
+                                self._flush_batch(db, pending, run)
+                                pending = []
+
+                            if progress_callback:
+                                progress_callback(processed, result.total_files, member_name, result)
+                    except BaseException:
+                        # Stop queued members and drop files written but never stored
+                        executor.shutdown(wait=True, cancel_futures=True)
+                        for future in futures:
+                            if future not in consumed and not future.cancelled() and future.exception() is None:
+                                self._remove_file(future.result().path)
+                        raise
+
+            self._flush_batch(db, pending, run)
+            pending = []
+
+        finally:
+            for member in pending:
+                self._remove_file(member.path)
+            db.close()
+
+        logger.info(f"Dojo ZIP ingestion completed: {result.success_count} new, {result.duplicate_count} duplicates, {result.error_count} errors")
+        return result
+
+    def _extract_member(self, zip_ref: zipfile.ZipFile, info: zipfile.ZipInfo) -> ExtractedMember:
+        """Copy one member to the uploads directory, hashing it on the way"""
+        original_name = os.path.basename(info.filename)
+        if info.file_size > self.max_member_size:
+            raise ValueError(f"{original_name} exceeds {self.max_member_size // (1024 * 1024)} MB")
+
+        unique_name = f"{uuid.uuid4().hex}_{original_name}"
+        final_path = os.path.join(self.uploads_path, unique_name)
+        partial_path = f"{final_path}.part"
+
+        sha256_hash = hashlib.sha256()
+        file_size = 0
+        try:
+            with zip_ref.open(info) as source, open(partial_path, "wb") as target:
+                for chunk in iter(lambda: source.read(MEMBER_CHUNK_SIZE), b""):
+                    file_size += len(chunk)
+                    if file_size > self.max_member_size:
+                        raise ValueError(f"{original_name} exceeds {self.max_member_size // (1024 * 1024)} MB")
+                    sha256_hash.update(chunk)
+                    target.write(chunk)
+            os.replace(partial_path, final_path)
+        except Exception:
+            self._remove_file(partial_path)
+            raise
+
+        return ExtractedMember(
+            original_name=original_name,
+            unique_name=unique_name,
+            path=final_path,
+            file_hash=sha256_hash.hexdigest(),
+            file_size=file_size
+        )
+
+    def _flush_batch(self, db: Session, batch: List[ExtractedMember], run: _IngestRun):
+        """Drop duplicates of a batch with one lookup, then insert the rest in one commit"""
+        if not batch:
+            return
+
+        result = run.result
+        new_members = batch  # Until the duplicate lookup has succeeded
+        try:
+            existing_by_hash, existing_by_name = find_existing_documents(
+                db,
+                run.dojo_project_id,
+                (member.file_hash for member in batch),
+                (member.original_name for member in batch) if run.match_names else ()
+            )
+
+            new_members = []
+            for member in batch:
+                is_duplicate = member.file_hash in existing_by_hash or member.file_hash in run.seen_hashes
+                if run.match_names:
+                    is_duplicate = is_duplicate or member.original_name in existing_by_name or member.original_name in run.seen_names
+                if is_duplicate:
+                    logger.info(f"Duplicate detected: {member.original_name}")
+                    result.duplicate_files.append(member.original_name)
+                    self._remove_file(member.path)
+                    continue
+
+                run.seen_hashes.add(member.file_hash)
+                run.seen_names.add(member.original_name)
+                new_members.append(member)
+
+            if not new_members:
+                return
+
+            documents = [
+                ProjectDocument(
+                    project_id=run.dojo_project_id,
+                    document_type="pitch_deck",
+                    file_name=member.original_name,
+                    file_path=f"{DOJO_UPLOADS_RELATIVE_PATH}/{member.unique_name}",
+                    original_filename=member.original_name,
+                    file_size=member.file_size,
+                    file_hash=member.file_hash,
+                    uploaded_by=run.uploaded_by,
+                    processing_status="pending",  # Ready for manual AI processing
+                    extracted_data=json.dumps({
+                        "data_source": "dojo",
+                        "zip_filename": run.zip_filename,
+                        "file_hash": member.file_hash
+                    })
+                )
+                for member in new_members
+            ]
+            db.add_all(documents)
+            db.flush()  # Batched INSERT ... RETURNING id
+            document_ids = [document.id for document in documents]
+            db.commit()
+
+            result.new_files.extend(member.original_name for member in new_members)
+            result.new_document_ids.extend(document_ids)
+
+        except Exception as e:
+            logger.error(f"Error storing batch of {len(batch)} dojo files: {e}")
+            db.rollback()
+            for member in new_members:
+                run.seen_hashes.discard(member.file_hash)
+                run.seen_names.discard(member.original_name)
+                self._remove_file(member.path)
+                result.error_files.append(member.original_name)
+
+    @staticmethod
+    def _remove_file(path: str):
+        """Remove a file written by the ingester, ignoring files that are already gone"""
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Could not remove {path}: {e}")
+
+
+# Global instance
+dojo_zip_ingester = DojoZipIngester(
+    os.path.join(settings.SHARED_FILESYSTEM_MOUNT_PATH, DOJO_UPLOADS_RELATIVE_PATH)
+)
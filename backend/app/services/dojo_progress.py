@@ -0,0 +1,299 @@
+"""
+Dojo Progress Store - Persistent progress records for dojo batch jobs
+
+Replaces the module-level progress dict in the dojo API. Every batch job (visual
+analysis, extractions, template processing, ZIP upload) gets a row in
+dojo_job_progress keyed by a job ID, so progress survives restarts and any uvicorn
+worker can answer progress requests with a primary-key lookup. Frequent updates are
+buffered in memory and written behind once per second; status changes to a terminal
+state are written immediately.
+"""
+
+import json
+import time
+import uuid
+import atexit
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from ..db.database import SessionLocal
+from ..db.models import DojoJobProgress
+
+logger = logging.getLogger(__name__)
+
+DOJO_STEPS = ("step2", "step3", "step4", "upload")
+TERMINAL_STATUSES = {"completed", "error"}
+FLUSH_INTERVAL_SECONDS = 1.0
+JSON_FIELDS = ("processing_times", "details")
+PROGRESS_FIELDS = (
+    "status", "current_deck", "current_chapter", "progress", "total",
+    "start_time", "completion_time", "current_deck_start_time"
+) + JSON_FIELDS
+
+
+def idle_progress(step: str) -> Dict[str, Any]:
+    """Progress payload for a step that has never run"""
+    progress = {"job_id": None, "step": step, "current_deck": "", "status": "idle", "progress": 0, "total": 0}
+    if step == "step4":
+        progress["current_chapter"] = ""
+    return progress
+
+
+class DojoProgressStore:
+    """Postgres-backed dojo job progress with an in-memory write-behind buffer"""
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal, flush_interval: float = FLUSH_INTERVAL_SECONDS):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Dict[str, Any]] = {}  # job_id -> changed fields not yet written
+        self._local: Dict[str, Dict[str, Any]] = {}  # Jobs run by this process -> current state
+        self._flusher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start_job(self, step: str, user_id: Optional[int] = None, total: int = 0, current_deck: str = "", details: Optional[Dict[str, Any]] = None) -> str:
+        """Create a job record right away and return its ID"""
+        job_id = str(uuid.uuid4())
+        state = {
+            "status": "processing",
+            "current_deck": current_deck,
+            "current_chapter": "",
+            "progress": 0,
+            "total": total,
+            "start_time": time.time(),
+            "completion_time": None,
+            "current_deck_start_time": None,
+            "processing_times": [],
+            "details": details or {}
+        }
+
+        db = self.session_factory()
+        try:
+            db.add(DojoJobProgress(job_id=job_id, step=step, user_id=user_id, **self._serialize(state)))
+            db.commit()
+        finally:
+            db.close()
+
+        with self._lock:
+            self._local[job_id] = state
+        self._ensure_flusher()
+        logger.info(f"Started dojo {step} job {job_id}")
+        return job_id
+
+    def update(self, job_id: Optional[str], **fields):
+        """Buffer field changes; terminal statuses are written immediately"""
+        if not job_id:
+            return
+        with self._lock:
+            if job_id in self._local:
+                self._local[job_id].update(fields)
+            self._pending.setdefault(job_id, {}).update(fields)
+
+        if fields.get("status") in TERMINAL_STATUSES:
+            self.flush(job_id)
+        else:
+            self._ensure_flusher()
+
+    def add_processing_time(self, job_id: Optional[str], seconds: float):
+        """Record one deck's processing time for a job run by this process"""
+        with self._lock:
+            state = self._local.get(job_id)
+            if state is None:
+                logger.warning(f"Ignoring processing time for dojo job {job_id} not run by this process")
+                return
+            state["processing_times"] = state["processing_times"] + [seconds]
+            self._pending.setdefault(job_id, {})["processing_times"] = state["processing_times"]
+
+    def increment(self, job_id: Optional[str], amount: int = 1, **fields):
+        """Atomically advance progress; safe when callbacks reach a different worker than the job"""
+        if not job_id:
+            return
+        self.flush(job_id)
+
+        db = self.session_factory()
+        try:
+            values = {getattr(DojoJobProgress, name): value for name, value in self._serialize(fields).items()}
+            values[DojoJobProgress.progress] = DojoJobProgress.progress + amount
+            values[DojoJobProgress.updated_at] = datetime.utcnow()
+            db.query(DojoJobProgress).filter(DojoJobProgress.job_id == job_id).update(values, synchronize_session=False)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to increment dojo job {job_id}: {e}")
+        finally:
+            db.close()
+
+        with self._lock:
+            if job_id in self._local:
+                self._local[job_id]["progress"] = (self._local[job_id].get("progress") or 0) + amount
+                self._local[job_id].update(fields)
+
+    def finish(self, job_id: Optional[str], status: str = "completed", **fields):
+        """Mark a job as completed or failed and write it through"""
+        if not job_id:
+            return
+        self.update(job_id, status=status, completion_time=time.time(), **fields)
+        with self._lock:
+            self._local.pop(job_id, None)
+
+    def flush(self, job_id: Optional[str] = None):
+        """Write buffered changes (of one job, or all) in one transaction"""
+        with self._lock:
+            if job_id is not None:
+                batch = {job_id: self._pending.pop(job_id)} if job_id in self._pending else {}
+            else:
+                batch, self._pending = self._pending, {}
+        if not batch:
+            return
+
+        db = self.session_factory()
+        try:
+            for pending_job_id, fields in batch.items():
+                values = self._serialize(fields)
+                values["updated_at"] = datetime.utcnow()
+                db.query(DojoJobProgress).filter(DojoJobProgress.job_id == pending_job_id).update(values, synchronize_session=False)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to write dojo progress, keeping {len(batch)} job(s) buffered: {e}")
+            with self._lock:
+                for pending_job_id, fields in batch.items():
+                    self._pending[pending_job_id] = {**fields, **self._pending.get(pending_job_id, {})}
+        finally:
+            db.close()
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Progress of one job by primary key, including this process's unwritten changes"""
+        db = self.session_factory()
+        try:
+            record = db.get(DojoJobProgress, job_id)
+            return self._to_dict(record) if record else None
+        finally:
+            db.close()
+
+    def latest_job_id(self, step: str, user_id: Optional[int] = None, active_only: bool = False) -> Optional[str]:
+        """ID of the most recently updated job for a step"""
+        db = self.session_factory()
+        try:
+            query = db.query(DojoJobProgress.job_id).filter(DojoJobProgress.step == step)
+            if user_id is not None:
+                query = query.filter(DojoJobProgress.user_id == user_id)
+            if active_only:
+                query = query.filter(DojoJobProgress.status == "processing")
+            row = query.order_by(DojoJobProgress.updated_at.desc()).first()
+            return row[0] if row else None
+        finally:
+            db.close()
+
+    def latest_jobs(self, user_id: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+        """Most recent job of every dojo step, in the shape of the old progress_tracker"""
+        db = self.session_factory()
+        try:
+            latest = {}
+            for step in DOJO_STEPS:
+                query = db.query(DojoJobProgress).filter(DojoJobProgress.step == step)
+                if user_id is not None:
+                    query = query.filter(DojoJobProgress.user_id == user_id)
+                record = query.order_by(DojoJobProgress.updated_at.desc()).first()
+                latest[step] = self._to_dict(record) if record else idle_progress(step)
+            return latest
+        finally:
+            db.close()
+
+    def list_jobs(self, user_id: Optional[int] = None, active_only: bool = False, limit: int = 20) -> List[Dict[str, Any]]:
+        """Recent jobs, newest first"""
+        db = self.session_factory()
+        try:
+            query = db.query(DojoJobProgress)
+            if user_id is not None:
+                query = query.filter(DojoJobProgress.user_id == user_id)
+            if active_only:
+                query = query.filter(DojoJobProgress.status == "processing")
+            records = query.order_by(DojoJobProgress.updated_at.desc()).limit(limit).all()
+            return [self._to_dict(record) for record in records]
+        finally:
+            db.close()
+
+    def _to_dict(self, record: DojoJobProgress) -> Dict[str, Any]:
+        """Serialize a record, overlay buffered changes and add timing/ETA figures"""
+        job = {
+            "job_id": record.job_id,
+            "step": record.step,
+            "user_id": record.user_id,
+            "status": record.status,
+            "current_deck": record.current_deck or "",
+            "current_chapter": record.current_chapter or "",
+            "progress": record.progress or 0,
+            "total": record.total or 0,
+            "start_time": record.start_time,
+            "completion_time": record.completion_time,
+            "current_deck_start_time": record.current_deck_start_time,
+            "processing_times": json.loads(record.processing_times) if record.processing_times else [],
+            "updated_at": record.updated_at.isoformat() if record.updated_at else None
+        }
+        job.update(json.loads(record.details) if record.details else {})
+
+        with self._lock:
+            pending = dict(self._pending.get(record.job_id, {}))
+        details = pending.pop("details", None)
+        job.update(pending)
+        if details:
+            job.update(details)
+
+        return self._with_timing(job)
+
+    @staticmethod
+    def _with_timing(job: Dict[str, Any]) -> Dict[str, Any]:
+        """Average time per deck, elapsed time and estimated time remaining"""
+        start_time = job.get("start_time")
+        if not start_time:
+            return job
+
+        end_time = job.get("completion_time") or time.time()
+        job["total_processing_time"] = end_time - start_time
+
+        processing_times = job.get("processing_times") or []
+        if processing_times:
+            average = sum(processing_times) / len(processing_times)
+        elif job.get("progress"):
+            average = job["total_processing_time"] / job["progress"]
+        else:
+            average = None
+        job["average_processing_time"] = average
+
+        remaining = max((job.get("total") or 0) - (job.get("progress") or 0), 0)
+        job["eta_seconds"] = average * remaining if average is not None and job.get("status") == "processing" else None
+        return job
+
+    @staticmethod
+    def _serialize(fields: Dict[str, Any]) -> Dict[str, Any]:
+        """Map progress fields to column values, encoding JSON columns"""
+        values = {}
+        for name, value in fields.items():
+            if name not in PROGRESS_FIELDS:
+                continue
+            values[name] = json.dumps(value) if name in JSON_FIELDS and value is not None else value
+        return values
+
+    def _ensure_flusher(self):
+        """Start the write-behind thread on first use"""
+        if self._flusher and self._flusher.is_alive():
+            return
+        self._flusher = threading.Thread(target=self._flush_loop, name="dojo-progress-flush", daemon=True)
+        self._flusher.start()
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Dojo progress flush failed: {e}")
+
+
+# Global instance
+dojo_progress_store = DojoProgressStore()
+atexit.register(dojo_progress_store.flush)
@@ -0,0 +1,307 @@
+"""
+Email Outbox - Persistent queue for outgoing emails
+
+Request handlers only insert a row into email_outbox; a background sender thread
+claims due messages in batches and delivers them over one authenticated SMTP
+connection that is kept open between batches. Failed deliveries are retried with
+exponential backoff until MAX_ATTEMPTS, permanent rejections of a message or its
+recipients fail at once. When the server cannot be reached or refuses the login
+or sender, the rest of the batch is put back without using up any attempts and
+the sender backs off before connecting again.
+Every uvicorn worker runs a sender; rows are claimed with SKIP LOCKED so a message
+is only delivered once.
+"""
+
+import time
+import smtplib
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session
+
+from ..db.database import SessionLocal
+from ..db.models import EmailOutboxMessage
+
+if TYPE_CHECKING:
+    from .email_service import EmailService
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 20
+MAX_ATTEMPTS = 6
+POLL_INTERVAL_SECONDS = 5.0
+RETRY_BASE_SECONDS = 30.0
+RETRY_MAX_SECONDS = 3600.0
+CLAIM_TIMEOUT_SECONDS = 300.0  # Messages left in 'sending' by a crashed worker are claimed again after this
+CONNECTION_IDLE_SECONDS = 60.0  # Most servers drop idle sessions; reconnect instead of reusing after this
+MESSAGES_PER_CONNECTION = 100
+
+
+def retry_delay(attempts: int) -> float:
+    """Backoff before the next attempt after the given number of failed attempts"""
+    return min(RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0), RETRY_MAX_SECONDS)
+
+
+def is_permanent_failure(error: Exception) -> bool:
+    """5xx rejections of this message's recipients or data will not succeed on retry"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return bool(error.recipients) and all(500 <= code < 600 for code, _ in error.recipients.values())
+    return isinstance(error, smtplib.SMTPDataError) and 500 <= error.smtp_code < 600
+
+
+def is_connection_failure(error: Exception) -> bool:
+    """Errors of the server session or account rather than the message; every message would hit them"""
+    if isinstance(error, (smtplib.SMTPSenderRefused, smtplib.SMTPServerDisconnected)):
+        return True
+    # smtplib errors are OSErrors too; only socket-level ones mean the server is unreachable
+    return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+
+
+class EmailOutbox:
+    """Postgres-backed email queue with a background sender reusing one SMTP connection"""
+
+    def __init__(self, mailer: "EmailService", session_factory: Callable[[], Session] = SessionLocal,
+                 batch_size: int = BATCH_SIZE, max_attempts: int = MAX_ATTEMPTS,
+                 poll_interval: float = POLL_INTERVAL_SECONDS):
+        self.mailer = mailer
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._smtp_last_used = 0.0
+        self._smtp_messages = 0
+        self._connection_failures = 0  # Consecutive batches stopped by connection errors, for backoff
+        self._sender: Optional[threading.Thread] = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._counters = {
+            "sent": 0, "failed": 0, "retried": 0, "deferred": 0, "connections_opened": 0,
+            "delivery_seconds_total": 0.0, "queue_seconds_total": 0.0
+        }
+        self._last_error: Optional[str] = None
+
+    def enqueue(self, to_email: str, subject: str, html_body: str, text_body: Optional[str] = None) -> bool:
+        """Store an email for delivery and wake the sender; True once it is queued"""
+        db = self.session_factory()
+        try:
+            db.add(EmailOutboxMessage(to_email=to_email, subject=subject, html_body=html_body, text_body=text_body))
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Could not queue email to {to_email}: {e}")
+            return False
+        finally:
+            db.close()
+
+        logger.info(f"Email to {to_email} queued")
+        self.start()
+        self._wake.set()
+        return True
+
+    def start(self):
+        """Start the sender thread if it is not running"""
+        if self._sender and self._sender.is_alive():
+            return
+        self._stop.clear()
+        self._sender = threading.Thread(target=self._send_loop, name="email-outbox-sender", daemon=True)
+        self._sender.start()
+
+    def stop(self, timeout: float = 10.0):
+        self._stop.set()
+        self._wake.set()
+        if self._sender:
+            self._sender.join(timeout)
+        self._close_connection()
+
+    def process_batch(self) -> int:
+        """Deliver one batch of due messages; returns how many were claimed"""
+        messages = self._claim_batch()
+        if not messages:
+            if self._smtp is not None and time.monotonic() - self._smtp_last_used > CONNECTION_IDLE_SECONDS:
+                self._close_connection()
+            return 0
+
+        outcomes = []
+        for index, message in enumerate(messages):
+            outcome = self._deliver(message)
+            outcomes.append(outcome)
+            if outcome.get("connection_error"):
+                # The rest of the batch would fail the same way (and log in again for each message)
+                self._connection_failures += 1
+                outcomes.extend({"message": pending, "error": outcome["error"], "connection_error": True}
+                                for pending in messages[index + 1:])
+                break
+        self._record_outcomes(outcomes)
+        return len(messages)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Delivery counters of this process plus the queue state shared by all workers"""
+        with self._lock:
+            counters = dict(self._counters)
+            last_error = self._last_error
+        delivered = counters.pop("sent")
+        delivery_total = counters.pop("delivery_seconds_total")
+        queue_total = counters.pop("queue_seconds_total")
+
+        db = self.session_factory()
+        try:
+            by_status = dict(
+                db.query(EmailOutboxMessage.status, func.count(EmailOutboxMessage.id))
+                .group_by(EmailOutboxMessage.status).all()
+            )
+            oldest_pending = db.query(func.min(EmailOutboxMessage.created_at)).filter(
+                EmailOutboxMessage.status.in_(("pending", "sending"))
+            ).scalar()
+        finally:
+            db.close()
+
+        return {
+            "sent": delivered,
+            **counters,
+            "avg_smtp_seconds": delivery_total / delivered if delivered else None,
+            "avg_queue_seconds": queue_total / delivered if delivered else None,
+            "last_error": last_error,
+            "sender_running": bool(self._sender and self._sender.is_alive()),
+            "queue": by_status,
+            "oldest_pending_seconds": (datetime.utcnow() - oldest_pending).total_seconds() if oldest_pending else None
+        }
+
+    def _claim_batch(self) -> List[Dict[str, Any]]:
+        """Mark due messages as sending and return their contents"""
+        now = datetime.utcnow()
+        db = self.session_factory()
+        try:
+            rows = db.query(EmailOutboxMessage).filter(or_(
+                and_(EmailOutboxMessage.status == "pending", EmailOutboxMessage.next_attempt_at <= now),
+                and_(EmailOutboxMessage.status == "sending",
+                     EmailOutboxMessage.updated_at < now - timedelta(seconds=CLAIM_TIMEOUT_SECONDS))
+            )).order_by(EmailOutboxMessage.id).limit(self.batch_size).with_for_update(skip_locked=True).all()
+
+            messages = []
+            for row in rows:
+                row.status = "sending"
+                row.attempts = (row.attempts or 0) + 1
+                row.updated_at = now
+                messages.append({
+                    "id": row.id, "to_email": row.to_email, "subject": row.subject, "html_body": row.html_body,
+                    "text_body": row.text_body, "attempts": row.attempts, "created_at": row.created_at
+                })
+            db.commit()
+            return messages
+        finally:
+            db.close()
+
+    def _deliver(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Send one message; a dropped reused connection is retried once on a fresh one"""
+        msg = self.mailer.build_message(message["to_email"], message["subject"], message["html_body"], message["text_body"])
+        start = time.monotonic()
+        for attempt in range(2):
+            reused = self._smtp is not None
+            try:
+                server = self._connection()
+            except Exception as e:
+                # Connecting, STARTTLS or the login failed
+                return {"message": message, "error": e, "connection_error": True}
+            try:
+                server.send_message(msg)
+                self._smtp_last_used = time.monotonic()
+                self._smtp_messages += 1
+                self._connection_failures = 0
+                return {"message": message, "error": None, "seconds": time.monotonic() - start}
+            except smtplib.SMTPServerDisconnected as e:
+                self._close_connection()
+                if reused and attempt == 0:
+                    continue
+                return {"message": message, "error": e, "connection_error": True}
+            except Exception as e:
+                # The session state is unknown after an error, start the next message on a new connection
+                self._close_connection()
+                return {"message": message, "error": e, "connection_error": is_connection_failure(e)}
+
+    def _record_outcomes(self, outcomes: List[Dict[str, Any]]):
+        """Write the results of a batch in one transaction and update the counters"""
+        now = datetime.utcnow()
+        connection_delay = retry_delay(self._connection_failures)
+        db = self.session_factory()
+        try:
+            for outcome in outcomes:
+                message, error = outcome["message"], outcome["error"]
+                row = db.get(EmailOutboxMessage, message["id"])
+                if row is None:
+                    continue
+                if error is None:
+                    row.status, row.sent_at, row.last_error = "sent", now, None
+                    logger.info(f"Email sent successfully to {message['to_email']}")
+                    self._count(sent=1, delivery_seconds_total=outcome["seconds"],
+                                queue_seconds_total=(now - message["created_at"]).total_seconds() if message["created_at"] else 0.0)
+                elif outcome.get("connection_error"):
+                    # Not the message's fault: give the attempt back and wait for the server
+                    row.status, row.last_error = "pending", str(error)
+                    row.attempts = message["attempts"] - 1
+                    row.next_attempt_at = now + timedelta(seconds=connection_delay)
+                    self._count(deferred=1, error=str(error))
+                elif is_permanent_failure(error) or message["attempts"] >= self.max_attempts:
+                    row.status, row.last_error = "failed", str(error)
+                    logger.error(f"Failed to send email to {message['to_email']} after {message['attempts']} attempts: {error}")
+                    self._count(failed=1, error=str(error))
+                else:
+                    delay = retry_delay(message["attempts"])
+                    row.status, row.last_error = "pending", str(error)
+                    row.next_attempt_at = now + timedelta(seconds=delay)
+                    logger.warning(f"Email to {message['to_email']} failed, retrying in {delay:.0f}s: {error}")
+                    self._count(retried=1, error=str(error))
+            db.commit()
+            deferred = sum(1 for outcome in outcomes if outcome.get("connection_error"))
+            if deferred:
+                logger.warning(f"SMTP connection failed, {deferred} emails deferred for {connection_delay:.0f}s: "
+                               f"{outcomes[-1]['error']}")
+        finally:
+            db.close()
+
+    def _count(self, error: Optional[str] = None, **amounts):
+        with self._lock:
+            for name, amount in amounts.items():
+                self._counters[name] += amount
+            if error:
+                self._last_error = error
+
+    def _connection(self) -> smtplib.SMTP:
+        """Open SMTP connection, reconnecting when it sat idle or sent its share of messages"""
+        if self._smtp is not None and (
+            time.monotonic() - self._smtp_last_used > CONNECTION_IDLE_SECONDS
+            or self._smtp_messages >= MESSAGES_PER_CONNECTION
+        ):
+            self._close_connection()
+        if self._smtp is None:
+            self._smtp = self.mailer.open_smtp_connection()
+            self._smtp_last_used = time.monotonic()
+            self._smtp_messages = 0
+            self._count(connections_opened=1)
+        return self._smtp
+
+    def _close_connection(self):
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except Exception:
+            pass
+        self._smtp = None
+
+    def _send_loop(self):
+        while not self._stop.is_set():
+            try:
+                claimed = self.process_batch()
+            except Exception as e:
+                logger.error(f"Email outbox sender failed: {e}")
+                claimed = 0
+            if claimed < self.batch_size:
+                # Sleep until the next poll unless a new email is queued
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+        self._close_connection()
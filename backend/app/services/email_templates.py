@@ -0,0 +1,103 @@
+"""
+Email Templates - Cached Jinja2 templates for outgoing emails
+
+The markup of every email lives in app/templates/emails as <name>.html plus an
+optional <name>.txt. Templates are compiled once per process (optionally with a
+bytecode cache shared across restarts) and the translated strings of each email
+are resolved once per language through the I18nService, so rendering a batch of
+invitations is only variable substitution.
+"""
+
+import logging
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, StrictUndefined, TemplateNotFound, select_autoescape
+
+from ..core.config import settings
+from .i18n_service import I18nService, i18n_service
+
+logger = logging.getLogger(__name__)
+
+TEMPLATES_DIR = Path(__file__).parent.parent / "templates" / "emails"
+
+# Translation section per email where it differs from "emails.<name>"
+EMAIL_SECTIONS = {"gp_invitation": "emails.invitation"}
+
+
+class RenderedEmail(NamedTuple):
+    subject: str
+    html_body: str
+    text_body: Optional[str]
+
+
+class Translations(dict):
+    """Strings of one email section in one language, looked up on first use"""
+
+    def __init__(self, i18n: I18nService, section: str, language: str):
+        super().__init__()
+        self.i18n = i18n
+        self.section = section
+        self.language = language
+
+    def __missing__(self, key: str) -> str:
+        value = self[key] = self.i18n.t(f"{self.section}.{key}", self.language)
+        return value
+
+    def __call__(self, key: str, **variables) -> str:
+        """String with placeholders filled in, e.g. t("invited_by", gp_name=...)"""
+        if not variables:
+            return self[key]
+        return self.i18n.t(f"{self.section}.{key}", self.language, **variables)
+
+
+@lru_cache(maxsize=None)
+def template_environment(templates_dir: str = str(TEMPLATES_DIR), bytecode_cache_dir: str = "") -> Environment:
+    """Shared Jinja2 environment; templates are never re-read once compiled"""
+    bytecode_cache = None
+    if bytecode_cache_dir:
+        Path(bytecode_cache_dir).mkdir(parents=True, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(bytecode_cache_dir)
+    return Environment(
+        loader=FileSystemLoader(templates_dir),
+        autoescape=select_autoescape(enabled_extensions=("html",), default_for_string=False),
+        bytecode_cache=bytecode_cache,
+        auto_reload=False,
+        cache_size=-1,
+        trim_blocks=True,
+        lstrip_blocks=True,
+        undefined=StrictUndefined
+    )
+
+
+class EmailTemplateRegistry:
+    """Compiled email templates and their translations, cached per language"""
+
+    def __init__(self, i18n: I18nService = i18n_service, templates_dir: Path = TEMPLATES_DIR,
+                 bytecode_cache_dir: str = settings.EMAIL_TEMPLATE_CACHE_DIR):
+        self.i18n = i18n
+        self.environment = template_environment(str(templates_dir), bytecode_cache_dir or "")
+        self._compiled: Dict[Tuple[str, str, Any], Tuple[Any, Any, Translations]] = {}
+
+    def get(self, name: str, language: str):
+        """(html template, text template or None, translations) for an email in a language"""
+        key = (name, language, getattr(self.i18n, "version", 0))
+        compiled = self._compiled.get(key)
+        if compiled is None:
+            html = self.environment.get_template(f"{name}.html")
+            try:
+                text = self.environment.get_template(f"{name}.txt")
+            except TemplateNotFound:
+                text = None
+            compiled = self._compiled[key] = (html, text, Translations(self.i18n, EMAIL_SECTIONS.get(name, f"emails.{name}"), language))
+        return compiled
+
+    def render(self, template: str, language: str, **context) -> RenderedEmail:
+        html, text, translations = self.get(template, language)
+        context.update(t=translations, language=language)
+        return RenderedEmail(
+            subject=translations["subject"],
+            html_body=html.render(context),
+            text_body=text.render(context) if text else None
+        )
@@ -0,0 +1,227 @@
+"""
+Experiment Details - Projection-aware reads of dojo extraction experiments
+
+Experiment results live in JSONB columns of extraction_experiments. Instead of loading
+and parsing every results document, the per-deck entries are unnested in Postgres
+(jsonb_array_elements), so a request only transfers the sections it asks for and only
+the entries of the requested page of decks.
+"""
+
+import json
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from ..db.models import ProjectDocument
+
+logger = logging.getLogger(__name__)
+
+# Section name -> (JSONB column, keys of the per-deck arrays inside it; None = column is the array)
+EXPERIMENT_SECTIONS: Dict[str, Tuple[str, Tuple[Optional[str], ...]]] = {
+    "results": ("results_json", ("results",)),
+    "classification": ("classification_results_json", (None,)),
+    "company_name": ("company_name_results_json", ("company_name_results",)),
+    "funding_amount": ("funding_amount_results_json", ("funding_amount_results",)),
+    "deck_date": ("deck_date_results_json", ("deck_date_results",)),
+    "template_processing": ("template_processing_results_json", ("template_processing_results", "results")),
+}
+# Template processing holds full chapter analyses, so it is only loaded when asked for
+DEFAULT_SECTIONS = ("results", "classification", "company_name", "funding_amount", "deck_date")
+MAX_PAGE_SIZE = 500
+
+
+def parse_sections(fields: Optional[str]) -> List[str]:
+    """Parse a ?fields= value; None selects the default sections, an empty value none"""
+    if fields is None:
+        return list(DEFAULT_SECTIONS)
+    sections = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [section for section in sections if section not in EXPERIMENT_SECTIONS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(EXPERIMENT_SECTIONS)}")
+    return list(dict.fromkeys(sections))
+
+
+def parse_document_ids(document_ids: Any) -> List[int]:
+    """document_ids is stored as text, e.g. '{65,68,61}'"""
+    if isinstance(document_ids, list):
+        return document_ids
+    if isinstance(document_ids, str) and document_ids.startswith("{") and document_ids.endswith("}"):
+        return [int(x.strip()) for x in document_ids[1:-1].split(",") if x.strip()]
+    return []
+
+
+def classification_fields(classification: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten a classification result into the fields shown per deck"""
+    return {
+        "primary_sector": classification.get("primary_sector"),
+        "secondary_sector": classification.get("secondary_sector"),
+        "confidence_score": classification.get("confidence_score"),
+        "classification_reasoning": classification.get("reasoning"),
+        "subcategory": classification.get("subcategory"),
+        "keywords_matched": classification.get("keywords_matched"),
+        "recommended_template": classification.get("recommended_template"),
+        "classification_error": classification.get("error")
+    }
+
+
+def _array_expression(column: str, key: Optional[str]) -> str:
+    """SQL for the per-deck array of a section, or an empty array if it has another shape"""
+    path = f"{column} -> '{key}'" if key else column
+    return f"CASE WHEN jsonb_typeof({path}) = 'array' THEN {path} ELSE '[]'::jsonb END"
+
+
+class ExperimentDetailsService:
+    """Loads experiment metadata and paginated per-deck sections with JSONB projections"""
+
+    def get_summary(self, db: Session, experiment_id: int) -> Optional[Dict[str, Any]]:
+        """Experiment metadata and statistics, without any per-deck results"""
+        row = db.execute(text(f"""
+            SELECT id, experiment_name, extraction_type, text_model_used, extraction_prompt,
+                   created_at, document_ids, classification_enabled, classification_completed_at,
+                   company_name_completed_at, funding_amount_completed_at, deck_date_completed_at,
+                   template_processing_completed_at,
+                   results_json -> 'total_decks', results_json -> 'successful_extractions',
+                   jsonb_array_length({_array_expression('results_json', 'results')}),
+                   company_name_results_json -> 'statistics',
+                   funding_amount_results_json -> 'statistics',
+                   deck_date_results_json -> 'statistics'
+            FROM extraction_experiments
+            WHERE id = :experiment_id
+        """), {"experiment_id": experiment_id}).fetchone()
+        if not row:
+            return None
+
+        return {
+            "id": row[0],
+            "experiment_name": row[1],
+            "extraction_type": row[2],
+            "text_model_used": row[3],
+            "extraction_prompt": row[4],
+            "created_at": row[5].isoformat() if row[5] else None,
+            "deck_ids": parse_document_ids(row[6]),
+            "classification_enabled": bool(row[7]),
+            "classification_completed_at": row[8].isoformat() if row[8] else None,
+            "company_name_completed_at": row[9].isoformat() if row[9] else None,
+            "funding_amount_completed_at": row[10].isoformat() if row[10] else None,
+            "deck_date_completed_at": row[11].isoformat() if row[11] else None,
+            "template_processing_completed_at": row[12].isoformat() if row[12] else None,
+            "total_decks": row[13] if row[13] is not None else 0,
+            "successful_extractions": row[14] if row[14] is not None else 0,
+            "total_results": row[15] or 0,
+            "company_name_statistics": row[16] or {},
+            "funding_amount_statistics": row[17] or {},
+            "deck_date_statistics": row[18] or {}
+        }
+
+    def get_result_page(self, db: Session, experiment_id: int, offset: int, limit: Optional[int], deck_ids_only: bool = False) -> List[Dict[str, Any]]:
+        """One page of the extraction results, in experiment order"""
+        entry = "jsonb_build_object('deck_id', entry -> 'deck_id')" if deck_ids_only else "entry"
+        rows = db.execute(text(f"""
+            SELECT {entry}
+            FROM extraction_experiments,
+                 jsonb_array_elements({_array_expression('results_json', 'results')}) WITH ORDINALITY AS page(entry, position)
+            WHERE id = :experiment_id
+            ORDER BY position
+            OFFSET :offset LIMIT :limit
+        """), {"experiment_id": experiment_id, "offset": offset, "limit": limit}).fetchall()
+        return [row[0] for row in rows if isinstance(row[0], dict)]
+
+    def get_section_entries(self, db: Session, experiment_id: int, section: str, deck_ids: Optional[Iterable[int]] = None) -> List[Dict[str, Any]]:
+        """Per-deck entries of a section, restricted to deck_ids when given"""
+        column, keys = EXPERIMENT_SECTIONS[section]
+        deck_filter = "AND entry ->> 'deck_id' = ANY(:deck_ids)" if deck_ids is not None else ""
+        params = {"experiment_id": experiment_id}
+        if deck_ids is not None:
+            params["deck_ids"] = [str(deck_id) for deck_id in deck_ids]
+
+        entries = []
+        for key in keys:
+            rows = db.execute(text(f"""
+                SELECT entry
+                FROM extraction_experiments,
+                     jsonb_array_elements({_array_expression(column, key)}) WITH ORDINALITY AS section(entry, position)
+                WHERE id = :experiment_id {deck_filter}
+                ORDER BY position
+            """), params).fetchall()
+            entries.extend(row[0] for row in rows if isinstance(row[0], dict))
+        return entries
+
+    def get_deck_info(self, db: Session, deck_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """File name, extracted company name and slide count of each deck"""
+        if not deck_ids:
+            return {}
+        decks = db.query(ProjectDocument.id, ProjectDocument.file_name, ProjectDocument.ai_extracted_startup_name).filter(
+            ProjectDocument.id.in_(deck_ids)
+        ).all()
+
+        page_counts = {}
+        try:
+            rows = db.execute(text("""
+                SELECT DISTINCT ON (document_id) document_id,
+                       CASE WHEN jsonb_typeof(analysis_result_json -> 'visual_analysis_results') = 'array'
+                            THEN jsonb_array_length(analysis_result_json -> 'visual_analysis_results') END
+                FROM visual_analysis_cache
+                WHERE document_id = ANY(:document_ids)
+                ORDER BY document_id, created_at DESC
+            """), {"document_ids": list(deck_ids)}).fetchall()
+            page_counts = {document_id: page_count for document_id, page_count in rows if page_count is not None}
+        except Exception as e:
+            logger.debug(f"Could not get page counts for experiment decks: {e}")
+            db.rollback()
+
+        return {
+            deck_id: {"filename": file_name, "company_name": company_name, "page_count": page_counts.get(deck_id)}
+            for deck_id, file_name, company_name in decks
+        }
+
+    def get_details(self, db: Session, experiment_id: int, sections: List[str], offset: int = 0, limit: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Experiment details with the requested sections for one page of decks"""
+        details = self.get_summary(db, experiment_id)
+        if details is None:
+            return None
+
+        paginated = offset > 0 or limit is not None
+        results = []
+        if "results" in sections or (paginated and sections):
+            # Other sections only need the deck IDs of the page
+            results = self.get_result_page(db, experiment_id, offset, limit, deck_ids_only="results" not in sections)
+        page_deck_ids = [result["deck_id"] for result in results if result.get("deck_id") is not None]
+        # Without pagination every entry is returned, also for decks missing from the results
+        entry_deck_ids = page_deck_ids if paginated else None
+
+        details.update({"fields": sections, "offset": offset, "limit": limit})
+
+        classification_lookup = {}
+        if "classification" in sections and details["classification_enabled"]:
+            for entry in self.get_section_entries(db, experiment_id, "classification", entry_deck_ids):
+                if entry.get("deck_id"):
+                    classification_lookup[entry["deck_id"]] = entry.get("classification_result", {})
+            details["classification_statistics"] = {}
+            # Serialized lookup by deck ID, the shape the experiment view parses
+            details["classification_results_json"] = json.dumps(classification_lookup) if classification_lookup else None
+
+        if "results" in sections:
+            deck_info = self.get_deck_info(db, page_deck_ids)
+            enhanced_results = []
+            for result in results:
+                deck_id = result.get("deck_id")
+                enhanced_result = {
+                    **result,
+                    "deck_info": deck_info.get(deck_id, {"filename": f"deck_{deck_id}", "company_name": None})
+                }
+                if deck_id in classification_lookup:
+                    enhanced_result.update(classification_fields(classification_lookup[deck_id]))
+                enhanced_results.append(enhanced_result)
+            details["results"] = enhanced_results
+
+        for section in ("company_name", "funding_amount", "deck_date", "template_processing"):
+            if section in sections:
+                details[f"{section}_results"] = self.get_section_entries(db, experiment_id, section, entry_deck_ids)
+
+        return details
+
+
+# Global instance
+experiment_details_service = ExperimentDetailsService()
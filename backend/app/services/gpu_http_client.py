@@ -7,8 +7,9 @@ replacing the NFS-based communication system.
 
 import requests
 import httpx
+import json
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable
 from dataclasses import dataclass
 from ..core.config import settings
 
@@ -549,6 +550,94 @@ class GPUHTTPClient:
                 "error": str(e)
             }
 
+    async def run_classification_batch(self, model_name: str, shared_context: str, items: List[Dict[str, str]],
+                                       on_result: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Run classification for many prompts in one request
+        
+        Args:
+            model_name: Name of the model to use for classification
+            shared_context: Prompt prefix shared by all items (sector definitions)
+            items: List of {"id": ..., "prompt": ...} with the per-item part of the prompt
+            on_result: Called with each item result ({"id", "success", "response"/"error"}) as it streams in
+            
+        Returns:
+            Item results keyed by id, or error information
+        """
+        try:
+            if not self.gpu_host:
+                logger.error("GPU host not configured (GPU_DEVELOPMENT/GPU_PRODUCTION or GPU_INSTANCE_HOST)")
+                return {
+                    "success": False,
+                    "error": "GPU host not configured (GPU_DEVELOPMENT/GPU_PRODUCTION or GPU_INSTANCE_HOST)"
+                }
+            
+            logger.info(f"Requesting batch classification of {len(items)} items using model {model_name}")
+            
+            payload = {
+                "model": model_name,
+                "shared_context": shared_context,
+                "items": items,
+                "options": {
+                    "num_ctx": 32768,
+                    "temperature": 0.3
+                }
+            }
+            
+            results = {}
+            async with httpx.AsyncClient(timeout=httpx.Timeout(300.0, read=600.0)) as client:
+                async with client.stream(
+                    "POST",
+                    f"{self.base_url}/run-classification-batch",
+                    json=payload,
+                    headers={'Content-Type': 'application/json'}
+                ) as response:
+                    if response.status_code != 200:
+                        body = (await response.aread()).decode(errors="replace")
+                        logger.error(f"HTTP error {response.status_code}: {body}")
+                        return {
+                            "success": False,
+                            "error": f"HTTP {response.status_code}: {body}",
+                            "results": results
+                        }
+                    
+                    # One JSON object per line, in completion order, then a summary line
+                    async for line in response.aiter_lines():
+                        if not line.strip():
+                            continue
+                        result = json.loads(line)
+                        if result.get("done"):
+                            continue
+                        results[str(result.get("id"))] = result
+                        if on_result:
+                            on_result(result)
+            
+            logger.info(f"Completed batch classification: {len(results)}/{len(items)} results")
+            return {
+                "success": True,
+                "results": results
+            }
+                
+        except httpx.TimeoutException:
+            logger.error("Timeout processing batch classification")
+            return {
+                "success": False,
+                "error": "Batch classification timeout (no result within 10 minutes)",
+                "results": results
+            }
+        except httpx.ConnectError:
+            logger.error("Connection error communicating with GPU instance")
+            return {
+                "success": False,
+                "error": "Connection error communicating with GPU instance"
+            }
+        except Exception as e:
+            logger.error(f"Error processing batch classification: {e}")
+            return {
+                "success": False,
+                "error": str(e)
+            }
+
     def get_processing_progress(self, document_id: int) -> Dict[str, Any]:
         """
         Get processing progress for a specific document
@@ -594,7 +683,7 @@ class GPUHTTPClient:
                 "error": str(e)
             }
 
-    async def run_template_processing_batch(self, deck_ids: List[int], template_info: Optional[Dict[str, Any]] = None, generate_thumbnails: bool = True) -> Dict[str, Any]:
+    async def run_template_processing_batch(self, deck_ids: List[int], template_info: Optional[Dict[str, Any]] = None, generate_thumbnails: bool = True, job_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Run template processing for multiple decks with optional thumbnail generation
         
@@ -602,6 +691,7 @@ class GPUHTTPClient:
             deck_ids: List of pitch deck IDs
             template_info: Template information (id, name, prompt)
             generate_thumbnails: Whether to generate thumbnails
+            job_id: Dojo progress job that the GPU's progress callbacks update
             
         Returns:
             Template processing results for all decks
@@ -624,7 +714,8 @@ class GPUHTTPClient:
                 "deck_ids": deck_ids,
                 "template_info": template_info,
                 "generate_thumbnails": generate_thumbnails,
-                "progress_callback_url": progress_callback_url
+                "progress_callback_url": progress_callback_url,
+                "job_id": job_id
             }
             
             async with httpx.AsyncClient(timeout=3600.0) as client:  # 1 hour timeout
@@ -675,7 +766,7 @@ class GPUHTTPClient:
                 "error": str(e)
             }
     
-    async def run_template_processing_only(self, deck_ids: List[int], template_id: int, text_model: str = None, generate_thumbnails: bool = True) -> Dict[str, Any]:
+    async def run_template_processing_only(self, deck_ids: List[int], template_id: int, text_model: str = None, generate_thumbnails: bool = True, job_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Run template processing using cached visual analysis and extraction results
         
@@ -684,6 +775,7 @@ class GPUHTTPClient:
             template_id: Template ID to use for processing
             text_model: Text model to use for processing (optional)
             generate_thumbnails: Whether to generate thumbnails
+            job_id: Dojo progress job that the GPU's progress callbacks update
             
         Returns:
             Template processing results
@@ -702,7 +794,8 @@ class GPUHTTPClient:
                 "deck_ids": deck_ids,
                 "template_id": template_id,
                 "generate_thumbnails": generate_thumbnails,
-                "enable_progressive_delivery": True
+                "enable_progressive_delivery": True,
+                "job_id": job_id
             }
             
             # Add text_model if specified
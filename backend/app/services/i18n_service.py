@@ -14,6 +14,7 @@ class I18nService:
         self.translations: Dict[str, Dict[str, Any]] = {}
         self.default_language = "en"
         self.supported_languages = ["en", "de"]
+        self.version = 0  # Bumped on reload so cached email translations are resolved again
         self._load_translations()
     
     def _load_translations(self) -> None:
@@ -122,6 +123,7 @@ class I18nService:
         """Reload all translation files (useful for development)"""
         self.translations.clear()
         self._load_translations()
+        self.version += 1
 
 # Global i18n service instance
 i18n_service = I18nService()
\ No newline at end of file
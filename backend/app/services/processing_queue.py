@@ -24,6 +24,28 @@ from ..core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Postgres NOTIFY channel carrying the IDs of documents whose progress changed
+PROGRESS_NOTIFY_CHANNEL = "document_progress"
+
+def notify_document_progress(db: Session, document_id: Optional[int] = None, task_id: Optional[int] = None) -> None:
+    """Queue a progress notification; Postgres delivers it when the caller's transaction commits"""
+    if document_id is None and task_id is None:
+        return
+    try:
+        # Savepoint so a failed notification never aborts the caller's transaction
+        with db.begin_nested():
+            if document_id is not None:
+                db.execute(text("SELECT pg_notify(:channel, :document_id)"), {
+                    "channel": PROGRESS_NOTIFY_CHANNEL,
+                    "document_id": str(document_id)
+                })
+            else:
+                db.execute(text("""
+                    SELECT pg_notify(:channel, document_id::text) FROM processing_queue WHERE id = :task_id
+                """), {"channel": PROGRESS_NOTIFY_CHANNEL, "task_id": task_id})
+    except Exception as e:
+        logger.warning(f"Could not queue progress notification: {e}")
+
 class TaskStatus(Enum):
     QUEUED = "queued"
     PROCESSING = "processing" 
@@ -36,6 +58,15 @@ class TaskPriority(Enum):
     HIGH = 2
     URGENT = 3
 
+class TaskLane(Enum):
+    """Scheduling lanes; weights and reserved slots live in processing_queue_lanes"""
+    INTERACTIVE = "interactive"
+    BATCH = "batch"
+    MAINTENANCE = "maintenance"
+
+# Task types that do not belong to a document's upload pipeline and leave its processing status alone
+DOJO_TASK_TYPES = {"dojo_visual_analysis"}
+
 @dataclass
 class ProcessingTask:
     """Represents a processing task"""
@@ -57,6 +88,7 @@ class ProcessingTask:
     completed_at: Optional[datetime] = None
     results_file_path: Optional[str] = None
     last_error: Optional[str] = None
+    lane: TaskLane = TaskLane.INTERACTIVE
 
 class ProcessingQueueManager:
     """Manages the persistent processing queue system"""
@@ -132,9 +164,11 @@ class ProcessingQueueManager:
         task_type: str = "pdf_analysis",
         priority: TaskPriority = TaskPriority.NORMAL,
         processing_options: Optional[Dict[str, Any]] = None,
-        db: Optional[Session] = None
+        db: Optional[Session] = None,
+        lane: TaskLane = TaskLane.INTERACTIVE,
+        submitted_by: Optional[int] = None
     ) -> Optional[int]:
-        """Add a new processing task to the queue"""
+        """Add a new processing task to the queue, in a scheduling lane on behalf of a user"""
         
         if db is None:
             db = SessionLocal()
@@ -143,16 +177,25 @@ class ProcessingQueueManager:
             should_close = False
             
         try:
-            # Check if task already exists for this document AND task type (4-layer pipeline support)
+            # Check if task already exists for this document AND task type (4-layer pipeline support);
+            # a dojo task of another batch is only a duplicate if it runs the same model and prompt
+            match_options = {
+                key: value for key, value in (processing_options or {}).items() if key != "dojo_job_id"
+            } if task_type in DOJO_TASK_TYPES else {}
             existing_check = text("""
                 SELECT id FROM processing_queue 
                 WHERE document_id = :document_id 
                 AND task_type = :task_type
                 AND status IN ('queued', 'processing', 'retry')
+                AND COALESCE(processing_options, '{}'::JSONB) @> CAST(:match_options AS JSONB)
                 LIMIT 1
             """)
             
-            existing = db.execute(existing_check, {"document_id": document_id, "task_type": task_type}).fetchone()
+            existing = db.execute(existing_check, {
+                "document_id": document_id,
+                "task_type": task_type,
+                "match_options": json.dumps(match_options)
+            }).fetchone()
             if existing:
                 logger.info(f"Task already exists for document {document_id}: {existing[0]}")
                 return existing[0]
@@ -162,11 +205,11 @@ class ProcessingQueueManager:
                 INSERT INTO processing_queue (
                     document_id, task_type, status, priority,
                     file_path, company_id, processing_options,
-                    created_at
+                    lane, submitted_by, created_at
                 ) VALUES (
                     :document_id, :task_type, 'queued', :priority,
                     :file_path, :company_id, :processing_options,
-                    CURRENT_TIMESTAMP
+                    :lane, :submitted_by, CURRENT_TIMESTAMP
                 ) RETURNING id
             """)
             
@@ -176,19 +219,22 @@ class ProcessingQueueManager:
                 "priority": priority.value,
                 "file_path": file_path,
                 "company_id": company_id,
-                "processing_options": json.dumps(processing_options or {})
+                "processing_options": json.dumps(processing_options or {}),
+                "lane": lane.value,
+                "submitted_by": submitted_by
             })
             
             task_id = result.fetchone()[0]
             
             # Update project document to reference this task
-            update_doc_query = text("""
-                UPDATE project_documents 
-                SET processing_status = 'processing'
-                WHERE id = :document_id
-            """)
-            
-            db.execute(update_doc_query, {"document_id": document_id})
+            if task_type not in DOJO_TASK_TYPES:
+                update_doc_query = text("""
+                    UPDATE project_documents 
+                    SET processing_status = 'processing'
+                    WHERE id = :document_id
+                """)
+                
+                db.execute(update_doc_query, {"document_id": document_id})
             
             db.commit()
             
@@ -210,7 +256,9 @@ class ProcessingQueueManager:
         company_id: str,
         priority: TaskPriority = TaskPriority.NORMAL,
         processing_options: Optional[Dict[str, Any]] = None,
-        db: Optional[Session] = None
+        db: Optional[Session] = None,
+        lane: TaskLane = TaskLane.INTERACTIVE,
+        submitted_by: Optional[int] = None
     ) -> bool:
         """Create complete 4-layer processing pipeline for a document with proper dependencies"""
         
@@ -231,7 +279,9 @@ class ProcessingQueueManager:
                 task_type="visual_analysis",
                 priority=priority,
                 processing_options=processing_options,
-                db=db
+                db=db,
+                lane=lane,
+                submitted_by=submitted_by
             )
             
             if not visual_task_id:
@@ -246,7 +296,9 @@ class ProcessingQueueManager:
                 task_type="slide_feedback",
                 priority=priority,
                 processing_options=processing_options,  # No dependency - can run parallel
-                db=db
+                db=db,
+                lane=lane,
+                submitted_by=submitted_by
             )
             
             if not feedback_task_id:
@@ -261,7 +313,9 @@ class ProcessingQueueManager:
                 task_type="extractions_and_template",
                 priority=priority,
                 processing_options={**(processing_options or {}), "depends_on": visual_task_id},
-                db=db
+                db=db,
+                lane=lane,
+                submitted_by=submitted_by
             )
             
             if not extraction_task_id:
@@ -280,7 +334,9 @@ class ProcessingQueueManager:
                     task_type=task_type,
                     priority=priority,
                     processing_options={**(processing_options or {}), "depends_on": extraction_task_id},
-                    db=db
+                    db=db,
+                    lane=lane,
+                    submitted_by=submitted_by
                 )
                 
                 if specialized_task_id:
@@ -333,7 +389,7 @@ class ProcessingQueueManager:
                 return None
             
             logger.debug(f"Got result from get_next_processing_task: {result}")
-            task_id, document_id, task_type, file_path, company_id, processing_options = result
+            task_id, document_id, task_type, file_path, company_id, processing_options = result[:6]
             logger.debug(f"processing_options type: {type(processing_options)}, value: {processing_options}")
             
             # Get full task details
@@ -343,7 +399,7 @@ class ProcessingQueueManager:
                     file_path, company_id, processing_options,
                     progress_percentage, current_step, progress_message,
                     retry_count, max_retries, created_at, started_at,
-                    results_file_path, last_error
+                    results_file_path, last_error, lane
                 FROM processing_queue
                 WHERE id = :task_id
             """)
@@ -384,7 +440,8 @@ class ProcessingQueueManager:
                 created_at=task_row[13],
                 started_at=task_row[14],
                 results_file_path=task_row[15],
-                last_error=task_row[16]
+                last_error=task_row[16],
+                lane=TaskLane(task_row[17])
             )
             
         except Exception as e:
@@ -421,6 +478,8 @@ class ProcessingQueueManager:
             })
             
             success = result.fetchone()[0]
+            if success:
+                notify_document_progress(db, task_id=task_id)
             db.commit()
             
             if success:
@@ -465,6 +524,8 @@ class ProcessingQueueManager:
             })
             
             completed = result.fetchone()[0]
+            if completed:
+                notify_document_progress(db, task_id=task_id)
             db.commit()
             
             if completed:
@@ -489,10 +550,27 @@ class ProcessingQueueManager:
     # which creates all 4 tasks with proper dependencies from the start
     def get_task_progress(self, document_id: int, db: Session) -> Optional[Dict[str, Any]]:
         """Get current progress for a document (aggregated across 4-layer pipeline)"""
+        progress = self.get_tasks_progress(db, document_ids=[document_id])
+        if document_id not in progress:
+            return None
+        return progress[document_id]
+    
+    def get_tasks_progress(
+        self,
+        db: Session,
+        document_ids: Optional[List[int]] = None,
+        project_id: Optional[int] = None
+    ) -> Dict[int, Dict[str, Any]]:
+        """Get aggregated progress for several documents (or a whole project) with one query"""
+        if not document_ids and project_id is None:
+            return {}
+        
         try:
-            # Get all tasks for this document with timing information
-            query = text("""
+            # Get all tasks for these documents with timing information
+            query = text(f"""
                 SELECT 
+                    pq.document_id,
+                    pd.project_id,
                     pq.task_type,
                     pq.progress_percentage,
                     pq.current_step,
@@ -505,96 +583,107 @@ class ProcessingQueueManager:
                     pq.processing_duration_seconds,
                     pq.completed_at
                 FROM processing_queue pq
-                WHERE pq.document_id = :document_id
-                ORDER BY pq.created_at ASC
+                JOIN project_documents pd ON pd.id = pq.document_id
+                WHERE {"pq.document_id = ANY(:document_ids)" if document_ids else "pd.project_id = :project_id"}
+                ORDER BY pq.document_id, pq.created_at ASC
             """)
             
-            results = db.execute(query, {"document_id": document_id}).fetchall()
+            results = db.execute(query, {"document_ids": list(document_ids or []), "project_id": project_id}).fetchall()
             
-            if not results:
-                return None
-            
-            # Calculate overall progress based on 4-layer pipeline
-            tasks = {}
+            rows_by_document: Dict[int, List[Any]] = {}
+            project_by_document: Dict[int, int] = {}
             for row in results:
-                task_type, progress, step, message, status, started_at, retry_count, created_at, last_progress_update, processing_duration_seconds, completed_at = row
-                tasks[task_type] = {
-                    "progress": progress or 0,
-                    "step": step,
-                    "message": message,
-                    "status": status,
-                    "started_at": started_at.isoformat() if started_at else None,
-                    "retry_count": retry_count,
-                    "last_progress_update": last_progress_update.isoformat() if last_progress_update else None,
-                    "processing_duration_seconds": processing_duration_seconds,
-                    "completed_at": completed_at.isoformat() if completed_at else None
-                }
-            
-            # Calculate overall progress based on task completion
-            # Each task represents 25% of total progress
-            total_progress = 0
-            overall_status = "queued"
-            current_message = "Initializing processing pipeline"
-            current_step = "Queued"
-            
-            # Task order and weights
-            task_order = ["visual_analysis", "slide_feedback", "extractions_and_template", "specialized_clinical", "specialized_regulatory", "specialized_science"]
-            task_weights = {"visual_analysis": 20, "slide_feedback": 20, "extractions_and_template": 30, "specialized_clinical": 10, "specialized_regulatory": 10, "specialized_science": 10}
-            
-            for task_type in task_order:
-                if task_type in tasks:
-                    task = tasks[task_type]
-                    task_weight = task_weights.get(task_type, 10)
-                    
-                    if task["status"] == "completed":
-                        total_progress += task_weight
-                    elif task["status"] == "processing":
-                        # Add partial progress based on task's internal progress
-                        task_progress = task["progress"] or 0
-                        total_progress += (task_weight * task_progress / 100)
-                        overall_status = "processing"
-                        current_message = task["message"] or f"Processing {task_type}"
-                        current_step = task["step"] or f"Processing {task_type}"
-                        break  # Show current processing task
-                    elif task["status"] in ["queued", "retry"]:
-                        overall_status = "processing" if overall_status != "queued" else "queued"
-                        if overall_status == "queued":
-                            current_message = f"Queued: {task_type}"
-                            current_step = "Queued for processing"
-                        break
-                    elif task["status"] == "failed":
-                        overall_status = "failed"
-                        current_message = task["message"] or f"Failed: {task_type}"
-                        current_step = "Processing failed"
-                        break
-            
-            # Check if all tasks are completed
-            if total_progress >= 100:
-                overall_status = "completed"
-                current_message = "Document processing completed"
-                current_step = "Completed"
-            
-            # Get earliest started_at time from all tasks
-            earliest_start = None
-            max_retry_count = 0
-            for task in tasks.values():
-                if task["started_at"] and (not earliest_start or task["started_at"] < earliest_start):
-                    earliest_start = task["started_at"]
-                max_retry_count = max(max_retry_count, task["retry_count"] or 0)
-            
-            return {
-                "progress_percentage": min(int(total_progress), 100),
-                "current_step": current_step,
-                "message": current_message,
-                "status": overall_status,
-                "started_at": earliest_start.isoformat() if earliest_start else None,
-                "retry_count": max_retry_count,
-                "task_breakdown": tasks  # Debug info - shows individual task states
-            }
+                rows_by_document.setdefault(row[0], []).append(row[2:])
+                project_by_document[row[0]] = row[1]
+            
+            progress = {}
+            for doc_id, rows in rows_by_document.items():
+                progress[doc_id] = self._aggregate_task_progress(rows)
+                progress[doc_id]["project_id"] = project_by_document[doc_id]
+            return progress
             
         except Exception as e:
             logger.error(f"Failed to get task progress: {e}")
-            return None
+            return {}
+    
+    @staticmethod
+    def _aggregate_task_progress(rows: List[Any]) -> Dict[str, Any]:
+        """Weight the task rows of one document into overall pipeline progress"""
+        tasks = {}
+        for row in rows:
+            task_type, progress, step, message, status, started_at, retry_count, created_at, last_progress_update, processing_duration_seconds, completed_at = row
+            tasks[task_type] = {
+                "progress": progress or 0,
+                "step": step,
+                "message": message,
+                "status": status,
+                "started_at": started_at.isoformat() if started_at else None,
+                "retry_count": retry_count,
+                "last_progress_update": last_progress_update.isoformat() if last_progress_update else None,
+                "processing_duration_seconds": processing_duration_seconds,
+                "completed_at": completed_at.isoformat() if completed_at else None
+            }
+        
+        # Calculate overall progress based on task completion
+        total_progress = 0
+        overall_status = "queued"
+        current_message = "Initializing processing pipeline"
+        current_step = "Queued"
+        
+        # Task order and weights
+        task_order = ["visual_analysis", "slide_feedback", "extractions_and_template", "specialized_clinical", "specialized_regulatory", "specialized_science"]
+        task_weights = {"visual_analysis": 20, "slide_feedback": 20, "extractions_and_template": 30, "specialized_clinical": 10, "specialized_regulatory": 10, "specialized_science": 10}
+        
+        for task_type in task_order:
+            if task_type in tasks:
+                task = tasks[task_type]
+                task_weight = task_weights.get(task_type, 10)
+                
+                if task["status"] == "completed":
+                    total_progress += task_weight
+                elif task["status"] == "processing":
+                    # Add partial progress based on task's internal progress
+                    task_progress = task["progress"] or 0
+                    total_progress += (task_weight * task_progress / 100)
+                    overall_status = "processing"
+                    current_message = task["message"] or f"Processing {task_type}"
+                    current_step = task["step"] or f"Processing {task_type}"
+                    break  # Show current processing task
+                elif task["status"] in ["queued", "retry"]:
+                    overall_status = "processing" if overall_status != "queued" else "queued"
+                    if overall_status == "queued":
+                        current_message = f"Queued: {task_type}"
+                        current_step = "Queued for processing"
+                    break
+                elif task["status"] == "failed":
+                    overall_status = "failed"
+                    current_message = task["message"] or f"Failed: {task_type}"
+                    current_step = "Processing failed"
+                    break
+        
+        # Check if all tasks are completed
+        if total_progress >= 100:
+            overall_status = "completed"
+            current_message = "Document processing completed"
+            current_step = "Completed"
+        
+        # Get earliest started_at time from all tasks (ISO strings sort chronologically)
+        earliest_start = None
+        max_retry_count = 0
+        for task in tasks.values():
+            if task["started_at"] and (not earliest_start or task["started_at"] < earliest_start):
+                earliest_start = task["started_at"]
+            max_retry_count = max(max_retry_count, task["retry_count"] or 0)
+        
+        return {
+            "progress_percentage": min(int(total_progress), 100),
+            "current_step": current_step,
+            "message": current_message,
+            "status": overall_status,
+            "started_at": earliest_start,
+            "retry_count": max_retry_count,
+            "task_breakdown": tasks  # Debug info - shows individual task states
+        }
     
     def recover_abandoned_tasks(self, db: Session) -> int:
         """Recover tasks that were processing when server crashed"""
@@ -614,8 +703,41 @@ class ProcessingQueueManager:
             db.rollback()
             return 0
     
-    def retry_failed_tasks(self, db: Session, max_age_hours: int = 24) -> int:
-        """Retry failed tasks that haven't exceeded max retries"""
+    def cleanup_failed_task_checkpoints(self, db: Session, max_age_hours: int = 24) -> int:
+        """Delete checkpoints of failed tasks that will not be retried again"""
+        try:
+            result = db.execute(
+                text("SELECT cleanup_failed_task_checkpoints(:max_age_hours)"),
+                {"max_age_hours": max_age_hours}
+            )
+            deleted_count = result.fetchone()[0]
+            db.commit()
+            
+            if deleted_count > 0:
+                logger.info(f"Deleted {deleted_count} checkpoints of permanently failed tasks")
+            
+            return deleted_count
+            
+        except Exception as e:
+            logger.error(f"Failed to clean up task checkpoints: {e}")
+            db.rollback()
+            return 0
+    
+    def renew_task_leases(self, db: Session, server_id: str, task_ids: List[int], lease_seconds: int) -> List[int]:
+        """Extend the leases of a server's in-flight tasks; returns the tasks it still holds (caller commits)"""
+        if not task_ids:
+            return []
+        result = db.execute(
+            text("SELECT task_id FROM renew_task_leases(:server_id, :task_ids, :lease_seconds)"),
+            {"server_id": server_id, "task_ids": list(task_ids), "lease_seconds": lease_seconds}
+        )
+        return [row[0] for row in result.fetchall()]
+    
+    def retry_failed_tasks(self, db: Session, max_age_hours: int = 24, resume: bool = True) -> int:
+        """Retry failed tasks that haven't exceeded max retries
+
+        With resume, retried tasks continue from their checkpoints (finished pages and
+        questions); otherwise the checkpoints are dropped and the tasks start over."""
         try:
             query = text("""
                 SELECT id FROM processing_queue
@@ -628,7 +750,10 @@ class ProcessingQueueManager:
             
             retried_count = 0
             for (task_id,) in failed_tasks:
-                result = db.execute(text("SELECT retry_failed_task(:task_id)"), {"task_id": task_id})
+                result = db.execute(
+                    text("SELECT retry_failed_task(:task_id, :resume)"),
+                    {"task_id": task_id, "resume": resume}
+                )
                 if result.fetchone()[0]:
                     retried_count += 1
             
@@ -659,8 +784,30 @@ class ProcessingQueueManager:
             
             results = db.execute(stats_query).fetchall()
             
+            # Queue depth, waiting time and GPU share per scheduling lane
+            lane_query = text("""
+                SELECT
+                    l.lane,
+                    l.weight,
+                    l.reserved_slots,
+                    COUNT(pq.id) FILTER (WHERE pq.status IN ('queued', 'retry')) AS queued,
+                    COUNT(pq.id) FILTER (WHERE pq.status = 'processing') AS running,
+                    EXTRACT(EPOCH FROM (CURRENT_TIMESTAMP - MIN(pq.created_at) FILTER (WHERE pq.status IN ('queued', 'retry')))) AS oldest_queued_seconds,
+                    AVG(EXTRACT(EPOCH FROM (pq.started_at - pq.created_at))) FILTER (WHERE pq.started_at > CURRENT_TIMESTAMP - INTERVAL '24 hours') AS avg_wait_seconds,
+                    PERCENTILE_CONT(0.95) WITHIN GROUP (ORDER BY EXTRACT(EPOCH FROM (pq.started_at - pq.created_at)))
+                        FILTER (WHERE pq.started_at > CURRENT_TIMESTAMP - INTERVAL '24 hours') AS p95_wait_seconds,
+                    AVG(EXTRACT(EPOCH FROM (pq.completed_at - pq.started_at))) FILTER (WHERE pq.status = 'completed') AS avg_run_seconds,
+                    SUM(EXTRACT(EPOCH FROM (COALESCE(pq.completed_at, CURRENT_TIMESTAMP) - pq.started_at)))
+                        FILTER (WHERE pq.started_at > CURRENT_TIMESTAMP - INTERVAL '1 hour') AS gpu_seconds_last_hour
+                FROM processing_queue_lanes l
+                LEFT JOIN processing_queue pq ON pq.lane = l.lane
+                    AND (pq.status IN ('queued', 'retry', 'processing') OR pq.created_at > CURRENT_TIMESTAMP - INTERVAL '24 hours')
+                GROUP BY l.lane, l.weight, l.reserved_slots
+            """)
+            
             stats = {
                 "queue_stats": {row[0]: {"count": row[1], "avg_age_seconds": row[2]} for row in results},
+                "lanes": self._summarize_lanes(db.execute(lane_query).fetchall()),
                 "server_id": self.server_id,
                 "running_tasks": len(self._running_tasks),
                 "max_concurrent": self.max_concurrent_tasks
@@ -672,6 +819,28 @@ class ProcessingQueueManager:
             logger.error(f"Failed to get queue stats: {e}")
             return {"error": str(e)}
     
+    @staticmethod
+    def _summarize_lanes(rows: List[Any]) -> Dict[str, Dict[str, Any]]:
+        """Per-lane metrics with the GPU share each lane got in the last hour next to its weighted target"""
+        total_weight = sum(row[1] for row in rows) or 1
+        total_seconds = sum(float(row[9] or 0) for row in rows)
+        lanes = {}
+        for lane, weight, reserved, queued, running, oldest, avg_wait, p95_wait, avg_run, seconds in rows:
+            lanes[lane] = {
+                "weight": weight,
+                "reserved_slots": reserved,
+                "queued": queued,
+                "running": running,
+                "oldest_queued_seconds": round(float(oldest), 1) if oldest is not None else None,
+                "avg_wait_seconds": round(float(avg_wait), 1) if avg_wait is not None else None,
+                "p95_wait_seconds": round(float(p95_wait), 1) if p95_wait is not None else None,
+                "avg_run_seconds": round(float(avg_run), 1) if avg_run is not None else None,
+                "gpu_seconds_last_hour": round(float(seconds or 0), 1),
+                "gpu_share_last_hour": round(float(seconds or 0) / total_seconds, 3) if total_seconds else None,
+                "target_share": round(weight / total_weight, 3)
+            }
+        return lanes
+    
     async def heartbeat(self, db: Session) -> None:
         """Send heartbeat to indicate server is alive"""
         try:
@@ -0,0 +1,205 @@
+"""
+Progress Events - Pushes document processing progress to server-sent event streams
+
+Every backend process runs one shared fan-out. Progress writes (GPU progress updates,
+task status changes) issue a Postgres NOTIFY with the document ID; each process LISTENs
+on that channel, recomputes progress for the changed documents with one query, and
+pushes only documents whose progress actually changed to the subscribed streams.
+"""
+
+import asyncio
+import json
+import logging
+import select
+import threading
+from typing import Any, Dict, Optional, Set
+
+import psycopg2
+
+from ..core.config import settings
+from ..db.database import SessionLocal
+from .processing_queue import processing_queue_manager, PROGRESS_NOTIFY_CHANNEL
+
+logger = logging.getLogger(__name__)
+
+COALESCE_SECONDS = 0.5  # Bundle bursts of notifications into one progress query
+RESYNC_SECONDS = 15  # Safety refresh of subscribed documents and SSE keepalive interval
+SUBSCRIBER_QUEUE_SIZE = 100
+LISTEN_RECONNECT_SECONDS = 5
+
+
+class ProgressSubscription:
+    """One SSE client, subscribed to a single document or a whole project"""
+
+    def __init__(self, document_id: Optional[int] = None, project_id: Optional[int] = None):
+        self.document_id = document_id
+        self.project_id = project_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def push(self, event: Dict[str, Any]):
+        """Queue an event, dropping the oldest one if the client is not keeping up"""
+        if self.queue.full():
+            try:
+                self.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+        self.queue.put_nowait(event)
+
+
+class ProgressBroadcaster:
+    """Per-process fan-out of document progress to SSE subscribers"""
+
+    def __init__(self):
+        self._document_subscribers: Dict[int, Set[ProgressSubscription]] = {}
+        self._project_subscribers: Dict[int, Set[ProgressSubscription]] = {}
+        self._last_progress: Dict[int, Dict[str, Any]] = {}
+        self._dirty: Set[int] = set()
+        self._dirty_event: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._fanout_task: Optional[asyncio.Task] = None
+        self._listener_thread: Optional[threading.Thread] = None
+
+    async def subscribe(self, document_id: Optional[int] = None, project_id: Optional[int] = None) -> ProgressSubscription:
+        """Register a subscriber and queue an initial snapshot for it"""
+        self._ensure_started()
+        subscription = ProgressSubscription(document_id=document_id, project_id=project_id)
+
+        if document_id is not None:
+            self._document_subscribers.setdefault(document_id, set()).add(subscription)
+            snapshot = await asyncio.to_thread(self._load_progress, [document_id], None)
+        else:
+            self._project_subscribers.setdefault(project_id, set()).add(subscription)
+            snapshot = await asyncio.to_thread(self._load_progress, None, project_id)
+
+        for doc_id, progress in snapshot.items():
+            self._last_progress[doc_id] = progress
+            subscription.push(self._event(doc_id, progress))
+        return subscription
+
+    def unsubscribe(self, subscription: ProgressSubscription):
+        """Remove a subscriber and forget cached progress nobody watches anymore"""
+        if subscription.document_id is not None:
+            self._discard(self._document_subscribers, subscription.document_id, subscription)
+        else:
+            self._discard(self._project_subscribers, subscription.project_id, subscription)
+
+        self._last_progress = {
+            doc_id: progress for doc_id, progress in self._last_progress.items()
+            if doc_id in self._document_subscribers or progress.get("project_id") in self._project_subscribers
+        }
+
+    def mark_dirty(self, document_ids: Set[int]):
+        """Schedule a progress refresh for documents; must run on the event loop"""
+        self._dirty.update(document_ids)
+        if self._dirty_event:
+            self._dirty_event.set()
+
+    def _ensure_started(self):
+        """Start the fan-out task and the LISTEN thread on first use in this process"""
+        if self._fanout_task and not self._fanout_task.done():
+            return
+        self._loop = asyncio.get_running_loop()
+        self._dirty_event = asyncio.Event()
+        self._fanout_task = self._loop.create_task(self._fanout())
+
+        if not self._listener_thread or not self._listener_thread.is_alive():
+            self._listener_thread = threading.Thread(target=self._listen, name="progress-listener", daemon=True)
+            self._listener_thread.start()
+
+    async def _fanout(self):
+        """Recompute progress for changed documents and push it to their subscribers"""
+        while True:
+            try:
+                try:
+                    await asyncio.wait_for(self._dirty_event.wait(), timeout=RESYNC_SECONDS)
+                    await asyncio.sleep(COALESCE_SECONDS)
+                except asyncio.TimeoutError:
+                    # Periodic resync covers missed notifications (e.g. while LISTEN reconnects)
+                    self._dirty.update(self._last_progress.keys())
+                    self._dirty.update(self._document_subscribers.keys())
+                self._dirty_event.clear()
+
+                dirty, self._dirty = self._dirty, set()
+                if not dirty or not (self._document_subscribers or self._project_subscribers):
+                    continue
+
+                progress = await asyncio.to_thread(self._load_progress, list(dirty), None)
+                for doc_id, doc_progress in progress.items():
+                    if self._last_progress.get(doc_id) == doc_progress:
+                        continue
+                    self._last_progress[doc_id] = doc_progress
+                    event = self._event(doc_id, doc_progress)
+                    for subscription in self._document_subscribers.get(doc_id, ()):
+                        subscription.push(event)
+                    for subscription in self._project_subscribers.get(doc_progress.get("project_id"), ()):
+                        subscription.push(event)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Progress fan-out failed: {e}")
+                await asyncio.sleep(1)
+
+    def _listen(self):
+        """Blocking LISTEN loop; hands notified document IDs to the event loop"""
+        while True:
+            connection = None
+            try:
+                connection = psycopg2.connect(settings.DATABASE_URL)
+                connection.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                with connection.cursor() as cursor:
+                    cursor.execute(f"LISTEN {PROGRESS_NOTIFY_CHANNEL}")
+                logger.info(f"Listening for progress notifications on {PROGRESS_NOTIFY_CHANNEL}")
+
+                while True:
+                    if select.select([connection], [], [], RESYNC_SECONDS) == ([], [], []):
+                        continue
+                    connection.poll()
+                    document_ids = set()
+                    while connection.notifies:
+                        payload = connection.notifies.pop(0).payload
+                        if payload.isdigit():
+                            document_ids.add(int(payload))
+                    if document_ids:
+                        self._loop.call_soon_threadsafe(self.mark_dirty, document_ids)
+
+            except Exception as e:
+                logger.warning(f"Progress LISTEN connection lost, retrying in {LISTEN_RECONNECT_SECONDS}s: {e}")
+            finally:
+                if connection is not None:
+                    try:
+                        connection.close()
+                    except Exception:
+                        pass
+            threading.Event().wait(LISTEN_RECONNECT_SECONDS)
+
+    @staticmethod
+    def _load_progress(document_ids, project_id) -> Dict[int, Dict[str, Any]]:
+        """Run the batched progress query in its own session"""
+        db = SessionLocal()
+        try:
+            return processing_queue_manager.get_tasks_progress(db, document_ids=document_ids, project_id=project_id)
+        finally:
+            db.close()
+
+    @staticmethod
+    def _event(document_id: int, progress: Dict[str, Any]) -> Dict[str, Any]:
+        return {"document_id": document_id, "queue_progress": progress}
+
+    @staticmethod
+    def _discard(subscribers: Dict[int, Set[ProgressSubscription]], key: int, subscription: ProgressSubscription):
+        entries = subscribers.get(key)
+        if entries is None:
+            return
+        entries.discard(subscription)
+        if not entries:
+            del subscribers[key]
+
+
+def format_sse(event: Dict[str, Any], event_name: str = "progress") -> str:
+    """Serialize one server-sent event"""
+    return f"event: {event_name}\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+# Global instance - one fan-out per backend process
+progress_broadcaster = ProgressBroadcaster()
@@ -0,0 +1,77 @@
+"""
+Queue Lease Sweeper - Scheduled recovery of processing tasks with expired leases
+
+GPU workers claim tasks for a short lease and extend it with every heartbeat, so a
+lease only runs out when its worker died or hung. Instead of running
+cleanup_expired_locks() inside every claim, a background thread requeues expired
+tasks every sweep interval. The same sweep drops the checkpoints of failed tasks that
+will not be retried. Every uvicorn worker runs a sweeper; both cleanups are single
+idempotent statements, so concurrent sweeps are harmless.
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..db.database import SessionLocal
+from .processing_queue import processing_queue_manager
+
+logger = logging.getLogger(__name__)
+
+SWEEP_INTERVAL_SECONDS = 30.0
+
+
+class QueueLeaseSweeper:
+    """Background thread that requeues tasks whose worker stopped renewing their lease"""
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal,
+                 interval: float = SWEEP_INTERVAL_SECONDS):
+        self.session_factory = session_factory
+        self.interval = interval
+        self._sweeper: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._counters = {"sweeps": 0, "recovered": 0, "checkpoints_deleted": 0}
+
+    def start(self):
+        """Start the sweeper thread if it is not running"""
+        if self._sweeper and self._sweeper.is_alive():
+            return
+        self._stop.clear()
+        self._sweeper = threading.Thread(target=self._sweep_loop, name="queue-lease-sweeper", daemon=True)
+        self._sweeper.start()
+
+    def stop(self, timeout: float = 10.0):
+        self._stop.set()
+        if self._sweeper:
+            self._sweeper.join(timeout)
+
+    def sweep(self) -> int:
+        """Requeue tasks with expired leases once; returns how many were recovered"""
+        db = self.session_factory()
+        try:
+            recovered = processing_queue_manager.recover_abandoned_tasks(db)
+            checkpoints_deleted = processing_queue_manager.cleanup_failed_task_checkpoints(db)
+        finally:
+            db.close()
+        self._counters["sweeps"] += 1
+        self._counters["recovered"] += recovered
+        self._counters["checkpoints_deleted"] += checkpoints_deleted
+        return recovered
+
+    def metrics(self) -> Dict[str, Any]:
+        return {"interval_seconds": self.interval, "running": bool(self._sweeper and self._sweeper.is_alive()),
+                **self._counters}
+
+    def _sweep_loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.error(f"Queue lease sweep failed: {e}")
+
+
+# Global instance
+queue_lease_sweeper = QueueLeaseSweeper(interval=settings.QUEUE_LEASE_SWEEP_SECONDS)
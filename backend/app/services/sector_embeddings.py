@@ -0,0 +1,240 @@
+"""
+Sector Embeddings - Embedding pre-classifier over the healthcare sectors
+
+Sector descriptions, subcategories and keywords, plus company offerings whose
+classification was confirmed or corrected in classification_performance, are
+embedded into one NumPy matrix. An offering is scored against all rows with a
+single matrix product; when the best sector beats the runner-up by a clear
+margin the LLM classification can be skipped.
+
+The encoder is a hashed word uni/bigram TF-IDF (CPU only, no model download).
+The index can be prebuilt offline with scripts/build_sector_embedding_index.py
+and is otherwise built in-process whenever its signature changes.
+"""
+
+import logging
+import os
+import re
+import threading
+import zlib
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from .sector_index import SECTOR_SIGNATURE_QUERY
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_DIMENSION = 4096
+
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in into is it its of on or our that the their this to
+we with will which who can using use based provide provides platform company solution solutions
+""".split())
+
+# Offerings confirmed as classified, or manually corrected to another sector
+CONFIRMED_CLASSIFICATIONS_QUERY = text("""
+    SELECT DISTINCT ON (sc.id) sc.company_offering, COALESCE(corrected.id, sc.primary_sector_id)
+    FROM startup_classifications sc
+    LEFT JOIN classification_performance cp ON cp.classification_id = sc.id
+    LEFT JOIN healthcare_sectors corrected
+           ON cp.manual_correction_to IS NOT NULL
+          AND lower(cp.manual_correction_to) IN (lower(corrected.name), lower(corrected.display_name))
+    WHERE sc.company_offering IS NOT NULL
+      AND (cp.was_accurate = TRUE OR corrected.id IS NOT NULL OR sc.manual_override = TRUE)
+    ORDER BY sc.id, cp.created_at DESC NULLS LAST
+""")
+
+EXAMPLES_SIGNATURE_QUERY = text("""
+    SELECT COUNT(*) || ':' || COALESCE(MAX(id), 0) FROM classification_performance
+""")
+
+
+def _tokenize(value: str) -> List[str]:
+    tokens = [token for token in re.findall(r"[a-z0-9]+", value.lower()) if token not in STOPWORDS]
+    return tokens + [f"{first} {second}" for first, second in zip(tokens, tokens[1:])]
+
+
+def _bucket(feature: str, dimension: int) -> int:
+    # crc32 is stable across processes, unlike hash()
+    return zlib.crc32(feature.encode("utf-8")) % dimension
+
+
+class HashedTextEncoder:
+    """Hashed uni/bigram TF-IDF vectors, L2-normalized"""
+
+    def __init__(self, dimension: int = EMBEDDING_DIMENSION, idf: Optional[np.ndarray] = None):
+        self.dimension = dimension
+        self.idf = idf if idf is not None else np.ones(dimension, dtype=np.float32)
+
+    def _counts(self, texts: Sequence[str]) -> np.ndarray:
+        rows, columns = [], []
+        for row, value in enumerate(texts):
+            for feature in _tokenize(value or ""):
+                rows.append(row)
+                columns.append(_bucket(feature, self.dimension))
+        counts = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        np.add.at(counts, (np.asarray(rows, dtype=np.intp), np.asarray(columns, dtype=np.intp)), 1.0)
+        return counts
+
+    def fit(self, texts: Sequence[str]) -> "HashedTextEncoder":
+        """Learn inverse document frequencies from the corpus"""
+        document_frequency = (self._counts(texts) > 0).sum(axis=0)
+        self.idf = (np.log((1 + len(texts)) / (1 + document_frequency)) + 1).astype(np.float32)
+        return self
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.log1p(self._counts(texts)) * self.idf
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+
+def sector_document(sector: Dict[str, Any]) -> str:
+    """Text describing a sector: name, description, subcategories and keywords"""
+    subcategories = sector.get("subcategories") or []
+    keywords = sector.get("keywords") or []
+    return " ".join([
+        sector.get("display_name") or sector.get("name") or "",
+        sector.get("description") or "",
+        " ".join(subcategories) if isinstance(subcategories, list) else str(subcategories),
+        " ".join(keyword for keyword in keywords if isinstance(keyword, str)),
+    ])
+
+
+class SectorEmbeddingIndex:
+    """Embedded sector documents and confirmed offerings, scored per sector by best match"""
+
+    def __init__(self, encoder: HashedTextEncoder, vectors: np.ndarray, row_sector_ids: np.ndarray,
+                 sectors: List[Dict[str, Any]], signature: Optional[str] = None):
+        self.encoder = encoder
+        self.signature = signature
+        present = set(row_sector_ids.tolist())
+        self.sectors = [sector for sector in sectors if sector["id"] in present]
+        position = {sector["id"]: index for index, sector in enumerate(self.sectors)}
+        row_positions = np.array([position.get(sector_id, -1) for sector_id in row_sector_ids.tolist()], dtype=np.intp)
+
+        # Rows grouped by sector, so per-sector maxima are one reduceat; rows of unknown sectors are dropped
+        row_order = np.flatnonzero(row_positions >= 0)
+        row_order = row_order[np.argsort(row_positions[row_order], kind="stable")]
+        self.vectors = vectors[row_order]
+        self.row_sector_ids = row_sector_ids[row_order]
+        self._sector_starts = np.searchsorted(row_positions[row_order], np.arange(len(self.sectors)))
+
+    @classmethod
+    def build(cls, sectors: List[Dict[str, Any]], examples: List[Tuple[str, int]],
+              signature: Optional[str] = None, dimension: int = EMBEDDING_DIMENSION) -> "SectorEmbeddingIndex":
+        sector_ids = {sector["id"] for sector in sectors}
+        examples = [(offering, sector_id) for offering, sector_id in examples if offering and sector_id in sector_ids]
+        texts = [sector_document(sector) for sector in sectors] + [offering for offering, _ in examples]
+        row_sector_ids = np.array([sector["id"] for sector in sectors] + [sector_id for _, sector_id in examples], dtype=np.int64)
+
+        encoder = HashedTextEncoder(dimension).fit(texts)
+        return cls(encoder, encoder.encode(texts), row_sector_ids, sectors, signature)
+
+    def top_k(self, offerings: Sequence[str], k: int = 3) -> List[List[Tuple[Dict[str, Any], float]]]:
+        """Best k sectors with similarity for every offering"""
+        if not self.sectors or not offerings:
+            return [[] for _ in offerings]
+        similarities = self.encoder.encode(offerings) @ self.vectors.T
+        # Per sector, the similarity of its best matching row
+        sector_scores = np.maximum.reduceat(similarities, self._sector_starts, axis=1)
+        order = np.argsort(-sector_scores, axis=1, kind="stable")[:, :k]
+        return [
+            [(self.sectors[position], float(sector_scores[row, position])) for position in order[row]]
+            for row in range(len(offerings))
+        ]
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "wb") as f:
+            np.savez_compressed(
+                f, vectors=self.vectors, row_sector_ids=self.row_sector_ids, idf=self.encoder.idf,
+                signature=np.array(self.signature or "")
+            )
+
+    @classmethod
+    def load(cls, path: str, sectors: List[Dict[str, Any]]) -> "SectorEmbeddingIndex":
+        with np.load(path) as data:
+            encoder = HashedTextEncoder(data["idf"].shape[0], data["idf"])
+            return cls(encoder, data["vectors"], data["row_sector_ids"], sectors, str(data["signature"]) or None)
+
+
+def index_signature(db: Session) -> str:
+    """Changes when the sectors or the classification feedback change"""
+    return f"{db.execute(SECTOR_SIGNATURE_QUERY).scalar()}:{db.execute(EXAMPLES_SIGNATURE_QUERY).scalar()}"
+
+
+def load_confirmed_classifications(db: Session) -> List[Tuple[str, int]]:
+    return [(row[0], row[1]) for row in db.execute(CONFIRMED_CLASSIFICATIONS_QUERY).fetchall()]
+
+
+class SectorPreclassifier:
+    """Decides from the embedding index whether the LLM classification can be skipped"""
+
+    def __init__(self, index_path: str = "", min_similarity: float = 0.3, min_margin: float = 0.15, enabled: bool = True):
+        self.index_path = index_path
+        self.min_similarity = min_similarity
+        self.min_margin = min_margin
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._index: Optional[SectorEmbeddingIndex] = None
+
+    def get_index(self, db: Session, sectors: List[Dict[str, Any]]) -> SectorEmbeddingIndex:
+        """Current index: cached, prebuilt on disk, or built now if neither matches the signature"""
+        signature = index_signature(db)
+        with self._lock:
+            if self._index is not None and self._index.signature == signature:
+                return self._index
+
+        index = None
+        if self.index_path and os.path.exists(self.index_path):
+            try:
+                index = SectorEmbeddingIndex.load(self.index_path, sectors)
+                if index.signature != signature:
+                    index = None
+            except Exception as e:
+                logger.warning(f"Could not load sector embedding index from {self.index_path}: {e}")
+                index = None
+        if index is None:
+            index = SectorEmbeddingIndex.build(sectors, load_confirmed_classifications(db), signature)
+            logger.info(f"Built sector embedding index: {index.vectors.shape[0]} rows, {len(index.sectors)} sectors")
+
+        with self._lock:
+            self._index = index
+        return index
+
+    def preclassify(self, db: Session, sectors: List[Dict[str, Any]], offerings: Sequence[str], k: int = 3) -> List[Dict[str, Any]]:
+        """Top-k sectors per offering, with the margin and whether it is confident enough to skip the LLM"""
+        try:
+            ranked = self.get_index(db, sectors).top_k(offerings, k) if self.enabled else [[] for _ in offerings]
+        except Exception as e:
+            logger.warning(f"Sector pre-classification unavailable: {e}")
+            try:
+                db.rollback()
+            except Exception:
+                pass
+            ranked = [[] for _ in offerings]
+
+        predictions = []
+        for candidates in ranked:
+            similarity = candidates[0][1] if candidates else 0.0
+            margin = similarity - (candidates[1][1] if len(candidates) > 1 else 0.0)
+            predictions.append({
+                "candidates": candidates,
+                "similarity": similarity,
+                "margin": margin,
+                "confident": bool(candidates) and similarity >= self.min_similarity and margin >= self.min_margin
+            })
+        return predictions
+
+
+# Global instance
+sector_preclassifier = SectorPreclassifier(
+    index_path=settings.SECTOR_EMBEDDING_INDEX_PATH,
+    min_similarity=settings.SECTOR_PRECLASSIFIER_MIN_SIMILARITY,
+    min_margin=settings.SECTOR_PRECLASSIFIER_MIN_MARGIN,
+    enabled=settings.SECTOR_PRECLASSIFIER_ENABLED
+)
@@ -0,0 +1,112 @@
+"""
+Sector Index - Cached keyword matcher over the healthcare sectors
+
+All sector keywords are compiled into one case-insensitive regex with word
+boundaries, so the keyword pre-filter is a single scan of the offering. The
+index is shared across classifiers and only rebuilt when the active rows of
+healthcare_sectors change (checked with an md5 over those rows).
+"""
+
+import logging
+import re
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Changes whenever an active sector row is added, removed or edited
+SECTOR_SIGNATURE_QUERY = text("""
+    SELECT md5(COALESCE(string_agg(s::text, ',' ORDER BY s.id), ''))
+    FROM healthcare_sectors s
+    WHERE s.is_active = TRUE
+""")
+
+
+def _keyword_pattern(keyword: str) -> str:
+    """Keyword as a regex that only matches whole words"""
+    return rf"(?<!\w){re.escape(keyword)}(?!\w)"
+
+
+class SectorKeywordMatcher:
+    """Matches an offering against the keywords of all sectors in one regex scan"""
+
+    def __init__(self, sectors: List[Dict[str, Any]]):
+        self.sectors = sectors
+        # Lower-cased keyword -> (sector index, keyword as configured) for every sector listing it
+        self._keyword_sectors: Dict[str, List[tuple]] = {}
+        for index, sector in enumerate(sectors):
+            for keyword in dict.fromkeys(sector.get("keywords") or []):
+                if isinstance(keyword, str) and keyword.strip():
+                    self._keyword_sectors.setdefault(keyword.strip().lower(), []).append((index, keyword))
+
+        keywords = sorted(self._keyword_sectors, key=len, reverse=True)
+        # The lookahead reports the longest keyword at every word start, including overlapping ones
+        self._pattern = re.compile(
+            r"(?<!\w)(?=(" + "|".join(re.escape(keyword) for keyword in keywords) + r")(?!\w))",
+            re.IGNORECASE
+        ) if keywords else None
+        # Shorter keywords that match whenever a longer one does ("medical" within "medical device")
+        self._implied = {
+            keyword: [
+                other for other in keywords
+                if other != keyword and keyword.startswith(other) and re.match(_keyword_pattern(other), keyword)
+            ]
+            for keyword in keywords
+        }
+
+    def match(self, company_offering: str, limit: int = 3) -> List[Dict[str, Any]]:
+        """Top sectors by keyword score: {"sector", "score", "matched_keywords"}"""
+        if not self._pattern or not company_offering:
+            return []
+
+        matched: Dict[int, Dict[str, None]] = {}
+        for found in self._pattern.finditer(company_offering):
+            keyword = found.group(1).lower()
+            for hit in (keyword, *self._implied.get(keyword, ())):
+                for index, configured in self._keyword_sectors.get(hit, ()):
+                    matched.setdefault(index, {})[configured] = None
+
+        sector_scores = []
+        for index in sorted(matched):
+            sector = self.sectors[index]
+            # In the sector's keyword order, like the per-keyword scan reported them
+            matched_keywords = [keyword for keyword in dict.fromkeys(sector["keywords"]) if keyword in matched[index]]
+            # Give higher weight to longer, more specific keywords, normalized by the sector's keyword count
+            keyword_score = sum(len(keyword.split()) for keyword in matched_keywords)
+            sector_scores.append({
+                "sector": sector,
+                "score": keyword_score / len(sector["keywords"]),
+                "matched_keywords": matched_keywords
+            })
+
+        sector_scores.sort(key=lambda x: x["score"], reverse=True)
+        return sector_scores[:limit]
+
+
+class SectorIndexCache:
+    """Process-wide sector index, rebuilt only when healthcare_sectors changes"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._signature: Optional[str] = None
+        self._matcher: Optional[SectorKeywordMatcher] = None
+
+    def get(self, db: Session, load_sectors: Callable[[], List[Dict[str, Any]]]) -> SectorKeywordMatcher:
+        """Cached index, or a new one from load_sectors() if the sectors changed; raises on database errors"""
+        signature = db.execute(SECTOR_SIGNATURE_QUERY).scalar()
+        with self._lock:
+            if self._matcher is not None and signature == self._signature:
+                return self._matcher
+
+        matcher = SectorKeywordMatcher(load_sectors())
+        logger.info(f"Built sector keyword index for {len(matcher.sectors)} sectors")
+        with self._lock:
+            self._signature, self._matcher = signature, matcher
+        return matcher
+
+
+# Global instance
+sector_index_cache = SectorIndexCache()
@@ -0,0 +1,149 @@
+"""
+Slide Image Index
+
+Records where slide images live on the shared volume when visual analysis is
+cached, so the deck viewer can resolve each slide with a single indexed lookup
+instead of crawling the company/analysis directory tree.
+"""
+
+import os
+import json
+import logging
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, List, Optional, Any
+
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Slide images are written once per deck and never modified in place
+SLIDE_IMAGE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+
+# Layout written by gpu_processing/utils/slide_thumbnails.py next to the slide images
+THUMBNAIL_DIRNAME = "thumbnails"
+THUMBNAIL_MANIFEST_FILENAME = "manifest.json"
+THUMBNAIL_VARIANTS = {"small", "medium"}
+
+
+class SlideIndexService:
+    """Maintains the slide_images table and serves cache metadata for slide files"""
+
+    def __init__(self, mount_path: Optional[str] = None):
+        self.projects_root = os.path.join(mount_path or settings.SHARED_FILESYSTEM_MOUNT_PATH, "projects")
+
+    def extract_slide_entries(self, analysis_result_json: Any) -> List[Dict[str, Any]]:
+        """Pull (slide_number, slide_filename, slide_image_path) entries out of a visual analysis payload"""
+        if isinstance(analysis_result_json, str):
+            try:
+                analysis_result_json = json.loads(analysis_result_json)
+            except (ValueError, TypeError):
+                return []
+
+        if isinstance(analysis_result_json, dict):
+            pages = analysis_result_json.get("visual_analysis_results", [])
+        elif isinstance(analysis_result_json, list):
+            pages = analysis_result_json
+        else:
+            return []
+
+        entries = []
+        for index, page in enumerate(pages, 1):
+            if not isinstance(page, dict) or not page.get("slide_image_path"):
+                continue
+            slide_image_path = page["slide_image_path"]
+            entries.append({
+                "slide_number": page.get("page_number") or index,
+                "slide_filename": os.path.basename(slide_image_path),
+                "slide_image_path": slide_image_path
+            })
+        return entries
+
+    def register_slides(self, db: Session, document_id: int, analysis_result_json: Any) -> int:
+        """Upsert the slide paths of a visual analysis result for a document (caller commits)"""
+        entries = self.extract_slide_entries(analysis_result_json)
+        if not entries:
+            return 0
+
+        db.execute(text("""
+            INSERT INTO slide_images (document_id, slide_number, slide_filename, slide_image_path, created_at)
+            VALUES (:document_id, :slide_number, :slide_filename, :slide_image_path, CURRENT_TIMESTAMP)
+            ON CONFLICT (document_id, slide_filename) DO UPDATE SET
+                slide_number = EXCLUDED.slide_number,
+                slide_image_path = EXCLUDED.slide_image_path
+        """), [{"document_id": document_id, **entry} for entry in entries])
+
+        logger.info(f"Indexed {len(entries)} slide images for document {document_id}")
+        return len(entries)
+
+    def register_slide(self, db: Session, document_id: int, slide_filename: str, slide_image_path: str) -> None:
+        """Index a single slide found on disk (used to backfill documents processed before the index existed)"""
+        slide_number = None
+        stem = os.path.splitext(slide_filename)[0]
+        if stem.startswith("slide_") and stem[len("slide_"):].isdigit():
+            slide_number = int(stem[len("slide_"):])
+
+        db.execute(text("""
+            INSERT INTO slide_images (document_id, slide_number, slide_filename, slide_image_path, created_at)
+            VALUES (:document_id, :slide_number, :slide_filename, :slide_image_path, CURRENT_TIMESTAMP)
+            ON CONFLICT (document_id, slide_filename) DO NOTHING
+        """), {
+            "document_id": document_id,
+            "slide_number": slide_number,
+            "slide_filename": slide_filename,
+            "slide_image_path": slide_image_path
+        })
+
+    def deck_directory(self, db: Session, document_id: int, company_id: str, deck_name: str) -> str:
+        """Absolute analysis directory of a deck, taken from the index when available"""
+        indexed = db.execute(text(
+            "SELECT slide_image_path FROM slide_images WHERE document_id = :document_id LIMIT 1"
+        ), {"document_id": document_id}).fetchone()
+        if indexed and indexed[0]:
+            return os.path.dirname(self.absolute_path(indexed[0]))
+        return os.path.join(self.projects_root, company_id, "analysis", deck_name)
+
+    def load_thumbnail_manifest(self, deck_directory: str) -> Optional[Dict[str, Any]]:
+        """Read the thumbnail manifest written by the GPU thumbnail stage, if present"""
+        manifest_path = os.path.join(deck_directory, THUMBNAIL_DIRNAME, THUMBNAIL_MANIFEST_FILENAME)
+        if not os.path.exists(manifest_path):
+            return None
+        with open(manifest_path, "r") as f:
+            return json.load(f)
+
+    def absolute_path(self, slide_image_path: str) -> str:
+        """Resolve an indexed (projects-relative) slide path to an absolute path on the shared volume"""
+        if os.path.isabs(slide_image_path):
+            return slide_image_path
+        return os.path.join(self.projects_root, slide_image_path)
+
+    def cache_headers(self, stat_result: os.stat_result) -> Dict[str, str]:
+        """Build ETag/Last-Modified/Cache-Control headers for a slide file"""
+        return {
+            "ETag": f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"',
+            "Last-Modified": formatdate(stat_result.st_mtime, usegmt=True),
+            "Cache-Control": SLIDE_IMAGE_CACHE_CONTROL
+        }
+
+    def is_not_modified(self, request_headers: Any, cache_headers: Dict[str, str]) -> bool:
+        """Evaluate If-None-Match / If-Modified-Since against the slide's cache headers"""
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match:
+            candidates = [tag.strip() for tag in if_none_match.split(",")]
+            return "*" in candidates or cache_headers["ETag"] in candidates or f"W/{cache_headers['ETag']}" in candidates
+
+        if_modified_since = request_headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+                modified = parsedate_to_datetime(cache_headers["Last-Modified"])
+                return modified <= since
+            except (TypeError, ValueError):
+                return False
+
+        return False
+
+
+slide_index_service = SlideIndexService()
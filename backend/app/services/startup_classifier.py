@@ -6,48 +6,57 @@ Classifies startups based on company offering using healthcare sector definition
 import json
 import logging
 import re
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Callable
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 
+from .sector_embeddings import sector_preclassifier
+from .sector_index import SectorKeywordMatcher, sector_index_cache
+
 logger = logging.getLogger(__name__)
 
+# Offerings per GPU batch request; results stream back while the batch runs
+CLASSIFICATION_BATCH_SIZE = 50
+
+# Used when the healthcare_sectors table cannot be read
+FALLBACK_SECTORS = [
+    {
+        "id": 1,
+        "name": "healthtech",
+        "display_name": "HealthTech",
+        "description": "General health technology solutions",
+        "keywords": ["health", "medical", "healthcare", "digital health", "telemedicine", "ai", "artificial intelligence", "medical imaging", "diagnostics"],
+        "subcategories": ["Digital Health", "Telemedicine", "Health Apps"],
+        "confidence_threshold": 0.3,
+        "regulatory_requirements": []
+    },
+    {
+        "id": 2,
+        "name": "medtech",
+        "display_name": "MedTech",
+        "description": "Medical devices and equipment",
+        "keywords": ["device", "medical device", "equipment", "surgical", "implant", "monitoring"],
+        "subcategories": ["Medical Devices", "Surgical Equipment"],
+        "confidence_threshold": 0.3,
+        "regulatory_requirements": []
+    }
+]
+
+
 class StartupClassifier:
     """Service for classifying startups into healthcare sectors"""
     
     def __init__(self, db: Session):
         self.db = db
-        self.sectors = self._load_healthcare_sectors()
+        self.sector_index = self._get_sector_index()
+        self.sectors = self.sector_index.sectors
         self.classification_model = self._get_classification_model()
+        self._sector_context = None
     
-    def _load_healthcare_sectors(self) -> List[Dict[str, Any]]:
-        """Load healthcare sectors from database"""
+    def _get_sector_index(self) -> SectorKeywordMatcher:
+        """Shared sector index; sectors are only reloaded when healthcare_sectors changes"""
         try:
-            query = text("""
-            SELECT id, name, display_name, description, keywords, subcategories, 
-                   confidence_threshold, regulatory_requirements
-            FROM healthcare_sectors
-            WHERE is_active = TRUE
-            ORDER BY display_name
-            """)
-            
-            result = self.db.execute(query).fetchall()
-            
-            sectors = []
-            for row in result:
-                sectors.append({
-                    "id": row[0],
-                    "name": row[1],
-                    "display_name": row[2],
-                    "description": row[3],
-                    "keywords": json.loads(row[4]),
-                    "subcategories": json.loads(row[5]),
-                    "confidence_threshold": row[6],
-                    "regulatory_requirements": json.loads(row[7])
-                })
-            
-            return sectors
-            
+            return sector_index_cache.get(self.db, self._load_healthcare_sectors)
         except Exception as e:
             logger.error(f"Error loading healthcare sectors: {e}")
             # Rollback any failed transaction
@@ -55,30 +64,36 @@ class StartupClassifier:
                 self.db.rollback()
             except:
                 pass
-                
-            # Return some basic fallback sectors if database doesn't exist
-            return [
-                {
-                    "id": 1,
-                    "name": "healthtech",
-                    "display_name": "HealthTech",
-                    "description": "General health technology solutions",
-                    "keywords": ["health", "medical", "healthcare", "digital health", "telemedicine", "ai", "artificial intelligence", "medical imaging", "diagnostics"],
-                    "subcategories": ["Digital Health", "Telemedicine", "Health Apps"],
-                    "confidence_threshold": 0.3,
-                    "regulatory_requirements": []
-                },
-                {
-                    "id": 2,
-                    "name": "medtech",
-                    "display_name": "MedTech",
-                    "description": "Medical devices and equipment",
-                    "keywords": ["device", "medical device", "equipment", "surgical", "implant", "monitoring"],
-                    "subcategories": ["Medical Devices", "Surgical Equipment"],
-                    "confidence_threshold": 0.3,
-                    "regulatory_requirements": []
-                }
-            ]
+            
+            # Use some basic fallback sectors if database doesn't exist
+            return SectorKeywordMatcher(FALLBACK_SECTORS)
+    
+    def _load_healthcare_sectors(self) -> List[Dict[str, Any]]:
+        """Load healthcare sectors from database"""
+        query = text("""
+        SELECT id, name, display_name, description, keywords, subcategories, 
+               confidence_threshold, regulatory_requirements
+        FROM healthcare_sectors
+        WHERE is_active = TRUE
+        ORDER BY display_name
+        """)
+        
+        result = self.db.execute(query).fetchall()
+        
+        sectors = []
+        for row in result:
+            sectors.append({
+                "id": row[0],
+                "name": row[1],
+                "display_name": row[2],
+                "description": row[3],
+                "keywords": json.loads(row[4]),
+                "subcategories": json.loads(row[5]),
+                "confidence_threshold": row[6],
+                "regulatory_requirements": json.loads(row[7])
+            })
+        
+        return sectors
     
     def _get_classification_model(self) -> str:
         """Get the active classification model from configuration"""
@@ -109,67 +124,22 @@ class StartupClassifier:
     
     def _keyword_based_classification(self, company_offering: str) -> List[Dict[str, Any]]:
         """Perform keyword-based classification scoring"""
-        offering_lower = company_offering.lower()
-        sector_scores = []
-        
-        for sector in self.sectors:
-            matched_keywords = []
-            keyword_score = 0
-            
-            for keyword in sector["keywords"]:
-                if keyword.lower() in offering_lower:
-                    matched_keywords.append(keyword)
-                    # Give higher weight to longer, more specific keywords
-                    keyword_score += len(keyword.split())
-            
-            if matched_keywords:
-                # Normalize score by number of keywords in sector
-                normalized_score = keyword_score / len(sector["keywords"])
-                
-                sector_scores.append({
-                    "sector": sector,
-                    "score": normalized_score,
-                    "matched_keywords": matched_keywords
-                })
-        
-        # Sort by score descending
-        sector_scores.sort(key=lambda x: x["score"], reverse=True)
-        
-        return sector_scores[:3]  # Return top 3 candidates
+        return self.sector_index.match(company_offering)  # Top 3 candidates
     
-    def _create_classification_prompt(self, company_offering: str, top_candidates: List[Dict[str, Any]]) -> str:
-        """Create classification prompt for AI model"""
-        
-        # Add all sectors for completeness (primary classification basis)
-        all_sectors = []
-        for sector in self.sectors:
-            all_sectors.append(f"""- {sector['display_name']}: {sector['description']}
+    def _create_sector_context(self) -> str:
+        """Prompt prefix shared by every classification: task, sector definitions and response format"""
+        if self._sector_context is None:
+            # Add all sectors for completeness (primary classification basis)
+            all_sectors = []
+            for sector in self.sectors:
+                all_sectors.append(f"""- {sector['display_name']}: {sector['description']}
   Subcategories: {", ".join(sector['subcategories'])}""")
-        
-        # Build keyword context if available (supportive information)
-        keyword_context = ""
-        if top_candidates:
-            sector_descriptions = []
-            for candidate in top_candidates:
-                sector = candidate["sector"]
-                sector_descriptions.append(f"""
-{sector["display_name"]}:
-- Matched keywords: {", ".join(candidate["matched_keywords"])}
-- Keyword relevance score: {candidate["score"]:.2f}""")
-            keyword_context = f"""
-
-Keyword Analysis Results (supportive context):
-{chr(10).join(sector_descriptions)}
-
-Note: These keyword matches are provided as additional context. Base your classification primarily on the company offering description and sector definitions above."""
-        
-        prompt = f"""
+            
+            self._sector_context = f"""
 You are a healthcare venture capital analyst. Your task is to classify a startup based on their company offering into one of the healthcare sectors below.
 
-Company Offering: "{company_offering}"
-
 Healthcare Sectors:
-{chr(10).join(all_sectors)}{keyword_context}
+{chr(10).join(all_sectors)}
 
 Analyze the company offering and classify it into the most appropriate healthcare sector. Consider:
 1. The primary business focus and target market
@@ -191,8 +161,34 @@ Respond in JSON format with the following structure:
 
 Ensure the confidence score reflects how certain you are about the classification (0.0 to 1.0).
 """
+        return self._sector_context
+    
+    def _create_offering_prompt(self, company_offering: str, top_candidates: List[Dict[str, Any]]) -> str:
+        """Per-startup part of the classification prompt"""
+        # Build keyword context if available (supportive information)
+        keyword_context = ""
+        if top_candidates:
+            sector_descriptions = []
+            for candidate in top_candidates:
+                sector = candidate["sector"]
+                sector_descriptions.append(f"""
+{sector["display_name"]}:
+- Matched keywords: {", ".join(candidate["matched_keywords"])}
+- Keyword relevance score: {candidate["score"]:.2f}""")
+            keyword_context = f"""
+
+Keyword Analysis Results (supportive context):
+{chr(10).join(sector_descriptions)}
+
+Note: These keyword matches are provided as additional context. Base your classification primarily on the company offering description and sector definitions above."""
         
-        return prompt
+        return f"""
+Company Offering: "{company_offering}"{keyword_context}
+"""
+    
+    def _create_classification_prompt(self, company_offering: str, top_candidates: List[Dict[str, Any]]) -> str:
+        """Create classification prompt for AI model"""
+        return self._create_sector_context() + self._create_offering_prompt(company_offering, top_candidates)
     
     def _parse_ai_response(self, response: str) -> Dict[str, Any]:
         """Parse AI response and extract classification data"""
@@ -261,6 +257,147 @@ Ensure the confidence score reflects how certain you are about the classificatio
                 pass
             return None
     
+    def _result_from_response(self, response: Dict[str, Any], top_candidates: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Turn a GPU classification response into a classification, falling back to keyword matches"""
+        if not response.get("success"):
+            logger.error(f"GPU classification failed: {response.get('error')}")
+            # Fallback to keyword-based classification if available
+            if top_candidates:
+                best_candidate = top_candidates[0]
+                sector = best_candidate["sector"]
+                template_id = self._get_default_template_id(sector["id"])
+                
+                return {
+                    "primary_sector": sector["name"],
+                    "subcategory": sector["subcategories"][0] if sector["subcategories"] else "",
+                    "confidence_score": min(best_candidate["score"], 0.5),
+                    "reasoning": f"GPU classification failed, using keyword match. Error: {response.get('error')}. Matched keywords: {', '.join(best_candidate['matched_keywords'])}",
+                    "secondary_sector": None,
+                    "keywords_matched": best_candidate["matched_keywords"],
+                    "recommended_template": template_id
+                }
+            else:
+                # No keywords and GPU failed - return unknown
+                return {
+                    "primary_sector": "unknown",
+                    "subcategory": "",
+                    "confidence_score": 0.0,
+                    "reasoning": f"GPU classification failed and no keyword matches found. Error: {response.get('error')}",
+                    "secondary_sector": None,
+                    "keywords_matched": [],
+                    "recommended_template": None
+                }
+        
+        # Parse AI response
+        ai_response_text = response.get('response', '')
+        logger.info(f"GPU classification response: {ai_response_text[:200]}...")
+        ai_result = self._parse_ai_response(ai_response_text)
+        
+        if not ai_result:
+            # Fallback to keyword-based classification if available
+            if top_candidates:
+                best_candidate = top_candidates[0]
+                sector = best_candidate["sector"]
+                template_id = self._get_default_template_id(sector["id"])
+                
+                return {
+                    "primary_sector": sector["name"],
+                    "subcategory": sector["subcategories"][0] if sector["subcategories"] else "",
+                    "confidence_score": min(best_candidate["score"], 0.7),
+                    "reasoning": f"Keyword-based classification (AI parsing failed). Matched keywords: {', '.join(best_candidate['matched_keywords'])}",
+                    "secondary_sector": None,
+                    "keywords_matched": best_candidate["matched_keywords"],
+                    "recommended_template": template_id
+                }
+            else:
+                # No keywords and AI parsing failed - return unknown
+                return {
+                    "primary_sector": "unknown",
+                    "subcategory": "",
+                    "confidence_score": 0.0,
+                    "reasoning": "AI classification response could not be parsed and no keyword matches found",
+                    "secondary_sector": None,
+                    "keywords_matched": [],
+                    "recommended_template": None
+                }
+        
+        # Step 3: Validate and enhance AI result
+        primary_sector = self._find_sector_by_name(ai_result.get("primary_sector", ""))
+        
+        if not primary_sector:
+            # Fallback to best keyword match if available
+            if top_candidates:
+                best_candidate = top_candidates[0]
+                sector = best_candidate["sector"]
+                template_id = self._get_default_template_id(sector["id"])
+                
+                return {
+                    "primary_sector": sector["name"],
+                    "subcategory": sector["subcategories"][0] if sector["subcategories"] else "",
+                    "confidence_score": min(best_candidate["score"], 0.6),
+                    "reasoning": f"AI classification failed validation, using keyword match. Matched keywords: {', '.join(best_candidate['matched_keywords'])}",
+                    "secondary_sector": None,
+                    "keywords_matched": best_candidate["matched_keywords"],
+                    "recommended_template": template_id
+                }
+            else:
+                # No keywords and AI validation failed - return unknown
+                return {
+                    "primary_sector": "unknown",
+                    "subcategory": "",
+                    "confidence_score": 0.0,
+                    "reasoning": f"AI classified as '{ai_result.get('primary_sector', '')}' but this sector was not found in database, and no keyword matches available",
+                    "secondary_sector": None,
+                    "keywords_matched": [],
+                    "recommended_template": None
+                }
+        
+        # Get template for primary sector
+        template_id = self._get_default_template_id(primary_sector["id"])
+        
+        # Validate subcategory
+        subcategory = ai_result.get("subcategory", "")
+        if subcategory not in primary_sector["subcategories"]:
+            subcategory = primary_sector["subcategories"][0] if primary_sector["subcategories"] else ""
+        
+        # Apply confidence threshold
+        confidence = min(ai_result.get("confidence", 0.5), 1.0)
+        if confidence < primary_sector["confidence_threshold"]:
+            confidence = primary_sector["confidence_threshold"]
+        
+        final_result = {
+            "primary_sector": primary_sector["name"],
+            "subcategory": subcategory,
+            "confidence_score": confidence,
+            "reasoning": ai_result.get("reasoning", "AI-based classification"),
+            "secondary_sector": ai_result.get("secondary_sector"),
+            "keywords_matched": ai_result.get("keywords_matched", []),
+            "recommended_template": template_id
+        }
+        
+        logger.info(f"Final classification result: sector={final_result['primary_sector']}, confidence={final_result['confidence_score']}")
+        return final_result
+    
+    def _preclassified_result(self, prediction: Dict[str, Any], top_candidates: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Classification from a confident embedding match, without an LLM call"""
+        (sector, similarity), *others = prediction["candidates"]
+        runner_up = others[0][0] if others else None
+        matched_keywords = next(
+            (candidate["matched_keywords"] for candidate in top_candidates if candidate["sector"]["id"] == sector["id"]), []
+        )
+        return {
+            "primary_sector": sector["name"],
+            "subcategory": sector["subcategories"][0] if sector["subcategories"] else "",
+            "confidence_score": round(similarity, 3),
+            "reasoning": f"Embedding pre-classification: closest to {sector['display_name']} "
+                         f"(similarity {similarity:.2f}, margin {prediction['margin']:.2f} over "
+                         f"{runner_up['display_name'] if runner_up else 'any other sector'})",
+            "secondary_sector": runner_up["name"] if runner_up else None,
+            "keywords_matched": matched_keywords,
+            "recommended_template": self._get_default_template_id(sector["id"]),
+            "classification_method": "embedding"
+        }
+    
     async def classify(self, company_offering: str, manual_classification: Optional[str] = None) -> Dict[str, Any]:
         """Main classification method"""
         try:
@@ -282,6 +419,11 @@ Ensure the confidence score reflects how certain you are about the classificatio
             # Step 1: Keyword-based pre-filtering (optional enhancement)
             top_candidates = self._keyword_based_classification(company_offering)
             
+            # Embedding pre-classification; a confident match skips the LLM call
+            prediction = sector_preclassifier.preclassify(self.db, self.sectors, [company_offering])[0]
+            if prediction["confident"]:
+                return self._preclassified_result(prediction, top_candidates)
+            
             # Step 2: AI-based classification (primary method)
             # Always run AI classification with all sectors, keywords are just supportive
             prompt = self._create_classification_prompt(company_offering, top_candidates)
@@ -293,137 +435,74 @@ Ensure the confidence score reflects how certain you are about the classificatio
                 prompt=prompt
             )
             
-            if not response.get("success"):
-                logger.error(f"GPU classification failed: {response.get('error')}")
-                # Fallback to keyword-based classification if available
-                if top_candidates:
-                    best_candidate = top_candidates[0]
-                    sector = best_candidate["sector"]
-                    template_id = self._get_default_template_id(sector["id"])
-                    
-                    return {
-                        "primary_sector": sector["name"],
-                        "subcategory": sector["subcategories"][0] if sector["subcategories"] else "",
-                        "confidence_score": min(best_candidate["score"], 0.5),
-                        "reasoning": f"GPU classification failed, using keyword match. Error: {response.get('error')}. Matched keywords: {', '.join(best_candidate['matched_keywords'])}",
-                        "secondary_sector": None,
-                        "keywords_matched": best_candidate["matched_keywords"],
-                        "recommended_template": template_id
-                    }
-                else:
-                    # No keywords and GPU failed - return unknown
-                    return {
-                        "primary_sector": "unknown",
-                        "subcategory": "",
-                        "confidence_score": 0.0,
-                        "reasoning": f"GPU classification failed and no keyword matches found. Error: {response.get('error')}",
-                        "secondary_sector": None,
-                        "keywords_matched": [],
-                        "recommended_template": None
-                    }
-            
-            # Parse AI response
-            ai_response_text = response.get('response', '')
-            logger.info(f"GPU classification response: {ai_response_text[:200]}...")
-            ai_result = self._parse_ai_response(ai_response_text)
-            
-            if not ai_result:
-                # Fallback to keyword-based classification if available
-                if top_candidates:
-                    best_candidate = top_candidates[0]
-                    sector = best_candidate["sector"]
-                    template_id = self._get_default_template_id(sector["id"])
-                    
-                    return {
-                        "primary_sector": sector["name"],
-                        "subcategory": sector["subcategories"][0] if sector["subcategories"] else "",
-                        "confidence_score": min(best_candidate["score"], 0.7),
-                        "reasoning": f"Keyword-based classification (AI parsing failed). Matched keywords: {', '.join(best_candidate['matched_keywords'])}",
-                        "secondary_sector": None,
-                        "keywords_matched": best_candidate["matched_keywords"],
-                        "recommended_template": template_id
-                    }
-                else:
-                    # No keywords and AI parsing failed - return unknown
-                    return {
-                        "primary_sector": "unknown",
-                        "subcategory": "",
-                        "confidence_score": 0.0,
-                        "reasoning": "AI classification response could not be parsed and no keyword matches found",
-                        "secondary_sector": None,
-                        "keywords_matched": [],
-                        "recommended_template": None
-                    }
-            
-            # Step 3: Validate and enhance AI result
-            primary_sector = self._find_sector_by_name(ai_result.get("primary_sector", ""))
-            
-            if not primary_sector:
-                # Fallback to best keyword match if available
-                if top_candidates:
-                    best_candidate = top_candidates[0]
-                    sector = best_candidate["sector"]
-                    template_id = self._get_default_template_id(sector["id"])
-                    
-                    return {
-                        "primary_sector": sector["name"],
-                        "subcategory": sector["subcategories"][0] if sector["subcategories"] else "",
-                        "confidence_score": min(best_candidate["score"], 0.6),
-                        "reasoning": f"AI classification failed validation, using keyword match. Matched keywords: {', '.join(best_candidate['matched_keywords'])}",
-                        "secondary_sector": None,
-                        "keywords_matched": best_candidate["matched_keywords"],
-                        "recommended_template": template_id
-                    }
-                else:
-                    # No keywords and AI validation failed - return unknown
-                    return {
-                        "primary_sector": "unknown",
-                        "subcategory": "",
-                        "confidence_score": 0.0,
-                        "reasoning": f"AI classified as '{ai_result.get('primary_sector', '')}' but this sector was not found in database, and no keyword matches available",
-                        "secondary_sector": None,
-                        "keywords_matched": [],
-                        "recommended_template": None
-                    }
-            
-            # Get template for primary sector
-            template_id = self._get_default_template_id(primary_sector["id"])
+            return self._result_from_response(response, top_candidates)
             
-            # Validate subcategory
-            subcategory = ai_result.get("subcategory", "")
-            if subcategory not in primary_sector["subcategories"]:
-                subcategory = primary_sector["subcategories"][0] if primary_sector["subcategories"] else ""
+        except Exception as e:
+            logger.error(f"Error in startup classification: {e}")
+            return self._error_result(e)
+    
+    async def classify_batch(self, company_offerings: Dict[Any, str],
+                             on_result: Optional[Callable[[Any, Dict[str, Any]], None]] = None) -> Dict[Any, Dict[str, Any]]:
+        """Classify many offerings; confident embedding matches skip the LLM, the rest go in one GPU request per batch"""
+        from ..services.gpu_http_client import gpu_http_client
+        
+        classifications = {}
+        keys = list(company_offerings)
+        for batch_start in range(0, len(keys), CLASSIFICATION_BATCH_SIZE):
+            batch_keys = keys[batch_start:batch_start + CLASSIFICATION_BATCH_SIZE]
+            predictions = sector_preclassifier.preclassify(self.db, self.sectors, [company_offerings[key] for key in batch_keys])
+            candidates_by_id = {}
+            items = []
+            for key, prediction in zip(batch_keys, predictions):
+                top_candidates = self._keyword_based_classification(company_offerings[key])
+                if prediction["confident"]:
+                    classifications[key] = self._preclassified_result(prediction, top_candidates)
+                    if on_result:
+                        on_result(key, classifications[key])
+                    continue
+                candidates_by_id[str(key)] = (key, top_candidates)
+                items.append({"id": str(key), "prompt": self._create_offering_prompt(company_offerings[key], top_candidates)})
             
-            # Apply confidence threshold
-            confidence = min(ai_result.get("confidence", 0.5), 1.0)
-            if confidence < primary_sector["confidence_threshold"]:
-                confidence = primary_sector["confidence_threshold"]
+            if not items:
+                continue
             
-            final_result = {
-                "primary_sector": primary_sector["name"],
-                "subcategory": subcategory,
-                "confidence_score": confidence,
-                "reasoning": ai_result.get("reasoning", "AI-based classification"),
-                "secondary_sector": ai_result.get("secondary_sector"),
-                "keywords_matched": ai_result.get("keywords_matched", []),
-                "recommended_template": template_id
-            }
+            def store_result(item_result: Dict[str, Any]) -> None:
+                if str(item_result.get("id")) not in candidates_by_id:
+                    return
+                key, top_candidates = candidates_by_id[str(item_result["id"])]
+                try:
+                    classifications[key] = self._result_from_response(item_result, top_candidates)
+                except Exception as e:
+                    logger.error(f"Error in startup classification of {key}: {e}")
+                    classifications[key] = self._error_result(e)
+                if on_result:
+                    on_result(key, classifications[key])
             
-            logger.info(f"Final classification result: sector={final_result['primary_sector']}, confidence={final_result['confidence_score']}")
-            return final_result
+            response = await gpu_http_client.run_classification_batch(
+                model_name=self.classification_model,
+                shared_context=self._create_sector_context(),
+                items=items,
+                on_result=store_result
+            )
             
-        except Exception as e:
-            logger.error(f"Error in startup classification: {e}")
-            # Return error classification
-            return {
-                "primary_sector": "unknown",
-                "subcategory": "",
-                "confidence_score": 0.0,
-                "reasoning": f"Classification failed due to error: {str(e)}",
-                "secondary_sector": None,
-                "keywords_matched": [],
-                "recommended_template": None
-            }
+            # Items the batch did not return (request failed or stream cut off) fall back to keywords
+            for key in batch_keys:
+                if key not in classifications:
+                    store_result({"id": str(key), "success": False, "error": response.get("error", "No result returned for item")})
+        
+        return classifications
+    
+    def _error_result(self, error: Exception) -> Dict[str, Any]:
+        """Classification returned when classifying raised"""
+        return {
+            "primary_sector": "unknown",
+            "subcategory": "",
+            "confidence_score": 0.0,
+            "reasoning": f"Classification failed due to error: {str(error)}",
+            "secondary_sector": None,
+            "keywords_matched": [],
+            "recommended_template": None
+        }
 
 # Main API function
 async def classify_startup_offering(
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark storage of the large analysis JSON columns
+
+Compares, for a sample of rows, the stored row size, read latency and parse CPU of
+the analysis JSON as TEXT (what the column used to be) and as JSONB, plus a
+field-level JSONB read. zstd-compressed bytes are reported too when the
+zstandard package is installed.
+
+Usage:
+    python scripts/benchmark_analysis_json_storage.py [--sample 50] [--repeat 5]
+"""
+
+import sys
+import os
+import time
+import json
+import argparse
+import statistics
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.database import SessionLocal
+from app.db.models import load_json_column
+from sqlalchemy import text
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# (table, column, field-level expression answering a typical question about the document)
+COLUMNS = [
+    ("visual_analysis_cache", "analysis_result_json",
+     "jsonb_array_length(CASE WHEN jsonb_typeof(analysis_result_json::jsonb -> 'visual_analysis_results') = 'array' "
+     "THEN analysis_result_json::jsonb -> 'visual_analysis_results' ELSE '[]'::jsonb END)"),
+    ("extraction_experiments", "results_json", "results_json::jsonb -> 'total_decks'"),
+    ("extraction_experiments", "template_processing_results_json", "template_processing_results_json::jsonb -> 'template_used'"),
+]
+
+
+def timed(function, repeat):
+    """Median wall time in milliseconds and the last result"""
+    durations = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        durations.append((time.perf_counter() - start) * 1000)
+    return statistics.median(durations), result
+
+
+def benchmark_column(db, table, column, field_expression, sample, repeat):
+    column_type = db.execute(text("""
+        SELECT data_type FROM information_schema.columns
+        WHERE table_name = :table AND column_name = :column
+    """), {"table": table, "column": column}).scalar()
+
+    ids = [row[0] for row in db.execute(text(
+        f"SELECT id FROM {table} WHERE {column} IS NOT NULL ORDER BY id DESC LIMIT :sample"
+    ), {"sample": sample}).fetchall()]
+    if not ids:
+        print(f"{table}.{column}: no rows")
+        return
+
+    sizes = db.execute(text(f"""
+        SELECT SUM(pg_column_size({column})), SUM(octet_length({column}::text)), SUM(pg_column_size({column}::jsonb))
+        FROM {table} WHERE id = ANY(:ids)
+    """), {"ids": ids}).fetchone()
+
+    read_text_ms, text_rows = timed(lambda: db.execute(text(
+        f"SELECT {column}::text FROM {table} WHERE id = ANY(:ids)"), {"ids": ids}).fetchall(), repeat)
+    read_jsonb_ms, _ = timed(lambda: db.execute(text(
+        f"SELECT {column}::jsonb FROM {table} WHERE id = ANY(:ids)"), {"ids": ids}).fetchall(), repeat)
+    read_field_ms, _ = timed(lambda: db.execute(text(
+        f"SELECT {field_expression} FROM {table} WHERE id = ANY(:ids)"), {"ids": ids}).fetchall(), repeat)
+
+    documents = [row[0] for row in text_rows]
+    parse_ms, _ = timed(lambda: [load_json_column(document) for document in documents], repeat)
+
+    print(f"\n{table}.{column} ({column_type}, {len(ids)} rows)")
+    print(f"  stored size:            {sizes[0] / 1024:10.1f} KB")
+    print(f"  as text (uncompressed): {sizes[1] / 1024:10.1f} KB")
+    print(f"  as jsonb (in memory):   {sizes[2] / 1024:10.1f} KB")
+    print(f"  read as text:           {read_text_ms:10.1f} ms  (+ {parse_ms:.1f} ms json.loads)")
+    print(f"  read as jsonb:          {read_jsonb_ms:10.1f} ms  (decoded by psycopg2)")
+    print(f"  read one field:         {read_field_ms:10.1f} ms")
+
+    if zstandard:
+        compressor = zstandard.ZstdCompressor(level=3)
+        decompressor = zstandard.ZstdDecompressor()
+        compressed = [compressor.compress(document.encode("utf-8")) for document in documents]
+        decompress_ms, _ = timed(lambda: [json.loads(decompressor.decompress(blob)) for blob in compressed], repeat)
+        print(f"  zstd level 3:           {sum(len(blob) for blob in compressed) / 1024:10.1f} KB  "
+              f"({decompress_ms:.1f} ms decompress + json.loads)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark analysis JSON column storage")
+    parser.add_argument("--sample", type=int, default=50, help="Rows per column")
+    parser.add_argument("--repeat", type=int, default=5, help="Repetitions per measurement (median is reported)")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        for table, column, field_expression in COLUMNS:
+            benchmark_column(db, table, column, field_expression, args.sample, args.repeat)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark the embedding sector pre-classifier against stored classifications
+
+Cross-validates on the confirmed classifications (each fold is predicted by an
+index built without it) and reports top-1/top-3 accuracy, the share of offerings
+that would skip the LLM and their accuracy for a range of margin thresholds, and
+the pre-classification latency. With --llm-sample, the LLM classification latency
+and agreement are measured on a few offerings for comparison.
+
+Usage:
+    python scripts/benchmark_sector_preclassifier.py [--folds 5] [--llm-sample 0]
+"""
+
+import sys
+import os
+import time
+import random
+import asyncio
+import argparse
+import statistics
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.services.sector_embeddings import SectorEmbeddingIndex, load_confirmed_classifications, sector_preclassifier
+from app.services.startup_classifier import StartupClassifier
+
+MARGINS = [0.0, 0.05, 0.1, 0.15, 0.2, 0.25, 0.3]
+
+
+def cross_validate(sectors, examples, folds):
+    """(true sector id, ranked [(sector id, similarity)]) per example, and per-offering latencies in ms"""
+    random.Random(0).shuffle(examples)
+    predictions, single_ms, batch_ms = [], [], []
+    for fold in range(folds):
+        held_out = examples[fold::folds]
+        training = [example for index, example in enumerate(examples) if index % folds != fold]
+        index = SectorEmbeddingIndex.build(sectors, training)
+        if not held_out:
+            continue
+
+        start = time.perf_counter()
+        ranked = index.top_k([offering for offering, _ in held_out])
+        batch_ms.append((time.perf_counter() - start) * 1000 / len(held_out))
+        for offering, _ in held_out[:20]:
+            start = time.perf_counter()
+            index.top_k([offering])
+            single_ms.append((time.perf_counter() - start) * 1000)
+
+        for (_, sector_id), candidates in zip(held_out, ranked):
+            predictions.append((sector_id, [(sector["id"], similarity) for sector, similarity in candidates]))
+    return predictions, single_ms, batch_ms
+
+
+def report(predictions, min_similarity):
+    total = len(predictions)
+    top1 = sum(1 for truth, ranked in predictions if ranked and ranked[0][0] == truth)
+    top3 = sum(1 for truth, ranked in predictions if truth in [sector_id for sector_id, _ in ranked[:3]])
+    print(f"\n{total} confirmed classifications")
+    print(f"  top-1 accuracy: {top1 / total:6.1%}")
+    print(f"  top-3 accuracy: {top3 / total:6.1%}")
+
+    print(f"\n  min similarity {min_similarity:.2f}")
+    print("  margin   skips LLM   accuracy of skipped")
+    for margin in MARGINS:
+        confident = [
+            (truth, ranked) for truth, ranked in predictions
+            if ranked and ranked[0][1] >= min_similarity
+            and ranked[0][1] - (ranked[1][1] if len(ranked) > 1 else 0.0) >= margin
+        ]
+        correct = sum(1 for truth, ranked in confident if ranked[0][0] == truth)
+        accuracy = f"{correct / len(confident):6.1%}" if confident else "     -"
+        marker = "  <- configured" if abs(margin - settings.SECTOR_PRECLASSIFIER_MIN_MARGIN) < 1e-9 else ""
+        print(f"  {margin:5.2f}   {len(confident) / total:8.1%}   {accuracy}{marker}")
+
+
+async def llm_comparison(db, examples, sample):
+    """Latency and agreement of the LLM classification on a sample of offerings"""
+    classifier = StartupClassifier(db)
+    sector_names = {sector["id"]: sector["name"] for sector in classifier.sectors}
+    sector_preclassifier.enabled = False
+    durations, agreements = [], 0
+    for offering, sector_id in examples[:sample]:
+        start = time.perf_counter()
+        result = await classifier.classify(offering)
+        durations.append((time.perf_counter() - start) * 1000)
+        agreements += result.get("primary_sector") == sector_names.get(sector_id)
+    print(f"\nLLM classification on {len(durations)} offerings")
+    print(f"  median latency: {statistics.median(durations):10.1f} ms")
+    print(f"  accuracy:       {agreements / len(durations):10.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the embedding sector pre-classifier")
+    parser.add_argument("--folds", type=int, default=5, help="Cross-validation folds")
+    parser.add_argument("--llm-sample", type=int, default=0, help="Offerings to also classify with the LLM")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        sectors = StartupClassifier(db).sectors
+        examples = load_confirmed_classifications(db)
+        if not examples:
+            print("No confirmed classifications in classification_performance")
+            return
+
+        predictions, single_ms, batch_ms = cross_validate(sectors, list(examples), args.folds)
+        report(predictions, settings.SECTOR_PRECLASSIFIER_MIN_SIMILARITY)
+        print("\nPre-classification latency")
+        print(f"  single offering:        {statistics.median(single_ms):8.2f} ms")
+        print(f"  per offering in batch:  {statistics.median(batch_ms):8.2f} ms")
+
+        if args.llm_sample:
+            asyncio.run(llm_comparison(db, examples, args.llm_sample))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
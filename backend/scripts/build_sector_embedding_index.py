@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Build the sector embedding index offline
+
+Embeds the active healthcare sectors and the confirmed classifications and writes
+the index to SECTOR_EMBEDDING_INDEX_PATH (or --output). Backend workers load it
+at start instead of building it, as long as sectors and feedback are unchanged.
+
+Usage:
+    python scripts/build_sector_embedding_index.py [--output /mnt/CPU-GPU/cache/sector_embedding_index.npz]
+"""
+
+import sys
+import os
+import time
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.services.sector_embeddings import SectorEmbeddingIndex, index_signature, load_confirmed_classifications
+from app.services.startup_classifier import StartupClassifier
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the sector embedding index")
+    parser.add_argument("--output", default=settings.SECTOR_EMBEDDING_INDEX_PATH, help="Path of the .npz index")
+    args = parser.parse_args()
+
+    if not args.output:
+        parser.error("--output is required when SECTOR_EMBEDDING_INDEX_PATH is not set")
+
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        sectors = StartupClassifier(db).sectors
+        examples = load_confirmed_classifications(db)
+        index = SectorEmbeddingIndex.build(sectors, examples, index_signature(db))
+        index.save(args.output)
+        print(f"Indexed {len(index.sectors)} sectors and {len(examples)} confirmed classifications "
+              f"({index.vectors.shape[0]} rows) in {time.perf_counter() - start:.2f}s -> {args.output}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+"""
+Unit tests for saving GPU analysis results through the internal API
+"""
+
+import json
+
+from app.api.internal import chapter_analysis_rows
+
+
+class TestChapterAnalysisRows:
+    """Test cases for chapter_analysis_rows"""
+
+    def test_chapters_keyed_by_template_chapter(self):
+        """Every chapter of the name-keyed payload gets its own row under its template chapter id"""
+        rows = chapter_analysis_rows(7, {
+            "clinical_evidence": {"template_chapter_id": 11, "questions": [{"question_id": 1}]},
+            "regulatory": {"template_chapter_id": 12, "questions": [{"question_id": 2}]}
+        })
+
+        assert [row["chapter_id"] for row in rows] == [11, 12]
+        assert json.loads(rows[1]["analysis_results_json"])["questions"] == [{"question_id": 2}]
+        assert all(row["document_id"] == 7 for row in rows)
+
+    def test_fallback_chapters_use_their_position(self):
+        """Chapters without a template_chapters row do not collapse into one row"""
+        rows = chapter_analysis_rows(7, {"problem_analysis": {"template_chapter_id": None}, "financials": {}, "3": {}})
+        assert [row["chapter_id"] for row in rows] == [1, 2, 3]
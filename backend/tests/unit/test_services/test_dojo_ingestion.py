@@ -0,0 +1,124 @@
+"""
+Unit tests for dojo ZIP ingestion and set-based duplicate detection
+"""
+
+import os
+import zipfile
+import hashlib
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.models import Base, User, Project, ProjectDocument
+from app.services.dojo_ingestion import DojoZipIngester, find_existing_documents
+from app.api.dojo_enhanced import check_duplicate_file
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine, tables=[User.__table__, Project.__table__, ProjectDocument.__table__])
+    factory = sessionmaker(bind=engine)
+
+    session = factory()
+    session.add_all([
+        Project(id=1, company_id="dojo", project_name="Dojo Testing Environment"),
+        Project(id=2, company_id="acme", project_name="Acme")
+    ])
+    session.add_all([
+        ProjectDocument(project_id=1, file_name="deck_a.pdf", file_hash="a" * 64),
+        ProjectDocument(project_id=1, file_name="deck_b.pdf", file_hash="b" * 64),
+        ProjectDocument(project_id=2, file_name="deck_c.pdf", file_hash="c" * 64)
+    ])
+    session.commit()
+    session.close()
+    return factory
+
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    yield session
+    session.close()
+
+
+class TestFindExistingDocuments:
+    """Test cases for find_existing_documents"""
+
+    def test_matches_hashes_and_names_in_project(self, db):
+        """Hash and name matches are returned separately and scoped to the project"""
+        by_hash, by_name = find_existing_documents(
+            db, 1, ["a" * 64, "c" * 64, "d" * 64], ["deck_b.pdf", "deck_c.pdf"]
+        )
+
+        assert set(by_hash) == {"a" * 64}
+        assert set(by_name) == {"deck_b.pdf"}
+
+    def test_empty_batch_skips_query(self, db):
+        """An empty batch returns no matches"""
+        assert find_existing_documents(db, 1, [], []) == ({}, {})
+
+    def test_check_duplicate_file(self, db):
+        """Single-file check matches by name or hash"""
+        assert check_duplicate_file(db, 1, "other.pdf", "b" * 64) is not None
+        assert check_duplicate_file(db, 1, "deck_a.pdf", "f" * 64) is not None
+        assert check_duplicate_file(db, 1, "other.pdf", "f" * 64) is None
+
+
+class TestDojoZipIngester:
+    """Test cases for DojoZipIngester"""
+
+    def test_ingest_streams_members_in_batches(self, tmp_path, session_factory):
+        """PDFs are written and hashed from the archive; duplicates and non-PDFs are skipped"""
+        existing_content = b"%PDF existing"
+        zip_path = tmp_path / "upload.zip"
+        with zipfile.ZipFile(zip_path, "w") as archive:
+            for number in range(5):
+                archive.writestr(f"decks/deck_{number}.pdf", f"%PDF deck {number}".encode())
+            archive.writestr("decks/copy_of_deck_0.pdf", b"%PDF deck 0")
+            archive.writestr("decks/known.pdf", existing_content)
+            archive.writestr("decks/notes.txt", b"not a deck")
+            archive.writestr("__MACOSX/decks/._deck_0.pdf", b"resource fork")
+
+        session = session_factory()
+        session.add(ProjectDocument(project_id=1, file_name="old.pdf", file_hash=hashlib.sha256(existing_content).hexdigest()))
+        session.commit()
+        session.close()
+
+        uploads_path = tmp_path / "uploads"
+        progress = []
+        ingester = DojoZipIngester(str(uploads_path), max_workers=3, batch_size=2, session_factory=session_factory)
+        result = ingester.ingest(
+            str(zip_path), uploaded_by=None, dojo_project_id=1, zip_filename="upload.zip",
+            progress_callback=lambda processed, total, name, _: progress.append((processed, total))
+        )
+
+        assert result.total_files == 7
+        assert result.success_count == 5
+        assert result.duplicate_count == 2
+        assert result.error_count == 0
+        assert progress[0] == (0, 7) and progress[-1] == (7, 7)
+
+        # Only the new documents remain on disk, without partial files
+        assert len(os.listdir(uploads_path)) == 5
+
+        session = session_factory()
+        documents = session.query(ProjectDocument).filter(ProjectDocument.id.in_(result.new_document_ids)).all()
+        for document in documents:
+            stored = tmp_path / "uploads" / os.path.basename(document.file_path)
+            assert document.file_hash == hashlib.sha256(stored.read_bytes()).hexdigest()
+            assert document.file_size == stored.stat().st_size
+        session.close()
+
+    def test_oversized_member_is_reported_as_error(self, tmp_path, session_factory):
+        """Members above the per-file limit are rejected without leaving files behind"""
+        zip_path = tmp_path / "upload.zip"
+        with zipfile.ZipFile(zip_path, "w") as archive:
+            archive.writestr("big.pdf", b"x" * 2048)
+
+        uploads_path = tmp_path / "uploads"
+        ingester = DojoZipIngester(str(uploads_path), max_member_size=1024, session_factory=session_factory)
+        result = ingester.ingest(str(zip_path), uploaded_by=None, dojo_project_id=1)
+
+        assert result.error_files == ["big.pdf"]
+        assert os.listdir(uploads_path) == []
@@ -0,0 +1,161 @@
+"""
+Unit tests for the persistent dojo progress store
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api.internal import advance_dojo_job
+from app.db.models import Base, User, DojoJobProgress
+from app.services.dojo_progress import DojoProgressStore
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine, tables=[User.__table__, DojoJobProgress.__table__])
+    return sessionmaker(bind=engine)
+
+
+@pytest.fixture
+def store(session_factory):
+    # A long interval keeps the write-behind thread out of the tests
+    return DojoProgressStore(session_factory=session_factory, flush_interval=3600)
+
+
+def stored_progress(session_factory, job_id):
+    session = session_factory()
+    try:
+        return session.get(DojoJobProgress, job_id).progress
+    finally:
+        session.close()
+
+
+class TestDojoProgressStore:
+    """Test cases for DojoProgressStore"""
+
+    def test_updates_are_buffered_until_flush(self, store, session_factory):
+        """Progress updates are visible at once but written behind"""
+        job_id = store.start_job("step2", total=4, current_deck="Starting visual analysis...")
+        store.update(job_id, current_deck="deck_1.pdf", progress=1)
+
+        assert stored_progress(session_factory, job_id) == 0
+        job = store.get_job(job_id)
+        assert job["current_deck"] == "deck_1.pdf"
+        assert job["progress"] == 1
+
+        store.flush()
+        assert stored_progress(session_factory, job_id) == 1
+
+    def test_finish_writes_through(self, store, session_factory):
+        """Terminal statuses are written immediately"""
+        job_id = store.start_job("upload", details={"zip_filename": "decks.zip", "new_files": 0})
+        store.update(job_id, progress=3, total=3, details={"zip_filename": "decks.zip", "new_files": 3})
+        store.finish(job_id, "completed")
+
+        other_process = DojoProgressStore(session_factory=session_factory)
+        job = other_process.get_job(job_id)
+        assert job["status"] == "completed"
+        assert job["progress"] == 3
+        assert job["new_files"] == 3
+        assert job["eta_seconds"] is None
+
+    def test_increment_is_atomic_in_database(self, store, session_factory):
+        """Callbacks reaching another process advance the stored progress"""
+        job_id = store.start_job("step4", total=14)
+        other_process = DojoProgressStore(session_factory=session_factory)
+        other_process.increment(job_id, current_chapter="Team")
+        other_process.increment(job_id, current_chapter="Market")
+
+        job = store.get_job(job_id)
+        assert job["progress"] == 2
+        assert job["current_chapter"] == "Market"
+
+    def test_eta_from_processing_times(self, store):
+        """Average deck time and remaining decks give the ETA"""
+        job_id = store.start_job("step2", total=5)
+        store.add_processing_time(job_id, 10.0)
+        store.add_processing_time(job_id, 20.0)
+        store.update(job_id, progress=2)
+
+        job = store.get_job(job_id)
+        assert job["average_processing_time"] == 15.0
+        assert job["eta_seconds"] == 45.0
+
+    def test_latest_jobs_per_step(self, store):
+        """Every step reports its newest job of the user, or idle"""
+        store.start_job("step3", user_id=None)
+        job_id = store.start_job("step3", user_id=None)
+        store.flush()
+
+        latest = store.latest_jobs()
+        assert latest["step3"]["job_id"] == job_id
+        assert latest["step2"]["status"] == "idle"
+        assert latest["step4"]["current_chapter"] == ""
+        assert store.latest_job_id("step3", active_only=True) == job_id
+
+
+def queue_db(job_id, file_name, finished_rows, total):
+    """Session mock answering advance_dojo_job's task, finished-task and total queries"""
+    db = MagicMock()
+    task, finished, count = MagicMock(), MagicMock(), MagicMock()
+    task.fetchone.return_value = (job_id, file_name)
+    finished.fetchall.return_value = finished_rows
+    count.scalar.return_value = total
+    db.execute.side_effect = [task, finished, count]
+    return db
+
+
+class TestAdvanceDojoJob:
+    """Test cases for counting queue tasks towards their dojo batch job"""
+
+    def test_progress_counts_finished_tasks_once(self, store, session_factory):
+        """Repeated status updates do not count a task twice"""
+        job_id = store.start_job("step2", total=3)
+        # The task callback reaches a worker that did not start the job
+        other_process = DojoProgressStore(session_factory=session_factory, flush_interval=3600)
+
+        with patch("app.api.internal.dojo_progress_store", other_process):
+            for _ in range(2):
+                advance_dojo_job(queue_db(job_id, "deck_1.pdf", [("completed", 12.0)], 3), 1)
+
+        job = store.get_job(job_id)
+        assert job["progress"] == 1
+        assert job["processing_times"] == [12.0]
+        assert job["status"] == "processing"
+
+    def test_failed_task_with_retries_left_finishes_job(self, store, session_factory):
+        """A failed deck counts as finished even though nothing retries it"""
+        job_id = store.start_job("step2", total=3)
+        db = queue_db(job_id, "deck_3.pdf", [("completed", 12.0), ("failed", 30.0), ("completed", 18.0)], 3)
+
+        with patch("app.api.internal.dojo_progress_store", store):
+            advance_dojo_job(db, 3)
+
+        job = store.get_job(job_id)
+        assert job["status"] == "completed"
+        assert job["progress"] == 3
+        assert job["processing_times"] == [12.0, 30.0, 18.0]
+        assert job["current_deck"] == "Completed: 2/3 decks processed"
+
+    def test_retried_task_reopens_job(self, store, session_factory):
+        """Picking up a retried task reopens the finished job until the task finishes again"""
+        job_id = store.start_job("step2", total=2)
+
+        with patch("app.api.internal.dojo_progress_store", store):
+            advance_dojo_job(queue_db(job_id, "deck_2.pdf", [("completed", 12.0), ("failed", 30.0)], 2), 2)
+            assert store.get_job(job_id)["status"] == "completed"
+
+            advance_dojo_job(queue_db(job_id, "deck_2.pdf", [("completed", 12.0)], 2), 2)
+            job = store.get_job(job_id)
+            assert job["status"] == "processing"
+            assert job["completion_time"] is None
+            assert job["progress"] == 1
+
+            advance_dojo_job(queue_db(job_id, "deck_2.pdf", [("completed", 12.0), ("completed", 25.0)], 2), 2)
+            job = store.get_job(job_id)
+            assert job["status"] == "completed"
+            assert job["current_deck"] == "Completed: 2/2 decks processed"
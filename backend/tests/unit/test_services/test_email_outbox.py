@@ -0,0 +1,165 @@
+"""
+Unit tests for the email outbox and its background sender
+"""
+
+import smtplib
+import pytest
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.models import Base, EmailOutboxMessage
+from app.services.email_outbox import EmailOutbox, retry_delay
+from app.services.email_service import EmailService
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine, tables=[EmailOutboxMessage.__table__])
+    return sessionmaker(bind=engine)
+
+
+@pytest.fixture
+def mailer():
+    mailer = EmailService()
+    mailer.open_smtp_connection = MagicMock(side_effect=lambda: MagicMock())
+    return mailer
+
+
+@pytest.fixture
+def outbox(mailer, session_factory):
+    outbox = EmailOutbox(mailer, session_factory=session_factory, batch_size=10, max_attempts=3)
+    outbox.start = MagicMock()  # Keep the sender thread out of the tests; batches are run by hand
+    return outbox
+
+
+def stored(session_factory):
+    session = session_factory()
+    try:
+        return session.query(EmailOutboxMessage).order_by(EmailOutboxMessage.id).all()
+    finally:
+        session.close()
+
+
+class TestEmailOutbox:
+    """Test cases for EmailOutbox"""
+
+    def test_send_email_only_queues(self, mailer, outbox, session_factory):
+        """With an outbox, send_email stores the message without touching SMTP"""
+        mailer.outbox = outbox
+        with patch("app.services.email_service.smtplib.SMTP") as mock_smtp:
+            assert mailer.send_email("a@example.com", "Subject", "<p>Hi</p>") is True
+
+        mock_smtp.assert_not_called()
+        mailer.open_smtp_connection.assert_not_called()
+        [message] = stored(session_factory)
+        assert message.status == "pending"
+        assert message.to_email == "a@example.com"
+
+    def test_batch_reuses_one_connection(self, mailer, outbox, session_factory):
+        """A batch is delivered over a single authenticated connection, kept open afterwards"""
+        for index in range(3):
+            outbox.enqueue(f"user{index}@example.com", "Subject", "<p>Hi</p>", "Hi")
+
+        assert outbox.process_batch() == 3
+
+        assert mailer.open_smtp_connection.call_count == 1
+        server = outbox._smtp
+        assert server.send_message.call_count == 3
+        assert server.send_message.call_args.args[0]["To"] == "user2@example.com"
+        assert [message.status for message in stored(session_factory)] == ["sent"] * 3
+        assert outbox._counters["sent"] == 3
+
+        outbox.enqueue("late@example.com", "Subject", "<p>Hi</p>")
+        outbox.process_batch()
+        assert mailer.open_smtp_connection.call_count == 1
+
+    def test_dropped_connection_is_reopened(self, mailer, outbox, session_factory):
+        """A reused connection the server closed is replaced without counting a failed attempt"""
+        outbox.enqueue("a@example.com", "Subject", "<p>Hi</p>")
+        outbox.process_batch()
+        outbox._smtp.send_message.side_effect = smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+
+        outbox.enqueue("b@example.com", "Subject", "<p>Hi</p>")
+        outbox.process_batch()
+
+        assert mailer.open_smtp_connection.call_count == 2
+        assert [message.status for message in stored(session_factory)] == ["sent", "sent"]
+
+    def test_transient_failures_back_off_then_fail(self, mailer, outbox, session_factory):
+        """Temporary errors are retried later with growing delays, up to max_attempts"""
+        server = MagicMock()
+        server.send_message.side_effect = smtplib.SMTPDataError(451, b"Try again later")
+        mailer.open_smtp_connection.side_effect = lambda: server
+        outbox.enqueue("a@example.com", "Subject", "<p>Hi</p>")
+
+        before = datetime.utcnow()
+        outbox.process_batch()
+        [message] = stored(session_factory)
+        assert message.status == "pending"
+        assert message.attempts == 1
+        assert (message.next_attempt_at - before).total_seconds() >= retry_delay(1)
+        assert outbox.process_batch() == 0  # Not due yet
+
+        session = session_factory()
+        session.query(EmailOutboxMessage).update({"next_attempt_at": before})
+        session.commit()
+        session.close()
+        outbox.process_batch()
+        assert stored(session_factory)[0].attempts == 2
+
+        session = session_factory()
+        session.query(EmailOutboxMessage).update({"next_attempt_at": before})
+        session.commit()
+        session.close()
+        outbox.process_batch()
+        [message] = stored(session_factory)
+        assert message.status == "failed"
+        assert message.attempts == 3
+        assert retry_delay(2) == 2 * retry_delay(1)
+
+    def test_permanent_rejection_fails_at_once(self, mailer, outbox, session_factory):
+        """5xx rejections of the recipient are not retried"""
+        outbox.enqueue("nobody@example.com", "Subject", "<p>Hi</p>")
+        server = MagicMock()
+        server.send_message.side_effect = smtplib.SMTPRecipientsRefused({"nobody@example.com": (550, b"No such user")})
+        mailer.open_smtp_connection.side_effect = lambda: server
+
+        outbox.process_batch()
+
+        [message] = stored(session_factory)
+        assert message.status == "failed"
+        assert message.attempts == 1
+        assert outbox.metrics()["failed"] == 1
+
+    def test_login_failure_defers_the_batch(self, mailer, outbox, session_factory):
+        """A refused login stops the batch and backs off without using up attempts or failing messages"""
+        mailer.open_smtp_connection.side_effect = smtplib.SMTPAuthenticationError(535, b"Bad credentials")
+        for index in range(3):
+            outbox.enqueue(f"user{index}@example.com", "Subject", "<p>Hi</p>")
+
+        before = datetime.utcnow()
+        assert outbox.process_batch() == 3
+
+        assert mailer.open_smtp_connection.call_count == 1
+        messages = stored(session_factory)
+        assert [message.status for message in messages] == ["pending"] * 3
+        assert [message.attempts for message in messages] == [0] * 3
+        assert all((message.next_attempt_at - before).total_seconds() >= retry_delay(1) for message in messages)
+        assert outbox.metrics()["deferred"] == 3
+        assert outbox.metrics()["failed"] == 0
+
+    def test_refused_sender_defers_the_batch(self, mailer, outbox, session_factory):
+        """A 5xx reply to MAIL FROM concerns the account, not the message"""
+        server = MagicMock()
+        server.send_message.side_effect = smtplib.SMTPSenderRefused(550, b"Sender rejected", "noreply@example.com")
+        mailer.open_smtp_connection.side_effect = lambda: server
+        outbox.enqueue("a@example.com", "Subject", "<p>Hi</p>")
+        outbox.enqueue("b@example.com", "Subject", "<p>Hi</p>")
+
+        outbox.process_batch()
+
+        assert server.send_message.call_count == 1
+        assert [message.status for message in stored(session_factory)] == ["pending", "pending"]
@@ -0,0 +1,60 @@
+"""
+Unit tests for the cached email template registry
+"""
+
+from unittest.mock import MagicMock
+
+from app.services.email_templates import EmailTemplateRegistry
+from app.services.i18n_service import I18nService
+
+
+def counting_i18n():
+    i18n = I18nService()
+    i18n.t = MagicMock(wraps=i18n.t)
+    return i18n
+
+
+class TestEmailTemplateRegistry:
+    """Test cases for EmailTemplateRegistry"""
+
+    def test_translations_resolved_once_per_language(self):
+        """Rendering many invitations looks every string up only once"""
+        i18n = counting_i18n()
+        registry = EmailTemplateRegistry(i18n)
+
+        for index in range(50):
+            registry.render("invitation", "de", gp_name="Anna", project_name=f"Project {index}",
+                            invitation_url=f"https://example.com/invite/{index}")
+        lookups = i18n.t.call_count
+        rendered = registry.render("invitation", "de", gp_name="Anna", project_name="Last", invitation_url="https://example.com/x")
+
+        # Only the strings with placeholders are formatted per send
+        assert i18n.t.call_count - lookups == 4
+        assert rendered.subject == i18n.translations["de"]["emails"]["invitation"]["subject"]
+        assert "Project: Last" in rendered.text_body
+        assert "Anna" in rendered.html_body
+
+        registry.render("invitation", "en", gp_name="Anna", project_name="Last", invitation_url="https://example.com/x")
+        assert i18n.t.call_count - lookups > 4 + 4
+
+    def test_html_is_escaped_and_text_is_not(self):
+        """Values are escaped in the HTML body only"""
+        registry = EmailTemplateRegistry(I18nService())
+
+        rendered = registry.render("invitation", "en", gp_name="Anna", project_name="<Bio & Tech>",
+                                   invitation_url="https://example.com/invite?a=1&b=2")
+
+        assert "&lt;Bio &amp; Tech&gt;" in rendered.html_body
+        assert 'href="https://example.com/invite?a=1&amp;b=2"' in rendered.html_body
+        assert "Project: <Bio & Tech>" in rendered.text_body
+
+    def test_reload_resolves_translations_again(self):
+        """Changed translations are picked up after I18nService.reload_translations"""
+        i18n = I18nService()
+        registry = EmailTemplateRegistry(i18n)
+        assert registry.render("welcome", "en", company_name="Acme", login_url="/login").text_body is None
+
+        i18n.reload_translations()
+        i18n.translations["en"]["emails"]["welcome"]["subject"] = "Welcome aboard"
+
+        assert registry.render("welcome", "en", company_name="Acme", login_url="/login").subject == "Welcome aboard"
@@ -0,0 +1,85 @@
+"""
+Unit tests for the projection-aware experiment details
+"""
+
+import json
+import pytest
+from unittest.mock import patch
+
+from app.services.experiment_details import (
+    ExperimentDetailsService, parse_sections, parse_document_ids, DEFAULT_SECTIONS
+)
+
+
+class TestParsing:
+    """Test cases for request and column parsing"""
+
+    def test_parse_sections(self):
+        """Default, explicit, empty and unknown field selections"""
+        assert parse_sections(None) == list(DEFAULT_SECTIONS)
+        assert parse_sections("classification, funding_amount,classification") == ["classification", "funding_amount"]
+        assert parse_sections("") == []
+        with pytest.raises(ValueError):
+            parse_sections("results,everything")
+
+    def test_parse_document_ids(self):
+        """document_ids text in Postgres array format"""
+        assert parse_document_ids("{65,68, 61}") == [65, 68, 61]
+        assert parse_document_ids(None) == []
+
+
+class TestExperimentDetailsService:
+    """Test cases for ExperimentDetailsService.get_details"""
+
+    @pytest.fixture
+    def service(self):
+        service = ExperimentDetailsService()
+        summary = {"id": 7, "classification_enabled": True, "deck_ids": [1, 2, 3], "total_results": 3}
+        sections = {
+            "classification": [{"deck_id": 2, "classification_result": {"primary_sector": "Diagnostics", "reasoning": "Lab tests"}}],
+            "funding_amount": [{"deck_id": 2, "funding_amount": "EUR 2M"}],
+        }
+
+        def section_entries(db, experiment_id, section, deck_ids=None):
+            return [entry for entry in sections.get(section, []) if deck_ids is None or entry["deck_id"] in deck_ids]
+
+        with patch.object(service, "get_summary", return_value=dict(summary)), \
+                patch.object(service, "get_result_page", return_value=[{"deck_id": 2, "offering_extraction": "Lab tests"}]) as result_page, \
+                patch.object(service, "get_section_entries", side_effect=section_entries) as section_entries_mock, \
+                patch.object(service, "get_deck_info", return_value={2: {"filename": "deck_2.pdf", "company_name": None, "page_count": 12}}):
+            service.result_page = result_page
+            service.section_entries = section_entries_mock
+            yield service
+
+    def test_page_merges_only_requested_sections(self, service):
+        """A page of results carries classification; only requested sections are loaded"""
+        details = service.get_details(None, 7, ["results", "classification", "funding_amount"], offset=1, limit=1)
+
+        service.result_page.assert_called_once_with(None, 7, 1, 1, deck_ids_only=False)
+        loaded_sections = [call.args[2] for call in service.section_entries.call_args_list]
+        assert loaded_sections == ["classification", "funding_amount"]
+        assert all(call.args[3] == [2] for call in service.section_entries.call_args_list)
+
+        result = details["results"][0]
+        assert result["deck_info"]["page_count"] == 12
+        assert result["primary_sector"] == "Diagnostics"
+        assert result["classification_reasoning"] == "Lab tests"
+        assert json.loads(details["classification_results_json"]) == {"2": {"primary_sector": "Diagnostics", "reasoning": "Lab tests"}}
+        assert details["funding_amount_results"] == [{"deck_id": 2, "funding_amount": "EUR 2M"}]
+        assert "deck_date_results" not in details
+        assert "template_processing_results" not in details
+
+    def test_metadata_only(self, service):
+        """An empty selection returns metadata without reading any per-deck entries"""
+        details = service.get_details(None, 7, [])
+
+        service.result_page.assert_not_called()
+        service.section_entries.assert_not_called()
+        assert details["deck_ids"] == [1, 2, 3]
+        assert "results" not in details
+
+    def test_paginated_section_reads_page_deck_ids(self, service):
+        """A paginated section without results still pages by the experiment's deck order"""
+        service.get_details(None, 7, ["funding_amount"], offset=0, limit=1)
+
+        service.result_page.assert_called_once_with(None, 7, 0, 1, deck_ids_only=True)
@@ -0,0 +1,76 @@
+"""
+Unit tests for processing queue lanes and their metrics
+"""
+
+import json
+from unittest.mock import MagicMock
+
+from app.services.processing_queue import ProcessingQueueManager, TaskLane
+
+
+def lane_row(lane, weight, reserved=0, queued=0, running=0, oldest=None, avg_wait=None, p95_wait=None,
+             avg_run=None, seconds=None):
+    return (lane, weight, reserved, queued, running, oldest, avg_wait, p95_wait, avg_run, seconds)
+
+
+class TestProcessingQueueLanes:
+    """Test lane assignment and per-lane queue statistics"""
+
+    def test_lane_stats_compare_share_with_weight(self):
+        """Each lane reports depth, waiting times and its GPU share next to the weighted target"""
+        lanes = ProcessingQueueManager._summarize_lanes([
+            lane_row("interactive", 8, reserved=1, queued=1, running=1, oldest=12.34, avg_wait=4.0, p95_wait=9.51,
+                     avg_run=80.0, seconds=600.0),
+            lane_row("batch", 2, queued=150, oldest=5400.0, avg_wait=900.0, seconds=2400.0),
+            lane_row("maintenance", 1),
+        ])
+
+        assert lanes["interactive"]["oldest_queued_seconds"] == 12.3
+        assert lanes["interactive"]["p95_wait_seconds"] == 9.5
+        assert lanes["interactive"]["gpu_share_last_hour"] == 0.2
+        assert lanes["interactive"]["target_share"] == round(8 / 11, 3)
+        assert lanes["batch"]["queued"] == 150
+        assert lanes["batch"]["gpu_share_last_hour"] == 0.8
+        assert lanes["maintenance"]["gpu_seconds_last_hour"] == 0.0
+        assert lanes["maintenance"]["avg_wait_seconds"] is None
+
+    def test_idle_queue_has_no_share(self):
+        """Without GPU time in the window the share is unknown instead of zero"""
+        lanes = ProcessingQueueManager._summarize_lanes([lane_row("interactive", 8), lane_row("batch", 2)])
+        assert lanes["batch"]["gpu_share_last_hour"] is None
+
+    def test_add_task_records_lane_and_submitter(self):
+        """Tasks carry their lane and submitter; dojo tasks leave the document status alone"""
+        db = MagicMock()
+        db.execute.return_value.fetchone.side_effect = [None, (41,)]
+        manager = ProcessingQueueManager()
+
+        task_id = manager.add_task(
+            document_id=7, file_path="dojo/deck.pdf", company_id="dojo", task_type="dojo_visual_analysis",
+            processing_options={"dojo_job_id": "job-1"}, db=db, lane=TaskLane.BATCH, submitted_by=3
+        )
+
+        assert task_id == 41
+        insert_params = db.execute.call_args_list[1].args[1]
+        assert insert_params["lane"] == "batch"
+        assert insert_params["submitted_by"] == 3
+        assert json.loads(insert_params["processing_options"]) == {"dojo_job_id": "job-1"}
+        assert db.execute.call_count == 2  # No project_documents status update
+        db.commit.assert_called_once()
+
+    def test_dojo_duplicates_match_model_and_prompt(self):
+        """An active dojo task of another batch is only reused if it runs the same model and prompt"""
+        db = MagicMock()
+        db.execute.return_value.fetchone.return_value = (17,)
+        manager = ProcessingQueueManager()
+
+        task_id = manager.add_task(
+            document_id=7, file_path="dojo/deck.pdf", company_id="dojo", task_type="dojo_visual_analysis",
+            processing_options={"dojo_job_id": "job-2", "vision_model": "gemma3:12b", "analysis_prompt": "Describe"},
+            db=db, lane=TaskLane.BATCH
+        )
+
+        assert task_id == 17
+        check_params = db.execute.call_args_list[0].args[1]
+        assert json.loads(check_params["match_options"]) == {"vision_model": "gemma3:12b", "analysis_prompt": "Describe"}
+        db.commit.assert_not_called()
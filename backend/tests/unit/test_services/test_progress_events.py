@@ -0,0 +1,80 @@
+"""
+Unit tests for the document progress fan-out
+"""
+
+import asyncio
+from datetime import datetime
+from unittest.mock import patch
+
+from app.services import progress_events
+from app.services.processing_queue import ProcessingQueueManager
+from app.services.progress_events import ProgressBroadcaster, format_sse
+
+
+def task_row(task_type, status, progress=0, started_at=None):
+    return (task_type, progress, f"{task_type} step", None, status, started_at, 0, None, None, None, None)
+
+
+class TestAggregateTaskProgress:
+    """Test cases for the weighted pipeline progress"""
+
+    def test_processing_task_adds_partial_weight(self):
+        """Completed tasks count fully, the running task by its own percentage"""
+        started_at = datetime(2026, 1, 1, 12, 0, 0)
+        progress = ProcessingQueueManager._aggregate_task_progress([
+            task_row("visual_analysis", "completed", 100, started_at),
+            task_row("slide_feedback", "processing", 50, datetime(2026, 1, 1, 12, 5, 0)),
+            task_row("extractions_and_template", "queued")
+        ])
+
+        assert progress["progress_percentage"] == 30
+        assert progress["status"] == "processing"
+        assert progress["current_step"] == "slide_feedback step"
+        assert progress["started_at"] == started_at.isoformat()
+
+
+class TestProgressBroadcaster:
+    """Test cases for ProgressBroadcaster"""
+
+    def test_pushes_only_changed_documents(self):
+        """Document and project subscribers receive a snapshot, then only real changes"""
+        state = {
+            1: {"project_id": 10, "progress_percentage": 20},
+            2: {"project_id": 10, "progress_percentage": 0}
+        }
+
+        def load_progress(document_ids, project_id):
+            if project_id is not None:
+                return {doc_id: dict(progress) for doc_id, progress in state.items() if progress["project_id"] == project_id}
+            return {doc_id: dict(state[doc_id]) for doc_id in document_ids if doc_id in state}
+
+        async def scenario():
+            broadcaster = ProgressBroadcaster()
+            with patch.object(ProgressBroadcaster, "_load_progress", staticmethod(load_progress)), \
+                    patch.object(progress_events, "COALESCE_SECONDS", 0), \
+                    patch.object(ProgressBroadcaster, "_listen", lambda self: None):
+                document_subscription = await broadcaster.subscribe(document_id=1)
+                project_subscription = await broadcaster.subscribe(project_id=10)
+
+                assert document_subscription.queue.qsize() == 1
+                assert project_subscription.queue.qsize() == 2
+                for subscription in (document_subscription, project_subscription):
+                    while not subscription.queue.empty():
+                        subscription.queue.get_nowait()
+
+                state[1]["progress_percentage"] = 45
+                broadcaster.mark_dirty({1, 2})
+                event = await asyncio.wait_for(document_subscription.queue.get(), timeout=1)
+                assert event == {"document_id": 1, "queue_progress": state[1]}
+                assert (await project_subscription.queue.get())["document_id"] == 1
+                assert project_subscription.queue.empty()  # Document 2 did not change
+
+                broadcaster.unsubscribe(document_subscription)
+                broadcaster.unsubscribe(project_subscription)
+                broadcaster._fanout_task.cancel()
+
+        asyncio.run(scenario())
+
+    def test_format_sse(self):
+        """Events are serialized as named SSE messages"""
+        assert format_sse({"document_id": 1}) == 'event: progress\ndata: {"document_id": 1}\n\n'
@@ -0,0 +1,43 @@
+"""
+Unit tests for the scheduled recovery of expired processing task leases
+"""
+
+from unittest.mock import MagicMock, patch
+
+from app.services.queue_lease_sweeper import QueueLeaseSweeper
+
+
+class TestQueueLeaseSweeper:
+    """Test the background sweep that requeues abandoned tasks"""
+
+    def test_sweep_recovers_expired_tasks(self):
+        """Each sweep runs the expired-lock and checkpoint cleanups in its own session and closes it"""
+        db = MagicMock()
+        sweeper = QueueLeaseSweeper(session_factory=lambda: db, interval=60)
+
+        with patch("app.services.queue_lease_sweeper.processing_queue_manager.recover_abandoned_tasks",
+                   return_value=2) as recover, \
+                patch("app.services.queue_lease_sweeper.processing_queue_manager.cleanup_failed_task_checkpoints",
+                      return_value=5) as cleanup:
+            assert sweeper.sweep() == 2
+            assert sweeper.sweep() == 2
+
+        recover.assert_called_with(db)
+        cleanup.assert_called_with(db)
+        assert db.close.call_count == 2
+        assert sweeper.metrics()["sweeps"] == 2
+        assert sweeper.metrics()["recovered"] == 4
+        assert sweeper.metrics()["checkpoints_deleted"] == 10
+
+    def test_start_and_stop(self):
+        """The sweeper thread starts once and stops without waiting for the next interval"""
+        sweeper = QueueLeaseSweeper(session_factory=MagicMock(), interval=3600)
+
+        sweeper.start()
+        thread = sweeper._sweeper
+        sweeper.start()
+        assert sweeper._sweeper is thread
+        assert sweeper.metrics()["running"]
+
+        sweeper.stop(timeout=5)
+        assert not thread.is_alive()
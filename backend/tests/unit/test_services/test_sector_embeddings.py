@@ -0,0 +1,78 @@
+"""
+Unit tests for the embedding sector pre-classifier
+"""
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from app.services.sector_embeddings import SectorEmbeddingIndex, SectorPreclassifier
+
+SECTORS = [
+    {"id": 1, "name": "diagnostics", "display_name": "Diagnostics", "description": "Laboratory and point of care diagnostic tests",
+     "subcategories": ["Lab Diagnostics"], "keywords": ["biomarker", "assay"]},
+    {"id": 2, "name": "medtech", "display_name": "MedTech", "description": "Medical devices, implants and surgical equipment",
+     "subcategories": ["Medical Devices"], "keywords": ["implant", "catheter"]},
+    {"id": 3, "name": "digital_health", "display_name": "Digital Health", "description": "Apps and software for patients",
+     "subcategories": ["Telemedicine"], "keywords": ["app", "remote monitoring"]},
+]
+EXAMPLES = [
+    ("Blood biomarker assay detecting sepsis within an hour", 1),
+    ("Smart catheter that reduces urinary tract infections", 2),
+    ("Mobile app connecting patients with therapists by video", 3),
+]
+
+
+@pytest.fixture
+def index():
+    return SectorEmbeddingIndex.build(SECTORS, EXAMPLES, signature="v1")
+
+
+class TestSectorEmbeddingIndex:
+    """Test cases for SectorEmbeddingIndex"""
+
+    def test_top_k_ranks_closest_sector_first(self, index):
+        """Offerings are scored against sector documents and confirmed examples in one batch"""
+        ranked = index.top_k(["A rapid assay for sepsis biomarkers", "Video therapy app for patients"], k=2)
+
+        assert ranked[0][0][0]["name"] == "diagnostics"
+        assert ranked[1][0][0]["name"] == "digital_health"
+        assert ranked[0][0][1] > ranked[0][1][1]
+
+    def test_save_and_load_round_trip(self, index, tmp_path):
+        """A prebuilt index gives the same scores after loading"""
+        path = str(tmp_path / "sector_index.npz")
+        index.save(path)
+        loaded = SectorEmbeddingIndex.load(path, SECTORS)
+
+        assert loaded.signature == "v1"
+        offering = ["Catheter implant for surgery"]
+        assert [(sector["id"], round(score, 5)) for sector, score in loaded.top_k(offering)[0]] == \
+            [(sector["id"], round(score, 5)) for sector, score in index.top_k(offering)[0]]
+
+
+class TestSectorPreclassifier:
+    """Test cases for SectorPreclassifier.preclassify"""
+
+    def test_confident_only_above_margin(self, index):
+        """The LLM is only skipped when the best sector clearly beats the runner-up"""
+        preclassifier = SectorPreclassifier(min_similarity=0.2, min_margin=0.1)
+        with patch.object(preclassifier, "get_index", return_value=index):
+            predictions = preclassifier.preclassify(MagicMock(), SECTORS, [
+                "Smart catheter that reduces urinary tract infections in hospitals",
+                "A company",
+            ])
+
+        assert predictions[0]["confident"] is True
+        assert predictions[0]["candidates"][0][0]["name"] == "medtech"
+        assert predictions[1]["confident"] is False
+
+    def test_unavailable_index_is_never_confident(self):
+        """Database errors fall through to the LLM classification"""
+        preclassifier = SectorPreclassifier()
+        db = MagicMock()
+        db.execute.side_effect = RuntimeError("no database")
+
+        predictions = preclassifier.preclassify(db, SECTORS, ["An implant"])
+
+        assert predictions[0]["confident"] is False
+        db.rollback.assert_called_once()
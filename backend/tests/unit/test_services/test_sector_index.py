@@ -0,0 +1,50 @@
+"""
+Unit tests for the cached sector keyword index
+"""
+
+import pytest
+from unittest.mock import MagicMock
+
+from app.services.sector_index import SectorKeywordMatcher, SectorIndexCache
+
+SECTORS = [
+    {"id": 1, "name": "healthtech", "keywords": ["AI", "medical", "digital health"]},
+    {"id": 2, "name": "medtech", "keywords": ["device", "medical device", "implant"]},
+]
+
+
+class TestSectorKeywordMatcher:
+    """Test cases for SectorKeywordMatcher.match"""
+
+    def test_whole_words_only(self):
+        """Keywords inside other words do not match"""
+        matcher = SectorKeywordMatcher(SECTORS)
+        assert matcher.match("We maintain implantable scaffolds") == []
+
+    def test_overlapping_keywords_and_scores(self):
+        """Nested keywords all count, case-insensitively, scored like the per-keyword scan"""
+        matcher = SectorKeywordMatcher(SECTORS)
+        candidates = matcher.match("An AI-guided Medical Device for cardiology")
+
+        assert [candidate["sector"]["name"] for candidate in candidates] == ["medtech", "healthtech"]
+        assert candidates[0]["matched_keywords"] == ["device", "medical device"]
+        assert candidates[0]["score"] == pytest.approx(3 / 3)
+        assert sorted(candidates[1]["matched_keywords"]) == ["AI", "medical"]
+
+
+class TestSectorIndexCache:
+    """Test cases for SectorIndexCache.get"""
+
+    def test_rebuilds_only_when_sectors_change(self):
+        """Sectors are reloaded when the table signature changes"""
+        cache = SectorIndexCache()
+        db = MagicMock()
+        db.execute.return_value.scalar.side_effect = ["v1", "v1", "v2"]
+        load_sectors = MagicMock(return_value=SECTORS)
+
+        first = cache.get(db, load_sectors)
+        assert cache.get(db, load_sectors) is first
+        assert load_sectors.call_count == 1
+
+        assert cache.get(db, load_sectors) is not first
+        assert load_sectors.call_count == 2
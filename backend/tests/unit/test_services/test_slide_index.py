@@ -0,0 +1,58 @@
+"""
+Unit tests for the slide image index service
+"""
+
+import json
+import os
+import pytest
+
+from app.services.slide_index import SlideIndexService, SLIDE_IMAGE_CACHE_CONTROL
+
+
+class TestSlideIndexService:
+    """Test cases for SlideIndexService"""
+
+    def test_extract_slide_entries_from_cached_payload(self):
+        """Slide entries are read from the visual_analysis_results wrapper and from JSON strings"""
+        service = SlideIndexService(mount_path="/mnt/test")
+        payload = {
+            "visual_analysis_results": [
+                {"page_number": 1, "slide_image_path": "acme/analysis/deck/slide_1.jpg", "description": "Cover"},
+                {"page_number": 2, "description": "No image"},
+                {"page_number": 3, "slide_image_path": "acme/analysis/deck/slide_3.jpg"}
+            ]
+        }
+
+        for candidate in (payload, json.dumps(payload)):
+            entries = service.extract_slide_entries(candidate)
+            assert entries == [
+                {"slide_number": 1, "slide_filename": "slide_1.jpg", "slide_image_path": "acme/analysis/deck/slide_1.jpg"},
+                {"slide_number": 3, "slide_filename": "slide_3.jpg", "slide_image_path": "acme/analysis/deck/slide_3.jpg"}
+            ]
+
+    def test_extract_slide_entries_invalid_payload(self):
+        """Malformed payloads produce no entries instead of raising"""
+        service = SlideIndexService(mount_path="/mnt/test")
+        assert service.extract_slide_entries("not json") == []
+        assert service.extract_slide_entries(None) == []
+
+    def test_absolute_path(self):
+        """Indexed paths are relative to the projects directory of the shared volume"""
+        service = SlideIndexService(mount_path="/mnt/test")
+        assert service.absolute_path("acme/analysis/deck/slide_1.jpg") == "/mnt/test/projects/acme/analysis/deck/slide_1.jpg"
+        assert service.absolute_path("/already/absolute.jpg") == "/already/absolute.jpg"
+
+    def test_conditional_request_handling(self, tmp_path):
+        """ETag and Last-Modified validators produce 304 decisions"""
+        service = SlideIndexService(mount_path=str(tmp_path))
+        slide = tmp_path / "slide_1.jpg"
+        slide.write_bytes(b"jpeg-bytes")
+
+        headers = service.cache_headers(os.stat(slide))
+        assert headers["Cache-Control"] == SLIDE_IMAGE_CACHE_CONTROL
+
+        assert service.is_not_modified({"if-none-match": headers["ETag"]}, headers) is True
+        assert service.is_not_modified({"if-none-match": '"other"'}, headers) is False
+        assert service.is_not_modified({"if-modified-since": headers["Last-Modified"]}, headers) is True
+        assert service.is_not_modified({"if-modified-since": "Thu, 01 Jan 1970 00:00:00 GMT"}, headers) is False
+        assert service.is_not_modified({}, headers) is False
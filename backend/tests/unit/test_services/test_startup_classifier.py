@@ -0,0 +1,99 @@
+"""
+Unit tests for batched startup classification
+"""
+
+import asyncio
+import json
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.services.sector_embeddings import sector_preclassifier
+from app.services.sector_index import SectorKeywordMatcher
+from app.services.startup_classifier import StartupClassifier
+
+SECTORS = [
+    {
+        "id": 1, "name": "diagnostics", "display_name": "Diagnostics", "description": "Diagnostic tests",
+        "keywords": ["diagnostic", "lab test"], "subcategories": ["Lab Diagnostics"],
+        "confidence_threshold": 0.3, "regulatory_requirements": []
+    },
+    {
+        "id": 2, "name": "medtech", "display_name": "MedTech", "description": "Medical devices",
+        "keywords": ["device", "implant"], "subcategories": ["Medical Devices"],
+        "confidence_threshold": 0.3, "regulatory_requirements": []
+    },
+]
+
+
+@pytest.fixture
+def classifier():
+    classifier = StartupClassifier.__new__(StartupClassifier)  # Skip __init__, it needs the database
+    classifier.db = None
+    classifier.sector_index = SectorKeywordMatcher(SECTORS)
+    classifier.sectors = classifier.sector_index.sectors
+    classifier.classification_model = "gemma3:12b"
+    classifier._sector_context = None
+    with patch.object(StartupClassifier, "_get_default_template_id", return_value=9), \
+            patch.object(sector_preclassifier, "enabled", False):
+        yield classifier
+
+
+class TestClassifyBatch:
+    """Test cases for StartupClassifier.classify_batch"""
+
+    def test_one_request_with_shared_sector_context(self, classifier):
+        """All offerings go out in one batch; the sector list is sent once, not per item"""
+        async def run_batch(model_name, shared_context, items, on_result=None):
+            for item in reversed(items):  # Results stream back in completion order
+                on_result({"id": item["id"], "success": True,
+                           "response": json.dumps({"primary_sector": "diagnostics", "confidence": 0.9})})
+            return {"success": True, "results": {}}
+
+        streamed = []
+        with patch("app.services.gpu_http_client.gpu_http_client.run_classification_batch",
+                   new=AsyncMock(side_effect=run_batch)) as mock_batch:
+            classifications = asyncio.run(classifier.classify_batch(
+                {11: "A lab test for sepsis", 12: "An implant monitoring device"},
+                on_result=lambda key, classification: streamed.append(key)
+            ))
+
+        assert mock_batch.await_count == 1
+        kwargs = mock_batch.call_args.kwargs
+        assert "Diagnostics: Diagnostic tests" in kwargs["shared_context"]
+        assert all("Healthcare Sectors" not in item["prompt"] for item in kwargs["items"])
+        assert 'Company Offering: "A lab test for sepsis"' in kwargs["items"][0]["prompt"]
+        assert streamed == [12, 11]
+        assert classifications[11]["primary_sector"] == "diagnostics"
+        assert classifications[11]["recommended_template"] == 9
+
+    def test_missing_results_fall_back_to_keywords(self, classifier):
+        """Items the failed batch did not return still get a keyword classification"""
+        with patch("app.services.gpu_http_client.gpu_http_client.run_classification_batch",
+                   new=AsyncMock(return_value={"success": False, "error": "Connection error"})):
+            classifications = asyncio.run(classifier.classify_batch({"a": "An implant device", "b": "A consumer game"}))
+
+        assert classifications["a"]["primary_sector"] == "medtech"
+        assert "Connection error" in classifications["a"]["reasoning"]
+        assert classifications["b"]["primary_sector"] == "unknown"
+
+    def test_confident_embedding_matches_skip_the_llm(self, classifier):
+        """Only offerings the pre-classifier is unsure about are sent to the GPU"""
+        def preclassify(db, sectors, offerings, k=3):
+            return [
+                {"candidates": [(SECTORS[1], 0.25), (SECTORS[0], 0.05)], "similarity": 0.25, "margin": 0.2, "confident": True}
+                if "implant" in offering else
+                {"candidates": [(SECTORS[0], 0.3), (SECTORS[1], 0.28)], "similarity": 0.3, "margin": 0.02, "confident": False}
+                for offering in offerings
+            ]
+
+        with patch.object(sector_preclassifier, "preclassify", side_effect=preclassify), \
+                patch("app.services.gpu_http_client.gpu_http_client.run_classification_batch",
+                      new=AsyncMock(return_value={"success": False, "error": "offline"})) as mock_batch:
+            classifications = asyncio.run(classifier.classify_batch({1: "An implant device", 2: "A lab test"}))
+
+        assert [item["id"] for item in mock_batch.call_args.kwargs["items"]] == ["2"]
+        assert classifications[1]["primary_sector"] == "medtech"
+        assert classifications[1]["secondary_sector"] == "diagnostics"
+        assert sorted(classifications[1]["keywords_matched"]) == ["device", "implant"]
+        assert classifications[1]["confidence_score"] == 0.25  # The similarity itself, not the sector's threshold
+        assert classifications[1]["classification_method"] == "embedding"
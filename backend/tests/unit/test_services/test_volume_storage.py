@@ -0,0 +1,54 @@
+"""
+Unit tests for streamed uploads in the volume storage service
+"""
+
+import asyncio
+import hashlib
+import io
+import pytest
+from unittest.mock import patch
+
+from app.core import volume_storage as volume_storage_module
+from app.core.volume_storage import VolumeStorageService, UploadTooLargeError, UPLOAD_CHUNK_SIZE
+
+
+class FakeUpload:
+    """Minimal stand-in for fastapi.UploadFile"""
+
+    def __init__(self, content: bytes):
+        self._buffer = io.BytesIO(content)
+
+    async def read(self, size: int = -1) -> bytes:
+        return self._buffer.read(size)
+
+
+@pytest.fixture
+def storage(tmp_path):
+    with patch.object(volume_storage_module.settings, "SHARED_FILESYSTEM_MOUNT_PATH", str(tmp_path)):
+        yield VolumeStorageService()
+
+
+class TestSaveUploadStream:
+    """Test cases for VolumeStorageService.save_upload_stream"""
+
+    def test_streams_file_and_computes_hash(self, storage):
+        """Hash and size are computed in the same pass that writes the file"""
+        content = b"%PDF-1.4" + b"x" * (UPLOAD_CHUNK_SIZE * 2 + 17)
+
+        stored = asyncio.run(storage.save_upload_stream(FakeUpload(content), "deck.pdf", "Acme Health"))
+
+        assert stored.file_path.startswith("uploads/acme_health/")
+        assert stored.file_path.endswith("/deck.pdf")
+        assert stored.file_size == len(content)
+        assert stored.file_hash == hashlib.sha256(content).hexdigest()
+        assert storage.get_file_path(stored.file_path).read_bytes() == content
+
+    def test_oversized_upload_is_removed(self, storage):
+        """Uploads above max_size raise and leave no partial file behind"""
+        content = b"x" * (UPLOAD_CHUNK_SIZE + 1)
+
+        with pytest.raises(UploadTooLargeError):
+            asyncio.run(storage.save_upload_stream(FakeUpload(content), "deck.pdf", "Acme", max_size=UPLOAD_CHUNK_SIZE))
+
+        company_dir = storage.uploads_dir / "acme"
+        assert list(company_dir.iterdir()) == []
@@ -37,7 +37,8 @@ import {
   deleteDeck, 
   getDocumentFailureDetails, 
   retryFailedDocument,
-  getProcessingProgress
+  getProcessingProgress,
+  streamProjectProcessingProgress
 } from '../services/api';
 
 const ProjectUploads = ({ projectId, onUploadComplete, onDeleteComplete }) => {
@@ -119,9 +120,10 @@ const ProjectUploads = ({ projectId, onUploadComplete, onDeleteComplete }) => {
     }
   }, [projectId, loadUploads]);
 
-  // Periodic refresh of queue progress for processing documents
+  // Live queue progress for processing documents: one server-sent event stream for the
+  // whole project, falling back to periodic polling if the stream is unavailable
   useEffect(() => {
-    if (uploads.length === 0) return;
+    if (uploads.length === 0 || !projectId) return;
     
     const processingUploads = uploads.filter(upload => 
       upload.processing_status === 'processing' || upload.processing_status === 'queued'
@@ -129,12 +131,27 @@ const ProjectUploads = ({ projectId, onUploadComplete, onDeleteComplete }) => {
     
     if (processingUploads.length === 0) return;
     
-    const interval = setInterval(() => {
-      loadQueueProgress(uploads);
-    }, 10000); // Update every 10 seconds
+    const controller = new AbortController();
+    let interval = null;
     
-    return () => clearInterval(interval);
-  }, [uploads, loadQueueProgress]);
+    streamProjectProcessingProgress(projectId, (event) => {
+      setQueueProgress(prev => ({
+        ...prev,
+        [event.document_id]: { ...prev[event.document_id], ...event }
+      }));
+    }, controller.signal).catch((error) => {
+      if (controller.signal.aborted) return;
+      console.error('Progress stream unavailable, falling back to polling:', error);
+      interval = setInterval(() => {
+        loadQueueProgress(uploads);
+      }, 10000); // Update every 10 seconds
+    });
+    
+    return () => {
+      controller.abort();
+      if (interval) clearInterval(interval);
+    };
+  }, [uploads, projectId, loadQueueProgress]);
 
 
   const handleViewDetails = async (upload) => {
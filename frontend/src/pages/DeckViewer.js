@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import {
   Box,
   Typography,
@@ -35,7 +35,8 @@ import { useNavigate, useParams } from 'react-router-dom';
 import { 
   getProjectDeckAnalysis,
   getSlideFeedback,
-  addManualFeedback
+  addManualFeedback,
+  getDocumentSlideOverview
 } from '../services/api';
 import api from '../services/api';
 import { formatMarkdownText } from '../utils/markdownFormatter';
@@ -117,6 +118,21 @@ const FeedbackBubble = ({ feedbackItem }) => {
   );
 };
 
+// One slide cut out of the deck's sprite sheet, scaled to the card width
+const SpriteThumbnail = ({ overview, tile }) => {
+  const offset = (position, size, total) => (total > size ? (position / (total - size)) * 100 : 0);
+  return (
+    <Box sx={{
+      width: '100%',
+      aspectRatio: `${tile.width}/${tile.height}`,
+      backgroundImage: `url(${overview.spriteUrl})`,
+      backgroundRepeat: 'no-repeat',
+      backgroundSize: `${(overview.spriteWidth / tile.width) * 100}% auto`,
+      backgroundPosition: `${offset(tile.x, tile.width, overview.spriteWidth)}% ${offset(tile.y, tile.height, overview.spriteHeight)}%`
+    }} />
+  );
+};
+
 // Slide Feedback Display Component
 const SlideFeedbackDisplay = ({ slideNumber, feedback, loading = false, projectId, deckId, currentUser, onFeedbackAdded }) => {
   const { t } = useTranslation(['deckViewer', 'common']);
@@ -275,6 +291,9 @@ const DeckViewer = () => {
   const [deckAnalysis, setDeckAnalysis] = useState(null);
   const [slides, setSlides] = useState([]);
   const [imageUrls, setImageUrls] = useState({});
+  // Thumbnail manifest and sprite sheet: one request for all navigation thumbnails
+  const [slideOverview, setSlideOverview] = useState(null);
+  const requestedImages = useRef(new Set());
   
   // Slide feedback data
   const [slideFeedback, setSlideFeedback] = useState({});
@@ -306,10 +325,20 @@ const DeckViewer = () => {
     return () => window.removeEventListener('keydown', handleKeyPress);
   }, [currentSlide, slides.length]);
 
+  // Full-size images are loaded on demand: the current slide and the next one
+  useEffect(() => {
+    [slides[currentSlide], slides[currentSlide + 1]]
+      .filter(Boolean)
+      .forEach(slide => loadSlideImage(slide));
+  }, [currentSlide, slides]);
+
   const loadDeckAnalysis = async () => {
     try {
       setLoading(true);
       setError(null);
+      requestedImages.current = new Set();
+      setImageUrls({});
+      setSlideOverview(null);
       
       const response = await getProjectDeckAnalysis(projectId, deckId);
       const analysisData = response.data || response;
@@ -324,8 +353,8 @@ const DeckViewer = () => {
         { label: `${t('title')}: ${analysisData.deck_name}`, path: null }
       ]);
       
-      // Load slide images
-      loadSlideImages(analysisData.slides || []);
+      // Load navigation thumbnails; full-size images follow the current slide
+      loadSlideOverview(analysisData.slides || []);
       
       // Load slide feedback
       loadSlideFeedback();
@@ -345,58 +374,45 @@ const DeckViewer = () => {
     }
   };
 
-  const loadSlideImages = async (slidesData) => {
-    const imageUrlsTemp = {};
-    
-    for (const slide of slidesData) {
-      if (slide.slide_image_path) {
-        try {
-          // Use standard slide naming pattern
-          const filename = `slide_${slide.page_number}.jpg`;
-          // Extract deck name from slide_image_path or use fallback
-          let deckName = 'test-pitch-deck'; // Default for current test case
-          if (slide.slide_image_path) {
-            const pathParts = slide.slide_image_path.split('/');
-            if (pathParts.length >= 2) {
-              deckName = pathParts[pathParts.length - 2]; // Get parent folder name
-            }
-          }
-          
-          // Use correct document-based endpoint  
-          const response = await api.get(`/projects/documents/${deckId}/slide-image/${filename}`, {
-            responseType: 'blob'
-          });
-          
-          const imageBlob = response.data;
-          const imageUrl = URL.createObjectURL(imageBlob);
-          imageUrlsTemp[slide.page_number] = imageUrl;
-          
-        } catch (err) {
-          console.error(`Error loading image for slide ${slide.page_number}:`, err);
-          
-          // Fallback: try with slide_image_path if available
-          if (slide.slide_image_path) {
-            try {
-              const pathParts = slide.slide_image_path.split('/');
-              const deckName = pathParts[pathParts.length - 2];
-              const filename = pathParts[pathParts.length - 1];
-              
-              const response = await api.get(`/projects/documents/${deckId}/slide-image/${filename}`, {
-                responseType: 'blob'
-              });
-              
-              const imageBlob = response.data;
-              const imageUrl = URL.createObjectURL(imageBlob);
-              imageUrlsTemp[slide.page_number] = imageUrl;
-            } catch (fallbackErr) {
-              console.error(`Fallback image loading also failed for slide ${slide.page_number}:`, fallbackErr);
-            }
-          }
-        }
+  const loadSlideOverview = async (slidesData) => {
+    try {
+      const response = await getDocumentSlideOverview(deckId);
+      const { manifest, sprite } = response.data;
+      setSlideOverview({
+        spriteUrl: `data:${sprite.media_type};base64,${sprite.data}`,
+        spriteWidth: manifest.sprite.width,
+        spriteHeight: manifest.sprite.height,
+        tiles: Object.fromEntries(manifest.slides.map(entry => [entry.slide_number, entry.sprite]))
+      });
+    } catch (err) {
+      // Decks analysed before thumbnails existed have no overview: fall back to the full images
+      console.warn('No slide overview available, loading full slide images:', err);
+      slidesData.forEach(slide => loadSlideImage(slide));
+    }
+  };
+
+  const loadSlideImage = async (slide) => {
+    if (!slide?.slide_image_path || requestedImages.current.has(slide.page_number)) {
+      return;
+    }
+    requestedImages.current.add(slide.page_number);
+    // Try the standard slide naming pattern first, then the file name from slide_image_path
+    const candidates = [...new Set([
+      `slide_${slide.page_number}.jpg`,
+      slide.slide_image_path.split('/').pop()
+    ])];
+    for (const filename of candidates) {
+      try {
+        const response = await api.get(`/projects/documents/${deckId}/slide-image/${filename}`, {
+          responseType: 'blob'
+        });
+        const imageUrl = URL.createObjectURL(response.data);
+        setImageUrls(prev => ({ ...prev, [slide.page_number]: imageUrl }));
+        return;
+      } catch (err) {
+        console.error(`Error loading image ${filename} for slide ${slide.page_number}:`, err);
       }
     }
-    
-    setImageUrls(imageUrlsTemp);
   };
 
   const loadSlideFeedback = async () => {
@@ -476,7 +492,20 @@ const DeckViewer = () => {
           </Typography>
         </Box>
         
-        {imageUrls[slide.page_number] && (
+        {slideOverview?.tiles[slide.page_number] ? (
+          <Box sx={{ 
+            width: '100%', 
+            aspectRatio: '16/9', 
+            mb: 1,
+            overflow: 'hidden',
+            borderRadius: 1,
+            backgroundColor: 'grey.100',
+            display: 'flex',
+            alignItems: 'center'
+          }}>
+            <SpriteThumbnail overview={slideOverview} tile={slideOverview.tiles[slide.page_number]} />
+          </Box>
+        ) : imageUrls[slide.page_number] && (
           <Box sx={{ 
             width: '100%', 
             aspectRatio: '16/9', 
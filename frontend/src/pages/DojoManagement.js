@@ -1434,8 +1434,8 @@ const DojoManagement = () => {
       const user = JSON.parse(localStorage.getItem('user'));
       const token = user?.token;
 
-      // Get the experiment details to extract the deck IDs
-      const response = await fetch(`/api/dojo/extraction-test/experiments/${experiment.id}`, {
+      // Get the experiment metadata (no per-deck sections) to extract the deck IDs
+      const response = await fetch(`/api/dojo/extraction-test/experiments/${experiment.id}?fields=`, {
         headers: { 'Authorization': `Bearer ${token}` }
       });
 
@@ -165,6 +165,10 @@ export const getSlideImage = (projectId, deckName, slideFilename) =>
     responseType: 'blob'
   });
 
+// Thumbnail manifest plus sprite sheet for a whole deck in one request (list/overview screens)
+export const getDocumentSlideOverview = (documentId) =>
+  api.get(`/projects/documents/${documentId}/slide-overview`);
+
 export const deleteDeck = (projectId, deckId) =>
   api.delete(`/projects/${projectId}/deck/${deckId}`);
 
@@ -231,6 +235,49 @@ export const createProject = (projectData) =>
 export const getProcessingProgress = (pitchDeckId) =>
   api.get(`/documents/processing-progress/${pitchDeckId}`);
 
+// Streams server-sent progress events for all documents of a project.
+// Uses fetch instead of EventSource so the Authorization header can be sent.
+// Resolves when the stream ends; abort it through the given AbortSignal.
+export const streamProjectProcessingProgress = async (projectId, onProgress, signal) => {
+  const user = JSON.parse(localStorage.getItem('user')) || JSON.parse(localStorage.getItem('tempUser'));
+  const response = await fetch(
+    `${API_CONFIG.BASE_URL}/documents/projects/${projectId}/processing-progress/stream`,
+    {
+      headers: {
+        Accept: 'text/event-stream',
+        ...(user?.token ? { Authorization: `Bearer ${user.token}` } : {})
+      },
+      signal
+    }
+  );
+  if (!response.ok || !response.body) {
+    throw new Error(`Progress stream failed with status ${response.status}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) return;
+    buffer += decoder.decode(value, { stream: true });
+
+    let boundary;
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const rawEvent = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      const data = rawEvent
+        .split('\n')
+        .filter((line) => line.startsWith('data:'))
+        .map((line) => line.slice(5).trim())
+        .join('\n');
+      if (data) {
+        onProgress(JSON.parse(data));
+      }
+    }
+  }
+};
+
 // GP Invitation API
 export const inviteGP = (inviteData) =>
   api.post('/auth/invite-gp', inviteData);
@@ -33,6 +33,14 @@ class ProcessingConfig:
     batch_size: int = 16
     max_length: int = 512
     temperature: float = 0.7
+    text_model_concurrency: int = 4  # Parallel text model requests per batch (match OLLAMA_NUM_PARALLEL)
+    deck_context_mode: str = "retrieval"  # "retrieval": relevant slides per question, "full": whole deck every time
+    deck_context_tokens: int = 4096  # Token budget for deck content per question / specialized analysis
+    page_routing_mode: str = "hybrid"  # "hybrid": text-dominant slides described from the PDF text layer, "vision": every slide as image
+    slide_cache_enabled: bool = True  # Reuse slide descriptions/feedback across a company's decks and versions
+    slide_cache_max_distance: int = 0  # 0: identical slides only; 1-3: near-duplicates with the same text layer
+    task_lease_seconds: int = 120  # Queue task lease, renewed by every heartbeat while the task runs
+    batch_yield_max_seconds: int = 1800  # Longest a direct dojo batch pauses between decks for interactive tasks
     
     # Scoring thresholds
     min_score: float = 0.0
@@ -53,6 +61,14 @@ class ProcessingConfig:
             device=os.getenv("PROCESSING_DEVICE", "cuda"),
             batch_size=int(os.getenv("BATCH_SIZE", "16")),
             temperature=float(os.getenv("TEMPERATURE", "0.7")),
+            text_model_concurrency=int(os.getenv("TEXT_MODEL_CONCURRENCY", "4")),
+            deck_context_mode=os.getenv("DECK_CONTEXT_MODE", "retrieval").lower(),
+            deck_context_tokens=int(os.getenv("DECK_CONTEXT_TOKENS", "4096")),
+            page_routing_mode=os.getenv("PAGE_ROUTING_MODE", "hybrid").lower(),
+            slide_cache_enabled=os.getenv("SLIDE_CACHE_ENABLED", "true").lower() == "true",
+            slide_cache_max_distance=int(os.getenv("SLIDE_CACHE_MAX_DISTANCE", "0")),
+            task_lease_seconds=int(os.getenv("TASK_LEASE_SECONDS", "120")),
+            batch_yield_max_seconds=int(os.getenv("BATCH_YIELD_MAX_SECONDS", "1800")),
             include_debug_info=os.getenv("INCLUDE_DEBUG_INFO", "false").lower() == "true",
         )
     
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Deck Context Evaluation - relevant slides vs. the whole deck in template prompts
+
+Runs the template questions of each deck twice, once with the full deck text in every
+prompt (DECK_CONTEXT_MODE=full) and once with the slides picked by the slide retrieval
+index, and reports how far the question scores differ, how many deck tokens each
+prompt carried and how long each run took.
+
+Usage:
+    python evaluate_deck_context.py --template-id 5 --deck-ids 101 102 [--tokens 4096] [--output report.json]
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, List
+
+import requests
+
+from utils.healthcare_template_analyzer import analysis_engine_cache
+from utils.slide_retrieval import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+MODES = ("full", "retrieval")
+
+
+def load_visual_analysis(backend_url: str, deck_ids: List[int]) -> Dict[int, List[Dict[str, Any]]]:
+    """Cached visual analysis results per deck from the backend"""
+    response = requests.post(
+        f"{backend_url}/api/dojo/internal/get-cached-visual-analysis",
+        json={"deck_ids": deck_ids},
+        timeout=30
+    )
+    response.raise_for_status()
+    cached = response.json().get("cached_analysis", {})
+    return {int(deck_id): data.get("visual_analysis_results", []) for deck_id, data in cached.items()}
+
+
+def run_template(engine, template_config: Dict[str, Any], visual_analysis_results: List[Dict[str, Any]],
+                 mode: str, token_budget: int) -> Dict[str, Any]:
+    """Template analysis of one deck in one context mode: scores, deck tokens per prompt and duration"""
+    session = engine.new_session(visual_analysis_results=visual_analysis_results)
+    session.template_config = template_config
+    session.deck_context_mode = mode
+    session.deck_context_tokens = token_budget
+
+    context_tokens = []
+    deck_context = session._deck_context
+
+    def recording_deck_context(query: str) -> str:
+        context = deck_context(query)
+        context_tokens.append(estimate_tokens(context))
+        return context
+
+    session._deck_context = recording_deck_context
+    start = time.monotonic()
+    session._execute_template_analysis()
+    return {
+        "seconds": time.monotonic() - start,
+        "scores": {str(question_id): result["score"] for question_id, result in session.question_results.items()},
+        "context_tokens": context_tokens
+    }
+
+
+def compare_runs(full: Dict[str, Any], retrieval: Dict[str, Any]) -> Dict[str, Any]:
+    """Score agreement, prompt size and latency of the retrieval run relative to the full-deck run"""
+    questions = sorted(set(full["scores"]) & set(retrieval["scores"]))
+    differences = [retrieval["scores"][question] - full["scores"][question] for question in questions]
+    return {
+        "questions": len(questions),
+        "mean_absolute_score_difference": sum(abs(d) for d in differences) / len(differences) if differences else 0.0,
+        "mean_score_difference": sum(differences) / len(differences) if differences else 0.0,
+        "exact_score_agreement": sum(1 for d in differences if d == 0) / len(differences) if differences else 1.0,
+        "max_absolute_score_difference": max((abs(d) for d in differences), default=0),
+        "full_context_tokens": sum(full["context_tokens"]),
+        "retrieval_context_tokens": sum(retrieval["context_tokens"]),
+        "full_seconds": round(full["seconds"], 2),
+        "retrieval_seconds": round(retrieval["seconds"], 2),
+        "speedup": full["seconds"] / retrieval["seconds"] if retrieval["seconds"] else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare relevant-slide and full-deck context for template analysis")
+    parser.add_argument("--template-id", type=int, required=True)
+    parser.add_argument("--deck-ids", type=int, nargs="+", required=True)
+    parser.add_argument("--tokens", type=int, default=4096, help="Deck context token budget for the retrieval run")
+    parser.add_argument("--backend-url", default=os.getenv("BACKEND_DEVELOPMENT", "http://localhost:8000"))
+    parser.add_argument("--output", help="Write the full report as JSON to this file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    engine = analysis_engine_cache.get()
+    template_config = engine._load_template_config(args.template_id)
+    visual_analysis = load_visual_analysis(args.backend_url, args.deck_ids)
+
+    report = {"template_id": args.template_id, "token_budget": args.tokens, "decks": {}}
+    for deck_id in args.deck_ids:
+        results = visual_analysis.get(deck_id)
+        if not results:
+            print(f"Deck {deck_id}: no cached visual analysis, skipped")
+            continue
+        runs = {mode: run_template(engine, template_config, results, mode, args.tokens) for mode in MODES}
+        comparison = compare_runs(runs["full"], runs["retrieval"])
+        report["decks"][deck_id] = {"slides": len(results), **comparison, "runs": runs}
+        print(
+            f"Deck {deck_id} ({len(results)} slides): "
+            f"|Δscore| {comparison['mean_absolute_score_difference']:.2f}, "
+            f"agreement {comparison['exact_score_agreement']:.0%}, "
+            f"deck tokens {comparison['full_context_tokens']} -> {comparison['retrieval_context_tokens']}, "
+            f"time {comparison['full_seconds']}s -> {comparison['retrieval_seconds']}s"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
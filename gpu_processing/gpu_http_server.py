@@ -15,14 +15,18 @@ import requests
 import threading
 import time
 import socket
-from flask import Flask, request, jsonify
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from flask import Flask, Response, request, jsonify, stream_with_context
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Callable, Iterator
 from pathlib import Path
 
 # Import PDF processing components
 from main import PDFProcessor
 from config.processing_config import config
+from utils.model_residency import model_residency_tracker, model_kind
+from utils.slide_cache import slide_analysis_cache, parse_hash
+from utils.task_checkpoints import task_checkpoint_store
 
 # Configure logging to write to shared filesystem - NO FALLBACKS!
 import os
@@ -87,6 +91,12 @@ class GPUHTTPServer:
         self.heartbeat_thread = None
         self.queue_polling_thread = None
         self.shutdown_flag = False
+        # Queue tasks this server is working on (task id -> lane); their leases are renewed with every heartbeat
+        self.in_flight_tasks = {}
+        self.in_flight_lock = threading.Lock()
+        # poll_for_queue_tasks runs one queue task at a time; registered as the server's slots so
+        # the queue's lane reservations are computed from the capacity actually in use
+        self.queue_concurrency = 1
         
         logger.info(f"Initialized GPUHTTPServer with backend URL: {self.backend_url}")
         logger.info(f"Server ID: {self.server_id}")
@@ -368,6 +378,7 @@ class GPUHTTPServer:
                 text_model = data.get('text_model')
                 generate_thumbnails = data.get('generate_thumbnails', True)
                 enable_progressive_delivery = data.get('enable_progressive_delivery', False)
+                dojo_job_id = data.get('job_id')  # Echoed in progress callbacks so the backend updates this job
                 
                 if not deck_ids:
                     return jsonify({
@@ -392,14 +403,17 @@ class GPUHTTPServer:
                 # Get cached visual analysis for all decks at once
                 cached_analysis = self._get_cached_visual_analysis(deck_ids)
                 
-                # Load template configuration
-                from utils.healthcare_template_analyzer import HealthcareTemplateAnalyzer
+                # Shared analyzer engine; each deck runs in its own session
+                from utils.healthcare_template_analyzer import analysis_engine_cache
+                engine = analysis_engine_cache.get()
                 
                 # Process each deck
                 batch_results = []
                 
                 for deck_id in deck_ids:
                     try:
+                        self._yield_to_interactive_tasks()
+                        
                         # Check if we have cached visual analysis for this deck
                         if deck_id not in cached_analysis:
                             logger.error(f"No cached visual analysis found for deck {deck_id}")
@@ -423,27 +437,21 @@ class GPUHTTPServer:
                             logger.warning(f"No extraction results found for deck {deck_id} - proceeding with visual analysis only")
                             extraction_data = {}  # Empty dict to avoid errors
                         
-                        # Create analyzer with model overrides if specified
+                        # Session with the deck's visual analysis, extraction results and model overrides if specified
+                        analyzer = engine.new_session(
+                            deck_id=deck_id,
+                            visual_analysis_results=deck_visual_data['visual_analysis_results'],
+                            extraction_data=extraction_data,
+                            text_model=text_model,
+                            scoring_model=text_model
+                        )
                         if text_model:
-                            analyzer = HealthcareTemplateAnalyzer(text_model_override=text_model, scoring_model_override=text_model)
-                            logger.info(f"🔧 Creating analyzer with text and scoring models for deck {deck_id}: {text_model}")
-                        else:
-                            analyzer = HealthcareTemplateAnalyzer()
-                        
-                        # Set visual analysis results
-                        analyzer.visual_analysis_results = deck_visual_data['visual_analysis_results']
+                            logger.info(f"🔧 Using text and scoring model for deck {deck_id}: {text_model}")
                         logger.info(f"Loaded {len(analyzer.visual_analysis_results)} visual analysis results for deck {deck_id}")
                         
-                        # Set extraction results
-                        analyzer.company_offering = extraction_data.get('company_offering', '')
-                        analyzer.startup_name = extraction_data.get('startup_name', '')
-                        analyzer.funding_amount = extraction_data.get('funding_amount', '')
-                        analyzer.deck_date = extraction_data.get('deck_date', '')
-                        analyzer.classification_result = extraction_data.get('classification', {})
-                        
-                        # Load template configuration using analyzer's database connection (like the old method)
+                        # Load template configuration using the engine's database connection (like the old method)
                         try:
-                            analyzer.template_config = analyzer._load_template_config(template_id)
+                            analyzer.template_config = engine._load_template_config(template_id)
                             if analyzer.template_config:
                                 template_name = analyzer.template_config.get('template', {}).get('name', 'Unknown')
                                 logger.info(f"Loaded template '{template_name}' for deck {deck_id}")
@@ -461,7 +469,8 @@ class GPUHTTPServer:
                                 "chapter_name": chapter_name,
                                 "deck_id": deck_id,
                                 "status": status,
-                                "deck_name": deck_name  # Pass deck name for better progress display
+                                "deck_name": deck_name,  # Pass deck name for better progress display
+                                "job_id": dojo_job_id
                             }
                             
                             # Add chapter results for progressive delivery if enabled and results provided
@@ -475,9 +484,8 @@ class GPUHTTPServer:
                                 json=callback_data
                             )
                         
-                        # Store progress callback and deck_id for chapter processing
+                        # Store progress callback for chapter processing
                         analyzer.progress_callback = progress_callback
-                        analyzer.current_deck_id = deck_id
                         
                         # Execute ONLY template analysis (no visual analysis, no extractions)
                         analyzer._execute_template_analysis()
@@ -572,6 +580,8 @@ class GPUHTTPServer:
                 
                 for deck_id in deck_ids:
                     try:
+                        self._yield_to_interactive_tasks()
+                        
                         # Check if we have cached visual analysis for this deck
                         if deck_id not in cached_analysis:
                             logger.error(f"No cached visual analysis found for deck {deck_id}")
@@ -600,15 +610,14 @@ class GPUHTTPServer:
                             logger.warning(f"No extraction results found for deck {deck_id} - proceeding with visual analysis only")
                             extraction_data = {}  # Empty dict to avoid errors
                         
-                        # Create analyzer for specialized analysis
-                        from utils.healthcare_template_analyzer import HealthcareTemplateAnalyzer
+                        # Session for specialized analysis on the shared engine
+                        from utils.healthcare_template_analyzer import analysis_engine_cache
                         
+                        analyzer = analysis_engine_cache.get().new_session(deck_id=deck_id, text_model=text_model, scoring_model=text_model)
                         if text_model:
-                            analyzer = HealthcareTemplateAnalyzer(text_model_override=text_model, scoring_model_override=text_model)
-                            logger.info(f"🔧 Creating analyzer with text model for deck {deck_id}: {text_model}")
+                            logger.info(f"🔧 Using text model for deck {deck_id}: {text_model}")
                         else:
-                            analyzer = HealthcareTemplateAnalyzer()
-                            logger.info(f"🔧 Creating analyzer with default models for deck {deck_id}")
+                            logger.info(f"🔧 Using default models for deck {deck_id}")
                         
                         # Run ONLY specialized analysis
                         logger.info(f"🔍 Running specialized analysis for deck {deck_id}")
@@ -717,25 +726,7 @@ class GPUHTTPServer:
                             continue
                         
                         logger.info(f"Processing deck {deck_id}: {file_path}")
-                        
-                        # Use the healthcare template analyzer for visual analysis
-                        from utils.healthcare_template_analyzer import HealthcareTemplateAnalyzer
-                        
-                        # Create analyzer - it will use configured models and prompts from database
-                        analyzer = HealthcareTemplateAnalyzer()
-                        
-                        # Only override if explicitly provided (not None)
-                        if vision_model:
-                            analyzer.vision_model = vision_model
-                            logger.info(f"Overriding vision model to: {vision_model}")
-                        
-                        if analysis_prompt:
-                            analyzer.image_analysis_prompt = analysis_prompt
-                            logger.info(f"Overriding analysis prompt")
-                        
-                        # Full file path for processing
-                        from pathlib import Path
-                        full_pdf_path = str(Path(config.mount_path) / file_path)
+                        self._yield_to_interactive_tasks()
                         
                         # Get company_id for this deck (use actual company or fallback to "dojo" for legacy)
                         if i < len(company_ids) and company_ids[i]:
@@ -745,27 +736,11 @@ class GPUHTTPServer:
                             company_id = "dojo"
                             logger.warning(f"No company_id provided for deck {deck_id}, using 'dojo' as fallback")
                         
-                        # Run visual analysis with actual company_id
-                        analyzer._analyze_visual_content(full_pdf_path, company_id=company_id, deck_id=deck_id)
-                        
-                        # Generate slide feedback after visual analysis
-                        logger.info(f"Generating slide feedback for deck {deck_id}")
-                        analyzer.deck_id = deck_id  # Set deck_id for feedback storage
-                        analyzer._generate_slide_feedback()
-                        
-                        # Format results for caching
-                        visual_results = {
-                            "visual_analysis_results": analyzer.visual_analysis_results
-                        }
-                        
-                        batch_results[str(deck_id)] = visual_results
+                        batch_results[str(deck_id)] = self._run_dojo_visual_analysis(
+                            deck_id, file_path, company_id, vision_model, analysis_prompt
+                        )
                         processed_decks.append(deck_id)
                         
-                        # Cache result immediately to backend
-                        self._cache_visual_analysis_result(deck_id, visual_results, vision_model, analysis_prompt)
-                        
-                        logger.info(f"Completed visual analysis for deck {deck_id}")
-                        
                     except Exception as e:
                         logger.error(f"Error processing deck {deck_id}: {e}")
                         batch_results[str(deck_id)] = {"error": str(e)}
@@ -829,14 +804,12 @@ class GPUHTTPServer:
                 
                 logger.info(f"Starting offering extraction for {len(deck_ids)} decks using {text_model}")
                 
-                # Process each deck for extraction
-                extraction_results = []
-                
                 # Get cached visual analysis from production server
                 cached_analysis = self._get_cached_visual_analysis(deck_ids) if use_cached_visual else {}
                 
-                for deck_id in deck_ids:
+                def extract_offering(deck_id):
                     try:
+                        self._yield_to_interactive_tasks()
                         logger.info(f"Extracting offering for deck {deck_id}")
                         
                         # Prepare visual analysis context
@@ -898,24 +871,25 @@ IMPORTANT: Base your answer ONLY on the visual analysis above. If no meaningful
                         
                         offering_result = response['message']['content']
                         
-                        extraction_results.append({
+                        logger.info(f"Completed extraction for deck {deck_id}")
+                        return {
                             "deck_id": deck_id,
                             "offering_extraction": offering_result,
                             "visual_analysis_used": visual_used,
                             "text_model_used": text_model
-                        })
-                        
-                        logger.info(f"Completed extraction for deck {deck_id}")
+                        }
                         
                     except Exception as e:
                         logger.error(f"Error extracting offering for deck {deck_id}: {e}")
-                        extraction_results.append({
+                        return {
                             "deck_id": deck_id,
                             "offering_extraction": f"Error: {str(e)}",
                             "visual_analysis_used": False,
                             "text_model_used": text_model
-                        })
-                        continue
+                        }
+                
+                # Decks share the prefetched visual analysis and run concurrently on the text model
+                extraction_results = self._map_concurrently(extract_offering, deck_ids)
                 
                 logger.info(f"Completed offering extraction for {len(extraction_results)} decks")
                 
@@ -961,17 +935,20 @@ IMPORTANT: Base your answer ONLY on the visual analysis above. If no meaningful
                 
                 logger.info(f"Starting comprehensive extraction experiment '{experiment_name}' for {len(deck_ids)} decks")
                 
-                # Import and instantiate the analyzer
-                from utils.healthcare_template_analyzer import HealthcareTemplateAnalyzer
-                analyzer = HealthcareTemplateAnalyzer()
+                # Shared analyzer engine - only its pipeline prompts are needed here
+                from utils.healthcare_template_analyzer import analysis_engine_cache
+                analyzer = analysis_engine_cache.get()
                 
                 # Collect all extraction results
                 all_results = {}
                 
+                # Fetch the cached visual analysis of the whole batch once for all extraction steps
+                visual_analysis_by_deck = self._get_cached_visual_analysis(deck_ids)
+                
                 # Step 1: Run offering extraction
                 logger.info("Step 3.1: Running company offering extraction...")
                 offering_prompt = analyzer._get_pipeline_prompt('offering_extraction')
-                offering_results = self._run_extraction_step(deck_ids, offering_prompt, text_model, 'offering_extraction')
+                offering_results = self._run_extraction_step(deck_ids, offering_prompt, text_model, 'offering_extraction', visual_analysis_by_deck)
                 all_results["offering_extraction"] = offering_results
                 
                 # Step 2: Run classification (if enabled)
@@ -987,7 +964,7 @@ IMPORTANT: Base your answer ONLY on the visual analysis above. If no meaningful
                 if processing_options.get('extract_company_name', True):
                     logger.info("Step 3.3: Extracting company names...")
                     name_prompt = analyzer._get_pipeline_prompt('startup_name_extraction')
-                    company_name_results = self._run_extraction_step(deck_ids, name_prompt, text_model, 'company_name_extraction')
+                    company_name_results = self._run_extraction_step(deck_ids, name_prompt, text_model, 'company_name_extraction', visual_analysis_by_deck)
                 all_results["company_names"] = company_name_results
                 
                 # Step 4: Extract funding amounts (if enabled)
@@ -995,7 +972,7 @@ IMPORTANT: Base your answer ONLY on the visual analysis above. If no meaningful
                 if processing_options.get('extract_funding_amount', True):
                     logger.info("Step 3.4: Extracting funding amounts...")
                     funding_prompt = analyzer._get_pipeline_prompt('funding_amount_extraction')
-                    funding_results = self._run_extraction_step(deck_ids, funding_prompt, text_model, 'funding_amount_extraction')
+                    funding_results = self._run_extraction_step(deck_ids, funding_prompt, text_model, 'funding_amount_extraction', visual_analysis_by_deck)
                 all_results["funding_amounts"] = funding_results
                 
                 # Step 5: Extract deck dates (if enabled)
@@ -1003,7 +980,7 @@ IMPORTANT: Base your answer ONLY on the visual analysis above. If no meaningful
                 if processing_options.get('extract_deck_date', True):
                     logger.info("Step 3.5: Extracting deck dates...")
                     date_prompt = analyzer._get_pipeline_prompt('deck_date_extraction')
-                    date_results = self._run_extraction_step(deck_ids, date_prompt, text_model, 'deck_date_extraction')
+                    date_results = self._run_extraction_step(deck_ids, date_prompt, text_model, 'deck_date_extraction', visual_analysis_by_deck)
                 all_results["deck_dates"] = date_results
                 
                 # Save ALL extraction results together in one experiment
@@ -1090,6 +1067,115 @@ IMPORTANT: Base your answer ONLY on the visual analysis above. If no meaningful
                     "timestamp": datetime.now().isoformat()
                 }), 500
         
+        @self.app.route('/api/run-classification-batch', methods=['POST'])
+        def run_classification_batch():
+            """Run classification for many prompts sharing one sector context, streaming results as NDJSON"""
+            data = request.get_json(silent=True)
+            if not data:
+                return jsonify({
+                    "success": False,
+                    "error": "No JSON data provided",
+                    "timestamp": datetime.now().isoformat()
+                }), 400
+            
+            model = data.get('model')
+            shared_context = data.get('shared_context', '')
+            items = data.get('items', [])
+            options = data.get('options', {})
+            
+            if not model:
+                return jsonify({
+                    "success": False,
+                    "error": "model is required",
+                    "timestamp": datetime.now().isoformat()
+                }), 400
+            
+            if not items or any(not item.get('prompt') for item in items):
+                return jsonify({
+                    "success": False,
+                    "error": "items with a prompt are required",
+                    "timestamp": datetime.now().isoformat()
+                }), 400
+            
+            logger.info(f"Starting batch classification of {len(items)} items using model {model}")
+            
+            def generate():
+                failed = 0
+                for result in self._run_classification_batch(model, shared_context, items, options):
+                    if not result["success"]:
+                        failed += 1
+                    yield json.dumps(result) + "\n"
+                logger.info(f"Batch classification completed: {len(items) - failed}/{len(items)} successful")
+                yield json.dumps({"done": True, "total": len(items), "failed": failed}) + "\n"
+            
+            return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+        
+        @self.app.route('/api/model-residency', methods=['GET'])
+        def model_residency():
+            """Loaded models and model load counts / load time per hour"""
+            return jsonify({
+                "success": True,
+                **model_residency_tracker.metrics(),
+                "timestamp": datetime.now().isoformat()
+            })
+        
+        @self.app.route('/api/slide-cache/stats', methods=['GET'])
+        def slide_cache_stats():
+            """Slide cache hit rates since start, plus stored entries per kind"""
+            from utils.healthcare_template_analyzer import get_database_url
+            try:
+                entries = slide_analysis_cache.entry_counts(get_database_url())
+            except Exception as e:
+                logger.warning(f"Could not count slide cache entries: {e}")
+                entries = None
+            return jsonify({
+                "success": True,
+                **slide_analysis_cache.metrics(),
+                "entries": entries,
+                "timestamp": datetime.now().isoformat()
+            })
+        
+        @self.app.route('/api/slide-cache/invalidate', methods=['POST'])
+        def slide_cache_invalidate():
+            """Delete slide cache entries by kind, company, vision model, prompt, slide hashes or age"""
+            data = request.get_json(silent=True) or {}
+            filters = {
+                "kind": data.get('kind'),
+                "company_id": data.get('company_id'),
+                "vision_model": data.get('vision_model'),
+                "prompt": data.get('prompt'),
+                "slide_hashes": [parse_hash(value) for value in data.get('slide_hashes') or []] or None,
+                "older_than_days": data.get('older_than_days')
+            }
+            if filters["slide_hashes"] and None in filters["slide_hashes"]:
+                return jsonify({
+                    "success": False,
+                    "error": "slide_hashes must be 16-digit hex strings",
+                    "timestamp": datetime.now().isoformat()
+                }), 400
+            if all(value is None for value in filters.values()) and not data.get('all'):
+                return jsonify({
+                    "success": False,
+                    "error": "Provide at least one filter, or all=true to clear the cache",
+                    "timestamp": datetime.now().isoformat()
+                }), 400
+            
+            from utils.healthcare_template_analyzer import get_database_url
+            try:
+                deleted = slide_analysis_cache.invalidate(get_database_url(), **filters)
+            except Exception as e:
+                logger.error(f"Slide cache invalidation failed: {e}")
+                return jsonify({
+                    "success": False,
+                    "error": str(e),
+                    "timestamp": datetime.now().isoformat()
+                }), 500
+            return jsonify({
+                "success": True,
+                "deleted": deleted,
+                "timestamp": datetime.now().isoformat()
+            })
+        
         @self.app.route('/api/processing-progress/<int:document_id>', methods=['GET'])
         def get_processing_progress(document_id: int):
             """Get processing progress for a specific pitch deck"""
@@ -1245,6 +1331,7 @@ IMPORTANT: Base your answer ONLY on the visual analysis above. If no meaningful
                 template_info = data.get('template_info')
                 generate_thumbnails = data.get('generate_thumbnails', True)
                 progress_callback_url = data.get('progress_callback_url')
+                dojo_job_id = data.get('job_id')
                 processing_options = data.get('processing_options', {})
                 
                 # Validation
@@ -1271,6 +1358,7 @@ IMPORTANT: Base your answer ONLY on the visual analysis above. If no meaningful
                 
                 for deck_id in deck_ids:
                     try:
+                        self._yield_to_interactive_tasks()
                         logger.info(f"Processing deck {deck_id} with template '{template_name}'")
                         
                         # Get visual analysis for this deck (keys are integers after conversion)
@@ -1326,7 +1414,8 @@ IMPORTANT: Base your answer ONLY on the visual analysis above. If no meaningful
                                         requests.post(progress_callback_url, json={
                                             "deck_id": deck_id,
                                             "chapter_name": chapter_name,
-                                            "status": status
+                                            "status": status,
+                                            "job_id": dojo_job_id
                                         }, timeout=5)
                                     except Exception as e:
                                         logger.warning(f"Failed to send progress callback: {e}")
@@ -1357,9 +1446,9 @@ IMPORTANT: Base your answer ONLY on the visual analysis above. If no meaningful
                                 company_id = result[1] if len(result) > 1 else "dojo"  # Use actual company_id or fallback
                                 full_pdf_path = str(Path(config.mount_path) / pdf_path)
                                 
-                                # Create analyzer and run full analysis
-                                from utils.healthcare_template_analyzer import HealthcareTemplateAnalyzer
-                                analyzer = HealthcareTemplateAnalyzer()
+                                # Create a session on the shared engine and run full analysis
+                                from utils.healthcare_template_analyzer import analysis_engine_cache
+                                analyzer = analysis_engine_cache.get().new_session(deck_id=deck_id)
                                 
                                 # The analyzer will load the template from database using template_id
                                 # We need to set the template config before calling analyze_pdf (unless extraction_only)
@@ -1571,15 +1660,6 @@ Please provide a comprehensive analysis focusing on the requested areas."""
             logger.error(f"Error formatting template analysis: {e}")
             return f"Error formatting analysis results: {str(e)}"
     
-    def _get_visual_analysis_for_deck(self, deck_id: int) -> Dict:
-        """Get cached visual analysis for a single deck"""
-        try:
-            cached_analysis = self._get_cached_visual_analysis([deck_id])
-            return cached_analysis.get(deck_id, {})
-        except Exception as e:
-            logger.error(f"Error getting visual analysis for deck {deck_id}: {e}")
-            return {}
-
     def _format_visual_analysis_for_extraction(self, visual_analysis: Dict) -> str:
         """Format visual analysis data for extraction prompts"""
         try:
@@ -1637,22 +1717,53 @@ Please provide a comprehensive analysis focusing on the requested areas."""
             logger.error(f"Error getting cached visual analysis from backend: {e}")
             return {}
     
-    def _run_extraction_step(self, deck_ids: List[int], prompt: str, text_model: str, extraction_type: str) -> List[Dict]:
-        """Run a single extraction step for multiple decks"""
-        extraction_results = []
+    def _map_concurrently(self, worker: Callable[[Any], Any], items: List[Any]) -> List[Any]:
+        """Run worker over items on the text model pool, keeping the input order"""
+        if not items:
+            return []
+        with ThreadPoolExecutor(max_workers=min(config.text_model_concurrency, len(items))) as executor:
+            return list(executor.map(worker, items))
+    
+    def _run_classification_batch(self, model: str, shared_context: str, items: List[Dict[str, Any]],
+                                  options: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Classify items concurrently, yielding each result as soon as it completes"""
+        def classify_item(item):
+            try:
+                # Shared context first, so Ollama can reuse the cached prompt prefix across items
+                response = ollama.generate(
+                    model=model,
+                    prompt=f"{shared_context}{item['prompt']}",
+                    options=options
+                )
+                return {"id": item.get("id"), "success": True, "response": response['response']}
+            except Exception as e:
+                logger.error(f"Error classifying batch item {item.get('id')}: {e}")
+                return {"id": item.get("id"), "success": False, "error": str(e)}
         
-        for deck_id in deck_ids:
+        if not items:
+            return
+        with ThreadPoolExecutor(max_workers=min(config.text_model_concurrency, len(items))) as executor:
+            futures = [executor.submit(classify_item, item) for item in items]
+            for future in as_completed(futures):
+                yield future.result()
+    
+    def _run_extraction_step(self, deck_ids: List[int], prompt: str, text_model: str, extraction_type: str,
+                             visual_analysis_by_deck: Optional[Dict[int, Dict]] = None) -> List[Dict]:
+        """Run a single extraction step for multiple decks, reusing prefetched visual analysis when given"""
+        if visual_analysis_by_deck is None:
+            visual_analysis_by_deck = self._get_cached_visual_analysis(deck_ids)
+        
+        def extract_deck(deck_id):
             try:
                 # Get visual analysis for this deck
-                visual_analysis = self._get_visual_analysis_for_deck(deck_id)
+                visual_analysis = visual_analysis_by_deck.get(deck_id, {})
                 
                 if not visual_analysis or 'visual_analysis_results' not in visual_analysis:
                     logger.warning(f"No visual analysis found for deck {deck_id}")
-                    extraction_results.append({
+                    return {
                         "deck_id": deck_id,
                         f"{extraction_type}": "No visual analysis available for extraction"
-                    })
-                    continue
+                    }
                 
                 # Format visual analysis for extraction prompt
                 visual_context = self._format_visual_analysis_for_extraction(visual_analysis)
@@ -1684,23 +1795,22 @@ IMPORTANT: Base your answer ONLY on the visual analysis above. If no meaningful
                 
                 extraction_result = response['message']['content']
                 
-                extraction_results.append({
+                logger.info(f"Completed {extraction_type} for deck {deck_id}")
+                return {
                     "deck_id": deck_id,
                     f"{extraction_type}": extraction_result,
                     "text_model_used": text_model
-                })
-                
-                logger.info(f"Completed {extraction_type} for deck {deck_id}")
+                }
                 
             except Exception as e:
                 logger.error(f"Error in {extraction_type} for deck {deck_id}: {e}")
-                extraction_results.append({
+                return {
                     "deck_id": deck_id,
                     f"{extraction_type}": f"Error: {str(e)}",
                     "text_model_used": text_model
-                })
+                }
         
-        return extraction_results
+        return self._map_concurrently(extract_deck, deck_ids)
     
     def _save_extraction_experiment(self, experiment_name: str, deck_ids: List[int], results: List[Dict], experiment_type: str) -> int:
         """Save extraction experiment results to database via HTTP"""
@@ -1732,53 +1842,45 @@ IMPORTANT: Base your answer ONLY on the visual analysis above. If no meaningful
             return 0
     
     def _run_classification_step(self, deck_ids: List[int], offering_results: List[Dict]) -> List[Dict]:
-        """Run classification step using offering results"""
-        classification_results = []
+        """Run classification step using offering results, in one backend batch request"""
+        offerings = {}
+        for result in offering_results:
+            if result.get('deck_id') in deck_ids and result.get('offering_extraction'):
+                offerings[str(result['deck_id'])] = result['offering_extraction']
         
-        for deck_id in deck_ids:
+        classifications = {}
+        error = None
+        if offerings:
             try:
-                # Find offering result for this deck
-                deck_offering = None
-                for result in offering_results:
-                    if result.get('deck_id') == deck_id:
-                        deck_offering = result.get('offering_extraction', '')
-                        break
-                
-                if not deck_offering:
-                    classification_results.append({
-                        "deck_id": deck_id,
-                        "classification_result": {"error": "No offering available for classification"}
-                    })
-                    continue
-                
                 # Use internal classification endpoint (no authentication required)
                 import requests
                 backend_url = os.getenv('BACKEND_PRODUCTION', 'http://65.108.32.168:8000')
-                response = requests.post(f"{backend_url}/api/dojo/internal/classify",
+                response = requests.post(f"{backend_url}/api/dojo/internal/classify-batch",
                     json={
-                        "company_offering": deck_offering
+                        "company_offerings": offerings
                     },
-                    timeout=30
+                    timeout=max(30, 10 * len(offerings))
                 )
                 
                 if response.status_code == 200:
-                    classification_data = response.json()
-                    classification_results.append({
-                        "deck_id": deck_id,
-                        "classification_result": classification_data
-                    })
+                    classifications = response.json().get("classifications", {})
                 else:
-                    classification_results.append({
-                        "deck_id": deck_id,
-                        "classification_result": {"error": f"Classification failed: {response.status_code}"}
-                    })
+                    error = f"Classification failed: {response.status_code}"
                 
             except Exception as e:
-                logger.error(f"Error in classification for deck {deck_id}: {e}")
-                classification_results.append({
-                    "deck_id": deck_id,
-                    "classification_result": {"error": str(e)}
-                })
+                logger.error(f"Error in batch classification for {len(offerings)} decks: {e}")
+                error = str(e)
+        
+        classification_results = []
+        for deck_id in deck_ids:
+            if str(deck_id) not in offerings:
+                classification_result = {"error": "No offering available for classification"}
+            else:
+                classification_result = classifications.get(str(deck_id)) or {"error": error or "No classification returned"}
+            classification_results.append({
+                "deck_id": deck_id,
+                "classification_result": classification_result
+            })
         
         return classification_results
     
@@ -1899,6 +2001,56 @@ IMPORTANT: Base your answer ONLY on the visual analysis above. If no meaningful
             logger.error(f"Error loading template {template_id}: {e}")
             return {}
     
+    def _run_dojo_visual_analysis(self, deck_id: int, file_path: str, company_id: str,
+                                  vision_model: Optional[str], analysis_prompt: Optional[str]) -> Dict[str, Any]:
+        """Visual analysis and slide feedback of one dojo deck, cached to the backend right away"""
+        # Use the healthcare template analyzer for visual analysis
+        from utils.healthcare_template_analyzer import analysis_engine_cache
+        
+        # Session on the shared engine - configured models and prompts from database,
+        # only overridden if explicitly provided (not None)
+        analyzer = analysis_engine_cache.get().new_session(
+            deck_id=deck_id, vision_model=vision_model, image_analysis_prompt=analysis_prompt
+        )
+        if vision_model:
+            logger.info(f"Overriding vision model to: {vision_model}")
+        if analysis_prompt:
+            logger.info(f"Overriding analysis prompt")
+        
+        # Run visual analysis with actual company_id
+        full_pdf_path = str(Path(config.mount_path) / file_path)
+        analyzer._analyze_visual_content(full_pdf_path, company_id=company_id, deck_id=deck_id)
+        
+        # Generate slide feedback after visual analysis
+        logger.info(f"Generating slide feedback for deck {deck_id}")
+        analyzer._generate_slide_feedback()
+        
+        # Format results for caching
+        visual_results = {
+            "visual_analysis_results": analyzer.visual_analysis_results
+        }
+        if analyzer.page_routing:
+            visual_results["page_routing"] = analyzer.page_routing
+        
+        # Cache result immediately to backend
+        self._cache_visual_analysis_result(deck_id, visual_results, vision_model, analysis_prompt)
+        
+        logger.info(f"Completed visual analysis for deck {deck_id}")
+        return visual_results
+
+    def _yield_to_interactive_tasks(self):
+        """Pause a direct dojo batch between decks while this server runs interactive queue work"""
+        deadline = time.monotonic() + config.batch_yield_max_seconds
+        waiting = False
+        while not self.shutdown_flag and time.monotonic() < deadline:
+            with self.in_flight_lock:
+                if "interactive" not in self.in_flight_tasks.values():
+                    break
+            if not waiting:
+                logger.info("⏸️ Pausing dojo batch while interactive queue tasks run")
+                waiting = True
+            time.sleep(2)
+
     def _cache_visual_analysis_result(self, deck_id: int, visual_results: Dict, vision_model: str, analysis_prompt: str):
         """Cache visual analysis result immediately to backend"""
         try:
@@ -2176,6 +2328,7 @@ IMPORTANT: Base your answer ONLY on the visual analysis above. If no meaningful
                     # Layer 1 & 2: Vision Container tasks
                     "visual_analysis": True,
                     "slide_feedback": True,
+                    "dojo_visual_analysis": True,
                     # Layer 3: Text Container main task
                     "extractions_and_template": True,
                     # Layer 4: Text Container specialized tasks
@@ -2185,7 +2338,7 @@ IMPORTANT: Base your answer ONLY on the visual analysis above. If no meaningful
                     # Legacy compatibility
                     "pdf_analysis": True
                 },
-                "max_concurrent_tasks": 3
+                "max_concurrent_tasks": self.queue_concurrency
             }
             
             response = requests.post(
@@ -2207,29 +2360,41 @@ IMPORTANT: Base your answer ONLY on the visual analysis above. If no meaningful
             return False
 
     def send_heartbeat(self):
-        """Send periodic heartbeat to backend to maintain server registration"""
+        """Send periodic heartbeat to backend to maintain server registration and renew task leases"""
+        # Several heartbeats per lease, so one lost request does not let a running task expire
+        interval = min(30, max(config.task_lease_seconds // 4, 1))
         while not self.shutdown_flag:
             try:
                 if self.is_registered:
+                    with self.in_flight_lock:
+                        task_ids = sorted(self.in_flight_tasks)
                     response = requests.post(
                         f"{self.backend_url}/api/internal/server-heartbeat",
-                        json={"server_id": self.server_id},
+                        json={
+                            "server_id": self.server_id,
+                            "task_ids": task_ids,
+                            "lease_seconds": config.task_lease_seconds
+                        },
                         timeout=10
                     )
                     
                     if response.status_code == 200:
                         logger.debug(f"💓 Heartbeat sent for server {self.server_id}")
+                        lost_task_ids = response.json().get("lost_task_ids") or []
+                        if lost_task_ids:
+                            # The lease ran out before this heartbeat; the sweeper may already have requeued them
+                            logger.warning(f"⚠️ Lost the leases of tasks {lost_task_ids}, another server may pick them up")
                     else:
                         logger.warning(f"⚠️ Heartbeat failed: {response.status_code}")
                         # Try to re-register if heartbeat fails
                         self.is_registered = False
                         self.register_with_queue_system()
                 
-                time.sleep(30)  # Send heartbeat every 30 seconds
+                time.sleep(interval)
                 
             except Exception as e:
                 logger.error(f"❌ Heartbeat error: {e}")
-                time.sleep(30)
+                time.sleep(interval)
 
     def poll_for_queue_tasks(self):
         """Poll the backend for available processing queue tasks"""
@@ -2247,6 +2412,7 @@ IMPORTANT: Base your answer ONLY on the visual analysis above. If no meaningful
                                 # Layer 1 & 2: Vision Container tasks
                                 "visual_analysis": True,
                                 "slide_feedback": True,
+                                "dojo_visual_analysis": True,
                                 # Layer 3: Text Container main task
                                 "extractions_and_template": True,
                                 # Layer 4: Text Container specialized tasks
@@ -2254,7 +2420,11 @@ IMPORTANT: Base your answer ONLY on the visual analysis above. If no meaningful
                                 "specialized_regulatory": True,
                                 "specialized_science": True,
                                 # Legacy compatibility
-                                "pdf_analysis": True
+                                "pdf_analysis": True,
+                                # Short lease, kept alive by the heartbeat while the task runs
+                                "lease_seconds": config.task_lease_seconds,
+                                # Loaded models, so the queue can prefer tasks that avoid a model swap
+                                **model_residency_tracker.claim_hints(self._models_by_kind())
                             }
                         },
                         timeout=10
@@ -2290,12 +2460,17 @@ IMPORTANT: Base your answer ONLY on the visual analysis above. If no meaningful
         task_type = task_data.get("task_type")
         document_id = task_data.get("document_id")
         
-        logger.info(f"🚀 Processing queue task {task_id}: {task_type} for document {document_id}")
+        logger.info(f"🚀 Processing queue task {task_id}: {task_type} for document {document_id} ({task_data.get('lane', 'interactive')} lane)")
         
+        with self.in_flight_lock:
+            self.in_flight_tasks[task_id] = task_data.get("lane") or "interactive"
         try:
             # Update task status to processing
             self.update_task_status(task_id, "processing", "Task picked up by GPU server")
             
+            # Load the task's models up front and keep them resident for following same-model tasks
+            model_residency_tracker.prepare(task_type, self._task_models(task_data))
+            
             # Route task based on type (4-layer container architecture)
             if task_type == "visual_analysis":
                 # Vision Container: Visual analysis of PDF pages
@@ -2303,6 +2478,9 @@ IMPORTANT: Base your answer ONLY on the visual analysis above. If no meaningful
             elif task_type == "slide_feedback":
                 # Vision Container: Slide feedback generation
                 success = self.process_slide_feedback_task(task_data)
+            elif task_type == "dojo_visual_analysis":
+                # Vision Container: One deck of a dojo visual analysis batch
+                success = self.process_dojo_visual_analysis_task(task_data)
             elif task_type == "extractions_and_template":
                 # Text Container: Main processing (extractions + template)
                 success = self.process_extractions_and_template_task(task_data)
@@ -2320,6 +2498,8 @@ IMPORTANT: Base your answer ONLY on the visual analysis above. If no meaningful
             if success:
                 self.update_task_status(task_id, "completed", "Task completed successfully")
                 logger.info(f"✅ Completed queue task {task_id}")
+                # Results are saved; checkpoints only matter for failed or interrupted attempts
+                task_checkpoint_store.clear(self.pdf_processor.analyzer.database_url, task_id)
             else:
                 # Enhanced failure reporting - check if we have detailed failure information
                 if hasattr(self, '_last_task_failure_details'):
@@ -2334,6 +2514,32 @@ IMPORTANT: Base your answer ONLY on the visual analysis above. If no meaningful
         except Exception as e:
             logger.error(f"❌ Error processing queue task {task_id}: {e}")
             self.update_task_status(task_id, "failed", f"Task error: {str(e)}")
+        finally:
+            with self.in_flight_lock:
+                self.in_flight_tasks.pop(task_id, None)
+
+    def _models_by_kind(self, engine=None) -> Dict[str, List[str]]:
+        """Models of the analyzer engine per task kind ('vision' / 'text'); the last built engine by default"""
+        if engine is None:
+            from utils.healthcare_template_analyzer import analysis_engine_cache
+            engine = analysis_engine_cache.current
+        if engine is None:
+            return {}
+        return {"vision": [engine.vision_model], "text": [engine.text_model, engine.scoring_model]}
+
+    def _task_models(self, task_data: Dict[str, Any]) -> List[str]:
+        """Models a queue task will run on"""
+        try:
+            from utils.healthcare_template_analyzer import analysis_engine_cache
+            models = self._models_by_kind(analysis_engine_cache.get())
+        except Exception as e:
+            logger.warning(f"Could not determine models for task {task_data.get('task_id')}: {e}")
+            models = {}
+        kind = model_kind(task_data.get("task_type", ""))
+        vision_model = (task_data.get("processing_options") or {}).get("vision_model")
+        if kind == "vision" and vision_model:
+            return [vision_model]
+        return models.get(kind, [])
 
     def update_task_status(self, task_id: int, status: str, message: str):
         """Update task status in the processing queue"""
@@ -2402,7 +2608,7 @@ IMPORTANT: Base your answer ONLY on the visual analysis above. If no meaningful
             logger.info(f"👁️ Processing visual analysis task {task_id} for document {document_id}")
             
             # Use the new visual analysis method from PDF processor
-            success = self.pdf_processor.process_visual_analysis(file_path, document_id)
+            success = self.pdf_processor.process_visual_analysis(file_path, document_id, task_id=task_id)
             
             if success:
                 logger.info(f"✅ Visual analysis completed for document {document_id}")
@@ -2415,6 +2621,24 @@ IMPORTANT: Base your answer ONLY on the visual analysis above. If no meaningful
             logger.error(f"❌ Error in visual analysis task: {e}")
             return False
 
+    def process_dojo_visual_analysis_task(self, task_data: Dict[str, Any]) -> bool:
+        """Process one deck of a dojo visual analysis batch (Vision Container, batch lane)"""
+        try:
+            options = task_data.get("processing_options") or {}
+            document_id = task_data.get("document_id")
+            
+            logger.info(f"👁️ Processing dojo visual analysis task {task_data.get('task_id')} for deck {document_id}")
+            
+            visual_results = self._run_dojo_visual_analysis(
+                document_id, task_data.get("file_path"), task_data.get("company_id") or "dojo",
+                options.get("vision_model"), options.get("analysis_prompt")
+            )
+            return bool(visual_results.get("visual_analysis_results"))
+            
+        except Exception as e:
+            logger.error(f"❌ Error in dojo visual analysis task: {e}")
+            return False
+
     def process_slide_feedback_task(self, task_data: Dict[str, Any]) -> bool:
         """Process slide feedback task (Vision Container)"""
         try:
@@ -2500,7 +2724,9 @@ IMPORTANT: Base your answer ONLY on the visual analysis above. If no meaningful
             result = self.pdf_processor.process_extractions_and_template(
                 file_path=file_path,
                 company_id=company_id,
-                deck_id=document_id
+                deck_id=document_id,
+                previous_document_id=(task_data.get("processing_options") or {}).get("previous_document_id"),
+                task_id=task_id
             )
             
             success = result.get("success", False)
@@ -17,6 +17,7 @@ import logging
 
 # Import the new healthcare template analyzer
 from utils.healthcare_template_analyzer import HealthcareTemplateAnalyzer
+from utils.task_checkpoints import task_checkpoint_store
 
 # Configure logging
 logging.basicConfig(
@@ -39,7 +40,8 @@ class PDFProcessor:
     # OLD MONOLITHIC METHOD REMOVED - Now using 4 separate methods:
     # process_visual_analysis(), process_slide_feedback(), 
     # process_extractions_and_template(), process_specialized_analysis()
-    def process_extractions_and_template(self, file_path: str, company_id: str = None, deck_id: int = None) -> Dict[str, Any]:
+    def process_extractions_and_template(self, file_path: str, company_id: str = None, deck_id: int = None,
+                                         previous_document_id: int = None, task_id: int = None) -> Dict[str, Any]:
         """
         Text Container AI processing using the HealthcareTemplateAnalyzer
         
@@ -54,6 +56,10 @@ class PDFProcessor:
         
         Specialized analysis tasks (handled separately):
         - Clinical validation, regulatory, scientific analyses
+        
+        previous_document_id: earlier version of a revised deck; template answers whose
+        slides did not change are carried forward from it
+        task_id: queue task; answered questions are checkpointed so a retry resumes
         """
         logger.info(f"Running text container healthcare analysis... (deck_id: {deck_id})")
         current_stage = "initialization"
@@ -64,7 +70,15 @@ class PDFProcessor:
             
             # Use the healthcare template analyzer for text processing only
             # Visual analysis results will be retrieved from cache by the analyzer
-            results = self.analyzer.analyze_pdf(file_path, company_id, deck_id=deck_id)
+            processing_options = {"previous_document_id": previous_document_id} if previous_document_id else None
+            session = self.analyzer.new_session(deck_id=deck_id)
+            if task_id:
+                session.checkpoints = task_checkpoint_store.open(self.analyzer.database_url, task_id)
+            try:
+                results = session.analyze_pdf(file_path, company_id, deck_id=deck_id, processing_options=processing_options)
+            finally:
+                if session.checkpoints:
+                    session.checkpoints.close()
             
             current_stage = "results_enhancement"
             logger.info(f"🔍 Starting stage: {current_stage}")
@@ -336,8 +350,10 @@ class PDFProcessor:
             return []
 
 
-    def process_visual_analysis(self, pdf_path: str, document_id: int) -> bool:
-        """Process visual analysis for a PDF document (Vision Container task)"""
+    def process_visual_analysis(self, pdf_path: str, document_id: int, task_id: int = None) -> bool:
+        """Process visual analysis for a PDF document (Vision Container task)
+
+        With a queue task_id, every analyzed page is checkpointed so a retry resumes."""
         try:
             logger.info(f"👁️ Processing visual analysis for document {document_id}: {pdf_path}")
             
@@ -351,14 +367,20 @@ class PDFProcessor:
             path_parts = pdf_path.split('/')
             company_id = path_parts[0] if len(path_parts) > 1 else 'unknown'
             
-            # Initialize analyzer and run only visual analysis
-            self.analyzer.visual_analysis_results = []
-            self.analyzer._analyze_visual_content(full_path, company_id, document_id)
+            # Run only visual analysis in a session of its own
+            session = self.analyzer.new_session(deck_id=document_id)
+            if task_id:
+                session.checkpoints = task_checkpoint_store.open(self.analyzer.database_url, task_id)
+            try:
+                session._analyze_visual_content(full_path, company_id, document_id)
+            finally:
+                if session.checkpoints:
+                    session.checkpoints.close()
             
-            if self.analyzer.visual_analysis_results:
-                logger.info(f"✅ Visual analysis completed: {len(self.analyzer.visual_analysis_results)} pages analyzed")
+            if session.visual_analysis_results:
+                logger.info(f"✅ Visual analysis completed: {len(session.visual_analysis_results)} pages analyzed")
                 # Cache the visual analysis results for downstream tasks
-                self.analyzer._save_visual_analysis(document_id)
+                session._save_visual_analysis(document_id)
                 logger.info(f"💾 Cached visual analysis results for document {document_id}")
                 return True
             else:
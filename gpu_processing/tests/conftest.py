@@ -44,6 +44,32 @@ def mock_ollama():
                     }
 
 
+@pytest.fixture
+def analyzer_session(tmp_path):
+    """Factory for analysis sessions on a HealthcareTemplateAnalyzer built without Ollama or a database.
+
+    Tests pick the deck, models, visual results, page routing mode and checkpoints of each session.
+    """
+    from utils.healthcare_template_analyzer import HealthcareTemplateAnalyzer
+
+    def new_session(deck_id=7, model="gemma3:12b", visual_analysis_results=None, page_routing_mode="vision",
+                    checkpoints=None):
+        engine = HealthcareTemplateAnalyzer.__new__(HealthcareTemplateAnalyzer)
+        engine.vision_model = engine.text_model = engine.scoring_model = model
+        engine.image_analysis_prompt = "Describe this slide"
+        engine.database_url = "postgresql://unused"
+        engine.get_model_options = Mock(return_value={"num_ctx": 8192, "num_predict": 2048})
+        engine._get_company_info_from_path = Mock(return_value=("acme", "deck", deck_id))
+        engine._create_project_directories = Mock(return_value=str(tmp_path))
+        engine.task_validator = Mock()
+        session = engine.new_session(deck_id=deck_id, visual_analysis_results=visual_analysis_results)
+        session.page_routing_mode = page_routing_mode
+        session.checkpoints = checkpoints
+        return session
+
+    return new_session
+
+
 @pytest.fixture
 def mock_pdf_processing():
     """Mock PDF processing libraries."""
@@ -0,0 +1,70 @@
+import pytest
+from unittest.mock import MagicMock, patch
+
+from utils.healthcare_template_analyzer import AnalysisEngineCache, AnalysisSession, HealthcareTemplateAnalyzer
+
+
+@pytest.fixture
+def engine():
+    """Engine with its configuration set by hand instead of loaded from the database."""
+    engine = HealthcareTemplateAnalyzer.__new__(HealthcareTemplateAnalyzer)
+    engine.backend_base_url = "http://localhost:8000"
+    engine.vision_model = "vision:latest"
+    engine.text_model = "text:latest"
+    engine.scoring_model = "scoring:latest"
+    engine.image_analysis_prompt = "Describe this slide"
+    engine._lock = MagicMock()
+    engine._model_options = {}
+    engine._prompts = {}
+    engine._get_model_options = MagicMock(side_effect=lambda text, vision, scoring: {"num_ctx": 32768, "model": text})
+    return engine
+
+
+class TestAnalysisSession:
+    """Test per-document sessions on a shared analyzer engine."""
+
+    def test_sessions_keep_separate_state(self, engine):
+        """Results of one document never leak into another document's session."""
+        first = engine.new_session(deck_id=1, visual_analysis_results=[{"page_number": 1}],
+                                   extraction_data={"company_offering": "Diagnostics", "company_name": "Acme"})
+        second = engine.new_session(deck_id=2)
+
+        first.chapter_results["problem"] = {"score": 5}
+
+        assert isinstance(first, AnalysisSession)
+        assert first.startup_name == "Acme"
+        assert second.company_offering == ""
+        assert second.chapter_results == {}
+        assert second.visual_analysis_results == []
+        assert not hasattr(engine, "chapter_results")
+
+    def test_model_overrides_are_per_session(self, engine):
+        """Overriding a model changes only that session; options are computed once per combination."""
+        custom = engine.new_session(text_model="custom:7b", scoring_model="custom:7b")
+        default = engine.new_session()
+        again = engine.new_session(text_model="custom:7b", scoring_model="custom:7b")
+
+        assert custom.text_model == "custom:7b"
+        assert default.text_model == engine.text_model == "text:latest"
+        assert custom.vision_model == "vision:latest"
+        assert custom.image_analysis_prompt == "Describe this slide"
+        assert again.model_options is custom.model_options
+        assert engine._get_model_options.call_count == 2
+
+    def test_engine_reused_until_configuration_changes(self):
+        """The cache builds a new engine only when the model/prompt signature changes."""
+        factory = MagicMock(side_effect=lambda: object())
+        cache = AnalysisEngineCache(factory=factory)
+        cursor = MagicMock()
+        cursor.fetchone.side_effect = [("a",), ("a",), ("b",)]
+
+        with patch("utils.healthcare_template_analyzer.psycopg2.connect") as connect:
+            connect.return_value.cursor.return_value = cursor
+            first, second, third = cache.get(), cache.get(), cache.get()
+
+            assert first is second
+            assert third is not first
+            assert factory.call_count == 2
+
+            connect.side_effect = Exception("database unavailable")
+            assert cache.get() is third
@@ -0,0 +1,47 @@
+from unittest.mock import MagicMock, patch
+
+from utils.bulk_writes import bulk_upsert, unique_rows
+from utils.healthcare_template_analyzer import HealthcareTemplateAnalyzer
+
+
+def feedback(slide_number, text="Too much text"):
+    return {"deck_id": 7, "slide_number": slide_number, "slide_filename": f"slide_{slide_number}.jpg",
+            "feedback_text": text, "has_issues": text is not None}
+
+
+class TestBulkWrites:
+    """Test multi-row upserts of GPU results."""
+
+    def test_bulk_upsert_sends_one_statement(self):
+        """All rows go out in a single execute_values page with the upsert clause."""
+        cursor = MagicMock()
+        rows = [{"id": number, "value": f"v{number}"} for number in range(50)]
+
+        with patch("utils.bulk_writes.execute_values") as execute_values:
+            assert bulk_upsert(cursor, "results", ["id", "value"], rows, ["id"], ["value"]) == 50
+
+        execute_values.assert_called_once()
+        _, query, values = execute_values.call_args.args
+        assert query == "INSERT INTO results (id, value) VALUES %s ON CONFLICT (id) DO UPDATE SET value = EXCLUDED.value"
+        assert len(values) == 50
+        assert execute_values.call_args.kwargs["page_size"] == 50
+
+    def test_duplicate_keys_keep_last_row(self):
+        """A conflict key may only appear once per statement; the latest row wins."""
+        rows = [{"id": 1, "value": "old"}, {"id": 2, "value": "b"}, {"id": 1, "value": "new"}]
+        assert unique_rows(rows, ["id"]) == [{"id": 1, "value": "new"}, {"id": 2, "value": "b"}]
+
+    def test_slide_feedback_saved_in_one_transaction(self):
+        """A deck's slide feedback uses one connection, one statement and one commit."""
+        analyzer = HealthcareTemplateAnalyzer.__new__(HealthcareTemplateAnalyzer)
+        analyzer.database_url = "postgresql://localhost/test"
+
+        with patch("utils.bulk_writes.psycopg2.connect") as connect, \
+                patch("utils.bulk_writes.execute_values") as execute_values:
+            assert analyzer._save_slide_feedback(7, [feedback(number) for number in range(1, 51)]) is True
+
+        connect.assert_called_once_with("postgresql://localhost/test")
+        execute_values.assert_called_once()
+        assert len(execute_values.call_args.args[2]) == 50
+        connect.return_value.__exit__.assert_called_once()
+        connect.return_value.close.assert_called_once()
@@ -0,0 +1,107 @@
+import json
+from unittest.mock import MagicMock, patch
+
+from utils.deck_versions import diff_slide_versions, question_context_hash
+from utils.slide_cache import text_hash
+
+TITLE = "Title slide: CardioSense remote heart monitoring."
+CLINICAL = "Clinical study: 400 patient randomized trial."
+REGULATORY = "Regulatory: FDA 510(k) clearance planned."
+CLINICAL_V2 = "Clinical study: 1200 patient multicenter trial completed."
+
+
+def page(page_number, slide_hash, detail, description):
+    """A stored page whose text layer is its description."""
+    return {"page_number": page_number, "slide_hash": slide_hash, "slide_text_hash": text_hash(description),
+            "slide_detail_hash": detail * 64, "description": description}
+
+
+PREVIOUS = [
+    page(1, "00000000000000ff", "1", TITLE),
+    page(2, "0000ffff00000000", "2", CLINICAL),
+    page(3, "ff00000000000000", "3", REGULATORY),
+]
+# Version two: slide 1 re-exported (one bit off), regulatory slide moved up, clinical slide rewritten
+# on the same template, so its 64-bit hash equals the old clinical slide's
+CURRENT = [
+    page(1, "00000000000001ff", "4", TITLE),
+    page(2, "ff00000000000000", "3", REGULATORY),
+    page(3, "0000ffff00000000", "5", CLINICAL_V2),
+]
+QUESTIONS = [
+    {"question_id": 1, "question_text": "How strong is the clinical trial evidence?"},
+    {"question_id": 2, "question_text": "Which FDA regulatory pathway is planned?"},
+]
+
+
+def session(analyzer_session, visual_analysis_results):
+    analysis = analyzer_session(deck_id=12, model="phi4:latest", visual_analysis_results=visual_analysis_results)
+    analysis.deck_context_tokens = 16
+    analysis.template_config = {"chapters": [
+        {"id": 11, "chapter_id": "clinical_evidence", "name": "Clinical Evidence", "questions": QUESTIONS[:1]},
+        {"id": 12, "chapter_id": "regulatory", "name": "Regulatory", "questions": QUESTIONS[1:]},
+    ]}
+    analysis._score_question = MagicMock(return_value=(6, "Score: 6"))
+    return analysis
+
+
+def stored_chapter_rows(analysis):
+    """chapter_analysis_results rows of a finished analysis, as the backend saves its chapter_analysis payload."""
+    chapter_analysis = analysis._format_healthcare_results(processing_time=1.0)["chapter_analysis"]
+    return [(chapter["template_chapter_id"], json.dumps(chapter)) for chapter in chapter_analysis.values()]
+
+
+class TestDeckVersions:
+    """Test slide diffs and carried-forward answers for revised decks."""
+
+    def test_slide_diff(self):
+        """Moved slides are unchanged; rewritten slides are changed even when their layout hash matches."""
+        diff = diff_slide_versions(PREVIOUS, CURRENT, max_distance=3)
+        assert diff["unchanged"] == {1: 1, 2: 3}
+        assert diff["changed"] == [3]
+        assert diff["removed"] == [2]
+
+        exact = diff_slide_versions(PREVIOUS, CURRENT, max_distance=0)
+        assert exact["unchanged"] == {2: 3}
+        assert exact["changed"] == [1, 3]
+
+    def test_pages_without_slide_key_are_changed(self):
+        legacy = [{"page_number": 1, "slide_hash": "00000000000000ff", "description": TITLE}]
+        diff = diff_slide_versions(legacy, CURRENT[:1], max_distance=3)
+        assert diff["changed"] == [1]
+        assert not diff["hashed"]
+
+    def test_context_hash_tracks_question_and_slides(self):
+        base = question_context_hash(QUESTIONS[0], "deck text", "phi4", "phi4")
+        assert base == question_context_hash(QUESTIONS[0], "deck text", "phi4", "phi4")
+        assert base != question_context_hash(QUESTIONS[0], "new deck text", "phi4", "phi4")
+        assert base != question_context_hash(QUESTIONS[1], "deck text", "phi4", "phi4")
+        assert base != question_context_hash(QUESTIONS[0], "deck text", "gemma3:12b", "phi4")
+
+    def test_only_questions_with_changed_slides_rerun(self, analyzer_session):
+        """The regulatory answer carries forward with provenance; the clinical question is re-analyzed."""
+        first = session(analyzer_session, PREVIOUS)
+        with patch("utils.healthcare_template_analyzer.ollama.generate", return_value={"response": "First answer"}):
+            first._execute_template_analysis()
+
+        second = session(analyzer_session, CURRENT)
+        second.current_deck_id = 13
+        rows = stored_chapter_rows(first)
+        assert [chapter_id for chapter_id, _ in rows] == [11, 12]
+        connection = MagicMock()
+        connection.cursor.return_value.fetchall.return_value = rows
+        with patch("utils.healthcare_template_analyzer.psycopg2.connect", return_value=connection), \
+                patch.object(second, "_fetch_cached_visual_analysis", return_value=PREVIOUS):
+            second._load_previous_version(12)
+        assert set(second.previous_question_results) == {1, 2}
+        with patch("utils.healthcare_template_analyzer.ollama.generate", return_value={"response": "New answer"}) as generate:
+            second._execute_template_analysis()
+
+        generate.assert_called_once()
+        assert "1200 patient" in generate.call_args.kwargs["prompt"]
+        clinical, regulatory = second.question_results[1], second.question_results[2]
+        assert clinical["response"] == "New answer" and clinical["analyzed_in_document_id"] == 13
+        assert regulatory["response"] == "First answer"
+        assert regulatory["score"] == 6
+        assert regulatory["carried_forward_from"] == 12
+        assert regulatory["analyzed_in_document_id"] == 12
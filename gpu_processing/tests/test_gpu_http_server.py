@@ -386,6 +386,57 @@ class TestConcurrentRequests:
                 assert data['success'] is True
 
 
+class TestExtractionVisualAnalysisPrefetch:
+    """Test suite for sharing cached visual analysis across extraction steps."""
+
+    def test_extraction_step_uses_prefetched_visual_analysis(self):
+        """Prefetched visual analysis is used without calling the backend again."""
+        server = GPUHTTPServer.__new__(GPUHTTPServer)  # Skip __init__, it needs the database
+        visual_analysis = {1: {"visual_analysis_results": [{"page_number": 1, "description": "Team slide"}]}}
+
+        with patch.object(GPUHTTPServer, '_get_cached_visual_analysis') as mock_fetch, \
+             patch('ollama.chat', return_value={"message": {"content": "Acme Health"}}) as mock_chat:
+            results = server._run_extraction_step([1, 2], "Extract the company name", "gemma3:12b",
+                                                  'company_name_extraction', visual_analysis)
+
+        mock_fetch.assert_not_called()
+        assert mock_chat.call_count == 1
+        assert "Slide 1: Team slide" in mock_chat.call_args.kwargs['messages'][0]['content']
+        assert results[0]['company_name_extraction'] == "Acme Health"
+        assert results[1]['company_name_extraction'] == "No visual analysis available for extraction"
+
+    def test_extraction_step_fetches_batch_once_without_prefetch(self):
+        """Without prefetched data the whole batch is fetched in one call."""
+        server = GPUHTTPServer.__new__(GPUHTTPServer)
+
+        with patch.object(GPUHTTPServer, '_get_cached_visual_analysis', return_value={}) as mock_fetch:
+            server._run_extraction_step([1, 2, 3], "Extract the funding amount", "gemma3:12b", 'funding_amount_extraction')
+
+        mock_fetch.assert_called_once_with([1, 2, 3])
+
+
+class TestBatchClassification:
+    """Test suite for concurrent batch classification."""
+
+    def test_batch_prefixes_shared_context_and_yields_every_item(self):
+        """Each item prompt is prefixed with the shared context; failures are reported per item."""
+        server = GPUHTTPServer.__new__(GPUHTTPServer)
+
+        def generate(model, prompt, options):
+            if "deck 2" in prompt:
+                raise RuntimeError("model busy")
+            return {"response": '{"primary_sector": "diagnostics"}'}
+
+        items = [{"id": str(n), "prompt": f"Company Offering: deck {n}"} for n in (1, 2, 3)]
+        with patch('ollama.generate', side_effect=generate) as mock_generate:
+            results = list(server._run_classification_batch("gemma3:12b", "SECTORS\n", items, {}))
+
+        assert sorted(result["id"] for result in results) == ["1", "2", "3"]
+        assert all(call.kwargs["prompt"].startswith("SECTORS\nCompany Offering") for call in mock_generate.call_args_list)
+        failed = [result for result in results if not result["success"]]
+        assert failed == [{"id": "2", "success": False, "error": "model busy"}]
+
+
 def mock_open_for_write():
     """Helper function to mock file opening for write operations."""
     from unittest.mock import mock_open
@@ -0,0 +1,65 @@
+from unittest.mock import MagicMock
+
+from utils.model_residency import ModelResidencyTracker, model_kind
+
+
+def ollama_client(resident):
+    """Ollama client whose `ps` reports the given models, loading any model it is asked for."""
+    client = MagicMock()
+    client.ps.side_effect = lambda: {"models": [{"model": name} for name in resident]}
+    client.generate.side_effect = lambda model, prompt, keep_alive: resident.append(model if ":" in model else f"{model}:latest")
+    return client
+
+
+MODELS = {"vision": ["gemma3:12b"], "text": ["phi4:latest", "phi4:latest"]}
+
+
+class TestModelResidencyTracker:
+    """Test residency reporting, the same-kind task streak and load metrics."""
+
+    def test_task_kinds(self):
+        assert model_kind("visual_analysis") == model_kind("slide_feedback") == model_kind("dojo_visual_analysis") == "vision"
+        assert model_kind("extractions_and_template") == model_kind("specialized_clinical") == "text"
+
+    def test_claim_hints_report_resident_kinds(self):
+        """A kind counts as resident only when all its models are loaded; untagged names mean :latest."""
+        tracker = ModelResidencyTracker(client=ollama_client(["gemma3:12b"]))
+        hints = tracker.claim_hints({"vision": ["gemma3:12b"], "text": ["phi4"]})
+
+        assert hints["resident_model_kinds"] == ["vision"]
+        assert hints["resident_models"] == ["gemma3:12b"]
+        assert hints["affinity_streak"] == 0
+
+    def test_prepare_counts_only_real_loads(self):
+        """Preloading a resident model only extends keep_alive; a missing one is a timed load."""
+        resident = ["gemma3:12b"]
+        client = ollama_client(resident)
+        tracker = ModelResidencyTracker(client=client, keep_alive="30m")
+
+        tracker.prepare("visual_analysis", MODELS["vision"])
+        tracker.prepare("slide_feedback", MODELS["vision"])
+        assert tracker.metrics()["loads_total"] == 0
+        assert tracker.claim_hints(MODELS)["affinity_streak"] == 2
+
+        tracker.prepare("extractions_and_template", MODELS["text"])
+
+        client.generate.assert_called_with(model="phi4:latest", prompt="", keep_alive="30m")
+        metrics = tracker.metrics()
+        assert metrics["loads_total"] == 1
+        assert metrics["loads_per_hour"][0]["loads"] == 1
+        hints = tracker.claim_hints(MODELS)
+        assert hints["affinity_kind"] == "text"
+        assert hints["affinity_streak"] == 1
+        assert sorted(hints["resident_model_kinds"]) == ["text", "vision"]
+
+    def test_ollama_unavailable(self):
+        """Residency errors never block polling or task processing."""
+        client = MagicMock()
+        client.ps.side_effect = ConnectionError("ollama down")
+        client.generate.side_effect = ConnectionError("ollama down")
+        tracker = ModelResidencyTracker(client=client)
+
+        tracker.prepare("visual_analysis", ["gemma3:12b"])
+
+        assert tracker.claim_hints(MODELS)["resident_model_kinds"] == []
+        assert tracker.metrics()["loads_total"] == 0
@@ -0,0 +1,88 @@
+import pytest
+from io import BytesIO
+from unittest.mock import patch
+from PIL import Image
+
+fitz = pytest.importorskip("fitz")
+
+from utils.pdf_extractor import PDFExtractor, route_page
+from utils.healthcare_template_analyzer import summarize_page_routing
+from utils.slide_cache import SlideAnalysisCache
+
+BULLETS = [
+    "Problem: heart failure patients are readmitted within 30 days in one of four cases",
+    "Solution: a wearable patch streams vital signs to the cardiology team every minute",
+    "Evidence: a 400 patient randomized trial cut readmissions by 38 percent in 2024",
+    "Business model: hospitals pay a monthly fee per monitored patient under remote care codes",
+]
+
+
+@pytest.fixture
+def deck_pdf(tmp_path):
+    """Two slides: one with bullet text only, one that is a full-page picture."""
+    doc = fitz.open()
+    text_page = doc.new_page(width=960, height=540)
+    for line, bullet in enumerate(BULLETS):
+        text_page.insert_text((40, 80 + line * 40), bullet, fontsize=14)
+
+    picture = BytesIO()
+    Image.new("RGB", (320, 180), color=(30, 90, 160)).save(picture, format="PNG")
+    image_page = doc.new_page(width=960, height=540)
+    image_page.insert_image(image_page.rect, stream=picture.getvalue())
+    image_page.insert_text((40, 500), "Product photo", fontsize=12)
+
+    path = tmp_path / "deck.pdf"
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+class TestPageRouting:
+    """Test routing slides between the PDF text layer and the vision model."""
+
+    def test_page_layouts_and_routes(self, deck_pdf):
+        """Bullet slides are text-dominant, picture slides need the vision model."""
+        text_layout, image_layout = PDFExtractor().page_layouts(deck_pdf)
+
+        assert text_layout["word_count"] >= 40
+        assert text_layout["image_coverage"] == 0
+        assert image_layout["image_coverage"] > 0.9
+        assert route_page(text_layout) == "text"
+        assert route_page(image_layout) == "vision"
+        assert route_page({"word_count": 12, "image_coverage": 0.6, "drawing_count": 0}) == "vision_with_text"
+
+    def test_text_pages_skip_image_analysis(self, deck_pdf, analyzer_session):
+        """Only the picture slide is sent as an image; the routing is recorded for the deck."""
+        analysis = analyzer_session(page_routing_mode="hybrid")
+        pages = [Image.new("RGB", (96, 54)), Image.new("RGB", (96, 54))]
+        for page in pages:
+            page.format = "JPEG"
+
+        with patch("utils.healthcare_template_analyzer.convert_from_path", return_value=pages), \
+                patch("utils.healthcare_template_analyzer.SlideThumbnailGenerator"), \
+                patch("utils.healthcare_template_analyzer.slide_analysis_cache", SlideAnalysisCache(enabled=False)), \
+                patch("utils.healthcare_template_analyzer.get_information_for_image", return_value="A product photo") as vision, \
+                patch("utils.healthcare_template_analyzer.ollama.generate", return_value={"response": "Problem and solution slide"}) as text:
+            analysis._analyze_visual_content(deck_pdf, company_id="acme", deck_id=7)
+
+        vision.assert_called_once()
+        assert "wearable patch" in text.call_args.kwargs["prompt"]
+        assert text.call_args.kwargs["model"] == "gemma3:12b"
+        assert [page["description"] for page in analysis.visual_analysis_results] == ["Problem and solution slide", "A product photo"]
+        assert [page["analysis_route"] for page in analysis.visual_analysis_results] == ["text", "vision"]
+        assert analysis.page_routing["routes"] == {"cache": 0, "text": 1, "vision_with_text": 0, "vision": 1}
+
+    def test_time_saved_estimate(self):
+        """Saved time compares text pages with the deck's own vision pages."""
+        routing = summarize_page_routing([
+            {"page_number": 1, "route": "text", "seconds": 1.0},
+            {"page_number": 2, "route": "text", "seconds": 1.0},
+            {"page_number": 3, "route": "vision", "seconds": 9.0},
+        ])
+        assert routing["estimated_seconds_saved"] == 16.0
+        cached = summarize_page_routing([
+            {"page_number": 1, "route": "cache", "seconds": 0.0},
+            {"page_number": 2, "route": "vision", "seconds": 9.0},
+        ])
+        assert cached["estimated_seconds_saved"] == 9.0
+        assert summarize_page_routing([{"page_number": 1, "route": "text", "seconds": 1.0}])["estimated_seconds_saved"] is None
@@ -0,0 +1,175 @@
+import random
+from io import BytesIO
+from unittest.mock import MagicMock, patch
+
+from PIL import Image, ImageDraw
+
+from utils.slide_cache import (
+    DESCRIPTION, SlideAnalysisCache, SlideKey, closest_entry, dhash, hamming_distance, hash_bands, parse_hash, slide_key,
+    text_hash, to_signed, to_unsigned
+)
+
+
+def slide(seed):
+    """A 960x540 slide with a seeded layout of coloured blocks."""
+    generator = random.Random(seed)
+    image = Image.new("RGB", (960, 540), "white")
+    draw = ImageDraw.Draw(image)
+    for _ in range(12):
+        x, y = generator.randint(0, 860), generator.randint(0, 440)
+        draw.rectangle([x, y, x + generator.randint(40, 300), y + generator.randint(20, 200)],
+                       fill=tuple(generator.randint(0, 255) for _ in range(3)))
+    return image
+
+
+def text_slide(heading):
+    """A slide of the same template (title bar, logo, bullet blocks) with its own heading."""
+    image = Image.new("RGB", (960, 540), "white")
+    draw = ImageDraw.Draw(image)
+    draw.rectangle([0, 0, 960, 90], fill=(20, 60, 120))
+    draw.rectangle([860, 470, 940, 520], fill=(200, 40, 40))
+    draw.text((40, 30), heading, fill="white")
+    for line in range(5):
+        draw.rectangle([60, 140 + line * 60, 700, 160 + line * 60], fill=(120, 120, 120))
+    return image
+
+
+def reencoded(image, quality):
+    buffer = BytesIO()
+    image.save(buffer, format="JPEG", quality=quality)
+    return Image.open(BytesIO(buffer.getvalue()))
+
+
+class MemoryCache(SlideAnalysisCache):
+    """Slide cache over a dict instead of the slide_analysis_cache table."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.entries = {}
+
+    def lookup(self, database_url, kind, company_id, slide_keys, vision_model, prompt):
+        stored = [(key, entry) for (entry_kind, entry_company, key), entry in self.entries.items()
+                  if entry_kind == kind and entry_company == company_id]
+        found = {}
+        for key in slide_keys:
+            best = closest_entry(key, stored, self.max_distance)
+            if best:
+                found[key] = {**best[1], "distance": best[0]}
+        self._count(kind, lookups=len(slide_keys), exact_hits=len(found), misses=len(slide_keys) - len(found))
+        return found
+
+    def store(self, database_url, kind, company_id, entries, vision_model, prompt):
+        for entry in entries:
+            self.entries[(kind, company_id, entry["slide_key"])] = {"result": entry["result"], "has_issues": entry.get("has_issues")}
+        self._count(kind, stored=len(entries))
+        return len(entries)
+
+
+class TestSlideHash:
+    """Test the perceptual hash and its storage form."""
+
+    def test_near_duplicates_stay_close(self):
+        """Re-encoding a slide moves its hash by a few bits at most; a different slide is far away."""
+        original = slide(1)
+        assert hamming_distance(dhash(original), dhash(reencoded(original, 40))) <= 3
+        assert hamming_distance(dhash(original), dhash(slide(2))) > 10
+
+    def test_storage_roundtrip(self):
+        value = (1 << 64) - 5
+        assert -(1 << 63) <= to_signed(value) < 0
+        assert to_unsigned(to_signed(value)) == value
+        assert parse_hash(f"{value:016x}") == value
+        assert parse_hash("not-a-hash") is None
+        assert hash_bands(0x0004000300020001) == [1, 2, 3, 4]
+
+    def test_template_slides_get_different_keys(self):
+        """Text slides of one template are close in the 64-bit hash but differ in text and detail hash."""
+        market, competition = text_slide("Market Opportunity"), text_slide("Competition")
+        assert hamming_distance(dhash(market), dhash(competition)) <= 3
+
+        market_key = slide_key(market, "Market Opportunity\nEUR 4bn addressable market")
+        competition_key = slide_key(competition, "Competition\nThree incumbents, no remote monitoring")
+        assert market_key.text_hash != competition_key.text_hash
+        assert market_key.detail_hash != competition_key.detail_hash
+        assert closest_entry(market_key, [(competition_key, "Competition")], max_distance=3) is None
+        # Without a text layer the 256-bit hash alone keeps them apart
+        assert closest_entry(slide_key(market), [(slide_key(competition), "Competition")], max_distance=3) is None
+        assert text_hash("  Market\n Opportunity ") == text_hash("Market Opportunity")
+
+    def test_lookup_matches_exactly_by_default(self):
+        """Near-duplicates need an opt-in distance and an identical text layer; entries are scoped by company."""
+        stored = SlideKey(0x00FF00FF00FF00FF, text_hash("Team: CEO, CTO"), "a" * 64)
+        reexport = SlideKey(stored.slide_hash ^ 0b101, stored.text_hash, "b" * 64)
+        image_only = SlideKey(stored.slide_hash ^ 0b101, "", "b" * 64)
+        cursor = MagicMock()
+        cursor.fetchall.return_value = [(11, to_signed(stored.slide_hash), stored.text_hash, "a" * 64, "Team slide", None, "vision"),
+                                        (12, to_signed(stored.slide_hash), "", "a" * 64, "Photo", None, "vision")]
+        conn = MagicMock()
+        conn.cursor.return_value.__enter__.return_value = cursor
+
+        with patch("utils.slide_cache.psycopg2.connect", return_value=conn):
+            near = SlideAnalysisCache(max_distance=3)
+            found = near.lookup("postgresql://cache", DESCRIPTION, "acme", [reexport, image_only], "gemma3:12b", "Describe this slide")
+            assert cursor.execute.call_args_list[0].args[1][:2] == [DESCRIPTION, "acme"]
+            exact = SlideAnalysisCache()
+            missed = exact.lookup("postgresql://cache", DESCRIPTION, "acme", [reexport], "gemma3:12b", "Describe this slide")
+            hit = exact.lookup("postgresql://cache", DESCRIPTION, "acme", [stored], "gemma3:12b", "Describe this slide")
+            assert exact.lookup("postgresql://cache", DESCRIPTION, None, [stored], "gemma3:12b", "Describe this slide") == {}
+
+        assert found[reexport]["result"] == "Team slide"
+        assert found[reexport]["distance"] == 2
+        assert image_only not in found
+        assert missed == {}
+        assert hit[stored]["distance"] == 0
+        assert near.metrics()["kinds"][DESCRIPTION]["near_hits"] == 1
+        assert exact.metrics()["kinds"][DESCRIPTION]["exact_hits"] == 1
+        assert SlideAnalysisCache(max_distance=10).max_distance == 3
+
+    def test_lookup_errors_are_misses(self):
+        cache = SlideAnalysisCache()
+        keys = [slide_key(slide(1)), slide_key(slide(2))]
+        with patch("utils.slide_cache.psycopg2.connect", side_effect=ConnectionError("db down")):
+            assert cache.lookup("postgresql://cache", DESCRIPTION, "acme", keys, "gemma3:12b", "prompt") == {}
+        assert cache.metrics()["kinds"][DESCRIPTION]["misses"] == 2
+
+
+class TestSlideCacheReuse:
+    """Test reusing descriptions across versions of a deck."""
+
+    def analyze(self, analyzer_session, cache, pages, company_id="acme"):
+        analysis = analyzer_session()
+        pages = [reencoded(page, 90) for page in pages]
+        descriptions = iter(f"Description {number}" for number in range(100))
+        with patch("utils.healthcare_template_analyzer.convert_from_path", return_value=pages), \
+                patch("utils.healthcare_template_analyzer.SlideThumbnailGenerator"), \
+                patch("utils.healthcare_template_analyzer.slide_analysis_cache", cache), \
+                patch("utils.healthcare_template_analyzer.get_information_for_image",
+                      side_effect=lambda *args: next(descriptions)) as vision:
+            analysis._analyze_visual_content("deck.pdf", company_id=company_id, deck_id=7)
+        return analysis, vision
+
+    def test_reupload_pays_only_for_changed_slides(self, analyzer_session):
+        """Version two of a deck with two changed slides makes two vision calls."""
+        cache = MemoryCache()
+        first, vision = self.analyze(analyzer_session, cache, [slide(seed) for seed in range(5)])
+        assert vision.call_count == 5
+
+        second, vision = self.analyze(analyzer_session, cache, [slide(0), slide(10), slide(2), slide(3), slide(11)])
+
+        assert vision.call_count == 2
+        assert [page["analysis_route"] for page in second.visual_analysis_results] == ["cache", "vision", "cache", "cache", "vision"]
+        assert second.visual_analysis_results[2]["description"] == first.visual_analysis_results[2]["description"]
+        assert second.page_routing["routes"]["cache"] == 3
+        assert cache.metrics()["kinds"][DESCRIPTION]["exact_hits"] == 3
+
+    def test_other_companies_do_not_reuse_results(self, analyzer_session):
+        """The same slide uploaded by another company is analyzed again."""
+        cache = MemoryCache()
+        self.analyze(analyzer_session, cache, [slide(0), slide(1)])
+        _, vision = self.analyze(analyzer_session, cache, [slide(0), slide(1)], company_id="globex")
+        assert vision.call_count == 2
+
+    def test_repeated_slides_within_a_deck(self, analyzer_session):
+        """A slide repeated in the same deck is analyzed once."""
+        _, vision = self.analyze(analyzer_session, MemoryCache(), [slide(4), slide(5), slide(4)])
+        assert vision.call_count == 2
@@ -0,0 +1,58 @@
+from unittest.mock import MagicMock, patch
+
+from utils.slide_retrieval import SlideIndex, context_budget, estimate_tokens
+
+SLIDES = [
+    {"page_number": 1, "description": "Title slide: CardioSense, remote heart monitoring for cardiology clinics."},
+    {"page_number": 2, "description": "Problem: heart failure readmissions cost hospitals billions every year."},
+    {"page_number": 3, "description": "Clinical study: 400 patient randomized trial, primary endpoint readmission rate."},
+    {"page_number": 4, "description": "Regulatory: FDA 510(k) clearance planned, predicate device identified."},
+    {"page_number": 5, "description": "Team: founders with cardiology and medical device experience."},
+    {"page_number": 6, "description": "Funding: raising 5M seed round to finish the clinical trial."},
+]
+
+
+class TestSlideIndex:
+    """Test relevance-filtered deck context."""
+
+    def test_relevant_slides_in_deck_order(self):
+        """The best matching slides within the budget are kept, in their original order."""
+        index = SlideIndex(SLIDES)
+        budget = estimate_tokens(SLIDES[2]["description"]) + estimate_tokens(SLIDES[3]["description"]) + 2
+
+        selected = index.select("What is the FDA regulatory pathway and are the randomized study endpoints adequate?", budget)
+
+        assert selected == [2, 3]
+        assert index.context("FDA regulatory clearance", budget).startswith("Regulatory")
+        assert index.select("market size", budget) == [0, 1]  # No match: deck from the start
+
+    def test_small_deck_is_sent_in_full(self):
+        """A deck that fits into the budget is unchanged, whatever the question."""
+        index = SlideIndex(SLIDES)
+        assert index.context("team", token_budget=10_000) == " ".join(slide["description"] for slide in SLIDES)
+
+    def test_budget_respects_context_window(self):
+        """Deck content never takes more than num_ctx leaves after output and instructions."""
+        assert context_budget({"num_ctx": 8192, "num_predict": 2048}, 16384) == 8192 - 2048 - 1024
+        assert context_budget({"num_ctx": 32768, "num_predict": 4096}, 4096) == 4096
+
+    def test_questions_get_their_own_context(self, analyzer_session):
+        """Each template question and its scoring see the slides relevant to that question."""
+        session = analyzer_session(model="phi4:latest", visual_analysis_results=SLIDES)
+        session.deck_context_tokens = 40
+        session.template_config = {"chapters": [{"chapter_id": 1, "name": "Evidence", "questions": [
+            {"question_id": 1, "question_text": "How strong is the clinical trial evidence?"},
+            {"question_id": 2, "question_text": "Which FDA regulatory pathway is planned?"},
+        ]}]}
+        session._score_question = MagicMock(return_value=(5, "Score: 5"))
+
+        with patch("utils.healthcare_template_analyzer.ollama.generate", return_value={"response": "Answer"}) as generate:
+            session._execute_template_analysis()
+
+        first, second = (call.kwargs["prompt"] for call in generate.call_args_list)
+        assert "randomized trial" in first and "510(k)" not in first
+        assert "510(k)" in second and "Title slide" not in second
+        assert "510(k)" in session._score_question.call_args.args[3]
+
+        session.deck_context_mode = "full"
+        assert session._deck_context("anything") == SlideIndex(SLIDES).full_text
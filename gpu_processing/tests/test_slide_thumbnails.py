@@ -0,0 +1,47 @@
+import pytest
+import os
+import json
+from PIL import Image
+
+from utils.slide_thumbnails import SlideThumbnailGenerator, THUMBNAIL_DIRNAME, MANIFEST_FILENAME
+
+
+@pytest.fixture
+def rendered_slides():
+    """Three rendered pages in a typical 16:9 slide format."""
+    return [(number, Image.new("RGB", (1600, 900), color=(number * 40, 80, 120))) for number in range(1, 4)]
+
+
+class TestSlideThumbnailGenerator:
+    """Test thumbnail, sprite and manifest generation."""
+
+    def test_generate_writes_variants_sprite_and_manifest(self, tmp_path, rendered_slides):
+        """Every slide gets small/medium variants and a tile in the sprite sheet."""
+        manifest = SlideThumbnailGenerator(sprite_columns=2).generate(str(tmp_path), rendered_slides, deck_name="deck")
+
+        thumbnail_dir = tmp_path / THUMBNAIL_DIRNAME
+        with open(thumbnail_dir / MANIFEST_FILENAME) as f:
+            assert json.load(f) == manifest
+
+        assert manifest["slide_count"] == 3
+        assert manifest["sprite"]["columns"] == 2
+        assert manifest["sprite"]["rows"] == 2
+
+        for slide in manifest["slides"]:
+            small = slide["variants"]["small"]
+            medium = slide["variants"]["medium"]
+            assert small["width"] == 240 and small["height"] == 135
+            assert medium["width"] == 640
+            assert os.path.exists(tmp_path / small["jpeg"])
+            assert os.path.exists(tmp_path / medium["jpeg"])
+
+        assert manifest["slides"][2]["sprite"] == {"x": 0, "y": 135, "width": 240, "height": 135}
+        sprite = Image.open(tmp_path / manifest["sprite"]["filename"])
+        assert sprite.size == (480, 270)
+
+    def test_small_slides_are_not_upscaled(self, tmp_path):
+        """Slides narrower than a variant keep their original size."""
+        manifest = SlideThumbnailGenerator().generate(str(tmp_path), [(1, Image.new("RGB", (200, 100)))])
+
+        assert manifest["slides"][0]["variants"]["small"]["width"] == 200
+        assert manifest["slides"][0]["variants"]["medium"]["width"] == 200
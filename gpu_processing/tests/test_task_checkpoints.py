@@ -0,0 +1,101 @@
+import json
+from unittest.mock import MagicMock, patch
+
+from PIL import Image, ImageDraw
+
+from utils.slide_cache import SlideAnalysisCache, slide_key
+from utils.task_checkpoints import QUESTION, VISUAL_PAGE, TaskCheckpoints, TaskCheckpointStore
+
+
+def page(shade):
+    image = Image.new("RGB", (96, 54), "white")
+    ImageDraw.Draw(image).rectangle([10, 10, 10 + shade, 40], fill=(shade, 40, 90))
+    image.format = "JPEG"
+    return image
+
+
+class RecordingCheckpoints(TaskCheckpoints):
+    """Checkpoints that record saves instead of writing them to the database."""
+
+    def __init__(self, saved=None):
+        super().__init__("postgresql://unused", task_id=31, attempt=2, saved=saved)
+        self.saves = []
+
+    def save(self, stage, key, payload, fingerprint=None):
+        self.saves.append((stage, str(key)))
+        self._saved[(stage, str(key))] = (fingerprint, payload)
+
+
+class TestTaskCheckpoints:
+    """Test resuming interrupted tasks from their checkpoints."""
+
+    def test_fingerprint_must_match(self):
+        checkpoints = TaskCheckpoints("postgresql://unused", 31, saved={(QUESTION, "4"): ("abc", {"score": 5})})
+        assert checkpoints.get(QUESTION, 4, "abc") == {"score": 5}
+        assert checkpoints.get(QUESTION, 4, "changed") is None
+        assert checkpoints.get(QUESTION, 5, "abc") is None
+        assert checkpoints.resumed == 1
+
+    def test_open_loads_attempt_and_items(self):
+        cursor = MagicMock()
+        cursor.fetchone.return_value = (3,)
+        cursor.fetchall.return_value = [(VISUAL_PAGE, "1", "00ff", json.dumps({"description": "Title"}))]
+        conn = MagicMock()
+        conn.cursor.return_value.__enter__.return_value = cursor
+
+        with patch("utils.task_checkpoints.psycopg2.connect", return_value=conn):
+            checkpoints = TaskCheckpointStore().open("postgresql://queue", 31)
+
+        assert checkpoints.attempt == 3
+        assert checkpoints.get(VISUAL_PAGE, 1, "00ff") == {"description": "Title"}
+
+    def test_save_errors_never_fail_the_task(self):
+        checkpoints = TaskCheckpoints("postgresql://queue", 31)
+        with patch("utils.task_checkpoints.psycopg2.connect", side_effect=ConnectionError("db down")):
+            checkpoints.save(QUESTION, 1, {"score": 4}, "abc")
+        assert checkpoints.get(QUESTION, 1, "abc") == {"score": 4}
+
+    def test_visual_analysis_resumes_after_last_page(self, analyzer_session):
+        """Pages finished by the crashed attempt are not sent to the vision model again."""
+        pages = [page(20), page(70)]
+        first_page = {"description": "Title slide", "analysis_route": "vision"}
+        checkpoints = RecordingCheckpoints({(VISUAL_PAGE, "1"): (slide_key(pages[0]).fingerprint(), first_page)})
+        analysis = analyzer_session(checkpoints=checkpoints)
+
+        with patch("utils.healthcare_template_analyzer.convert_from_path", return_value=pages), \
+                patch("utils.healthcare_template_analyzer.SlideThumbnailGenerator"), \
+                patch("utils.healthcare_template_analyzer.slide_analysis_cache", SlideAnalysisCache(enabled=False)), \
+                patch("utils.healthcare_template_analyzer.get_information_for_image", return_value="Market slide") as vision:
+            analysis._analyze_visual_content("deck.pdf", company_id="acme", deck_id=7)
+
+        vision.assert_called_once()
+        assert [result["description"] for result in analysis.visual_analysis_results] == ["Title slide", "Market slide"]
+        assert checkpoints.saves == [(VISUAL_PAGE, "2")]
+
+    def test_template_analysis_resumes_answered_questions(self, analyzer_session):
+        """Answered questions come from the checkpoint; only the rest reach the text model."""
+        results = [{"page_number": 1, "description": "Clinical trial with 400 patients and FDA 510(k) plans."}]
+        checkpoints = RecordingCheckpoints()
+        analysis = analyzer_session(checkpoints=checkpoints)
+        analysis.visual_analysis_results = results
+        analysis.template_config = {"chapters": [{"chapter_id": 1, "name": "Evidence", "questions": [
+            {"question_id": 1, "question_text": "How strong is the clinical evidence?"},
+            {"question_id": 2, "question_text": "Which regulatory pathway is planned?"},
+        ]}]}
+        analysis._score_question = MagicMock(return_value=(5, "Score: 5"))
+
+        with patch("utils.healthcare_template_analyzer.ollama.generate", return_value={"response": "Answer"}):
+            analysis._execute_template_analysis()
+        assert checkpoints.saves == [(QUESTION, "1"), (QUESTION, "2")]
+
+        # The retry sees both questions checkpointed under unchanged context
+        retry = analyzer_session(checkpoints=RecordingCheckpoints(checkpoints._saved))
+        retry.visual_analysis_results = results
+        retry.template_config = analysis.template_config
+        retry._score_question = MagicMock()
+        with patch("utils.healthcare_template_analyzer.ollama.generate") as generate:
+            retry._execute_template_analysis()
+
+        generate.assert_not_called()
+        assert retry.question_results[2]["score"] == 5
+        assert retry.checkpoints.resumed == 2
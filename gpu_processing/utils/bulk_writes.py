@@ -0,0 +1,53 @@
+"""
+Bulk Writes - Multi-row upserts for GPU result tables
+
+Per-row result writes (one connection, INSERT and commit per slide) are replaced
+by a single INSERT ... VALUES ... ON CONFLICT statement built with execute_values,
+so a whole deck is written in one round trip and one transaction.
+"""
+
+import logging
+from typing import Any, Dict, Iterable, List, Sequence
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+logger = logging.getLogger(__name__)
+
+
+def unique_rows(rows: Iterable[Dict[str, Any]], key_columns: Sequence[str]) -> List[Dict[str, Any]]:
+    """Last row per conflict key - one statement cannot upsert the same row twice"""
+    latest: Dict[tuple, Dict[str, Any]] = {}
+    for row in rows:
+        latest[tuple(row[column] for column in key_columns)] = row
+    return list(latest.values())
+
+
+def bulk_upsert(cursor, table: str, columns: Sequence[str], rows: Iterable[Dict[str, Any]],
+                conflict_columns: Sequence[str], update_columns: Sequence[str]) -> int:
+    """Insert or update rows with one statement; returns the number of rows written (caller commits)"""
+    rows = unique_rows(rows, conflict_columns)
+    if not rows:
+        return 0
+
+    updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in update_columns)
+    query = (
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES %s "
+        f"ON CONFLICT ({', '.join(conflict_columns)}) "
+        + (f"DO UPDATE SET {updates}" if updates else "DO NOTHING")
+    )
+    # page_size covers all rows so the deck is sent as a single statement
+    execute_values(cursor, query, [tuple(row[column] for column in columns) for row in rows], page_size=len(rows))
+    return len(rows)
+
+
+def bulk_upsert_in_transaction(database_url: str, table: str, columns: Sequence[str], rows: Iterable[Dict[str, Any]],
+                               conflict_columns: Sequence[str], update_columns: Sequence[str]) -> int:
+    """bulk_upsert on a new connection, committed as one transaction"""
+    conn = psycopg2.connect(database_url)
+    try:
+        with conn:
+            with conn.cursor() as cursor:
+                return bulk_upsert(cursor, table, columns, rows, conflict_columns, update_columns)
+    finally:
+        conn.close()
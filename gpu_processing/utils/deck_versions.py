@@ -0,0 +1,80 @@
+"""
+Deck Versions - Slide diffs and carried-forward answers for revised decks
+
+When a startup uploads a revised deck, its slides are matched to the previous version
+by slide key (perceptual hashes and text layer). The vision side already skips unchanged
+slides through the slide cache; the text side re-runs a template question only when the
+deck content it sees (the slides retrieved for that question) or the question itself
+changed. Every other answer and score is carried forward from the previous version,
+with the document it was originally analyzed in.
+"""
+
+import hashlib
+from typing import Any, Dict, List, Optional
+
+from .slide_cache import closest_entry, page_slide_key
+
+
+def diff_slide_versions(previous: List[Dict[str, Any]], current: List[Dict[str, Any]],
+                        max_distance: int) -> Dict[str, Any]:
+    """Match the slides of a new deck version to the previous one by slide key
+
+    Returns page numbers: unchanged (new page -> previous page), changed (new pages without
+    a match) and removed (previous pages no new slide matched). Pages without a full slide
+    key never match."""
+    previous_hashes = [
+        (key, page.get("page_number"))
+        for page in previous
+        for key in [page_slide_key(page)] if key is not None
+    ]
+    unchanged, changed, matched = {}, [], set()
+    for page in current:
+        key = page_slide_key(page)
+        # Prefer previous slides that are not matched yet, so reordered duplicates pair up one to one
+        best = None
+        if key is not None:
+            best = closest_entry(key, [entry for entry in previous_hashes if entry[1] not in matched], max_distance)
+            best = best or closest_entry(key, previous_hashes, max_distance)
+        if best:
+            unchanged[page.get("page_number")] = best[1]
+            matched.add(best[1])
+        else:
+            changed.append(page.get("page_number"))
+    return {
+        "unchanged": unchanged,
+        "changed": changed,
+        "removed": [page_number for _, page_number in previous_hashes if page_number not in matched],
+        "hashed": bool(previous_hashes)
+    }
+
+
+def question_context_hash(question: Dict[str, Any], deck_context: str, text_model: str, scoring_model: str) -> str:
+    """Fingerprint of everything a template answer and its score depend on"""
+    parts = [
+        text_model, scoring_model, question.get("question_text", ""), question.get("healthcare_focus", ""),
+        question.get("scoring_criteria", ""), deck_context
+    ]
+    return hashlib.md5("\x1f".join(str(part or "") for part in parts).encode("utf-8")).hexdigest()
+
+
+def previous_question_results(chapter_analysis: Dict[str, Any]) -> Dict[Any, Dict[str, Any]]:
+    """Question results of a previous version by question_id, from its stored chapter analysis"""
+    results = {}
+    for chapter in chapter_analysis.values():
+        for question in (chapter or {}).get("questions", []):
+            if question.get("question_id") is not None and question.get("context_hash"):
+                results[question["question_id"]] = question
+    return results
+
+
+def carried_forward(previous: Optional[Dict[str, Any]], context_hash: str, previous_document_id: int) -> Optional[Dict[str, Any]]:
+    """The previous answer with its provenance if its context is unchanged, else None"""
+    if not previous or previous.get("context_hash") != context_hash:
+        return None
+    return {
+        "response": previous.get("response", ""),
+        "score": previous.get("score", 0),
+        "scoring_response": previous.get("scoring_response", ""),
+        "carried_forward_from": previous_document_id,
+        "analyzed_in_document_id": previous.get("analyzed_in_document_id") or previous_document_id
+    }
@@ -7,17 +7,27 @@ import os
 import json
 import time
 import threading
+from datetime import datetime
 from contextlib import contextmanager
 import logging
 import re
 import psycopg2
-from typing import Dict, List, Optional, Any
+from typing import Any, Callable, Dict, List, Optional
 from PIL import Image
 from io import BytesIO
 import ollama
 from pdf2image import convert_from_path
 import requests
 from .logging_utils import truncate_llm_output, log_llm_result, log_llm_extraction, log_prompt_preview
+from .slide_thumbnails import SlideThumbnailGenerator
+from .sector_keywords import SECTOR_SIGNATURE_QUERY, sector_matcher_cache
+from .bulk_writes import bulk_upsert_in_transaction
+from .slide_retrieval import SlideIndex, context_budget
+from .pdf_extractor import PDFExtractor, route_page
+from .slide_cache import DESCRIPTION, FEEDBACK, closest_entry, page_slide_key, slide_analysis_cache, slide_key
+from .deck_versions import carried_forward, diff_slide_versions, previous_question_results, question_context_hash
+from .task_checkpoints import QUESTION, VISUAL_PAGE
+from config.processing_config import config
 
 logger = logging.getLogger(__name__)
 
@@ -52,8 +62,72 @@ def get_information_for_image(image_bytes, prompt, model):
     
     return full_response
 
+# Text-dominant slides are described from their PDF text layer instead of the rendered image
+TEXT_PAGE_PROMPT = """{image_analysis_prompt}
+
+This slide is text-based. Instead of an image you get the text extracted from the slide; describe the slide from it.
+
+Slide text:
+{page_text}"""
+TEXT_HINT_PROMPT = """{image_analysis_prompt}
+
+Text on this slide, extracted from the PDF (use it to read labels and numbers exactly):
+{page_text}"""
+MAX_PAGE_TEXT_CHARS = 6000
+
+
+def summarize_page_routing(pages: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Per-deck routing record: pages per route and vision time saved, estimated from this deck's vision pages
+
+    Pages answered from the slide cache count as saved vision calls."""
+    text_seconds = [page["seconds"] for page in pages if page["route"] == "text"]
+    cache_seconds = [page["seconds"] for page in pages if page["route"] == "cache"]
+    vision_seconds = [page["seconds"] for page in pages if page["route"] in ("vision_with_text", "vision")]
+    seconds_saved = None
+    if (text_seconds or cache_seconds) and vision_seconds:
+        seconds_saved = round(
+            (sum(vision_seconds) / len(vision_seconds)) * (len(text_seconds) + len(cache_seconds))
+            - sum(text_seconds) - sum(cache_seconds), 2
+        )
+    return {
+        "mode": "hybrid",
+        "routes": {route: sum(1 for page in pages if page["route"] == route) for route in ("cache", "text", "vision_with_text", "vision")},
+        "text_seconds": round(sum(text_seconds), 2),
+        "vision_seconds": round(sum(vision_seconds), 2),
+        "estimated_seconds_saved": seconds_saved,
+        "pages": pages
+    }
+
+
+def get_database_url() -> str:
+    """Build database URL from environment variables or use DATABASE_URL directly"""
+    if os.getenv('DATABASE_URL'):
+        return os.getenv('DATABASE_URL')
+    db_host = os.getenv('DATABASE_HOST', '65.108.32.168')
+    db_port = os.getenv('DATABASE_PORT', '5432')
+    db_name = os.getenv('DATABASE_NAME', 'review-platform')
+    db_user = os.getenv('DATABASE_USER', 'review_user')
+    db_password = os.getenv('DATABASE_PASSWORD', 'review_password')
+    return f"postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
+
+
+# Changes whenever an active model configuration or pipeline prompt is added, removed or edited
+ENGINE_SIGNATURE_QUERY = """
+    SELECT md5(
+        COALESCE((SELECT string_agg(m::text, ',' ORDER BY m.id) FROM model_configs m WHERE m.is_active = true), '')
+        || '|' ||
+        COALESCE((SELECT string_agg(p::text, ',' ORDER BY p.id) FROM pipeline_prompts p WHERE p.is_active = true), '')
+    )
+"""
+
+
 class HealthcareTemplateAnalyzer:
-    """Template-based pitch deck analyzer for healthcare startups"""
+    """Template-based pitch deck analyzer for healthcare startups
+
+    Shared engine: models, prompts, templates and database access. It holds no
+    per-document state; every run gets its own AnalysisSession from new_session(),
+    so one engine can serve concurrent tasks.
+    """
     
     # Core specialized analysis types - easy to modify
     DEFAULT_SPECIALIZED_ANALYSES = [
@@ -70,19 +144,8 @@ class HealthcareTemplateAnalyzer:
         from .task_validator import TaskValidator
         self.task_validator = TaskValidator(backend_base_url)
         
-        # Initialize progress reporter for frontend updates
-        self._progress_reporter = None
         # Use PostgreSQL database connection
-        # Build database URL from environment variables or use DATABASE_URL directly
-        if os.getenv('DATABASE_URL'):
-            self.database_url = os.getenv('DATABASE_URL')
-        else:
-            db_host = os.getenv('DATABASE_HOST', '65.108.32.168')
-            db_port = os.getenv('DATABASE_PORT', '5432')
-            db_name = os.getenv('DATABASE_NAME', 'review-platform')
-            db_user = os.getenv('DATABASE_USER', 'review_user')
-            db_password = os.getenv('DATABASE_PASSWORD', 'review_password')
-            self.database_url = f"postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
+        self.database_url = get_database_url()
         
         # Model configuration - MUST come from database, no fallbacks
         self.vision_model = self.get_model_by_type("vision")
@@ -103,8 +166,11 @@ class HealthcareTemplateAnalyzer:
         logger.info(f"   Text Model: {self.text_model}")
         logger.info(f"   Scoring Model: {self.scoring_model}")
         
-        # Set model-appropriate parameters
-        self.model_options = self._get_model_options()
+        # Set model-appropriate parameters, cached per model combination used by sessions
+        self._lock = threading.Lock()
+        self._model_options = {}
+        self._prompts = {}
+        self.model_options = self.get_model_options(self.text_model, self.vision_model, self.scoring_model)
         
         # Log model configuration
         logger.info(f"🤖 AI Model Configuration:")
@@ -113,18 +179,6 @@ class HealthcareTemplateAnalyzer:
         logger.info(f"   🎯 Scoring Model (question scoring): {self.scoring_model}")
         logger.info(f"   ⚙️  Model Options: {self.model_options}")
         
-        # Analysis results storage
-        self.visual_analysis_results = []
-        self.company_offering = ""
-        self.startup_name = None
-        self.funding_amount = None
-        self.deck_date = None
-        self.classification_result = None
-        self.template_config = None
-        self.chapter_results = {}
-        self.question_results = {}
-        self.specialized_results = {}
-        
         # Initialize pipeline prompts - MUST come from database, no fallbacks
         logger.info("🔧 Initializing pipeline prompts from PostgreSQL...")
         self.image_analysis_prompt = self._get_pipeline_prompt("image_analysis")
@@ -146,13 +200,24 @@ class HealthcareTemplateAnalyzer:
         shared_path = os.getenv('SHARED_FILESYSTEM_MOUNT_PATH', '/mnt/CPU-GPU')
         self.project_root = os.path.join(shared_path, 'projects')
     
-    def _get_model_options(self) -> dict:
+    def get_model_options(self, text_model: str, vision_model: str, scoring_model: str) -> dict:
+        """Generation options for a model combination, computed once per engine"""
+        key = (text_model, vision_model, scoring_model)
+        with self._lock:
+            options = self._model_options.get(key)
+        if options is None:
+            options = self._get_model_options(text_model, vision_model, scoring_model)
+            with self._lock:
+                self._model_options[key] = options
+        return options
+
+    def _get_model_options(self, text_model: str, vision_model: str, scoring_model: str) -> dict:
         """Get appropriate generation options based on database-stored model specifications"""
         # Get context windows from database for each model
         models_to_check = [
-            (self.text_model, 'text'),
-            (self.vision_model, 'vision'), 
-            (self.scoring_model, 'scoring')
+            (text_model, 'text'),
+            (vision_model, 'vision'), 
+            (scoring_model, 'scoring')
         ]
         
         min_context_window = 32768  # Default safe value
@@ -357,6 +422,11 @@ class HealthcareTemplateAnalyzer:
     
     def _get_pipeline_prompt(self, stage_name: str) -> str:
         """Get pipeline prompt from PostgreSQL database - NO FALLBACKS"""
+        with self._lock:
+            cached = self._prompts.get(stage_name)
+        if cached is not None:
+            return cached
+
         logger.info(f"🔍 Loading {stage_name} prompt from PostgreSQL database")
         
         try:
@@ -373,6 +443,8 @@ class HealthcareTemplateAnalyzer:
             if result:
                 logger.info(f"✅ Using configured {stage_name} prompt from PostgreSQL:")
                 log_prompt_preview(logger, f"{stage_name} prompt", result[0])
+                with self._lock:
+                    self._prompts[stage_name] = result[0]
                 return result[0]
             else:
                 logger.error(f"❌ CRITICAL: No active {stage_name} prompt found in database")
@@ -385,145 +457,57 @@ class HealthcareTemplateAnalyzer:
             logger.error(f"   Please check database connectivity and pipeline_prompts table")
             raise RuntimeError(f"Cannot connect to database for pipeline prompt {stage_name}: {e}")
     
-    def _classify_startup(self, company_offering: str) -> Dict[str, Any]:
-        """Classify startup using direct PostgreSQL access and local AI processing"""
-        try:
-            # Get healthcare sectors from PostgreSQL database
-            healthcare_sectors = self._get_healthcare_sectors()
-            
-            if not healthcare_sectors:
-                logger.warning("No healthcare sectors found in database")
-                return self._fallback_classification(company_offering)
-            
-            # Perform classification using local AI models
-            return self._perform_local_classification(company_offering, healthcare_sectors)
-                
-        except Exception as e:
-            logger.error(f"Error in local classification: {e}")
-            return self._fallback_classification(company_offering)
-    
     def _get_healthcare_sectors(self) -> List[Dict[str, Any]]:
-        """Get healthcare sectors from PostgreSQL database"""
+        """Get healthcare sectors from PostgreSQL database, reloading them only when the table changes"""
         try:
             conn = psycopg2.connect(self.database_url)
-            cursor = conn.cursor()
-            
-            # Get healthcare sectors with their associated data
-            cursor.execute("""
-                SELECT id, name, display_name, description, keywords, subcategories
-                FROM healthcare_sectors 
-                WHERE is_active = true 
-                ORDER BY id
-            """)
-            
-            sectors = []
-            for row in cursor.fetchall():
-                sector_id, name, display_name, description, keywords, subcategories = row
-                
-                # Parse keywords if they exist
-                keywords_list = []
-                if keywords:
-                    try:
-                        import json
-                        keywords_list = json.loads(keywords) if isinstance(keywords, str) else keywords
-                    except:
-                        keywords_list = [keywords] if isinstance(keywords, str) else []
-                
-                sectors.append({
-                    "id": sector_id,
-                    "name": name,
-                    "display_name": display_name,
-                    "description": description or "",
-                    "keywords": keywords_list,
-                    "subcategories": subcategories or ""
-                })
-            
-            conn.close()
-            logger.info(f"Retrieved {len(sectors)} healthcare sectors from database")
-            return sectors
+            try:
+                cursor = conn.cursor()
+                cursor.execute(SECTOR_SIGNATURE_QUERY)
+                signature = cursor.fetchone()[0]
+                sector_matcher = sector_matcher_cache.get(signature, lambda: self._load_healthcare_sectors(cursor))
+            finally:
+                conn.close()
+            return sector_matcher.sectors
             
         except Exception as e:
             logger.error(f"Error fetching healthcare sectors: {e}")
             return []
     
-    def _perform_local_classification(self, company_offering: str, healthcare_sectors: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Perform classification using local AI models and healthcare sector data"""
-        try:
-            # Create classification prompt with all available sectors
-            sector_descriptions = []
-            for sector in healthcare_sectors:
-                sector_info = f"- {sector['name']}: {sector['description']}"
-                if sector['keywords']:
-                    sector_info += f" (Keywords: {', '.join(sector['keywords'])})"
-                sector_descriptions.append(sector_info)
-            
-            classification_prompt = f"""
-            You are a healthcare venture capital analyst. Classify the following startup offering into the most appropriate healthcare sector.
-            
-            Available healthcare sectors:
-            {chr(10).join(sector_descriptions)}
-            - other: For startups that don't fit into any of the above healthcare categories
-            
-            Company Offering: {company_offering}
-            
-            Analyze the offering and determine:
-            1. Primary healthcare sector (use the exact sector name from the list above, or "other" if none fit)
-            2. Confidence score (0.0 to 1.0)
-            3. Brief reasoning for the classification
-            4. Any secondary sector if applicable
-            5. Keywords that matched from the offering
-            
-            Respond in JSON format:
-            {{
-                "primary_sector": "exact_sector_name",
-                "confidence_score": 0.0-1.0,
-                "reasoning": "explanation",
-                "secondary_sector": "sector_name_or_null",
-                "keywords_matched": ["keyword1", "keyword2"]
-            }}
-            """
-            
-            # Use text model for classification
-            response = ollama.generate(
-                model=self.text_model,
-                prompt=classification_prompt,
-                options={**self.model_options, 'temperature': 0.2}  # Low temperature for consistent classification
-            )
-            
-            # Parse JSON response
-            import json
-            classification_text = response['response'].strip()
-            
-            # Extract JSON from response (handle cases where model adds extra text)
-            start_idx = classification_text.find('{')
-            end_idx = classification_text.rfind('}') + 1
-            if start_idx >= 0 and end_idx > start_idx:
-                json_str = classification_text[start_idx:end_idx]
-                classification_result = json.loads(json_str)
-                
-                # Find recommended template for the primary sector
-                recommended_template = None
-                for sector in healthcare_sectors:
-                    if sector['name'] == classification_result.get('primary_sector'):
-                        # Try to get template associated with this sector
-                        template_id = self._get_template_for_sector(sector['id'])
-                        recommended_template = template_id
-                        break
-                
-                # Add recommended template
-                classification_result['recommended_template'] = recommended_template
-                
-                logger.info(f"Local classification completed: {classification_result['primary_sector']} "
-                           f"(confidence: {classification_result.get('confidence_score', 0):.2f})")
-                
-                return classification_result
-            else:
-                logger.error("Could not parse JSON from classification response")
-                return self._fallback_classification(company_offering)
-                
-        except Exception as e:
-            logger.error(f"Error in local classification: {e}")
-            return self._fallback_classification(company_offering)
+    def _load_healthcare_sectors(self, cursor) -> List[Dict[str, Any]]:
+        """Load the active healthcare sectors with their keywords"""
+        # Get healthcare sectors with their associated data
+        cursor.execute("""
+            SELECT id, name, display_name, description, keywords, subcategories
+            FROM healthcare_sectors 
+            WHERE is_active = true 
+            ORDER BY id
+        """)
+        
+        sectors = []
+        for row in cursor.fetchall():
+            sector_id, name, display_name, description, keywords, subcategories = row
+            
+            # Parse keywords if they exist
+            keywords_list = []
+            if keywords:
+                try:
+                    import json
+                    keywords_list = json.loads(keywords) if isinstance(keywords, str) else keywords
+                except:
+                    keywords_list = [keywords] if isinstance(keywords, str) else []
+            
+            sectors.append({
+                "id": sector_id,
+                "name": name,
+                "display_name": display_name,
+                "description": description or "",
+                "keywords": keywords_list,
+                "subcategories": subcategories or ""
+            })
+        
+        logger.info(f"Retrieved {len(sectors)} healthcare sectors from database")
+        return sectors
     
     def _get_template_for_sector(self, sector_id: int) -> Optional[int]:
         """Get recommended template ID for a healthcare sector"""
@@ -552,6 +536,21 @@ class HealthcareTemplateAnalyzer:
         """Fallback classification when database access fails"""
         logger.warning("Using fallback classification")
         
+        # Keyword match against the cached sector index, if sectors were loaded before
+        sector_matcher = sector_matcher_cache.current
+        top_candidates = sector_matcher.match(company_offering) if sector_matcher else []
+        if top_candidates:
+            best_candidate = top_candidates[0]
+            sector = best_candidate["sector"]
+            return {
+                "primary_sector": sector["name"],
+                "confidence_score": min(best_candidate["score"], 0.5),
+                "reasoning": f"Keyword-based fallback classification. Matched keywords: {', '.join(best_candidate['matched_keywords'])}",
+                "secondary_sector": top_candidates[1]["sector"]["name"] if len(top_candidates) > 1 else None,
+                "keywords_matched": best_candidate["matched_keywords"],
+                "recommended_template": self._get_template_for_sector(sector["id"])
+            }
+        
         # Ultimate fallback
         # Try to get the 'other' sector's template ID
         try:
@@ -1071,134 +1070,476 @@ class HealthcareTemplateAnalyzer:
             ]
         }
     
-    def analyze_pdf(self, pdf_path: str, company_id: str = None, progress_callback=None, deck_id=None, processing_options: Dict = None) -> Dict[str, Any]:
-        """Main method to analyze a healthcare startup pitch deck"""
-        start_time = time.time()
-        logger.info(f"Starting healthcare template analysis of PDF: {pdf_path}")
-        
-        # Store progress callback and deck_id for chapter processing
-        self.progress_callback = progress_callback
-        self.current_deck_id = deck_id
-        
-        # Set up progress reporter for frontend updates
-        if deck_id:
-            from .progress_reporter import ProgressReporter
-            # Extract document name from path for better logging
-            document_name = os.path.basename(pdf_path) if pdf_path else f"Document {deck_id}"
-            self._progress_reporter = ProgressReporter(self.backend_base_url, deck_id, document_name)
-            self._progress_reporter.report_phase_start("Analysis Started", 1)
-        
-        # Log model configuration at start of analysis
-        logger.info(f"🤖 AI Model Configuration:")
-        logger.info(f"   📷 Vision Model (slide analysis): {self.vision_model}")
-        logger.info(f"   📝 Text Model (offering extraction, name extraction, classification, chapters, questions, specialized analysis): {self.text_model}")
-        logger.info(f"   🎯 Scoring Model (question scoring): {self.scoring_model}")
-        
-        # Clear state from previous analysis sessions (but preserve cached visual analysis if provided)
-        cached_visual_results = self.visual_analysis_results if self.visual_analysis_results else []
-        
-        self.visual_analysis_results = []
-        self.company_offering = ""
-        self.startup_name = None
-        self.funding_amount = None
-        self.deck_date = None
-        self.classification_result = None
-        self.template_config = None
-        self.chapter_results = {}
-        self.question_results = {}
-        
-        # Restore cached visual analysis if it was provided
-        if cached_visual_results:
-            self.visual_analysis_results = cached_visual_results
-            logger.info(f"Preserved cached visual analysis results ({len(cached_visual_results)} pages)")
-        else:
-            logger.info("Cleared previous analysis state")
-        
+    def _save_slide_feedback(self, deck_id: int, slide_feedback_data: list):
+        """Save Function 2: Slide feedback results (batch save after all feedback is generated)
+        All slides of the deck are upserted with one statement in a single transaction"""
         try:
-            # Vision Container Processing (moved to separate tasks)
-            # Visual analysis and slide feedback now run in vision container as separate tasks
-            logger.info("Visual analysis and slide feedback are handled by vision container tasks")
-            
-            # Text Container Processing: Extractions + Template Processing Only
-            # Visual analysis results should be provided by vision container tasks
-            if not self.visual_analysis_results:
-                logger.info("No visual analysis results provided - attempting to retrieve from cache")
-                if deck_id:
-                    # Try to get cached visual analysis from database
-                    try:
-                        response = requests.post(
-                            f"{self.backend_base_url}/api/dojo/internal/get-cached-visual-analysis",
-                            json={
-                                "document_id": deck_id,
-                                "document_type": "pitch_deck"  # Future: determine from database
-                            },
-                            timeout=30
-                        )
-                        if response.status_code == 200:
-                            result = response.json()
-                            if result.get("success") and result.get("cached_analysis"):
-                                # Extract visual_analysis_results from cached_analysis response
-                                cached_analysis = result["cached_analysis"]
-                                deck_id_str = str(deck_id)
-                                if deck_id_str in cached_analysis and "visual_analysis_results" in cached_analysis[deck_id_str]:
-                                    self.visual_analysis_results = cached_analysis[deck_id_str]["visual_analysis_results"]
-                                    logger.info(f"📥 Retrieved cached visual analysis: {len(self.visual_analysis_results)} pages")
-                                else:
-                                    logger.warning(f"No cached visual analysis found for document {deck_id}")
-                            else:
-                                logger.warning("No cached visual analysis found")
-                        else:
-                            logger.warning(f"Failed to retrieve cached visual analysis: HTTP {response.status_code}")
-                    except Exception as e:
-                        logger.warning(f"Error retrieving cached visual analysis: {e}")
-                
-                if not self.visual_analysis_results:
-                    logger.error("No visual analysis results available for text processing. Vision container should provide these.")
-                    raise ValueError("Text container requires visual analysis results from vision container")
+            if not slide_feedback_data:
+                logger.info(f"No slide feedback to save for document {deck_id}")
+                return False
             
-            # Step 2: Generate company offering summary
-            if not self.company_offering:
-                # Step 2: Generate company offering summary
-                self._generate_company_offering()
-                
-                # Step 2.5: Extract startup name
-                self._extract_startup_name()
-                
-                # Step 2.6: Extract funding amount
-                self._extract_funding_amount()
-                
-                # Step 2.7: Extract deck date
-                self._extract_deck_date()
-                
-                # Step 3: ALWAYS run classification (required for dojo experiments and analytics)
-                self.classification_result = self._classify_startup(self.company_offering)
-                logger.info(f"Startup classified as: {self.classification_result.get('primary_sector')} "
-                           f"({self.classification_result.get('confidence_score', 0):.2f} confidence)")
-                
-                # SAVE POINT 1: Save extraction results (company_offering, classification, funding, etc.)
-                if deck_id:
-                    extraction_data = {
-                        'company_offering': self.company_offering,
-                        'classification': self.classification_result,
-                        'funding_amount': getattr(self, 'funding_amount', ''),
-                        'deck_date': getattr(self, 'deck_date', ''),
-                        'company_name': getattr(self, 'company_name', '')
-                    }
-                    self._save_extraction_results(deck_id, extraction_data)
-                
-                # Step 4: Determine template selection method (classification vs GP override)
-                if processing_options and processing_options.get('use_single_template') and processing_options.get('selected_template_id'):
-                    # Use GP-specified template override (but keep classification results)
-                    template_id = processing_options.get('selected_template_id')
-                    logger.info(f"Template selection: GP override mode - using template_id={template_id}")
-                    logger.info(f"Classification result stored: {self.classification_result.get('primary_sector')} "
-                               f"(would have recommended template {self.classification_result.get('recommended_template')})")
-                    self.template_config = self._load_template_config_with_fallback(template_id)
-                else:
-                    # Use classification-recommended template
-                    template_id = self.classification_result.get("recommended_template")
-                    logger.info(f"Template selection: Classification mode - using recommended template_id={template_id}")
-                    self.template_config = self._load_template_config_with_fallback(template_id)
+            logger.info(f"💾 [2/4] Saving slide feedback for document {deck_id} ({len(slide_feedback_data)} slides)")
+            
+            now = datetime.now()
+            rows = [
+                {
+                    "document_id": feedback_item['deck_id'],
+                    "slide_number": feedback_item['slide_number'],
+                    "slide_filename": feedback_item['slide_filename'],
+                    "feedback_text": feedback_item['feedback_text'],
+                    "feedback_type": 'ai_analysis',
+                    "has_issues": feedback_item['has_issues'],
+                    "created_at": now,
+                    "updated_at": now
+                }
+                for feedback_item in slide_feedback_data
+            ]
+            
+            # Insert or update slide feedback (include feedback_type in conflict resolution)
+            saved = bulk_upsert_in_transaction(
+                self.database_url, "slide_feedback",
+                columns=["document_id", "slide_number", "slide_filename", "feedback_text", "feedback_type", "has_issues", "created_at", "updated_at"],
+                rows=rows,
+                conflict_columns=["document_id", "slide_number", "feedback_type"],
+                update_columns=["feedback_text", "has_issues", "updated_at"]
+            )
+            
+            logger.info(f"✅ Slide feedback saved for deck {deck_id} ({saved} slides)")
+            return True
+            
+        except Exception as e:
+            logger.error(f"❌ Error saving slide feedback for deck {deck_id}: {e}")
+            return False
+    
+    def _save_extraction_results(self, document_id: int, extraction_data: dict):
+        """Save Function 2: Extraction experiment results
+        This includes: company_offering, classification, funding_sought, deck_date, company_name"""
+        try:
+            import requests
+            import json
+            
+            # Essential extraction fields
+            essential_fields = ['company_offering', 'classification', 'funding_amount', 'deck_date', 'company_name']
+            
+            # Check if we have any extraction data
+            has_data = any(extraction_data.get(field) for field in essential_fields)
+            
+            if not has_data:
+                logger.info(f"No extraction results to save for document {document_id}")
+                return False
+            
+            logger.info(f"💾 [2/4] Saving extraction results for document {document_id}")
+            
+            # Prepare extraction data - ensure all fields are present
+            extraction_results = {
+                "company_offering": extraction_data.get('company_offering', ''),
+                "classification": extraction_data.get('classification', {}),
+                "funding_amount": extraction_data.get('funding_amount', ''),
+                "deck_date": extraction_data.get('deck_date', ''),
+                "company_name": extraction_data.get('company_name', '')
+            }
+            
+            # Save to main project_documents table
+            response = requests.post(
+                f"{self.backend_base_url}/api/internal/update-deck-results",
+                json={
+                    "document_id": document_id,
+                    "extraction_results": extraction_results,
+                    "results_file_path": f"extraction_results_document_{document_id}.json",
+                    "processing_status": "extraction_complete"
+                },
+                timeout=30
+            )
+            
+            if response.status_code == 200:
+                logger.info(f"✅ Saved extraction results for document {document_id}")
+                return True
+            else:
+                logger.error(f"❌ Failed to save extraction results: {response.status_code}")
+                return False
+                
+        except Exception as e:
+            logger.error(f"❌ Error saving extraction results for document {document_id}: {e}")
+            return False
+    
+    def _save_template_processing_results(self, document_id: int, template_results: dict):
+        """Save Function 3: Template processing results 
+        This includes: chapter_analysis, question_analysis, overall_score, template_used"""
+        try:
+            import requests
+            
+            # Check if we have template processing results
+            chapter_analysis = template_results.get("chapter_analysis", {})
+            
+            if not chapter_analysis:
+                logger.info(f"No template processing results to save for document {document_id}")
+                return False
+            
+            logger.info(f"💾 [3/4] Saving template processing results for document {document_id}")
+            
+            # Prepare template-specific data
+            template_data = {
+                "template_used": template_results.get("template_used", {}),
+                "chapter_analysis": chapter_analysis,
+                "question_analysis": template_results.get("question_analysis", {}),
+                "overall_score": template_results.get("overall_score", 0.0),
+                "report_chapters": template_results.get("report_chapters", {}),
+                "report_scores": template_results.get("report_scores", {}),
+                "processing_metadata": template_results.get("processing_metadata", {})
+            }
+            
+            # Save template processing to extraction_experiments
+            response = requests.post(
+                f"{self.backend_base_url}/api/internal/save-template-processing",
+                json={
+                    "experiment_name": f"template_deck_{document_id}",
+                    "document_id": document_id,
+                    "template_processing_results": template_data
+                },
+                timeout=30
+            )
+            
+            if response.status_code == 200:
+                logger.info(f"✅ Saved template processing results for document {document_id}")
+                return True
+            else:
+                logger.error(f"❌ Failed to save template processing results: {response.status_code}")
+                return False
+                
+        except Exception as e:
+            logger.error(f"❌ Error saving template processing results for document {document_id}: {e}")
+            return False
+    
+    def _save_specialized_analysis(self, document_id: int, specialized_analysis: dict):
+        """Save Function 4: Special analyses (regulatory, clinical, scientific)"""
+        try:
+            import requests
+            
+            # Filter out empty or None values
+            filtered_analysis = {
+                key: value for key, value in specialized_analysis.items() 
+                if value and str(value).strip()
+            }
+            
+            if not filtered_analysis:
+                logger.info(f"No specialized analysis to save for document {document_id}")
+                return False
+            
+            logger.info(f"💾 [4/4] Saving specialized analysis for document {document_id}: {list(filtered_analysis.keys())}")
+            
+            # Make HTTP request to save specialized analysis
+            response = requests.post(
+                f"{self.backend_base_url}/api/internal/save-specialized-analysis",
+                json={
+                    "document_id": document_id,
+                    "specialized_analysis": filtered_analysis
+                },
+                timeout=30
+            )
+            
+            if response.status_code == 200:
+                logger.info(f"✅ Saved specialized analysis for document {document_id}")
+                return True
+            else:
+                logger.error(f"❌ Failed to save specialized analysis: {response.status_code}")
+                return False
+                
+        except Exception as e:
+            logger.error(f"❌ Error saving specialized analysis for document {document_id}: {e}")
+            return False
+
+    def new_session(self, **kwargs) -> "AnalysisSession":
+        """Per-document run state on top of this engine; see AnalysisSession for the arguments"""
+        return AnalysisSession(self, **kwargs)
+
+    def analyze_pdf(self, pdf_path: str, company_id: str = None, progress_callback=None, deck_id=None, processing_options: Dict = None) -> Dict[str, Any]:
+        """Analyze a pitch deck in a fresh session"""
+        return self.new_session().analyze_pdf(pdf_path, company_id, progress_callback, deck_id, processing_options)
+
+    def run_specialized_analysis_only(self, visual_analysis_results, extraction_data=None, selected_analyses=None):
+        """Run the specialized analyses in a fresh session"""
+        return self.new_session().run_specialized_analysis_only(visual_analysis_results, extraction_data, selected_analyses)
+
+
+class AnalysisSession:
+    """State of one analysis run: a document's visual analysis, extractions and results
+
+    Models may be overridden per session; anything else (prompts, templates, database
+    and backend access) is read from the shared engine.
+    """
+
+    def __init__(self, engine: HealthcareTemplateAnalyzer, deck_id: int = None, progress_callback=None,
+                 visual_analysis_results: List[Dict[str, Any]] = None, extraction_data: Dict[str, Any] = None,
+                 text_model: str = None, scoring_model: str = None, vision_model: str = None,
+                 image_analysis_prompt: str = None):
+        self.engine = engine
+        self.current_deck_id = deck_id
+        self.progress_callback = progress_callback
+        self._progress_reporter = None
+
+        self.vision_model = vision_model or engine.vision_model
+        self.text_model = text_model or engine.text_model
+        self.scoring_model = scoring_model or engine.scoring_model
+        self.image_analysis_prompt = image_analysis_prompt or engine.image_analysis_prompt
+        self.model_options = engine.get_model_options(self.text_model, self.vision_model, self.scoring_model)
+
+        # Analysis results storage
+        self.visual_analysis_results = list(visual_analysis_results or [])
+        self.company_offering = ""
+        self.startup_name = None
+        self.funding_amount = None
+        self.deck_date = None
+        self.classification_result = None
+        self.template_config = None
+        self.chapter_results = {}
+        self.question_results = {}
+        self.specialized_results = {}
+        self.specialized_analysis = {}
+        if extraction_data:
+            self.load_extraction_data(extraction_data)
+
+        # How each slide was analyzed in _analyze_visual_content
+        self.page_routing_mode = config.page_routing_mode
+        self.page_routing = {}
+
+        # Deck content per prompt: "retrieval" selects relevant slides, "full" sends the whole deck
+        self.deck_context_mode = config.deck_context_mode
+        self.deck_context_tokens = config.deck_context_tokens
+        self._slide_index = None
+
+        # Previous version of a revised deck: slide diff and answers that may be carried forward
+        self.previous_document_id = None
+        self.previous_question_results = {}
+        self.version_diff = {}
+
+        # Queue task checkpoints (TaskCheckpoints): finished pages and questions survive a crash
+        self.checkpoints = None
+
+    def __getattr__(self, name):
+        # Only called for attributes the session does not have itself
+        if name == "engine":
+            raise AttributeError(name)
+        return getattr(self.engine, name)
+
+    def _deck_context(self, query: str) -> str:
+        """Pitch deck content for a prompt: the slides most relevant to the query within the token budget"""
+        if self._slide_index is None or self._slide_index[0] is not self.visual_analysis_results:
+            self._slide_index = (self.visual_analysis_results, SlideIndex(self.visual_analysis_results))
+        index = self._slide_index[1]
+        if self.deck_context_mode == "full":
+            return index.full_text
+        return index.context(query, context_budget(self.model_options, self.deck_context_tokens))
+
+    def load_extraction_data(self, extraction_data: Dict[str, Any]):
+        """Company offering, name, funding, date and classification from an earlier extraction"""
+        self.company_offering = extraction_data.get("company_offering", "")
+        self.startup_name = extraction_data.get("startup_name", extraction_data.get("company_name", ""))
+        self.funding_amount = extraction_data.get("funding_amount", "")
+        self.deck_date = extraction_data.get("deck_date", "")
+        self.classification_result = extraction_data.get("classification", {})
+
+    def _classify_startup(self, company_offering: str) -> Dict[str, Any]:
+        """Classify startup using direct PostgreSQL access and local AI processing"""
+        try:
+            # Get healthcare sectors from PostgreSQL database
+            healthcare_sectors = self._get_healthcare_sectors()
+            
+            if not healthcare_sectors:
+                logger.warning("No healthcare sectors found in database")
+                return self._fallback_classification(company_offering)
+            
+            # Perform classification using local AI models
+            return self._perform_local_classification(company_offering, healthcare_sectors)
+                
+        except Exception as e:
+            logger.error(f"Error in local classification: {e}")
+            return self._fallback_classification(company_offering)
+    
+    def _perform_local_classification(self, company_offering: str, healthcare_sectors: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Perform classification using local AI models and healthcare sector data"""
+        try:
+            # Create classification prompt with all available sectors
+            sector_descriptions = []
+            for sector in healthcare_sectors:
+                sector_info = f"- {sector['name']}: {sector['description']}"
+                if sector['keywords']:
+                    sector_info += f" (Keywords: {', '.join(sector['keywords'])})"
+                sector_descriptions.append(sector_info)
+            
+            classification_prompt = f"""
+            You are a healthcare venture capital analyst. Classify the following startup offering into the most appropriate healthcare sector.
+            
+            Available healthcare sectors:
+            {chr(10).join(sector_descriptions)}
+            - other: For startups that don't fit into any of the above healthcare categories
+            
+            Company Offering: {company_offering}
+            
+            Analyze the offering and determine:
+            1. Primary healthcare sector (use the exact sector name from the list above, or "other" if none fit)
+            2. Confidence score (0.0 to 1.0)
+            3. Brief reasoning for the classification
+            4. Any secondary sector if applicable
+            5. Keywords that matched from the offering
+            
+            Respond in JSON format:
+            {{
+                "primary_sector": "exact_sector_name",
+                "confidence_score": 0.0-1.0,
+                "reasoning": "explanation",
+                "secondary_sector": "sector_name_or_null",
+                "keywords_matched": ["keyword1", "keyword2"]
+            }}
+            """
+            
+            # Use text model for classification
+            response = ollama.generate(
+                model=self.text_model,
+                prompt=classification_prompt,
+                options={**self.model_options, 'temperature': 0.2}  # Low temperature for consistent classification
+            )
+            
+            # Parse JSON response
+            import json
+            classification_text = response['response'].strip()
+            
+            # Extract JSON from response (handle cases where model adds extra text)
+            start_idx = classification_text.find('{')
+            end_idx = classification_text.rfind('}') + 1
+            if start_idx >= 0 and end_idx > start_idx:
+                json_str = classification_text[start_idx:end_idx]
+                classification_result = json.loads(json_str)
+                
+                # Find recommended template for the primary sector
+                recommended_template = None
+                for sector in healthcare_sectors:
+                    if sector['name'] == classification_result.get('primary_sector'):
+                        # Try to get template associated with this sector
+                        template_id = self._get_template_for_sector(sector['id'])
+                        recommended_template = template_id
+                        break
+                
+                # Add recommended template
+                classification_result['recommended_template'] = recommended_template
+                
+                logger.info(f"Local classification completed: {classification_result['primary_sector']} "
+                           f"(confidence: {classification_result.get('confidence_score', 0):.2f})")
+                
+                return classification_result
+            else:
+                logger.error("Could not parse JSON from classification response")
+                return self._fallback_classification(company_offering)
+                
+        except Exception as e:
+            logger.error(f"Error in local classification: {e}")
+            return self._fallback_classification(company_offering)
+    
+    def analyze_pdf(self, pdf_path: str, company_id: str = None, progress_callback=None, deck_id=None, processing_options: Dict = None) -> Dict[str, Any]:
+        """Main method to analyze a healthcare startup pitch deck"""
+        start_time = time.time()
+        logger.info(f"Starting healthcare template analysis of PDF: {pdf_path}")
+        
+        # Store progress callback and deck_id for chapter processing
+        self.progress_callback = progress_callback
+        self.current_deck_id = deck_id
+        
+        # Set up progress reporter for frontend updates
+        if deck_id:
+            from .progress_reporter import ProgressReporter
+            # Extract document name from path for better logging
+            document_name = os.path.basename(pdf_path) if pdf_path else f"Document {deck_id}"
+            self._progress_reporter = ProgressReporter(self.backend_base_url, deck_id, document_name)
+            self._progress_reporter.report_phase_start("Analysis Started", 1)
+        
+        # Log model configuration at start of analysis
+        logger.info(f"🤖 AI Model Configuration:")
+        logger.info(f"   📷 Vision Model (slide analysis): {self.vision_model}")
+        logger.info(f"   📝 Text Model (offering extraction, name extraction, classification, chapters, questions, specialized analysis): {self.text_model}")
+        logger.info(f"   🎯 Scoring Model (question scoring): {self.scoring_model}")
+        
+        # Clear state from previous analysis sessions (but preserve cached visual analysis if provided)
+        cached_visual_results = self.visual_analysis_results if self.visual_analysis_results else []
+        
+        self.visual_analysis_results = []
+        self.company_offering = ""
+        self.startup_name = None
+        self.funding_amount = None
+        self.deck_date = None
+        self.classification_result = None
+        self.template_config = None
+        self.chapter_results = {}
+        self.question_results = {}
+        
+        # Restore cached visual analysis if it was provided
+        if cached_visual_results:
+            self.visual_analysis_results = cached_visual_results
+            logger.info(f"Preserved cached visual analysis results ({len(cached_visual_results)} pages)")
+        else:
+            logger.info("Cleared previous analysis state")
+        
+        try:
+            # Vision Container Processing (moved to separate tasks)
+            # Visual analysis and slide feedback now run in vision container as separate tasks
+            logger.info("Visual analysis and slide feedback are handled by vision container tasks")
+            
+            # Text Container Processing: Extractions + Template Processing Only
+            # Visual analysis results should be provided by vision container tasks
+            if not self.visual_analysis_results:
+                logger.info("No visual analysis results provided - attempting to retrieve from cache")
+                if deck_id:
+                    self.visual_analysis_results = self._fetch_cached_visual_analysis(deck_id)
+                
+                if not self.visual_analysis_results:
+                    logger.error("No visual analysis results available for text processing. Vision container should provide these.")
+                    raise ValueError("Text container requires visual analysis results from vision container")
+            
+            # Revised deck: diff its slides against the previous version and load that version's answers
+            if processing_options and processing_options.get('previous_document_id'):
+                self._load_previous_version(int(processing_options['previous_document_id']))
+            
+            # Step 2: Generate company offering summary
+            if not self.company_offering:
+                # Step 2: Generate company offering summary
+                self._generate_company_offering()
+                
+                # Step 2.5: Extract startup name
+                self._extract_startup_name()
+                
+                # Step 2.6: Extract funding amount
+                self._extract_funding_amount()
+                
+                # Step 2.7: Extract deck date
+                self._extract_deck_date()
+                
+                # Step 3: ALWAYS run classification (required for dojo experiments and analytics)
+                self.classification_result = self._classify_startup(self.company_offering)
+                logger.info(f"Startup classified as: {self.classification_result.get('primary_sector')} "
+                           f"({self.classification_result.get('confidence_score', 0):.2f} confidence)")
+                
+                # SAVE POINT 1: Save extraction results (company_offering, classification, funding, etc.)
+                if deck_id:
+                    extraction_data = {
+                        'company_offering': self.company_offering,
+                        'classification': self.classification_result,
+                        'funding_amount': getattr(self, 'funding_amount', ''),
+                        'deck_date': getattr(self, 'deck_date', ''),
+                        'company_name': getattr(self, 'company_name', '')
+                    }
+                    self._save_extraction_results(deck_id, extraction_data)
+                
+                # Step 4: Determine template selection method (classification vs GP override)
+                if processing_options and processing_options.get('use_single_template') and processing_options.get('selected_template_id'):
+                    # Use GP-specified template override (but keep classification results)
+                    template_id = processing_options.get('selected_template_id')
+                    logger.info(f"Template selection: GP override mode - using template_id={template_id}")
+                    logger.info(f"Classification result stored: {self.classification_result.get('primary_sector')} "
+                               f"(would have recommended template {self.classification_result.get('recommended_template')})")
+                    self.template_config = self._load_template_config_with_fallback(template_id)
+                else:
+                    # Use classification-recommended template
+                    template_id = self.classification_result.get("recommended_template")
+                    logger.info(f"Template selection: Classification mode - using recommended template_id={template_id}")
+                    self.template_config = self._load_template_config_with_fallback(template_id)
             
             # Step 5: Execute template-based analysis (skip if only extraction requested)
             if not (processing_options and processing_options.get('extraction_only', False)):
@@ -1237,6 +1578,63 @@ class HealthcareTemplateAnalyzer:
             logger.error(f"Error in healthcare template analysis: {e}")
             raise
     
+    def _fetch_cached_visual_analysis(self, document_id: int) -> List[Dict[str, Any]]:
+        """Visual analysis results of a document from the backend cache, or an empty list"""
+        try:
+            response = requests.post(
+                f"{self.backend_base_url}/api/dojo/internal/get-cached-visual-analysis",
+                json={
+                    "document_id": document_id,
+                    "document_type": "pitch_deck"  # Future: determine from database
+                },
+                timeout=30
+            )
+            if response.status_code != 200:
+                logger.warning(f"Failed to retrieve cached visual analysis: HTTP {response.status_code}")
+                return []
+            result = response.json()
+            cached_analysis = result.get("cached_analysis") if result.get("success") else None
+            results = (cached_analysis or {}).get(str(document_id), {}).get("visual_analysis_results")
+            if not results:
+                logger.warning(f"No cached visual analysis found for document {document_id}")
+                return []
+            logger.info(f"📥 Retrieved cached visual analysis: {len(results)} pages")
+            return results
+        except Exception as e:
+            logger.warning(f"Error retrieving cached visual analysis: {e}")
+            return []
+    
+    def _load_previous_version(self, previous_document_id: int):
+        """Slide diff against the previous deck version and its question results for carrying forward"""
+        self.previous_document_id = previous_document_id
+        previous_visual = self._fetch_cached_visual_analysis(previous_document_id)
+        self.version_diff = diff_slide_versions(previous_visual, self.visual_analysis_results, slide_analysis_cache.max_distance)
+        logger.info(
+            f"🔁 Deck version diff against document {previous_document_id}: "
+            f"{len(self.version_diff['unchanged'])} unchanged, {len(self.version_diff['changed'])} changed, "
+            f"{len(self.version_diff['removed'])} removed slides"
+        )
+        
+        try:
+            conn = psycopg2.connect(self.database_url)
+            try:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "SELECT chapter_id, analysis_results_json FROM chapter_analysis_results WHERE document_id = %s",
+                    (previous_document_id,)
+                )
+                chapter_analysis = {
+                    str(chapter_id): json.loads(data) if isinstance(data, str) else data
+                    for chapter_id, data in cursor.fetchall()
+                }
+            finally:
+                conn.close()
+            self.previous_question_results = previous_question_results(chapter_analysis)
+            logger.info(f"🔁 Loaded {len(self.previous_question_results)} question results of document {previous_document_id}")
+        except Exception as e:
+            logger.warning(f"Could not load question results of document {previous_document_id}, analyzing all questions: {e}")
+            self.previous_question_results = {}
+    
     def _analyze_visual_content(self, pdf_path: str, company_id: str = None, deck_id: int = None):
         """Convert PDF to images and analyze each page with project-based storage"""
         logger.info("Converting PDF to images for visual analysis")
@@ -1264,6 +1662,23 @@ class HealthcareTemplateAnalyzer:
             total_pages = len(pages_as_images)
             logger.info(f"Processing {total_pages} pages for {company_id}/{deck_name}")
             
+            # Text layer and layout per page, to route text-dominant slides away from the vision model
+            # and to tell apart slides that share a template in the slide cache
+            page_layouts = {}
+            if self.page_routing_mode == "hybrid" or slide_analysis_cache.enabled:
+                page_layouts = {layout["page_number"]: layout for layout in PDFExtractor().page_layouts(pdf_path)}
+            routed_pages = []
+            
+            # Slide key per page: unchanged or shared slides of the company reuse their cached description
+            slide_keys = [
+                slide_key(page_image, page_layouts.get(page_number + 1, {}).get("text"))
+                for page_number, page_image in enumerate(pages_as_images)
+            ]
+            cached_descriptions = slide_analysis_cache.lookup(
+                self.database_url, DESCRIPTION, company_id, slide_keys, self.vision_model, self.image_analysis_prompt
+            )
+            new_descriptions = []
+            
             for page_number, page_image in enumerate(pages_as_images):
                 # Check if document was deleted every 3 pages
                 if deck_id and page_number % 3 == 0:
@@ -1287,16 +1702,57 @@ class HealthcareTemplateAnalyzer:
                 slide_path = os.path.join(analysis_path, slide_filename)
                 page_image.save(slide_path, "JPEG")
                 
-                # Convert image to bytes for AI analysis
-                image_bytes = image_to_byte_array(page_image)
-                
-                # Get AI analysis of the page
-                logger.info(f"🔍 Analyzing page {page_number + 1} with prompt: {self.image_analysis_prompt[:100]}...")
-                page_analysis = get_information_for_image(
-                    image_bytes, 
-                    self.image_analysis_prompt, 
-                    self.vision_model
-                )
+                # Get AI analysis of the page - from the slide cache, from its text layer if the
+                # slide is text-dominant, or from the vision model
+                layout = page_layouts.get(page_number + 1) if self.page_routing_mode == "hybrid" else None
+                key = slide_keys[page_number]
+                start = time.monotonic()
+                checkpoint = self.checkpoints.get(VISUAL_PAGE, page_number + 1, key.fingerprint()) if self.checkpoints else None
+                cached = cached_descriptions.get(key) or self._deck_duplicate(key, new_descriptions)
+                if checkpoint:
+                    route = checkpoint["analysis_route"]
+                    page_analysis = checkpoint["description"]
+                    logger.info(f"♻️ Page {page_number + 1} resumed from checkpoint of an earlier attempt")
+                elif cached:
+                    route = "cache"
+                    page_analysis = cached["result"]
+                    logger.info(f"♻️ Reused cached description for page {page_number + 1} (distance {cached.get('distance', 0)})")
+                else:
+                    route = route_page(layout) if layout else "vision"
+                    page_analysis = self._describe_text_page(layout["text"]) if route == "text" else None
+                if page_analysis is None:
+                    if route == "text":
+                        route = "vision_with_text"
+                    prompt = self.image_analysis_prompt
+                    if route == "vision_with_text":
+                        prompt = TEXT_HINT_PROMPT.format(image_analysis_prompt=prompt, page_text=layout["text"][:MAX_PAGE_TEXT_CHARS])
+                    
+                    # Convert image to bytes for AI analysis
+                    image_bytes = image_to_byte_array(page_image)
+                    logger.info(f"🔍 Analyzing page {page_number + 1} ({route}) with prompt: {self.image_analysis_prompt[:100]}...")
+                    page_analysis = get_information_for_image(
+                        image_bytes, 
+                        prompt, 
+                        self.vision_model
+                    )
+                elif route == "text" and not checkpoint:
+                    logger.info(f"📄 Described page {page_number + 1} from its text layer")
+                
+                if self.checkpoints and not checkpoint:
+                    self.checkpoints.save(VISUAL_PAGE, page_number + 1, {"description": page_analysis, "analysis_route": route}, key.fingerprint())
+                
+                if route != "cache":
+                    new_descriptions.append({"slide_key": key, "result": page_analysis, "analysis_route": route})
+                
+                if layout or route == "cache":
+                    routed_pages.append({
+                        "page_number": page_number + 1,
+                        "route": route,
+                        "word_count": layout["word_count"] if layout else None,
+                        "image_coverage": layout["image_coverage"] if layout else None,
+                        "drawing_count": layout["drawing_count"] if layout else None,
+                        "seconds": round(time.monotonic() - start, 2)
+                    })
                 
                 # Store analysis with image path reference (structured format)
                 page_analysis_data = {
@@ -1305,12 +1761,35 @@ class HealthcareTemplateAnalyzer:
                     "description": page_analysis,
                     "company_id": company_id,
                     "deck_name": deck_name,
-                    "deck_id": deck_id
+                    "deck_id": deck_id,
+                    "analysis_route": route,
+                    **key.page_fields()
                 }
                 
                 self.visual_analysis_results.append(page_analysis_data)
             
             logger.info(f"Saved {total_pages} slide images to {analysis_path}")
+            
+            slide_analysis_cache.store(self.database_url, DESCRIPTION, company_id, new_descriptions, self.vision_model, self.image_analysis_prompt)
+            logger.info(f"♻️ Slide cache for deck {deck_id}: {total_pages - len(new_descriptions)}/{total_pages} descriptions reused")
+            
+            if routed_pages:
+                self.page_routing = summarize_page_routing(routed_pages)
+                logger.info(
+                    f"🧭 Page routing for deck {deck_id}: {self.page_routing['routes']}, "
+                    f"estimated vision time saved: {self.page_routing['estimated_seconds_saved']}s"
+                )
+            
+            # Thumbnail stage: small/medium variants, sprite sheet and manifest for overview screens
+            try:
+                SlideThumbnailGenerator().generate(
+                    analysis_path,
+                    [(page_number + 1, page_image) for page_number, page_image in enumerate(pages_as_images)],
+                    deck_name=deck_name
+                )
+            except Exception as e:
+                logger.warning(f"Could not generate slide thumbnails for {company_id}/{deck_name}: {e}")
+            
             if self._progress_reporter:
                 self._progress_reporter.report_phase_complete("Visual Analysis", 30)
                 
@@ -1318,6 +1797,31 @@ class HealthcareTemplateAnalyzer:
             logger.error(f"Error in visual content analysis: {e}")
             raise
     
+    def _deck_duplicate(self, key, analyzed: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """An earlier result of this deck for the same slide, e.g. a repeated section divider"""
+        best = closest_entry(key, ((entry["slide_key"], entry) for entry in analyzed), slide_analysis_cache.max_distance)
+        if not slide_analysis_cache.enabled or not best:
+            return None
+        distance, entry = best
+        return {**entry, "distance": distance}
+    
+    def _describe_text_page(self, page_text: str) -> Optional[str]:
+        """Slide description from the PDF text layer with a text-only prompt to the vision model
+
+        Staying on the vision model keeps it resident for the image pages of the deck;
+        without an image to encode the call costs a fraction of a vision request.
+        Returns None if the call fails, so the page falls back to image analysis."""
+        try:
+            response = ollama.generate(
+                model=self.vision_model,
+                prompt=TEXT_PAGE_PROMPT.format(image_analysis_prompt=self.image_analysis_prompt, page_text=page_text[:MAX_PAGE_TEXT_CHARS])
+            )
+            description = (response.get('response') or '').strip()
+            return description or None
+        except Exception as e:
+            logger.warning(f"Text-layer description failed, falling back to image analysis: {e}")
+            return None
+    
     def _generate_slide_feedback(self):
         """Generate AI feedback for each slide by analyzing images directly (IMAGE-to-TEXT)"""
         if not self.visual_analysis_results:
@@ -1328,7 +1832,7 @@ class HealthcareTemplateAnalyzer:
         logger.info(f"🔍 Generating slide feedback for {total_slides} slides using direct image analysis")
         
         # Report slide feedback phase start
-        if hasattr(self, '_progress_reporter'):
+        if self._progress_reporter:
             self._progress_reporter.report_phase_start("Slide Feedback Generation", 25)
         
         # Get slide feedback prompt
@@ -1341,7 +1845,15 @@ class HealthcareTemplateAnalyzer:
         processed_slides = 0
         slide_feedback_data = []  # Accumulate all feedback data
         
-        for slide_data in self.visual_analysis_results:
+        # Feedback for slides the company's decks had before (same slide key, model and prompt) is reused
+        known_keys = [page_slide_key(slide_data) for slide_data in self.visual_analysis_results]
+        company_id = next((slide_data.get('company_id') for slide_data in self.visual_analysis_results if slide_data.get('company_id')), None)
+        cached_feedback = slide_analysis_cache.lookup(
+            self.database_url, FEEDBACK, company_id, [key for key in known_keys if key is not None], self.vision_model, slide_feedback_prompt
+        )
+        new_feedback = []
+        
+        for slide_data, known_key in zip(self.visual_analysis_results, known_keys):
             try:
                 slide_number = slide_data['page_number']
                 slide_image_path = slide_data.get('slide_image_path')
@@ -1365,7 +1877,7 @@ class HealthcareTemplateAnalyzer:
                 logger.info(f"📝 Generating feedback for slide {slide_number} using image: {full_image_path}")
                 
                 # Report progress for each slide
-                if hasattr(self, '_progress_reporter'):
+                if self._progress_reporter:
                     progress = 25 + int((processed_slides / total_slides) * 10)  # 25-35% range for slide feedback
                     self._progress_reporter.report_phase_progress(
                         "Slide Feedback Generation", 
@@ -1382,17 +1894,29 @@ class HealthcareTemplateAnalyzer:
                     logger.error(f"Failed to load image {full_image_path}: {e}")
                     continue
                 
-                # Generate feedback using vision model directly on the image
-                feedback_response = get_information_for_image(
-                    image_bytes=image_bytes,
-                    prompt=slide_feedback_prompt,
-                    model=self.vision_model  # Use vision model for image analysis
-                )
-                
-                feedback_text = feedback_response.strip() if feedback_response else ""
-                
-                # Determine if slide has issues or is OK
-                has_issues = feedback_text.upper() != "SLIDE_OK" and len(feedback_text) > 10
+                key = known_key if known_key is not None else slide_key(image)
+                cached = cached_feedback.get(key) or self._deck_duplicate(key, new_feedback)
+                if cached:
+                    feedback_text = cached["result"] or ""
+                    has_issues = bool(cached["has_issues"])
+                    logger.info(f"♻️ Reused cached feedback for slide {slide_number}")
+                else:
+                    # Generate feedback using vision model directly on the image
+                    feedback_response = get_information_for_image(
+                        image_bytes=image_bytes,
+                        prompt=slide_feedback_prompt,
+                        model=self.vision_model  # Use vision model for image analysis
+                    )
+                    
+                    feedback_text = feedback_response.strip() if feedback_response else ""
+                    
+                    # Determine if slide has issues or is OK
+                    has_issues = feedback_text.upper() != "SLIDE_OK" and len(feedback_text) > 10
+                    new_feedback.append({
+                        "slide_key": key,
+                        "result": feedback_text if has_issues else None,
+                        "has_issues": has_issues
+                    })
                 
                 # Accumulate feedback data instead of saving immediately
                 slide_feedback_data.append({
@@ -1417,44 +1941,17 @@ class HealthcareTemplateAnalyzer:
                 continue
         
         # Report slide feedback completion
-        if hasattr(self, '_progress_reporter'):
+        if self._progress_reporter:
             self._progress_reporter.report_phase_complete("Slide Feedback Generation", 35)
                 
         logger.info("🎯 Slide feedback generation completed using direct image analysis")
         
+        slide_analysis_cache.store(self.database_url, FEEDBACK, company_id, new_feedback, self.vision_model, slide_feedback_prompt)
+        
         # Save slide feedback results (after all slides are processed)
         if slide_feedback_data and deck_id:
             self._save_slide_feedback(deck_id, slide_feedback_data)
     
-    def _save_individual_slide_feedback(self, deck_id: int, slide_number: int, slide_filename: str, feedback_text: str = None, has_issues: bool = False):
-        """Store individual slide feedback in the database (called for each slide)"""
-        try:
-            import psycopg2
-            from datetime import datetime
-            
-            conn = psycopg2.connect(self.database_url)
-            cursor = conn.cursor()
-            
-            # Insert or update slide feedback (include feedback_type in conflict resolution)
-            cursor.execute("""
-                INSERT INTO slide_feedback (document_id, slide_number, slide_filename, feedback_text, feedback_type, has_issues, created_at, updated_at)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT (document_id, slide_number, feedback_type) 
-                DO UPDATE SET 
-                    feedback_text = EXCLUDED.feedback_text,
-                    has_issues = EXCLUDED.has_issues,
-                    updated_at = EXCLUDED.updated_at
-            """, (deck_id, slide_number, slide_filename, feedback_text, 'ai_analysis', has_issues, datetime.now(), datetime.now()))
-            
-            conn.commit()
-            conn.close()
-            
-            logger.debug(f"📊 Stored slide feedback for deck {deck_id}, slide {slide_number}")
-            
-        except Exception as e:
-            logger.error(f"Failed to store slide feedback for deck {deck_id}, slide {slide_number}: {e}")
-            raise
-    
     def _save_visual_analysis(self, deck_id: int):
         """Save Function 1: Visual analysis results (for deck viewer availability)
         This caches visual analysis results so the deck viewer can display slides immediately"""
@@ -1462,10 +1959,12 @@ class HealthcareTemplateAnalyzer:
             import requests
             import json
             
-            # Prepare visual analysis data for caching
+            # Prepare visual analysis data for caching, with how each slide was analyzed
             cache_data = {
                 "visual_analysis_results": self.visual_analysis_results
             }
+            if self.page_routing:
+                cache_data["page_routing"] = self.page_routing
             
             # Use the backend's internal caching endpoint
             response = requests.post(
@@ -1487,173 +1986,9 @@ class HealthcareTemplateAnalyzer:
         except Exception as e:
             logger.error(f"❌ Error saving visual analysis results for deck {deck_id}: {e}")
             
-        # Note: Individual slide feedback is stored via _save_individual_slide_feedback() during generation
+        # Note: Slide feedback is stored in one batch via _save_slide_feedback() after generation
         # This function handles the overall visual analysis caching for deck viewer availability
     
-    def _save_slide_feedback(self, deck_id: int, slide_feedback_data: list):
-        """Save Function 2: Slide feedback results (batch save after all feedback is generated)
-        This saves all slide feedback data at once, consistent with other save functions"""
-        try:
-            if not slide_feedback_data:
-                logger.info(f"No slide feedback to save for document {deck_id}")
-                return False
-            
-            logger.info(f"💾 [2/4] Saving slide feedback for document {deck_id} ({len(slide_feedback_data)} slides)")
-            
-            # Save all slide feedback in batch
-            for feedback_item in slide_feedback_data:
-                self._save_individual_slide_feedback(
-                    deck_id=feedback_item['deck_id'],
-                    slide_number=feedback_item['slide_number'], 
-                    slide_filename=feedback_item['slide_filename'],
-                    feedback_text=feedback_item['feedback_text'],
-                    has_issues=feedback_item['has_issues']
-                )
-            
-            logger.info(f"✅ Slide feedback saved for deck {deck_id} ({len(slide_feedback_data)} slides)")
-            return True
-            
-        except Exception as e:
-            logger.error(f"❌ Error saving slide feedback for deck {deck_id}: {e}")
-            return False
-    
-    def _save_extraction_results(self, document_id: int, extraction_data: dict):
-        """Save Function 2: Extraction experiment results
-        This includes: company_offering, classification, funding_sought, deck_date, company_name"""
-        try:
-            import requests
-            import json
-            
-            # Essential extraction fields
-            essential_fields = ['company_offering', 'classification', 'funding_amount', 'deck_date', 'company_name']
-            
-            # Check if we have any extraction data
-            has_data = any(extraction_data.get(field) for field in essential_fields)
-            
-            if not has_data:
-                logger.info(f"No extraction results to save for document {document_id}")
-                return False
-            
-            logger.info(f"💾 [2/4] Saving extraction results for document {document_id}")
-            
-            # Prepare extraction data - ensure all fields are present
-            extraction_results = {
-                "company_offering": extraction_data.get('company_offering', ''),
-                "classification": extraction_data.get('classification', {}),
-                "funding_amount": extraction_data.get('funding_amount', ''),
-                "deck_date": extraction_data.get('deck_date', ''),
-                "company_name": extraction_data.get('company_name', '')
-            }
-            
-            # Save to main project_documents table
-            response = requests.post(
-                f"{self.backend_base_url}/api/internal/update-deck-results",
-                json={
-                    "document_id": document_id,
-                    "extraction_results": extraction_results,
-                    "results_file_path": f"extraction_results_document_{document_id}.json",
-                    "processing_status": "extraction_complete"
-                },
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                logger.info(f"✅ Saved extraction results for document {document_id}")
-                return True
-            else:
-                logger.error(f"❌ Failed to save extraction results: {response.status_code}")
-                return False
-                
-        except Exception as e:
-            logger.error(f"❌ Error saving extraction results for document {document_id}: {e}")
-            return False
-    
-    def _save_template_processing_results(self, document_id: int, template_results: dict):
-        """Save Function 3: Template processing results 
-        This includes: chapter_analysis, question_analysis, overall_score, template_used"""
-        try:
-            import requests
-            
-            # Check if we have template processing results
-            chapter_analysis = template_results.get("chapter_analysis", {})
-            
-            if not chapter_analysis:
-                logger.info(f"No template processing results to save for document {document_id}")
-                return False
-            
-            logger.info(f"💾 [3/4] Saving template processing results for document {document_id}")
-            
-            # Prepare template-specific data
-            template_data = {
-                "template_used": template_results.get("template_used", {}),
-                "chapter_analysis": chapter_analysis,
-                "question_analysis": template_results.get("question_analysis", {}),
-                "overall_score": template_results.get("overall_score", 0.0),
-                "report_chapters": template_results.get("report_chapters", {}),
-                "report_scores": template_results.get("report_scores", {}),
-                "processing_metadata": template_results.get("processing_metadata", {})
-            }
-            
-            # Save template processing to extraction_experiments
-            response = requests.post(
-                f"{self.backend_base_url}/api/internal/save-template-processing",
-                json={
-                    "experiment_name": f"template_deck_{document_id}",
-                    "document_id": document_id,
-                    "template_processing_results": template_data
-                },
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                logger.info(f"✅ Saved template processing results for document {document_id}")
-                return True
-            else:
-                logger.error(f"❌ Failed to save template processing results: {response.status_code}")
-                return False
-                
-        except Exception as e:
-            logger.error(f"❌ Error saving template processing results for document {document_id}: {e}")
-            return False
-    
-    def _save_specialized_analysis(self, document_id: int, specialized_analysis: dict):
-        """Save Function 4: Special analyses (regulatory, clinical, scientific)"""
-        try:
-            import requests
-            
-            # Filter out empty or None values
-            filtered_analysis = {
-                key: value for key, value in specialized_analysis.items() 
-                if value and str(value).strip()
-            }
-            
-            if not filtered_analysis:
-                logger.info(f"No specialized analysis to save for document {document_id}")
-                return False
-            
-            logger.info(f"💾 [4/4] Saving specialized analysis for document {document_id}: {list(filtered_analysis.keys())}")
-            
-            # Make HTTP request to save specialized analysis
-            response = requests.post(
-                f"{self.backend_base_url}/api/internal/save-specialized-analysis",
-                json={
-                    "document_id": document_id,
-                    "specialized_analysis": filtered_analysis
-                },
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                logger.info(f"✅ Saved specialized analysis for document {document_id}")
-                return True
-            else:
-                logger.error(f"❌ Failed to save specialized analysis: {response.status_code}")
-                return False
-                
-        except Exception as e:
-            logger.error(f"❌ Error saving specialized analysis for document {document_id}: {e}")
-            return False
-    
     def _generate_company_offering(self):
         """Generate company offering summary"""
         # Check if document was deleted before this major phase
@@ -1832,16 +2167,6 @@ class HealthcareTemplateAnalyzer:
             logger.warning("No template configuration available, skipping template analysis")
             return
         
-        # Extract descriptions from the structured data
-        descriptions = []
-        for page_data in self.visual_analysis_results:
-            if isinstance(page_data, dict):
-                descriptions.append(page_data.get("description", ""))
-            else:
-                descriptions.append(str(page_data))
-        
-        full_pitchdeck_text = " ".join(descriptions)
-        
         for chapter in self.template_config["chapters"]:
             chapter_id = chapter["chapter_id"]
             chapter_name = chapter["name"]
@@ -1866,6 +2191,42 @@ class HealthcareTemplateAnalyzer:
                 scoring_criteria = question.get("scoring_criteria", "")
                 healthcare_focus = question.get("healthcare_focus", "")
                 
+                # Slides relevant to this question, also used for scoring the answer
+                pitch_deck_text = self._deck_context(f"{question_text} {healthcare_focus} {scoring_criteria}")
+                context_hash = question_context_hash(question, pitch_deck_text, self.text_model, self.scoring_model)
+                
+                # Revised deck: keep the previous answer if the question and its slides are unchanged
+                previous = carried_forward(self.previous_question_results.get(question_id), context_hash, self.previous_document_id)
+                if previous:
+                    logger.info(f"🔁 Question {question_id}: context unchanged, carried forward from document {self.previous_document_id}")
+                    chapter_responses.append(previous["response"])
+                    chapter_scores.append(previous["score"])
+                    self.question_results[question_id] = {
+                        "question_text": question_text,
+                        "scoring_criteria": scoring_criteria,
+                        "healthcare_focus": healthcare_focus,
+                        "chapter_id": chapter_id,
+                        "context_hash": context_hash,
+                        **previous
+                    }
+                    continue
+                
+                checkpoint = self.checkpoints.get(QUESTION, question_id, context_hash) if self.checkpoints else None
+                if checkpoint:
+                    logger.info(f"♻️ Question {question_id} resumed from checkpoint of an earlier attempt")
+                    chapter_responses.append(checkpoint["response"])
+                    chapter_scores.append(checkpoint["score"])
+                    self.question_results[question_id] = {
+                        "question_text": question_text,
+                        "scoring_criteria": scoring_criteria,
+                        "healthcare_focus": healthcare_focus,
+                        "chapter_id": chapter_id,
+                        "context_hash": context_hash,
+                        "analyzed_in_document_id": self.current_deck_id,
+                        **checkpoint
+                    }
+                    continue
+                
                 # Generate question-specific analysis
                 question_prompt = f"""
                 You are a healthcare venture capital analyst reviewing a pitch deck. 
@@ -1877,7 +2238,7 @@ class HealthcareTemplateAnalyzer:
                 Based on the pitch deck content below, provide a single paragraph answering this question.
                 Focus on healthcare-specific considerations and clinical relevance.
                 
-                Pitch deck content: {full_pitchdeck_text}
+                Pitch deck content: {pitch_deck_text}
                 """
                 
                 try:
@@ -1891,7 +2252,7 @@ class HealthcareTemplateAnalyzer:
                     chapter_responses.append(question_response)
                     
                     # Generate score for this question
-                    score, scoring_response = self._score_question(question_text, scoring_criteria, question_response, full_pitchdeck_text)
+                    score, scoring_response = self._score_question(question_text, scoring_criteria, question_response, pitch_deck_text)
                     chapter_scores.append(score)
                     
                     # Store question result
@@ -1902,8 +2263,14 @@ class HealthcareTemplateAnalyzer:
                         "scoring_criteria": scoring_criteria,
                         "healthcare_focus": healthcare_focus,
                         "scoring_response": scoring_response,  # Add scoring response for debugging
-                        "chapter_id": chapter_id  # Add chapter association for startup-compatible format
+                        "chapter_id": chapter_id,  # Add chapter association for startup-compatible format
+                        "context_hash": context_hash,
+                        "analyzed_in_document_id": self.current_deck_id
                     }
+                    if self.checkpoints:
+                        self.checkpoints.save(QUESTION, question_id, {
+                            "response": question_response, "score": score, "scoring_response": scoring_response
+                        }, context_hash)
                     
                 except Exception as e:
                     logger.error(f"Error analyzing question {question_id}: {e}")
@@ -1950,6 +2317,7 @@ class HealthcareTemplateAnalyzer:
                 self.chapter_results[chapter_id] = {
                     "name": chapter_name,
                     "key": chapter_key,  # Add key for startup-compatible mapping
+                    "template_chapter_id": chapter.get("id"),  # template_chapters row; stored as chapter_id
                     "description": chapter.get("description", ""),
                     "questions": chapter_question_details,  # New structured format
                     "weighted_score": average_score,  # Frontend expects this field name
@@ -2051,24 +2419,14 @@ class HealthcareTemplateAnalyzer:
         if self._progress_reporter:
             self._progress_reporter.report_phase_start("Specialized Analysis", 85)
         
-        # Extract descriptions from the structured data
-        descriptions = []
-        for page_data in self.visual_analysis_results:
-            if isinstance(page_data, dict):
-                descriptions.append(page_data.get("description", ""))
-            else:
-                descriptions.append(str(page_data))
-        
-        full_pitchdeck_text = " ".join(descriptions)
-        
         for analysis_type in specialized_analyses:
             try:
                 if analysis_type == "clinical_validation":
-                    self._generate_clinical_validation_analysis(full_pitchdeck_text)
+                    self._generate_clinical_validation_analysis()
                 elif analysis_type == "regulatory_pathway":
-                    self._generate_regulatory_pathway_analysis(full_pitchdeck_text)
+                    self._generate_regulatory_pathway_analysis()
                 elif analysis_type == "scientific_hypothesis":
-                    self._generate_scientific_hypothesis_analysis(full_pitchdeck_text)
+                    self._generate_scientific_hypothesis_analysis()
                 else:
                     logger.warning(f"Unknown specialized analysis type: {analysis_type}")
                     
@@ -2076,7 +2434,7 @@ class HealthcareTemplateAnalyzer:
                 logger.error(f"Error in specialized analysis {analysis_type}: {e}")
                 self.specialized_results[analysis_type] = f"Error: {str(e)}"
     
-    def _generate_clinical_validation_analysis(self, pitch_deck_text: str):
+    def _generate_clinical_validation_analysis(self):
         """Generate clinical validation analysis"""
         prompt = """
         You are a healthcare venture capital analyst with clinical expertise.
@@ -2098,7 +2456,7 @@ class HealthcareTemplateAnalyzer:
         try:
             response = ollama.generate(
                 model=self.text_model,
-                prompt=prompt.format(pitch_deck_content=pitch_deck_text),
+                prompt=prompt.format(pitch_deck_content=self._deck_context(prompt)),
                 options={**self.model_options, 'temperature': 0.1}
             )
             
@@ -2108,7 +2466,7 @@ class HealthcareTemplateAnalyzer:
             logger.error(f"Error in clinical validation analysis: {e}")
             self.specialized_results["clinical_validation"] = f"Error: {str(e)}"
     
-    def _generate_regulatory_pathway_analysis(self, pitch_deck_text: str):
+    def _generate_regulatory_pathway_analysis(self):
         """Generate regulatory pathway analysis"""
         prompt = """
         You are a healthcare regulatory expert analyzing a pitch deck.
@@ -2130,7 +2488,7 @@ class HealthcareTemplateAnalyzer:
         try:
             response = ollama.generate(
                 model=self.text_model,
-                prompt=prompt.format(pitch_deck_content=pitch_deck_text),
+                prompt=prompt.format(pitch_deck_content=self._deck_context(prompt)),
                 options={**self.model_options, 'temperature': 0.1}
             )
             
@@ -2140,7 +2498,7 @@ class HealthcareTemplateAnalyzer:
             logger.error(f"Error in regulatory pathway analysis: {e}")
             self.specialized_results["regulatory_pathway"] = f"Error: {str(e)}"
     
-    def _generate_scientific_hypothesis_analysis(self, pitch_deck_text: str):
+    def _generate_scientific_hypothesis_analysis(self):
         """Generate scientific hypothesis analysis"""
         prompt = """
         You are a medical doctor and scientist reviewing a healthcare startup pitch deck.
@@ -2161,7 +2519,7 @@ class HealthcareTemplateAnalyzer:
         try:
             response = ollama.generate(
                 model=self.text_model,
-                prompt=prompt.format(pitch_deck_content=pitch_deck_text),
+                prompt=prompt.format(pitch_deck_content=self._deck_context(prompt)),
                 options={**self.model_options, 'temperature': 0.1}
             )
             
@@ -2218,11 +2576,15 @@ class HealthcareTemplateAnalyzer:
                         "score": question_data.get("score", 0),
                         "scoring_criteria": question_data.get("scoring_criteria", ""),
                         "healthcare_focus": question_data.get("healthcare_focus", "general"),
-                        "scoring_response": question_data.get("scoring_response", "")
+                        "scoring_response": question_data.get("scoring_response", ""),
+                        "context_hash": question_data.get("context_hash"),
+                        "analyzed_in_document_id": question_data.get("analyzed_in_document_id"),
+                        "carried_forward_from": question_data.get("carried_forward_from")
                     })
                     question_counter += 1
             
             formatted_chapter_analysis[chapter_key] = {
+                "template_chapter_id": chapter_data.get("template_chapter_id"),
                 "name": chapter_data.get("name", ""),
                 "description": chapter_data.get("description", ""),
                 "questions": questions_list,
@@ -2287,7 +2649,13 @@ class HealthcareTemplateAnalyzer:
                 },
                 "total_pages_analyzed": len(self.visual_analysis_results),
                 "classification_confidence": self.classification_result.get("confidence_score", 0.0) if self.classification_result else 0.0,
-                "template_id": self.template_config.get("template", {}).get("id") if self.template_config else None
+                "template_id": self.template_config.get("template", {}).get("id") if self.template_config else None,
+                "deck_version": {
+                    "previous_document_id": self.previous_document_id,
+                    "slide_diff": self.version_diff,
+                    "questions_carried_forward": sum(1 for result in self.question_results.values() if result.get("carried_forward_from")),
+                    "questions_analyzed": sum(1 for result in self.question_results.values() if not result.get("carried_forward_from"))
+                } if self.previous_document_id else None
             }
         }
     
@@ -2339,16 +2707,6 @@ class HealthcareTemplateAnalyzer:
             # Use selected analyses or default to all configured types
             analysis_types = selected_analyses if selected_analyses else self.DEFAULT_SPECIALIZED_ANALYSES
             
-            # Extract descriptions from the structured data
-            descriptions = []
-            for page_data in self.visual_analysis_results:
-                if isinstance(page_data, dict):
-                    descriptions.append(page_data.get("description", ""))
-                else:
-                    descriptions.append(str(page_data))
-            
-            full_pitchdeck_text = " ".join(descriptions)
-            
             # Generate each specialized analysis using database prompts
             for analysis_type in analysis_types:
                 try:
@@ -2357,12 +2715,12 @@ class HealthcareTemplateAnalyzer:
                     if prompt:
                         logger.info(f"🔬 Running {analysis_type} analysis")
                         
-                        # Create analysis prompt with context
-                        full_prompt = f"{prompt}\n\nPitch deck content:\n{full_pitchdeck_text}"
+                        # Create analysis prompt with the slides relevant to this analysis
+                        full_prompt = f"{prompt}\n\nPitch deck content:\n{self._deck_context(prompt)}"
                         
-                        # Generate analysis using text model
+                        # Generate analysis using text model, with the context window the budget was sized for
                         try:
-                            response = ollama.generate(model=self.text_model, prompt=full_prompt)
+                            response = ollama.generate(model=self.text_model, prompt=full_prompt, options={'num_ctx': self.model_options['num_ctx']})
                             analysis_result = response.get('response', '').strip() if response else None
                         except Exception as e:
                             logger.error(f"❌ Error generating {analysis_type} analysis: {e}")
@@ -2385,4 +2743,49 @@ class HealthcareTemplateAnalyzer:
         except Exception as e:
             logger.error(f"❌ Error in specialized analysis generation: {e}")
             import traceback
-            logger.error(traceback.format_exc())
\ No newline at end of file
+            logger.error(traceback.format_exc())
+
+
+class AnalysisEngineCache:
+    """Process-wide analyzer engine, rebuilt only when model or prompt configuration changes"""
+
+    def __init__(self, factory: Callable[[], HealthcareTemplateAnalyzer] = HealthcareTemplateAnalyzer):
+        self.factory = factory
+        self._lock = threading.Lock()
+        self._signature: Optional[str] = None
+        self._engine: Optional[HealthcareTemplateAnalyzer] = None
+
+    def get(self) -> HealthcareTemplateAnalyzer:
+        """Cached engine, or a new one if the configuration signature changed"""
+        try:
+            conn = psycopg2.connect(get_database_url())
+            try:
+                cursor = conn.cursor()
+                cursor.execute(ENGINE_SIGNATURE_QUERY)
+                signature = cursor.fetchone()[0]
+            finally:
+                conn.close()
+        except Exception as e:
+            if self._engine is None:
+                raise
+            logger.warning(f"Could not check analyzer configuration, reusing current engine: {e}")
+            return self._engine
+
+        with self._lock:
+            if self._engine is not None and signature == self._signature:
+                return self._engine
+
+        engine = self.factory()
+        logger.info("Built healthcare template analyzer engine for the current model and prompt configuration")
+        with self._lock:
+            self._signature, self._engine = signature, engine
+        return engine
+
+    @property
+    def current(self) -> Optional[HealthcareTemplateAnalyzer]:
+        """Last engine built, without checking the configuration"""
+        return self._engine
+
+
+# Global instance
+analysis_engine_cache = AnalysisEngineCache()
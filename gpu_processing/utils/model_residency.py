@@ -0,0 +1,151 @@
+"""
+Model Residency - Which Ollama models are loaded, and what loading them costs
+
+Vision tasks (visual_analysis, slide_feedback) and text tasks (extractions_and_template,
+specialized_*) use different models; when VRAM cannot hold both, every switch makes
+Ollama evict one and load the other. The worker therefore reports the model kinds that
+are resident (from `ollama ps`) and its current run of same-kind tasks with every queue
+poll, so get_next_processing_task can prefer tasks for the loaded model. Before a task
+runs, its models are loaded with keep_alive so they stay resident for the rest of the
+run, and every load is counted with its duration per hour.
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import ollama
+
+logger = logging.getLogger(__name__)
+
+VISION_TASK_TYPES = {"visual_analysis", "slide_feedback", "dojo_visual_analysis"}
+KEEP_ALIVE = os.getenv("OLLAMA_TASK_KEEP_ALIVE", "30m")
+# Anti-starvation bounds sent to the queue: after this many same-kind tasks in a row the
+# other kind goes first, and tasks waiting longer than the wait bound ignore affinity
+MAX_AFFINITY_STREAK = int(os.getenv("MODEL_AFFINITY_MAX_STREAK", "8"))
+MAX_AFFINITY_WAIT_SECONDS = int(os.getenv("MODEL_AFFINITY_MAX_WAIT_SECONDS", "600"))
+PS_CACHE_SECONDS = 5.0
+METRICS_HOURS = 24
+
+
+def model_kind(task_type: str) -> str:
+    """'vision' or 'text' - must match task_model_kind() in the queue migration"""
+    return "vision" if task_type in VISION_TASK_TYPES else "text"
+
+
+def normalize_model_name(name: str) -> str:
+    """Ollama reports untagged models as <name>:latest"""
+    return name if ":" in name else f"{name}:latest"
+
+
+class ModelResidencyTracker:
+    """Tracks loaded Ollama models, the current same-kind task run and model load metrics"""
+
+    def __init__(self, client=ollama, keep_alive: str = KEEP_ALIVE, max_streak: int = MAX_AFFINITY_STREAK,
+                 max_wait_seconds: int = MAX_AFFINITY_WAIT_SECONDS):
+        self.client = client
+        self.keep_alive = keep_alive
+        self.max_streak = max_streak
+        self.max_wait_seconds = max_wait_seconds
+        self._lock = threading.Lock()
+        self._resident: List[str] = []
+        self._resident_checked = 0.0
+        self._kind: Optional[str] = None
+        self._streak = 0
+        self._loads: "OrderedDict[str, Dict[str, float]]" = OrderedDict()
+
+    def resident_models(self, refresh: bool = False) -> List[str]:
+        """Names of the models Ollama currently holds in memory"""
+        with self._lock:
+            if not refresh and time.monotonic() - self._resident_checked < PS_CACHE_SECONDS:
+                return list(self._resident)
+        try:
+            response = self.client.ps()
+            models = response.get("models", []) if isinstance(response, dict) else getattr(response, "models", [])
+            resident = [
+                normalize_model_name(str(getattr(model, "model", None) or model.get("model") or model.get("name")))
+                for model in models or []
+            ]
+        except Exception as e:
+            logger.warning(f"Could not read loaded models from Ollama: {e}")
+            resident = []
+        with self._lock:
+            self._resident, self._resident_checked = resident, time.monotonic()
+        return list(resident)
+
+    def claim_hints(self, models_by_kind: Dict[str, List[str]]) -> Dict[str, Any]:
+        """Capabilities sent with a queue poll so the claim can prefer resident models"""
+        resident = set(self.resident_models())
+        resident_kinds = [
+            kind for kind, models in models_by_kind.items()
+            if models and all(normalize_model_name(model) in resident for model in models)
+        ]
+        with self._lock:
+            return {
+                "resident_models": sorted(resident),
+                "resident_model_kinds": resident_kinds,
+                "affinity_kind": self._kind,
+                "affinity_streak": self._streak,
+                "max_affinity_streak": self.max_streak,
+                "max_affinity_wait_seconds": self.max_wait_seconds
+            }
+
+    def prepare(self, task_type: str, models: List[str]):
+        """Load the task's models (timed if not resident) and keep them loaded for the run"""
+        kind = model_kind(task_type)
+        with self._lock:
+            self._streak = self._streak + 1 if kind == self._kind else 1
+            self._kind = kind
+
+        resident = set(self.resident_models(refresh=True))
+        for model in dict.fromkeys(model for model in models if model):
+            loaded = normalize_model_name(model) in resident
+            start = time.monotonic()
+            try:
+                # An empty prompt only loads the model; keep_alive also extends an already loaded one
+                self.client.generate(model=model, prompt="", keep_alive=self.keep_alive)
+            except Exception as e:
+                logger.warning(f"Could not preload model {model}: {e}")
+                continue
+            if not loaded:
+                seconds = time.monotonic() - start
+                self._record_load(seconds)
+                logger.info(f"🔄 Loaded model {model} for {task_type} in {seconds:.1f}s")
+
+        with self._lock:
+            self._resident_checked = 0.0
+
+    def metrics(self) -> Dict[str, Any]:
+        """Model loads and load time per hour, plus the current residency state"""
+        with self._lock:
+            per_hour = [
+                {"hour": hour, "loads": int(bucket["loads"]), "load_seconds": round(bucket["load_seconds"], 2)}
+                for hour, bucket in self._loads.items()
+            ]
+            kind, streak = self._kind, self._streak
+        return {
+            "resident_models": self.resident_models(),
+            "affinity_kind": kind,
+            "affinity_streak": streak,
+            "keep_alive": self.keep_alive,
+            "loads_total": sum(bucket["loads"] for bucket in per_hour),
+            "load_seconds_total": round(sum(bucket["load_seconds"] for bucket in per_hour), 2),
+            "loads_per_hour": per_hour
+        }
+
+    def _record_load(self, seconds: float):
+        hour = datetime.now().strftime("%Y-%m-%dT%H:00")
+        with self._lock:
+            bucket = self._loads.setdefault(hour, {"loads": 0, "load_seconds": 0.0})
+            bucket["loads"] += 1
+            bucket["load_seconds"] += seconds
+            while len(self._loads) > METRICS_HOURS:
+                self._loads.popitem(last=False)
+
+
+# Global instance
+model_residency_tracker = ModelResidencyTracker()
@@ -16,8 +16,35 @@ try:
 except ImportError:
     PDF_LIBS_AVAILABLE = False
 
+# Page layouts only need PyMuPDF
+try:
+    import fitz  # PyMuPDF
+    PYMUPDF_AVAILABLE = True
+except ImportError:
+    PYMUPDF_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Page routing thresholds for the hybrid visual analysis
+TEXT_PAGE_MIN_WORDS = 40  # Enough text for a description without looking at the page
+TEXT_PAGE_MAX_IMAGE_COVERAGE = 0.15  # Share of the page covered by raster images
+TEXT_PAGE_MAX_DRAWINGS = 40  # Vector charts and diagrams consist of many drawing paths
+TEXT_HINT_MIN_WORDS = 8  # Below this the text layer adds nothing to the vision prompt
+
+
+def route_page(layout: Dict[str, Any]) -> str:
+    """'text' for text-dominant pages, 'vision_with_text' for visual pages with a useful
+    text layer, 'vision' for image-only or scanned pages"""
+    words = layout.get("word_count", 0)
+    if (words >= TEXT_PAGE_MIN_WORDS
+            and layout.get("image_coverage", 0.0) <= TEXT_PAGE_MAX_IMAGE_COVERAGE
+            and layout.get("drawing_count", 0) <= TEXT_PAGE_MAX_DRAWINGS):
+        return "text"
+    if words >= TEXT_HINT_MIN_WORDS:
+        return "vision_with_text"
+    return "vision"
+
+
 class PDFExtractor:
     """Extract content from PDF files for AI processing"""
     
@@ -53,6 +80,37 @@ class PDFExtractor:
             logger.error(f"Error extracting content from {pdf_path}: {e}")
             return self._placeholder_extraction(pdf_path)
     
+    def page_layouts(self, pdf_path: str) -> List[Dict[str, Any]]:
+        """Text layer and layout summary of every page, read with PyMuPDF without rendering"""
+        if not PYMUPDF_AVAILABLE:
+            return []
+        
+        layouts = []
+        try:
+            with fitz.open(pdf_path) as doc:
+                for page in doc:
+                    page_rect = page.rect
+                    page_area = (page_rect.width * page_rect.height) or 1.0
+                    text = page.get_text("text").strip()
+                    
+                    image_area = 0.0
+                    for image in page.get_image_info():
+                        visible = fitz.Rect(image["bbox"]) & page_rect
+                        image_area += visible.width * visible.height
+                    
+                    layouts.append({
+                        "page_number": page.number + 1,
+                        "text": text,
+                        "word_count": len(text.split()),
+                        "image_coverage": round(min(image_area / page_area, 1.0), 3),
+                        "drawing_count": len(page.get_drawings())
+                    })
+        except Exception as e:
+            logger.error(f"Error reading page layouts from {pdf_path}: {e}")
+            return []
+        
+        return layouts
+    
     def _extract_text(self, pdf_path: str) -> Dict[str, Any]:
         """Extract text content from PDF"""
         text_content = {
@@ -0,0 +1,327 @@
+"""
+Slide Cache - Reuse slide analysis across decks and deck versions
+
+Every rendered slide gets a 64-bit perceptual difference hash (dHash). A 9x8 dHash mostly
+captures the layout, so text slides built on one template can be only a bit or two apart;
+the slide key therefore also holds the md5 of the page's text layer and a 256-bit dHash.
+Descriptions and feedback are stored per company, slide key, vision model and prompt hash,
+so a re-uploaded deck only pays vision calls for the slides that changed, and slides shared
+between a company's decks are analyzed once. Results are never reused across companies.
+
+Matching is exact by default. Optionally, near-duplicates (re-exports, compression noise)
+of slides with an identical text layer match within a Hamming distance of the 64-bit hash;
+the hash is split into four 16-bit bands so that lookups stay indexed: two hashes within
+distance 3 always share at least one band.
+"""
+
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import psycopg2
+from PIL import Image
+
+from .bulk_writes import bulk_upsert
+from config.processing_config import config
+
+logger = logging.getLogger(__name__)
+
+DESCRIPTION = "description"
+FEEDBACK = "feedback"
+HASH_SIZE = 8
+DETAIL_HASH_SIZE = 16  # 256 bits, fine enough to see different headings on one template
+BANDS = 4
+# Band lookup finds every hash within BANDS - 1 bits; larger distances would need a scan
+MAX_SUPPORTED_DISTANCE = BANDS - 1
+
+
+def dhash(image: Image.Image, size: int = HASH_SIZE) -> int:
+    """Difference hash of size*size bits: brightness gradient between neighbouring pixels of a grayscale thumbnail"""
+    pixels = list(image.convert("L").resize((size + 1, size), Image.LANCZOS).tobytes())
+    value = 0
+    for row in range(size):
+        for column in range(size):
+            left = pixels[row * (size + 1) + column]
+            right = pixels[row * (size + 1) + column + 1]
+            value = (value << 1) | (1 if left > right else 0)
+    return value
+
+
+def text_hash(page_text: Optional[str]) -> str:
+    """md5 of the whitespace-normalized text layer, "" for pages without one"""
+    normalized = " ".join((page_text or "").split())
+    return hashlib.md5(normalized.encode("utf-8")).hexdigest() if normalized else ""
+
+
+class SlideKey(NamedTuple):
+    """What a slide's cached analysis is keyed by"""
+    slide_hash: int  # 64-bit dHash: banded lookups, near-duplicates
+    text_hash: str  # md5 of the page text layer, "" without one
+    detail_hash: str  # 256-bit dHash as hex
+
+    def fingerprint(self) -> str:
+        """Single 32-character digest of the key, e.g. for task checkpoints"""
+        return hashlib.md5(f"{format_hash(self.slide_hash)}:{self.text_hash}:{self.detail_hash}".encode("utf-8")).hexdigest()
+
+    def page_fields(self) -> Dict[str, str]:
+        """The key as stored with a page of the visual analysis results"""
+        return {"slide_hash": format_hash(self.slide_hash), "slide_text_hash": self.text_hash, "slide_detail_hash": self.detail_hash}
+
+
+def slide_key(image: Image.Image, page_text: Optional[str] = None) -> SlideKey:
+    return SlideKey(dhash(image), text_hash(page_text), f"{dhash(image, DETAIL_HASH_SIZE):064x}")
+
+
+def page_slide_key(page: Dict[str, Any]) -> Optional[SlideKey]:
+    """Slide key of a stored page, or None for pages analyzed before full keys were recorded"""
+    slide_hash = parse_hash(page.get("slide_hash"))
+    if slide_hash is None or not page.get("slide_detail_hash"):
+        return None
+    return SlideKey(slide_hash, page.get("slide_text_hash") or "", page["slide_detail_hash"])
+
+
+def hamming_distance(first: int, second: int) -> int:
+    return bin(first ^ second).count("1")
+
+
+def hash_bands(slide_hash: int) -> List[int]:
+    """The four 16-bit bands of a slide hash, stored as indexed columns"""
+    return [(slide_hash >> (16 * band)) & 0xFFFF for band in range(BANDS)]
+
+
+def to_signed(slide_hash: int) -> int:
+    """Unsigned 64-bit hash as a Postgres BIGINT"""
+    return slide_hash - (1 << 64) if slide_hash >= 1 << 63 else slide_hash
+
+
+def to_unsigned(value: int) -> int:
+    return value + (1 << 64) if value < 0 else value
+
+
+def format_hash(slide_hash: int) -> str:
+    return f"{slide_hash:016x}"
+
+
+def parse_hash(value: Any) -> Optional[int]:
+    """Slide hash from its stored hex form, or None"""
+    try:
+        return int(value, 16) if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+def prompt_hash(prompt: str) -> str:
+    return hashlib.md5((prompt or "").encode("utf-8")).hexdigest()
+
+
+def match_distance(first: SlideKey, second: SlideKey, max_distance: int) -> Optional[int]:
+    """Hamming distance at which two slides count as the same slide, or None
+
+    Identical keys always match. Near-duplicates only match when max_distance allows it and
+    both slides have the same, non-empty text layer; image-only slides must be identical."""
+    if first.text_hash != second.text_hash:
+        return None
+    if first.slide_hash == second.slide_hash and first.detail_hash == second.detail_hash:
+        return 0
+    distance = hamming_distance(first.slide_hash, second.slide_hash)
+    if first.text_hash and max_distance > 0 and distance <= max_distance:
+        return distance
+    return None
+
+
+def closest_entry(key: SlideKey, entries: Iterable[Tuple[SlideKey, Any]], max_distance: int) -> Optional[Tuple[int, Any]]:
+    """(distance, value) of the entry nearest to the slide key within max_distance, or None"""
+    best = None
+    for entry_key, value in entries:
+        distance = match_distance(key, entry_key, max_distance)
+        if distance is not None and (best is None or distance < best[0]):
+            best = (distance, value)
+    return best
+
+
+class SlideAnalysisCache:
+    """Slide analysis results in the slide_analysis_cache table, with per-kind hit-rate counters"""
+
+    def __init__(self, max_distance: int = 0, enabled: bool = True):
+        self.max_distance = max(0, min(max_distance, MAX_SUPPORTED_DISTANCE))
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, kind: str, **increments: int):
+        with self._lock:
+            counters = self._counters.setdefault(
+                kind, {"lookups": 0, "exact_hits": 0, "near_hits": 0, "misses": 0, "stored": 0, "errors": 0}
+            )
+            for name, value in increments.items():
+                counters[name] += value
+
+    def lookup(self, database_url: str, kind: str, company_id: Optional[str], slide_keys: List[SlideKey],
+               vision_model: str, prompt: str) -> Dict[SlideKey, Dict[str, Any]]:
+        """Cached results for the slides of one deck of a company, found with a single query
+
+        Returns {slide_key: {"result", "has_issues", "analysis_route", "distance"}} for every
+        slide with a matching entry of the same company; lookup errors count as misses."""
+        slide_keys = list(dict.fromkeys(slide_keys))
+        if not self.enabled or not slide_keys or not company_id:
+            return {}
+
+        slide_hashes = [key.slide_hash for key in slide_keys]
+        bands = [sorted({hash_bands(slide_hash)[band] for slide_hash in slide_hashes}) for band in range(BANDS)]
+        if self.max_distance == 0:
+            match, match_params = "slide_hash = ANY(%s)", [[to_signed(slide_hash) for slide_hash in slide_hashes]]
+        else:
+            match = " OR ".join(f"hash_band_{band} = ANY(%s)" for band in range(BANDS))
+            match_params = bands
+
+        try:
+            conn = psycopg2.connect(database_url)
+            try:
+                with conn:
+                    with conn.cursor() as cursor:
+                        cursor.execute(f"""
+                            SELECT id, slide_hash, text_hash, detail_hash, result, has_issues, analysis_route
+                            FROM slide_analysis_cache
+                            WHERE kind = %s AND company_id = %s AND vision_model = %s AND prompt_hash = %s AND ({match})
+                        """, [kind, company_id, vision_model, prompt_hash(prompt), *match_params])
+                        rows = cursor.fetchall()
+
+                        found, used_ids = {}, set()
+                        candidates = [(SlideKey(to_unsigned(row[1]), row[2], row[3]), row) for row in rows]
+                        for key in slide_keys:
+                            best = closest_entry(key, candidates, self.max_distance)
+                            if best:
+                                distance, row = best
+                                found[key] = {
+                                    "result": row[4], "has_issues": row[5], "analysis_route": row[6], "distance": distance
+                                }
+                                used_ids.add(row[0])
+
+                        if used_ids:
+                            cursor.execute("""
+                                UPDATE slide_analysis_cache
+                                SET hit_count = hit_count + 1, last_used_at = CURRENT_TIMESTAMP
+                                WHERE id = ANY(%s)
+                            """, (sorted(used_ids),))
+            finally:
+                conn.close()
+        except Exception as e:
+            logger.warning(f"Slide cache lookup failed, analyzing all slides: {e}")
+            self._count(kind, lookups=len(slide_keys), misses=len(slide_keys), errors=1)
+            return {}
+
+        exact = sum(1 for entry in found.values() if entry["distance"] == 0)
+        self._count(kind, lookups=len(slide_keys), exact_hits=exact,
+                    near_hits=len(found) - exact, misses=len(slide_keys) - len(found))
+        return found
+
+    def store(self, database_url: str, kind: str, company_id: Optional[str], entries: List[Dict[str, Any]],
+              vision_model: str, prompt: str) -> int:
+        """Upsert fresh results of a company's deck; entries carry slide_key, result and optionally has_issues / analysis_route"""
+        if not self.enabled or not entries or not company_id:
+            return 0
+
+        rows = []
+        for entry in entries:
+            key = entry["slide_key"]
+            bands = hash_bands(key.slide_hash)
+            rows.append({
+                "kind": kind,
+                "company_id": company_id,
+                "slide_hash": to_signed(key.slide_hash),
+                "text_hash": key.text_hash,
+                "detail_hash": key.detail_hash,
+                "hash_band_0": bands[0],
+                "hash_band_1": bands[1],
+                "hash_band_2": bands[2],
+                "hash_band_3": bands[3],
+                "vision_model": vision_model,
+                "prompt_hash": prompt_hash(prompt),
+                "result": entry.get("result"),
+                "has_issues": entry.get("has_issues"),
+                "analysis_route": entry.get("analysis_route")
+            })
+
+        try:
+            conn = psycopg2.connect(database_url)
+            try:
+                with conn:
+                    with conn.cursor() as cursor:
+                        stored = bulk_upsert(
+                            cursor, "slide_analysis_cache", list(rows[0].keys()), rows,
+                            conflict_columns=["kind", "company_id", "slide_hash", "vision_model", "prompt_hash", "text_hash", "detail_hash"],
+                            update_columns=["result", "has_issues", "analysis_route"]
+                        )
+            finally:
+                conn.close()
+        except Exception as e:
+            logger.warning(f"Could not store {len(rows)} slide cache entries: {e}")
+            self._count(kind, errors=1)
+            return 0
+
+        self._count(kind, stored=stored)
+        return stored
+
+    def invalidate(self, database_url: str, kind: Optional[str] = None, company_id: Optional[str] = None,
+                   vision_model: Optional[str] = None, prompt: Optional[str] = None,
+                   slide_hashes: Optional[List[int]] = None, older_than_days: Optional[int] = None) -> int:
+        """Delete cache entries matching all given filters; without filters the whole cache is cleared"""
+        conditions, params = [], []
+        if kind:
+            conditions.append("kind = %s")
+            params.append(kind)
+        if company_id:
+            conditions.append("company_id = %s")
+            params.append(company_id)
+        if vision_model:
+            conditions.append("vision_model = %s")
+            params.append(vision_model)
+        if prompt is not None:
+            conditions.append("prompt_hash = %s")
+            params.append(prompt_hash(prompt))
+        if slide_hashes:
+            conditions.append("slide_hash = ANY(%s)")
+            params.append([to_signed(slide_hash) for slide_hash in slide_hashes])
+        if older_than_days is not None:
+            conditions.append("last_used_at < CURRENT_TIMESTAMP - make_interval(days => %s)")
+            params.append(int(older_than_days))
+
+        conn = psycopg2.connect(database_url)
+        try:
+            with conn:
+                with conn.cursor() as cursor:
+                    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+                    cursor.execute(f"DELETE FROM slide_analysis_cache{where}", params)
+                    deleted = cursor.rowcount
+        finally:
+            conn.close()
+        logger.info(f"🧹 Invalidated {deleted} slide cache entries")
+        return deleted
+
+    def metrics(self) -> Dict[str, Any]:
+        """Hit rates since process start, per result kind"""
+        with self._lock:
+            counters = {kind: dict(values) for kind, values in self._counters.items()}
+        for values in counters.values():
+            hits = values["exact_hits"] + values["near_hits"]
+            values["hit_rate"] = round(hits / values["lookups"], 3) if values["lookups"] else None
+        return {"enabled": self.enabled, "max_distance": self.max_distance, "kinds": counters}
+
+    def entry_counts(self, database_url: str) -> Dict[str, Dict[str, int]]:
+        """Stored entries and lifetime hits per result kind"""
+        conn = psycopg2.connect(database_url)
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    SELECT kind, COUNT(*), COALESCE(SUM(hit_count), 0)
+                    FROM slide_analysis_cache
+                    GROUP BY kind
+                """)
+                return {kind: {"entries": entries, "total_hits": int(hits)} for kind, entries, hits in cursor.fetchall()}
+        finally:
+            conn.close()
+
+
+# Global instance
+slide_analysis_cache = SlideAnalysisCache(max_distance=config.slide_cache_max_distance, enabled=config.slide_cache_enabled)
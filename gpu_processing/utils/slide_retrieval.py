@@ -0,0 +1,106 @@
+"""
+Slide Retrieval - Relevant deck context per template question
+
+Instead of sending every slide description with every question, a BM25 index over
+the visual analysis descriptions picks the slides most relevant to a question (or a
+specialized analysis prompt) until a token budget is filled. Selected slides keep
+their deck order. Decks that fit into the budget are sent in full, so short decks
+are analyzed exactly as before while long decks no longer overflow num_ctx.
+"""
+
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+# Rough prompt-size estimate without a tokenizer: ~4 characters per token
+CHARS_PER_TOKEN = 4
+# Tokens kept free for the instructions around the deck content
+PROMPT_RESERVE_TOKENS = 1024
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_WORD = re.compile(r"[a-z0-9]+(?:[-'][a-z0-9]+)*")
+_STOPWORDS = frozenset("""
+    a an and are as at be by can do does for from has have how if in into is it its of on or
+    our that the their them there these they this to was what when where which who why will
+    with would your you provide single paragraph answer question based below pitch deck content
+""".split())
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased content words with a plural 's' removed, so 'endpoints' matches 'endpoint'"""
+    return [
+        word[:-1] if len(word) > 3 and word.endswith("s") and not word.endswith("ss") else word
+        for word in _WORD.findall(text.lower()) if word not in _STOPWORDS and len(word) > 1
+    ]
+
+
+def slide_description(page_data: Any) -> str:
+    """Description of one visual analysis result, in either stored format"""
+    return page_data.get("description", "") if isinstance(page_data, dict) else str(page_data)
+
+
+def context_budget(model_options: Dict[str, Any], max_tokens: int) -> int:
+    """Tokens available for deck content: the configured cap, bounded by what num_ctx leaves free"""
+    available = model_options.get("num_ctx", 0) - model_options.get("num_predict", 0) - PROMPT_RESERVE_TOKENS
+    return max(min(max_tokens, available), 0) if available > 0 else max_tokens
+
+
+class SlideIndex:
+    """BM25 index over the slide descriptions of one deck"""
+
+    def __init__(self, visual_analysis_results: List[Any]):
+        self.descriptions = [slide_description(page_data) for page_data in visual_analysis_results]
+        self.full_text = " ".join(self.descriptions)
+        self._terms = [Counter(tokenize(description)) for description in self.descriptions]
+        self._lengths = [sum(terms.values()) for terms in self._terms]
+        self._average_length = (sum(self._lengths) / len(self._lengths)) if self._lengths else 0.0
+        document_frequency = Counter(term for terms in self._terms for term in terms)
+        count = len(self._terms)
+        self._idf = {
+            term: math.log(1 + (count - frequency + 0.5) / (frequency + 0.5))
+            for term, frequency in document_frequency.items()
+        }
+
+    def scores(self, query: str) -> List[float]:
+        """BM25 score of every slide for the query"""
+        query_terms = set(tokenize(query))
+        scores = []
+        for terms, length in zip(self._terms, self._lengths):
+            score = 0.0
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * length / self._average_length) if self._average_length else BM25_K1
+            for term in query_terms:
+                frequency = terms.get(term)
+                if frequency:
+                    score += self._idf[term] * frequency * (BM25_K1 + 1) / (frequency + norm)
+            scores.append(score)
+        return scores
+
+    def select(self, query: str, token_budget: int, top_k: Optional[int] = None) -> List[int]:
+        """Indexes of the most relevant slides fitting into the budget, in deck order"""
+        scores = self.scores(query)
+        ranked = sorted((index for index, score in enumerate(scores) if score > 0), key=lambda index: (-scores[index], index))
+        if not ranked:
+            # Nothing matches the query: fall back to the deck from the start
+            ranked = list(range(len(scores)))
+        selected, used = [], 0
+        for index in ranked:
+            if top_k is not None and len(selected) >= top_k:
+                break
+            cost = estimate_tokens(self.descriptions[index]) + 1
+            if used + cost > token_budget:
+                continue
+            selected.append(index)
+            used += cost
+        return sorted(selected)
+
+    def context(self, query: str, token_budget: int, top_k: Optional[int] = None) -> str:
+        """Deck content for a prompt: the whole deck if it fits, otherwise the selected slides"""
+        if top_k is None and estimate_tokens(self.full_text) <= token_budget:
+            return self.full_text
+        return " ".join(self.descriptions[index] for index in self.select(query, token_budget, top_k))
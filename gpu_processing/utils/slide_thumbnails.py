@@ -0,0 +1,148 @@
+"""
+Slide Thumbnails - Generates reduced slide variants, a sprite sheet and a manifest
+
+Runs right after visual analysis renders the slide images, so list and overview
+screens can show a whole deck from one sprite sheet instead of fetching every
+full-resolution slide separately.
+"""
+
+import os
+import json
+import math
+import logging
+from datetime import datetime
+from typing import Dict, List, Tuple, Any
+
+from PIL import Image, features
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_DIRNAME = "thumbnails"
+MANIFEST_FILENAME = "manifest.json"
+SPRITE_FILENAME = "sprite_small.jpg"
+MANIFEST_VERSION = 1
+
+# Variant name -> maximum width in pixels (height follows the slide aspect ratio)
+THUMBNAIL_VARIANTS = {
+    "small": 240,
+    "medium": 640
+}
+SPRITE_COLUMNS = 8
+JPEG_QUALITY = 80
+WEBP_QUALITY = 75
+
+
+class SlideThumbnailGenerator:
+    """Writes small/medium slide variants, a sprite sheet and a JSON manifest for one deck"""
+
+    def __init__(self, variants: Dict[str, int] = None, sprite_columns: int = SPRITE_COLUMNS):
+        self.variants = variants or THUMBNAIL_VARIANTS
+        self.sprite_columns = sprite_columns
+        self.webp_supported = features.check("webp")
+
+    def generate(self, analysis_path: str, slides: List[Tuple[int, Image.Image]], deck_name: str = None) -> Dict[str, Any]:
+        """
+        Generate thumbnails for the given slides
+
+        Args:
+            analysis_path: Deck analysis directory containing slide_N.jpg
+            slides: (slide_number, rendered page image) pairs
+            deck_name: Deck name recorded in the manifest
+
+        Returns:
+            The manifest that was written to {analysis_path}/thumbnails/manifest.json
+        """
+        thumbnail_path = os.path.join(analysis_path, THUMBNAIL_DIRNAME)
+        os.makedirs(thumbnail_path, exist_ok=True)
+
+        slide_entries = []
+        small_images = []
+        for slide_number, image in sorted(slides, key=lambda item: item[0]):
+            rgb_image = image.convert("RGB") if image.mode != "RGB" else image
+            entry = {
+                "slide_number": slide_number,
+                "filename": f"slide_{slide_number}.jpg",
+                "width": rgb_image.width,
+                "height": rgb_image.height,
+                "variants": {}
+            }
+
+            for variant_name, max_width in self.variants.items():
+                variant_image = self._resize(rgb_image, max_width)
+                entry["variants"][variant_name] = self._save_variant(thumbnail_path, slide_number, variant_name, variant_image)
+                if variant_name == "small":
+                    small_images.append(variant_image)
+
+            slide_entries.append(entry)
+
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "deck_name": deck_name,
+            "slide_count": len(slide_entries),
+            "generated_at": datetime.utcnow().isoformat(),
+            "variants": {name: {"max_width": width} for name, width in self.variants.items()},
+            "sprite": None,
+            "slides": slide_entries
+        }
+
+        if small_images:
+            manifest["sprite"] = self._write_sprite(thumbnail_path, small_images, slide_entries)
+
+        manifest_file = os.path.join(thumbnail_path, MANIFEST_FILENAME)
+        tmp_manifest_file = f"{manifest_file}.tmp"
+        with open(tmp_manifest_file, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_manifest_file, manifest_file)
+
+        logger.info(f"🖼️ Generated thumbnails and sprite for {len(slide_entries)} slides in {thumbnail_path}")
+        return manifest
+
+    def _resize(self, image: Image.Image, max_width: int) -> Image.Image:
+        """Scale an image down to max_width, keeping the aspect ratio"""
+        if image.width <= max_width:
+            return image.copy()
+        height = max(1, round(image.height * max_width / image.width))
+        return image.resize((max_width, height), Image.LANCZOS)
+
+    def _save_variant(self, thumbnail_path: str, slide_number: int, variant_name: str, image: Image.Image) -> Dict[str, Any]:
+        """Save one variant as JPEG (and WebP when Pillow supports it); returns its manifest entry"""
+        jpeg_filename = f"slide_{slide_number}_{variant_name}.jpg"
+        image.save(os.path.join(thumbnail_path, jpeg_filename), "JPEG", quality=JPEG_QUALITY, optimize=True)
+        variant = {
+            "jpeg": f"{THUMBNAIL_DIRNAME}/{jpeg_filename}",
+            "width": image.width,
+            "height": image.height
+        }
+
+        if self.webp_supported:
+            webp_filename = f"slide_{slide_number}_{variant_name}.webp"
+            image.save(os.path.join(thumbnail_path, webp_filename), "WEBP", quality=WEBP_QUALITY, method=4)
+            variant["webp"] = f"{THUMBNAIL_DIRNAME}/{webp_filename}"
+
+        return variant
+
+    def _write_sprite(self, thumbnail_path: str, small_images: List[Image.Image], slide_entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Tile the small variants into one sprite sheet and record each slide's offset"""
+        tile_width = max(image.width for image in small_images)
+        tile_height = max(image.height for image in small_images)
+        columns = min(self.sprite_columns, len(small_images))
+        rows = math.ceil(len(small_images) / columns)
+
+        sprite = Image.new("RGB", (tile_width * columns, tile_height * rows), color="white")
+        for index, (image, entry) in enumerate(zip(small_images, slide_entries)):
+            x = (index % columns) * tile_width
+            y = (index // columns) * tile_height
+            sprite.paste(image, (x, y))
+            entry["sprite"] = {"x": x, "y": y, "width": image.width, "height": image.height}
+
+        sprite.save(os.path.join(thumbnail_path, SPRITE_FILENAME), "JPEG", quality=JPEG_QUALITY, optimize=True)
+        return {
+            "filename": f"{THUMBNAIL_DIRNAME}/{SPRITE_FILENAME}",
+            "media_type": "image/jpeg",
+            "width": sprite.width,
+            "height": sprite.height,
+            "tile_width": tile_width,
+            "tile_height": tile_height,
+            "columns": columns,
+            "rows": rows
+        }
@@ -0,0 +1,120 @@
+"""
+Task Checkpoints - Resume long GPU tasks after a crash or restart
+
+visual_analysis and extractions_and_template persist every finished page description
+and question answer to task_checkpoints as soon as it exists, keyed by the queue task
+and the attempt that produced it. When cleanup_expired_locks or retry_failed_task
+requeues the task, the next attempt reuses those items instead of paying the vision
+and text models again. Each checkpoint carries a fingerprint of its inputs (slide key,
+question context hash), so an item whose inputs changed in between is recomputed.
+"""
+
+import json
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+import psycopg2
+
+logger = logging.getLogger(__name__)
+
+VISUAL_PAGE = "visual_page"
+QUESTION = "question"
+
+
+class TaskCheckpoints:
+    """Checkpoints of one queue task attempt; persistence errors are logged, never raised"""
+
+    def __init__(self, database_url: str, task_id: int, attempt: int = 1,
+                 saved: Optional[Dict[Tuple[str, str], Tuple[Optional[str], Any]]] = None):
+        self.database_url = database_url
+        self.task_id = task_id
+        self.attempt = attempt
+        self._saved = dict(saved or {})
+        self.resumed = 0
+        self._conn = None
+
+    def get(self, stage: str, key: Any, fingerprint: Optional[str] = None) -> Optional[Any]:
+        """Payload from an earlier attempt, if its fingerprint matches"""
+        entry = self._saved.get((stage, str(key)))
+        if entry is None or (fingerprint is not None and entry[0] != fingerprint):
+            return None
+        self.resumed += 1
+        return entry[1]
+
+    def save(self, stage: str, key: Any, payload: Any, fingerprint: Optional[str] = None):
+        """Persist one finished item right away"""
+        self._saved[(stage, str(key))] = (fingerprint, payload)
+        try:
+            if self._conn is None or self._conn.closed:
+                self._conn = psycopg2.connect(self.database_url)
+                self._conn.autocommit = True
+            with self._conn.cursor() as cursor:
+                cursor.execute("""
+                    INSERT INTO task_checkpoints (processing_queue_id, attempt, stage, item_key, fingerprint, payload)
+                    VALUES (%s, %s, %s, %s, %s, %s)
+                    ON CONFLICT (processing_queue_id, stage, item_key) DO UPDATE SET
+                        attempt = EXCLUDED.attempt,
+                        fingerprint = EXCLUDED.fingerprint,
+                        payload = EXCLUDED.payload,
+                        created_at = CURRENT_TIMESTAMP
+                """, (self.task_id, self.attempt, stage, str(key), fingerprint, json.dumps(payload)))
+        except Exception as e:
+            logger.warning(f"Could not checkpoint {stage} {key} of task {self.task_id}: {e}")
+            self.close()
+
+    def close(self):
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+            self._conn = None
+
+
+class TaskCheckpointStore:
+    """Opens and clears the checkpoints of queue tasks"""
+
+    def open(self, database_url: str, task_id: int) -> TaskCheckpoints:
+        """Checkpoints left by earlier attempts of the task, for the current attempt"""
+        try:
+            conn = psycopg2.connect(database_url)
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT COALESCE(attempt_count, 1) FROM processing_queue WHERE id = %s", (task_id,))
+                    row = cursor.fetchone()
+                    cursor.execute("""
+                        SELECT stage, item_key, fingerprint, payload
+                        FROM task_checkpoints
+                        WHERE processing_queue_id = %s
+                    """, (task_id,))
+                    saved = {
+                        (stage, item_key): (fingerprint, json.loads(payload) if isinstance(payload, str) else payload)
+                        for stage, item_key, fingerprint, payload in cursor.fetchall()
+                    }
+            finally:
+                conn.close()
+        except Exception as e:
+            logger.warning(f"Could not load checkpoints of task {task_id}, starting from scratch: {e}")
+            return TaskCheckpoints(database_url, task_id)
+
+        checkpoints = TaskCheckpoints(database_url, task_id, attempt=row[0] if row else 1, saved=saved)
+        if saved:
+            logger.info(f"♻️ Task {task_id} attempt {checkpoints.attempt}: resuming with {len(saved)} checkpointed items")
+        return checkpoints
+
+    def clear(self, database_url: str, task_id: int):
+        """Drop the checkpoints of a completed task"""
+        try:
+            conn = psycopg2.connect(database_url)
+            try:
+                with conn:
+                    with conn.cursor() as cursor:
+                        cursor.execute("DELETE FROM task_checkpoints WHERE processing_queue_id = %s", (task_id,))
+            finally:
+                conn.close()
+        except Exception as e:
+            logger.warning(f"Could not clear checkpoints of task {task_id}: {e}")
+
+
+# Global instance
+task_checkpoint_store = TaskCheckpointStore()
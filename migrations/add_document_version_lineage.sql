@@ -0,0 +1,11 @@
+-- Migration: Deck version lineage within a project
+-- Created: 2026-10-18
+-- Purpose: A pitch deck uploaded to a project that already has one becomes the next version
+--          of it. The GPU text step diffs the slides against previous_version_id and carries
+--          forward template answers whose slides did not change.
+
+ALTER TABLE project_documents
+    ADD COLUMN IF NOT EXISTS previous_version_id INTEGER REFERENCES project_documents(id) ON DELETE SET NULL,
+    ADD COLUMN IF NOT EXISTS version_number INTEGER NOT NULL DEFAULT 1;
+
+CREATE INDEX IF NOT EXISTS idx_project_documents_previous_version ON project_documents (previous_version_id);
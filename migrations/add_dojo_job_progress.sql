@@ -0,0 +1,27 @@
+-- Migration: Add persistent progress records for dojo batch jobs
+-- Created: 2026-10-18
+-- Purpose: Replace the per-process in-memory progress_tracker in dojo.py so progress
+--          survives restarts and is readable from every uvicorn worker
+
+CREATE TABLE IF NOT EXISTS dojo_job_progress (
+    job_id VARCHAR(36) PRIMARY KEY,
+    step VARCHAR(20) NOT NULL,
+    user_id INTEGER REFERENCES users(id),
+    status VARCHAR(20) DEFAULT 'processing',
+    current_deck TEXT,
+    current_chapter TEXT,
+    progress INTEGER DEFAULT 0,
+    total INTEGER DEFAULT 0,
+    start_time DOUBLE PRECISION,
+    completion_time DOUBLE PRECISION,
+    current_deck_start_time DOUBLE PRECISION,
+    processing_times TEXT,
+    details TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_dojo_job_progress_step_updated ON dojo_job_progress(step, updated_at);
+CREATE INDEX IF NOT EXISTS idx_dojo_job_progress_user_step_updated ON dojo_job_progress(user_id, step, updated_at);
+
+COMMENT ON TABLE dojo_job_progress IS 'Progress of dojo batch jobs (visual analysis, extractions, template processing, ZIP uploads)';
@@ -0,0 +1,24 @@
+-- Migration: Add persistent outbox for outgoing emails
+-- Created: 2026-10-18
+-- Purpose: Queue verification, password reset and invitation emails so API requests
+--          no longer wait on SMTP; a background sender delivers them with retries
+
+CREATE TABLE IF NOT EXISTS email_outbox (
+    id SERIAL PRIMARY KEY,
+    to_email VARCHAR(255) NOT NULL,
+    subject TEXT NOT NULL,
+    html_body TEXT NOT NULL,
+    text_body TEXT,
+    status VARCHAR(20) DEFAULT 'pending',
+    attempts INTEGER DEFAULT 0,
+    next_attempt_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_error TEXT,
+    sent_at TIMESTAMP,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_email_outbox_id ON email_outbox(id);
+CREATE INDEX IF NOT EXISTS idx_email_outbox_status_next_attempt ON email_outbox(status, next_attempt_at);
+
+COMMENT ON TABLE email_outbox IS 'Outgoing emails, delivered by the backend email sender with retries';
@@ -0,0 +1,103 @@
+-- Migration: Prefer queue tasks whose model is already loaded on the claiming GPU server
+-- Created: 2026-10-18
+-- Purpose: Group runs of vision tasks (visual_analysis, slide_feedback) and text tasks
+--          (extractions_and_template, specialized_*) so Ollama does not evict and reload
+--          models between every task. Workers send resident_model_kinds, affinity_kind,
+--          affinity_streak, max_affinity_streak and max_affinity_wait_seconds in their
+--          capabilities; workers that do not send them get the previous order.
+
+-- Model kind a task type runs on (keep in sync with gpu_processing/utils/model_residency.py)
+CREATE OR REPLACE FUNCTION task_model_kind(task_type VARCHAR)
+RETURNS TEXT AS $$
+    SELECT CASE WHEN task_type IN ('visual_analysis', 'slide_feedback') THEN 'vision' ELSE 'text' END;
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION get_next_processing_task(
+    server_id VARCHAR(255),
+    server_capabilities JSONB DEFAULT '{}'
+)
+RETURNS TABLE(
+    task_id INTEGER,
+    document_id INTEGER,
+    task_type VARCHAR(50),
+    file_path TEXT,
+    company_id VARCHAR(255),
+    processing_options JSONB
+) AS $$
+DECLARE
+    lock_duration INTERVAL := '30 minutes';
+    selected_task_id INTEGER;
+    preferred_kinds TEXT[];
+    max_streak INTEGER := COALESCE((server_capabilities->>'max_affinity_streak')::INTEGER, 8);
+    max_wait INTERVAL := make_interval(secs => COALESCE((server_capabilities->>'max_affinity_wait_seconds')::INTEGER, 600));
+BEGIN
+    -- Clean up any expired locks first
+    PERFORM cleanup_expired_locks();
+
+    IF COALESCE((server_capabilities->>'affinity_streak')::INTEGER, 0) >= max_streak THEN
+        -- The current run of same-model tasks is long enough: let the other kind go first
+        preferred_kinds := ARRAY(
+            SELECT kind FROM unnest(ARRAY['vision', 'text']) AS kind
+            WHERE kind IS DISTINCT FROM server_capabilities->>'affinity_kind'
+        );
+    ELSE
+        preferred_kinds := ARRAY(
+            SELECT jsonb_array_elements_text(COALESCE(server_capabilities->'resident_model_kinds', '[]'::JSONB))
+        );
+    END IF;
+
+    -- Find the next available task (without locking yet)
+    SELECT pq.id INTO selected_task_id
+    FROM processing_queue pq
+    WHERE
+        pq.status IN ('queued', 'retry')
+        AND (pq.next_retry_at IS NULL OR pq.next_retry_at <= CURRENT_TIMESTAMP)
+        AND pq.locked_by IS NULL
+        -- Check dependencies separately to avoid LEFT JOIN issues
+        AND NOT EXISTS (
+            SELECT 1 FROM task_dependencies td
+            WHERE td.dependent_task_id = pq.id
+            AND EXISTS (
+                SELECT 1 FROM processing_queue dep
+                WHERE dep.id = td.depends_on_task_id
+                AND dep.status != 'completed'
+            )
+        )
+    ORDER BY
+        pq.priority DESC,
+        -- Tasks that waited longer than the bound are not passed over for affinity
+        (pq.created_at < CURRENT_TIMESTAMP - max_wait) DESC,
+        (task_model_kind(pq.task_type) = ANY(preferred_kinds)) DESC,
+        pq.created_at ASC
+    LIMIT 1;
+
+    -- If no task found, return empty
+    IF selected_task_id IS NULL THEN
+        RETURN;
+    END IF;
+
+    -- Lock and update the selected task
+    UPDATE processing_queue
+    SET
+        locked_by = server_id,
+        locked_at = CURRENT_TIMESTAMP,
+        lock_expires_at = CURRENT_TIMESTAMP + lock_duration,
+        status = 'processing',
+        started_at = CASE WHEN started_at IS NULL THEN CURRENT_TIMESTAMP ELSE started_at END
+    WHERE id = selected_task_id
+    AND locked_by IS NULL  -- Double-check it's still unlocked
+    RETURNING
+        processing_queue.id,
+        processing_queue.document_id,
+        processing_queue.task_type,
+        processing_queue.file_path,
+        processing_queue.company_id,
+        processing_queue.processing_options
+    INTO task_id, document_id, task_type, file_path, company_id, processing_options;
+
+    -- Return the task if we successfully locked it
+    IF task_id IS NOT NULL THEN
+        RETURN NEXT;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,11 @@
+-- Migration: Add content hash to project documents
+-- Created: 2026-10-18
+-- Purpose: Store the SHA-256 computed while streaming uploads so duplicate uploads
+--          are detected with an index lookup instead of re-reading files
+
+ALTER TABLE project_documents ADD COLUMN IF NOT EXISTS file_hash VARCHAR(64);
+
+-- Duplicate detection is scoped to a project
+CREATE INDEX IF NOT EXISTS idx_project_documents_project_file_hash ON project_documents(project_id, file_hash);
+
+COMMENT ON COLUMN project_documents.file_hash IS 'SHA-256 hex digest of the uploaded file, computed while the upload is streamed';
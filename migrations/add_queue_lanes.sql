@@ -0,0 +1,189 @@
+-- Migration: Priority lanes and fair-share scheduling for the processing queue
+-- Created: 2026-10-18
+-- Purpose: Startup uploads, dojo batches and maintenance jobs share the GPU through one queue.
+--          Every task belongs to a lane (interactive, batch, maintenance) and records the
+--          user who submitted it. Claims pick the lane with the least weighted GPU time in
+--          the fair-share window, then the task's priority, then the submitter with the least
+--          GPU time within that lane, then model affinity. Lanes other than the one claiming
+--          must leave their reserved slots free, so a batch never fills every GPU slot while
+--          interactive work could arrive. Slots are the max_concurrent_tasks that live servers
+--          register, i.e. how many tasks their pollers really run at once. A reservation never
+--          takes the last slot, so a single-slot deployment is not starved of batch work; there
+--          interactive tasks win through their lane weight at the next claim.
+--          This is the authoritative get_next_processing_task: it also claims with the
+--          heartbeat lease of add_task_lease_renewal.sql, which sorts after this file.
+
+CREATE TABLE IF NOT EXISTS processing_queue_lanes (
+    lane VARCHAR(20) PRIMARY KEY,
+    weight INTEGER NOT NULL CHECK (weight > 0),          -- Share of GPU time relative to the other lanes
+    reserved_slots INTEGER NOT NULL DEFAULT 0 CHECK (reserved_slots >= 0),  -- Slots other lanes may not take
+    description TEXT
+);
+
+INSERT INTO processing_queue_lanes (lane, weight, reserved_slots, description) VALUES
+    ('interactive', 8, 1, 'Startup uploads and retries a user is waiting for'),
+    ('batch', 2, 0, 'Dojo visual analysis batches and template experiments'),
+    ('maintenance', 1, 0, 'Backfills and administrative reprocessing')
+ON CONFLICT (lane) DO NOTHING;
+
+ALTER TABLE processing_queue
+    ADD COLUMN IF NOT EXISTS lane VARCHAR(20) NOT NULL DEFAULT 'interactive' REFERENCES processing_queue_lanes(lane),
+    ADD COLUMN IF NOT EXISTS submitted_by INTEGER REFERENCES users(id) ON DELETE SET NULL;
+
+-- Existing tasks were all created by uploads; keep their submitter for fair share
+UPDATE processing_queue
+SET submitted_by = (processing_options->>'user_id')::INTEGER
+WHERE submitted_by IS NULL
+AND processing_options->>'user_id' ~ '^[0-9]+$'
+AND EXISTS (SELECT 1 FROM users u WHERE u.id = (processing_options->>'user_id')::INTEGER);
+
+CREATE INDEX IF NOT EXISTS idx_processing_queue_lane_status ON processing_queue(lane, status);
+CREATE INDEX IF NOT EXISTS idx_processing_queue_lane_started ON processing_queue(lane, started_at);
+
+-- Model kind a task type runs on (keep in sync with gpu_processing/utils/model_residency.py)
+CREATE OR REPLACE FUNCTION task_model_kind(task_type VARCHAR)
+RETURNS TEXT AS $$
+    SELECT CASE WHEN task_type IN ('visual_analysis', 'slide_feedback', 'dojo_visual_analysis') THEN 'vision' ELSE 'text' END;
+$$ LANGUAGE sql IMMUTABLE;
+
+-- The result gains the task's lane, so the signature changes
+DROP FUNCTION IF EXISTS get_next_processing_task(VARCHAR, JSONB);
+
+CREATE OR REPLACE FUNCTION get_next_processing_task(
+    server_id VARCHAR(255),
+    server_capabilities JSONB DEFAULT '{}'
+)
+RETURNS TABLE(
+    task_id INTEGER,
+    document_id INTEGER,
+    task_type VARCHAR(50),
+    file_path TEXT,
+    company_id VARCHAR(255),
+    processing_options JSONB,
+    lane VARCHAR(20)
+) AS $$
+DECLARE
+    -- Workers that renew leases with their heartbeat send lease_seconds; others keep 30 minutes
+    lock_duration INTERVAL := COALESCE(
+        make_interval(secs => (server_capabilities->>'lease_seconds')::INTEGER),
+        INTERVAL '30 minutes'
+    );
+    selected_task_id INTEGER;
+    preferred_kinds TEXT[];
+    max_streak INTEGER := COALESCE((server_capabilities->>'max_affinity_streak')::INTEGER, 8);
+    max_wait INTERVAL := make_interval(secs => COALESCE((server_capabilities->>'max_affinity_wait_seconds')::INTEGER, 600));
+    share_window INTERVAL := make_interval(secs => COALESCE((server_capabilities->>'fair_share_window_seconds')::INTEGER, 3600));
+    total_slots INTEGER;
+    running_tasks INTEGER;
+BEGIN
+    -- Expired leases are released by the backend's lease sweeper, not on every claim
+
+    IF COALESCE((server_capabilities->>'affinity_streak')::INTEGER, 0) >= max_streak THEN
+        -- The current run of same-model tasks is long enough: let the other kind go first
+        preferred_kinds := ARRAY(
+            SELECT kind FROM unnest(ARRAY['vision', 'text']) AS kind
+            WHERE kind IS DISTINCT FROM server_capabilities->>'affinity_kind'
+        );
+    ELSE
+        preferred_kinds := ARRAY(
+            SELECT jsonb_array_elements_text(COALESCE(server_capabilities->'resident_model_kinds', '[]'::JSONB))
+        );
+    END IF;
+
+    -- GPU slots of live servers (tasks their pollers run at once); without registered servers
+    -- reservations are not enforced
+    SELECT SUM(ps.max_concurrent_tasks) INTO total_slots
+    FROM processing_servers ps
+    WHERE ps.status = 'active' AND ps.last_heartbeat > CURRENT_TIMESTAMP - INTERVAL '2 minutes';
+    SELECT COUNT(*) INTO running_tasks FROM processing_queue WHERE status = 'processing';
+
+    -- Find the next available task (without locking yet)
+    WITH usage AS (
+        -- GPU seconds per lane and submitter within the fair-share window, running tasks included
+        SELECT
+            pq.lane,
+            COALESCE(pq.submitted_by, 0) AS submitted_by,
+            SUM(EXTRACT(EPOCH FROM (COALESCE(pq.completed_at, CURRENT_TIMESTAMP) - pq.started_at))) AS seconds
+        FROM processing_queue pq
+        WHERE pq.started_at > CURRENT_TIMESTAMP - share_window
+        GROUP BY pq.lane, COALESCE(pq.submitted_by, 0)
+    ),
+    lanes AS (
+        SELECT
+            l.lane,
+            l.reserved_slots,
+            (SELECT COUNT(*) FROM processing_queue pq WHERE pq.lane = l.lane AND pq.status = 'processing') AS running,
+            COALESCE((SELECT SUM(u.seconds) FROM usage u WHERE u.lane = l.lane), 0) / l.weight AS weighted_seconds
+        FROM processing_queue_lanes l
+    ),
+    open_lanes AS (
+        -- A lane may start a task if a slot stays free for every other lane's unused reservation;
+        -- reservations are capped below the total, so one slot is always open to every lane
+        SELECT x.lane, x.weighted_seconds
+        FROM lanes x
+        WHERE total_slots IS NULL
+        OR total_slots - running_tasks - (
+            SELECT COALESCE(SUM(GREATEST(LEAST(y.reserved_slots, total_slots - 1) - y.running, 0)), 0)
+            FROM lanes y WHERE y.lane <> x.lane
+        ) >= 1
+    )
+    SELECT pq.id INTO selected_task_id
+    FROM processing_queue pq
+    JOIN open_lanes ol ON ol.lane = pq.lane
+    LEFT JOIN usage su ON su.lane = pq.lane AND su.submitted_by = COALESCE(pq.submitted_by, 0)
+    WHERE
+        pq.status IN ('queued', 'retry')
+        AND (pq.next_retry_at IS NULL OR pq.next_retry_at <= CURRENT_TIMESTAMP)
+        AND pq.locked_by IS NULL
+        -- Check dependencies separately to avoid LEFT JOIN issues
+        AND NOT EXISTS (
+            SELECT 1 FROM task_dependencies td
+            WHERE td.dependent_task_id = pq.id
+            AND EXISTS (
+                SELECT 1 FROM processing_queue dep
+                WHERE dep.id = td.depends_on_task_id
+                AND dep.status != 'completed'
+            )
+        )
+    ORDER BY
+        -- Weighted fair share across lanes, then priority, then fair share across submitters
+        ol.weighted_seconds ASC,
+        pq.priority DESC,
+        COALESCE(su.seconds, 0) ASC,
+        -- Tasks that waited longer than the bound are not passed over for affinity
+        (pq.created_at < CURRENT_TIMESTAMP - max_wait) DESC,
+        (task_model_kind(pq.task_type) = ANY(preferred_kinds)) DESC,
+        pq.created_at ASC
+    LIMIT 1;
+
+    -- If no task found, return empty
+    IF selected_task_id IS NULL THEN
+        RETURN;
+    END IF;
+
+    -- Lock and update the selected task
+    UPDATE processing_queue
+    SET
+        locked_by = server_id,
+        locked_at = CURRENT_TIMESTAMP,
+        lock_expires_at = CURRENT_TIMESTAMP + lock_duration,
+        status = 'processing',
+        started_at = CASE WHEN started_at IS NULL THEN CURRENT_TIMESTAMP ELSE started_at END
+    WHERE id = selected_task_id
+    AND locked_by IS NULL  -- Double-check it's still unlocked
+    RETURNING
+        processing_queue.id,
+        processing_queue.document_id,
+        processing_queue.task_type,
+        processing_queue.file_path,
+        processing_queue.company_id,
+        processing_queue.processing_options,
+        processing_queue.lane
+    INTO task_id, document_id, task_type, file_path, company_id, processing_options, lane;
+
+    -- Return the task if we successfully locked it
+    IF task_id IS NOT NULL THEN
+        RETURN NEXT;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
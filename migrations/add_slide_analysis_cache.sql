@@ -0,0 +1,36 @@
+-- Migration: Perceptual-hash slide analysis cache
+-- Created: 2026-10-18
+-- Purpose: Reuse slide descriptions and slide feedback across a company's decks and deck
+--          versions. Entries are keyed by the company, the slide's 64-bit dHash, the md5 of
+--          its PDF text layer, a 256-bit dHash, the vision model and the md5 of the prompt.
+--          The 64-bit hash is also stored as four 16-bit bands so optional near-duplicate
+--          lookups (Hamming distance <= 3) stay on indexes. Written by the GPU server
+--          (gpu_processing/utils/slide_cache.py).
+
+CREATE TABLE IF NOT EXISTS slide_analysis_cache (
+    id SERIAL PRIMARY KEY,
+    kind VARCHAR(20) NOT NULL,              -- 'description' or 'feedback'
+    company_id VARCHAR(255) NOT NULL,       -- Results are only reused within the company that uploaded the slide
+    slide_hash BIGINT NOT NULL,             -- dHash as signed 64-bit integer
+    text_hash VARCHAR(32) NOT NULL DEFAULT '',  -- md5 of the normalized text layer, '' for image-only pages
+    detail_hash CHAR(64) NOT NULL,          -- 256-bit dHash (hex), tells apart slides sharing a template
+    hash_band_0 INTEGER NOT NULL,
+    hash_band_1 INTEGER NOT NULL,
+    hash_band_2 INTEGER NOT NULL,
+    hash_band_3 INTEGER NOT NULL,
+    vision_model VARCHAR(255) NOT NULL,
+    prompt_hash CHAR(32) NOT NULL,
+    result TEXT,                            -- description, or feedback text (NULL when the slide is OK)
+    has_issues BOOLEAN,
+    analysis_route VARCHAR(20),             -- text / vision_with_text / vision for descriptions
+    hit_count INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_used_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT uq_slide_analysis_cache_entry UNIQUE (kind, company_id, slide_hash, vision_model, prompt_hash, text_hash, detail_hash)
+);
+
+CREATE INDEX IF NOT EXISTS idx_slide_analysis_cache_band_0 ON slide_analysis_cache (kind, company_id, vision_model, prompt_hash, hash_band_0);
+CREATE INDEX IF NOT EXISTS idx_slide_analysis_cache_band_1 ON slide_analysis_cache (kind, company_id, vision_model, prompt_hash, hash_band_1);
+CREATE INDEX IF NOT EXISTS idx_slide_analysis_cache_band_2 ON slide_analysis_cache (kind, company_id, vision_model, prompt_hash, hash_band_2);
+CREATE INDEX IF NOT EXISTS idx_slide_analysis_cache_band_3 ON slide_analysis_cache (kind, company_id, vision_model, prompt_hash, hash_band_3);
+CREATE INDEX IF NOT EXISTS idx_slide_analysis_cache_last_used ON slide_analysis_cache (last_used_at);
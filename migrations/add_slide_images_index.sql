@@ -0,0 +1,39 @@
+-- Migration: Add slide image index
+-- Created: 2026-10-18
+-- Purpose: Record slide image paths at generation time so the slide-image endpoint
+--          resolves files with one indexed lookup instead of crawling the shared volume
+
+CREATE TABLE IF NOT EXISTS slide_images (
+    id SERIAL PRIMARY KEY,
+    document_id INTEGER NOT NULL REFERENCES project_documents(id) ON DELETE CASCADE,
+    slide_number INTEGER,
+    slide_filename VARCHAR(255) NOT NULL,
+    slide_image_path TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT uq_slide_images_document_filename UNIQUE (document_id, slide_filename)
+);
+
+-- Backfill from cached visual analysis (newest cache entry wins per slide)
+INSERT INTO slide_images (document_id, slide_number, slide_filename, slide_image_path, created_at)
+SELECT DISTINCT ON (vac.document_id, regexp_replace(page->>'slide_image_path', '^.*/', ''))
+    vac.document_id,
+    NULLIF(page->>'page_number', '')::int,
+    regexp_replace(page->>'slide_image_path', '^.*/', ''),
+    page->>'slide_image_path',
+    vac.created_at
+FROM visual_analysis_cache vac
+CROSS JOIN LATERAL jsonb_array_elements(
+    CASE
+        WHEN jsonb_typeof(vac.analysis_result_json::jsonb -> 'visual_analysis_results') = 'array'
+        THEN vac.analysis_result_json::jsonb -> 'visual_analysis_results'
+        ELSE '[]'::jsonb
+    END
+) AS page
+-- Explicit text cast: the column is TEXT before convert_analysis_json_columns_to_jsonb.sql and JSONB after
+WHERE vac.analysis_result_json::text LIKE '{%'
+AND COALESCE(page->>'slide_image_path', '') <> ''
+ORDER BY vac.document_id, regexp_replace(page->>'slide_image_path', '^.*/', ''), vac.created_at DESC
+ON CONFLICT (document_id, slide_filename) DO NOTHING;
+
+COMMENT ON TABLE slide_images IS 'Index of slide image files on the shared volume, written when visual analysis is cached';
+COMMENT ON COLUMN slide_images.slide_image_path IS 'Path relative to {SHARED_FILESYSTEM_MOUNT_PATH}/projects, e.g. company/analysis/deck/slide_1.jpg';
@@ -0,0 +1,91 @@
+-- Migration: Checkpointed, resumable GPU tasks
+-- Created: 2026-10-18
+-- Purpose: visual_analysis and extractions_and_template persist every finished page
+--          description and question answer, keyed by task and attempt. A task requeued by
+--          cleanup_expired_locks() or retry_failed_task() resumes from these checkpoints
+--          instead of redoing completed work. attempt_count counts how often a task was
+--          picked up; retry_failed_task(task_id, false) discards the checkpoints, and
+--          cleanup_failed_task_checkpoints() those of tasks that will not be retried.
+
+ALTER TABLE processing_queue ADD COLUMN IF NOT EXISTS attempt_count INTEGER NOT NULL DEFAULT 0;
+
+CREATE TABLE IF NOT EXISTS task_checkpoints (
+    id SERIAL PRIMARY KEY,
+    processing_queue_id INTEGER NOT NULL REFERENCES processing_queue(id) ON DELETE CASCADE,
+    attempt INTEGER NOT NULL DEFAULT 1,     -- attempt_count of the task when the item finished
+    stage VARCHAR(50) NOT NULL,             -- 'visual_page' or 'question'
+    item_key VARCHAR(100) NOT NULL,         -- page number or question id
+    fingerprint VARCHAR(64),                -- slide key / question context hash of the inputs
+    payload JSONB NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT uq_task_checkpoints_item UNIQUE (processing_queue_id, stage, item_key)
+);
+
+-- Every transition into 'processing' is a new attempt
+CREATE OR REPLACE FUNCTION count_task_attempt()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.status = 'processing' AND OLD.status IS DISTINCT FROM 'processing' THEN
+        NEW.attempt_count := COALESCE(OLD.attempt_count, 0) + 1;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_processing_queue_attempt ON processing_queue;
+CREATE TRIGGER trg_processing_queue_attempt
+    BEFORE UPDATE OF status ON processing_queue
+    FOR EACH ROW EXECUTE FUNCTION count_task_attempt();
+
+-- Retry a failed task; by default it resumes from its checkpoints
+DROP FUNCTION IF EXISTS retry_failed_task(INTEGER);
+CREATE OR REPLACE FUNCTION retry_failed_task(task_id INTEGER, resume BOOLEAN DEFAULT TRUE)
+RETURNS BOOLEAN AS $$
+DECLARE
+    requeued BOOLEAN;
+BEGIN
+    UPDATE processing_queue 
+    SET 
+        status = 'retry',
+        retry_count = retry_count + 1,
+        next_retry_at = CURRENT_TIMESTAMP + (INTERVAL '5 minutes' * POWER(2, retry_count)), -- Exponential backoff
+        locked_by = NULL,
+        locked_at = NULL,
+        lock_expires_at = NULL
+    WHERE 
+        id = task_id 
+        AND status = 'failed'
+        AND retry_count < max_retries;
+    -- The DELETE below resets FOUND
+    requeued := FOUND;
+    
+    IF requeued AND NOT resume THEN
+        DELETE FROM task_checkpoints WHERE processing_queue_id = task_id;
+    END IF;
+        
+    RETURN requeued;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Drop the checkpoints of failed tasks that will not be retried: out of retries, or older
+-- than the window in which retry_failed_tasks picks failed tasks up
+CREATE OR REPLACE FUNCTION cleanup_failed_task_checkpoints(max_age_hours INTEGER DEFAULT 24)
+RETURNS INTEGER AS $$
+DECLARE
+    deleted_count INTEGER;
+BEGIN
+    DELETE FROM task_checkpoints tc
+    USING processing_queue pq
+    WHERE pq.id = tc.processing_queue_id
+    AND pq.status = 'failed'
+    AND (
+        pq.retry_count >= pq.max_retries
+        OR pq.created_at <= CURRENT_TIMESTAMP - make_interval(hours => max_age_hours)
+    );
+    
+    GET DIAGNOSTICS deleted_count = ROW_COUNT;
+    RETURN deleted_count;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON TABLE task_checkpoints IS 'Finished items of in-flight GPU tasks, reused when a task is retried';
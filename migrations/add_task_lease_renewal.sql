@@ -0,0 +1,29 @@
+-- Migration: Heartbeat lease renewal for processing queue tasks
+-- Created: 2026-10-18
+-- Purpose: Claims lock tasks for a short lease (lease_seconds in the worker's capabilities,
+--          e.g. 120s) instead of a fixed 30 minutes. Workers renew the leases of their
+--          in-flight tasks with every /internal/server-heartbeat via renew_task_leases().
+--          cleanup_expired_locks() no longer runs inside each claim; the backend calls it
+--          from a scheduled sweep, so a dead worker's tasks are requeued within about a
+--          lease plus one sweep interval.
+--          The claim function itself, which reads lease_seconds and no longer cleans up
+--          expired locks, is defined once in add_queue_lanes.sql. Migrations run in filename
+--          order, so a definition here would replace the lanes version.
+
+-- Extend the leases of the given tasks held by a server; returns the tasks still held
+CREATE OR REPLACE FUNCTION renew_task_leases(
+    server_id VARCHAR(255),
+    task_ids INTEGER[],
+    lease_seconds INTEGER
+)
+RETURNS TABLE(task_id INTEGER) AS $$
+BEGIN
+    RETURN QUERY
+    UPDATE processing_queue pq
+    SET lock_expires_at = CURRENT_TIMESTAMP + make_interval(secs => lease_seconds)
+    WHERE pq.id = ANY(task_ids)
+    AND pq.locked_by = server_id
+    AND pq.status = 'processing'
+    RETURNING pq.id;
+END;
+$$ LANGUAGE plpgsql;
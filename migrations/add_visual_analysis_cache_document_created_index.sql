@@ -0,0 +1,10 @@
+-- Migration: Composite index for the latest cached visual analysis per document
+-- Created: 2026-10-18
+-- Purpose: Cached visual analysis is fetched for a whole batch of decks with one
+--          SELECT DISTINCT ON (document_id) ... ORDER BY document_id, created_at DESC.
+--          This index lets Postgres read the newest entry of each document directly.
+
+CREATE INDEX IF NOT EXISTS idx_visual_analysis_cache_document_created
+ON visual_analysis_cache(document_id, created_at DESC);
+
+ANALYZE visual_analysis_cache;
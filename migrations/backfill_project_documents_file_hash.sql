@@ -0,0 +1,16 @@
+-- Migration: Backfill file_hash for existing project documents
+-- Created: 2026-10-18
+-- Purpose: Dojo ingestion used to keep the SHA-256 only inside extracted_data and
+--          matched duplicates with a LIKE scan. Copy it into the indexed file_hash
+--          column so duplicate checks become index lookups.
+
+-- A regular expression avoids failing on rows whose extracted_data is not valid JSON
+UPDATE project_documents
+SET file_hash = substring(extracted_data FROM '"file_hash":\s*"([0-9a-f]{64})"')
+WHERE file_hash IS NULL
+  AND extracted_data LIKE '%"file_hash"%';
+
+-- Dojo duplicate detection also matches on the original file name
+CREATE INDEX IF NOT EXISTS idx_project_documents_project_file_name ON project_documents(project_id, file_name);
+
+ANALYZE project_documents;
@@ -0,0 +1,35 @@
+-- Migration: Store large analysis JSON columns as JSONB
+-- Created: 2026-10-18
+-- Purpose: visual_analysis_cache.analysis_result_json and the extraction_experiments
+--          *_results_json columns hold multi-hundred-KB JSON documents as TEXT, so every
+--          reader parsed the whole document. JSONB is stored pre-parsed and TOAST-compressed,
+--          lets queries read single fields (->, jsonb_array_length) without shipping the
+--          document, and psycopg2 decodes it natively. Writers keep sending JSON strings.
+--          Measure before/after with backend/scripts/benchmark_analysis_json_storage.py.
+
+BEGIN;
+
+-- Rows that are not valid JSON are kept as a JSON string instead of failing the conversion
+CREATE OR REPLACE FUNCTION pg_temp.to_jsonb_lenient(value TEXT) RETURNS JSONB AS $$
+BEGIN
+    RETURN value::jsonb;
+EXCEPTION WHEN others THEN
+    RETURN to_jsonb(value);
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
+
+ALTER TABLE visual_analysis_cache
+    ALTER COLUMN analysis_result_json TYPE JSONB USING pg_temp.to_jsonb_lenient(analysis_result_json);
+
+ALTER TABLE extraction_experiments
+    ALTER COLUMN results_json TYPE JSONB USING pg_temp.to_jsonb_lenient(results_json),
+    ALTER COLUMN classification_results_json TYPE JSONB USING pg_temp.to_jsonb_lenient(classification_results_json),
+    ALTER COLUMN company_name_results_json TYPE JSONB USING pg_temp.to_jsonb_lenient(company_name_results_json),
+    ALTER COLUMN funding_amount_results_json TYPE JSONB USING pg_temp.to_jsonb_lenient(funding_amount_results_json),
+    ALTER COLUMN deck_date_results_json TYPE JSONB USING pg_temp.to_jsonb_lenient(deck_date_results_json),
+    ALTER COLUMN template_processing_results_json TYPE JSONB USING pg_temp.to_jsonb_lenient(template_processing_results_json);
+
+COMMIT;
+
+ANALYZE visual_analysis_cache;
+ANALYZE extraction_experiments;